@@ -3,7 +3,7 @@ Base agent configuration and setup using LangChain
 """
 from typing import List, Dict, Any, Optional
 from langchain.agents import AgentExecutor, create_openai_functions_agent
-from langchain.memory import ConversationBufferMemory
+from langchain_core.messages import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.tools import Tool
 from langchain_anthropic import ChatAnthropic
@@ -13,6 +13,56 @@ import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
 from backend.shared.config import settings
+from backend.shared.integrations.complexity_classifier import ComplexityClassifier
+from backend.shared.integrations.litellm_router import get_litellm_router
+from .checkpoint import ApprovalRequired
+from .memory import create_conversation_memory
+from .usage_tracking import TokenUsageCallbackHandler
+
+
+# Model IDs per provider: "default" for general steps, "fast" for simple extractions
+MODEL_TIERS = {
+    "anthropic": {
+        "default": "claude-3-5-sonnet-20241022",
+        "fast": "claude-3-haiku-20240307"
+    },
+    "openai": {
+        "default": "gpt-4-turbo-preview",
+        "fast": "gpt-3.5-turbo"
+    },
+    "bedrock": {
+        "default": "anthropic.claude-3-5-sonnet-20241022-v2:0",
+        "fast": "anthropic.claude-3-haiku-20240307-v1:0"
+    }
+}
+
+# LiteLLM router model groups per provider and tier (used for hedged tool-less steps)
+ROUTER_MODELS = {
+    "anthropic": {
+        "default": "claude-3-5-sonnet",
+        "fast": "claude-3-haiku"
+    },
+    "openai": {
+        "default": "gpt-4",
+        "fast": "gpt-3.5"
+    }
+}
+
+# LangChain message types -> chat roles
+MESSAGE_ROLES = {"human": "user", "ai": "assistant", "system": "system"}
+
+# Older langchain-anthropic releases have no default_headers field and would send
+# the prompt-caching beta header as a request body parameter instead
+ANTHROPIC_SUPPORTS_HEADERS = "default_headers" in (
+    getattr(ChatAnthropic, "model_fields", None) or ChatAnthropic.__fields__
+)
+
+complexity_classifier = ComplexityClassifier(model_path=settings.complexity_model_path)
+
+
+def anthropic_prompt_caching() -> bool:
+    """Whether prompt caching is enabled and the installed ChatAnthropic can request it"""
+    return settings.anthropic_prompt_caching_enabled and ANTHROPIC_SUPPORTS_HEADERS
 
 
 class BaseAgent:
@@ -25,7 +75,10 @@ class BaseAgent:
         system_prompt: str,
         tools: List[Tool],
         llm_provider: Optional[str] = None,
-        memory_enabled: bool = True
+        memory_enabled: bool = True,
+        complexity_routing: Optional[bool] = None,
+        memory_config: Optional[Dict[str, Any]] = None,
+        hedge: Optional[bool] = None
     ):
         """
         Initialize the agent
@@ -35,63 +88,187 @@ class BaseAgent:
             tools: List of LangChain tools available to the agent
             llm_provider: LLM provider ('anthropic', 'openai', 'bedrock')
             memory_enabled: Whether to enable conversation memory
+            complexity_routing: Run simple extraction inputs on the fast model
+                (defaults to settings.complexity_routing_enabled)
+            memory_config: Workflow memory settings (strategy, max_token_limit)
+            hedge: Run tool-less steps through the LiteLLM router, hedging slow
+                calls to the fallback model (defaults to settings.llm_hedging_enabled)
         """
         self.system_prompt = system_prompt
         self.tools = tools
         self.llm_provider = llm_provider or settings.default_llm_provider
         self.memory_enabled = memory_enabled
+        self.complexity_routing = (
+            settings.complexity_routing_enabled if complexity_routing is None else complexity_routing
+        )
+        self.hedge = settings.llm_hedging_enabled if hedge is None else hedge
 
         # Initialize LLM
         self.llm = self._initialize_llm()
+        self._fast_llm = None
 
-        # Initialize memory
+        # Initialize memory (older turns are summarized by the fast model)
         self.memory = None
         if memory_enabled:
-            self.memory = ConversationBufferMemory(
-                memory_key="chat_history",
-                return_messages=True
-            )
+            self.memory = create_conversation_memory(self._get_fast_llm, memory_config)
 
-        # Create agent executor
+        # Create agent executor (fast-tier executor is built on first use)
         self.agent_executor = self._create_agent_executor()
+        self._executors = {"default": self.agent_executor}
+
+    def _initialize_llm(self, tier: str = "default"):
+        """Initialize the LLM based on provider and model tier"""
+        if self.llm_provider not in MODEL_TIERS:
+            raise ValueError(f"Unsupported LLM provider: {self.llm_provider}")
+
+        model_id = MODEL_TIERS[self.llm_provider][tier]
 
-    def _initialize_llm(self):
-        """Initialize the LLM based on provider"""
         if self.llm_provider == "anthropic":
+            llm_kwargs = {}
+            if anthropic_prompt_caching():
+                llm_kwargs["default_headers"] = {"anthropic-beta": "prompt-caching-2024-07-31"}
+
             return ChatAnthropic(
-                model="claude-3-5-sonnet-20241022",
+                model=model_id,
                 anthropic_api_key=settings.anthropic_api_key,
-                temperature=0
+                temperature=0,
+                **llm_kwargs
             )
         elif self.llm_provider == "openai":
             return ChatOpenAI(
-                model="gpt-4-turbo-preview",
+                model=model_id,
                 openai_api_key=settings.openai_api_key,
                 temperature=0
             )
-        elif self.llm_provider == "bedrock":
+        else:
             # AWS Bedrock integration
             from langchain_aws import ChatBedrock
             return ChatBedrock(
-                model_id="anthropic.claude-3-5-sonnet-20241022-v2:0",
+                model_id=model_id,
                 region_name=settings.aws_region
             )
-        else:
-            raise ValueError(f"Unsupported LLM provider: {self.llm_provider}")
 
-    def _create_agent_executor(self) -> AgentExecutor:
+    def _get_fast_llm(self):
+        """Get the fast-tier LLM, initializing it on first use"""
+        if self._fast_llm is None:
+            self._fast_llm = self._initialize_llm("fast")
+        return self._fast_llm
+
+    def get_memory_metrics(self) -> Optional[Dict[str, Any]]:
+        """Get conversation memory metrics, if the memory tracks them"""
+        if self.memory is not None and hasattr(self.memory, "get_metrics"):
+            return self.memory.get_metrics()
+        return None
+
+    def _select_executor(self, input_text: str):
+        """
+        Pick the executor for an input based on its estimated complexity
+
+        Returns:
+            Tuple of (AgentExecutor, model tier)
+        """
+        tier = self._select_tier(input_text)
+        if tier not in self._executors:
+            self._executors[tier] = self._create_agent_executor(self._get_fast_llm())
+
+        return self._executors[tier], tier
+
+    def _select_tier(self, input_text: str) -> str:
+        """Model tier for an input: "fast" for low-complexity inputs when routing is on"""
+        if not self.complexity_routing:
+            return "default"
+
+        # Only the user input: the system prompt is the same for every step and would dominate the features
+        messages = [{"role": "user", "content": input_text}]
+        complexity = complexity_classifier.classify(messages, tool_count=len(self.tools))
+
+        if settings.complexity_record_path:
+            complexity_classifier.record(messages, len(self.tools), complexity, settings.complexity_record_path)
+
+        return "fast" if complexity == "low" else "default"
+
+    def _uses_router(self) -> bool:
+        """
+        Whether runs go through the LiteLLM router instead of the agent executor
+
+        Only tool-less steps qualify: they are a single completion, which the
+        router can hedge. Tool calls stay on the LangChain agent.
+        """
+        return self.hedge and not self.tools and self.llm_provider in ROUTER_MODELS
+
+    async def _arouted_execute(self, input_text: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run a tool-less step as one (hedged) router completion"""
+        tier = self._select_tier(input_text)
+        history = []
+        if self.memory:
+            history = self.memory.load_memory_variables({"input": input_text}).get("chat_history", [])
+
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            *({"role": MESSAGE_ROLES.get(message.type, "user"), "content": message.content} for message in history),
+            {"role": "user", "content": self._format_context(context) + input_text}
+        ]
+        result = await get_litellm_router().acomplete(
+            messages, model=ROUTER_MODELS[self.llm_provider][tier], temperature=0, hedge=True
+        )
+        if result.get("status") == "failed":
+            return {
+                "success": False,
+                "error": result.get("error"),
+                "output": None
+            }
+
+        if self.memory:
+            self.memory.save_context({"input": input_text}, {"output": result["content"]})
+
+        usage = result.get("usage") or {}
+        return {
+            "success": True,
+            "output": result["content"],
+            "intermediate_steps": [],
+            "model_tier": tier,
+            "usage": {
+                "llm_calls": 1,
+                "input_tokens": usage.get("prompt_tokens", 0),
+                "output_tokens": usage.get("completion_tokens", 0),
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 0
+            },
+            "memory": self.get_memory_metrics(),
+            "hedged": result.get("hedged", False)
+        }
+
+    def _system_message(self):
+        """
+        Build the system message, marked as a cacheable prefix on Anthropic
+
+        Anthropic caches everything up to the breakpoint, and tool definitions
+        precede the system prompt, so one breakpoint here covers both.
+        """
+        if self.llm_provider == "anthropic" and anthropic_prompt_caching():
+            return SystemMessage(content=[
+                {
+                    "type": "text",
+                    "text": self.system_prompt,
+                    "cache_control": {"type": "ephemeral"}
+                }
+            ])
+
+        return ("system", self.system_prompt)
+
+    def _create_agent_executor(self, llm=None) -> AgentExecutor:
         """Create the agent executor with tools and memory"""
         # Create prompt template
         prompt = ChatPromptTemplate.from_messages([
-            ("system", self.system_prompt),
+            self._system_message(),
             MessagesPlaceholder(variable_name="chat_history", optional=True),
-            ("human", "{input}"),
+            ("human", "{prefetched_context}{input}"),
             MessagesPlaceholder(variable_name="agent_scratchpad")
-        ])
+        ]).partial(prefetched_context="")
 
         # Create agent
         agent = create_openai_functions_agent(
-            llm=self.llm,
+            llm=llm or self.llm,
             tools=self.tools,
             prompt=prompt
         )
@@ -109,24 +286,64 @@ class BaseAgent:
 
         return AgentExecutor(**executor_kwargs)
 
-    def execute(self, input_text: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    @staticmethod
+    def _format_context(context: Optional[Dict[str, Any]]) -> str:
+        """
+        Render prefetched context ahead of the user input
+
+        It goes in the human turn rather than the system prompt so the cached
+        system prefix stays identical across runs; memory stores only the
+        raw input.
+        """
+        sections = []
+        for name, value in (context or {}).items():
+            if not value:
+                continue
+            if isinstance(value, (list, tuple)):
+                value = "\n".join(f"- {item}" for item in value)
+            sections.append(f"{name.replace('_', ' ').capitalize()}:\n{value}")
+
+        if not sections:
+            return ""
+        return "Context retrieved for this request:\n\n" + "\n\n".join(sections) + "\n\nRequest:\n"
+
+    def execute(
+        self,
+        input_text: str,
+        context: Optional[Dict[str, Any]] = None,
+        callbacks: Optional[List[Any]] = None
+    ) -> Dict[str, Any]:
         """
         Execute the agent with the given input
 
         Args:
             input_text: User input
-            context: Additional context for the agent
+            context: Prefetched context (e.g. memories, documents) shown with the input
+            callbacks: Extra callback handlers for the run (e.g. checkpointing)
 
         Returns:
             Dictionary with agent output and metadata
+
+        Raises:
+            ApprovalRequired: If an approval tool suspended the run
         """
         try:
-            result = self.agent_executor.invoke({"input": input_text})
+            executor, tier = self._select_executor(input_text)
+            usage_handler = TokenUsageCallbackHandler()
+            result = executor.invoke(
+                {"input": input_text, "prefetched_context": self._format_context(context)},
+                config={"callbacks": [usage_handler, *(callbacks or [])]}
+            )
             return {
                 "success": True,
                 "output": result.get("output", ""),
-                "intermediate_steps": result.get("intermediate_steps", [])
+                "intermediate_steps": result.get("intermediate_steps", []),
+                "model_tier": tier,
+                "usage": usage_handler.usage,
+                "memory": self.get_memory_metrics()
             }
+        except ApprovalRequired:
+            raise
         except Exception as e:
             return {
                 "success": False,
@@ -134,24 +351,46 @@ class BaseAgent:
                 "output": None
             }
 
-    async def aexecute(self, input_text: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def aexecute(
+        self,
+        input_text: str,
+        context: Optional[Dict[str, Any]] = None,
+        callbacks: Optional[List[Any]] = None
+    ) -> Dict[str, Any]:
         """
         Async execute the agent with the given input
 
         Args:
             input_text: User input
-            context: Additional context for the agent
+            context: Prefetched context (e.g. memories, documents) shown with the input
+            callbacks: Extra callback handlers for the run (e.g. checkpointing)
 
         Returns:
             Dictionary with agent output and metadata
+
+        Raises:
+            ApprovalRequired: If an approval tool suspended the run
         """
         try:
-            result = await self.agent_executor.ainvoke({"input": input_text})
+            if self._uses_router():
+                return await self._arouted_execute(input_text, context)
+
+            executor, tier = self._select_executor(input_text)
+            usage_handler = TokenUsageCallbackHandler()
+            result = await executor.ainvoke(
+                {"input": input_text, "prefetched_context": self._format_context(context)},
+                config={"callbacks": [usage_handler, *(callbacks or [])]}
+            )
             return {
                 "success": True,
                 "output": result.get("output", ""),
-                "intermediate_steps": result.get("intermediate_steps", [])
+                "intermediate_steps": result.get("intermediate_steps", []),
+                "model_tier": tier,
+                "usage": usage_handler.usage,
+                "memory": self.get_memory_metrics()
             }
+        except ApprovalRequired:
+            raise
         except Exception as e:
             return {
                 "success": False,
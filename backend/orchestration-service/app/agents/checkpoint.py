@@ -0,0 +1,176 @@
+"""
+Agent run checkpoints for workflows that pause for human approval
+"""
+import asyncio
+import hashlib
+import json
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Any, List, Optional, Tuple
+from langchain_core.agents import AgentAction
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tools import BaseTool
+
+# Tool output kept per step in a checkpoint
+MAX_STEP_OUTPUT_CHARS = 2000
+
+
+def tool_input_text(tool_input: Any) -> str:
+    """
+    Normalized text of a tool call's input
+
+    A single-input call may be wrapped as {"__arg1": ...}; other dict inputs
+    are serialized with sorted keys so argument order does not matter.
+    """
+    if isinstance(tool_input, dict) and len(tool_input) == 1:
+        tool_input = next(iter(tool_input.values()))
+    if isinstance(tool_input, dict):
+        tool_input = json.dumps(tool_input, sort_keys=True, default=str)
+    return " ".join(str(tool_input).split())
+
+
+def approval_key(node_id: str, request: str) -> str:
+    """Key binding a decision to one approval node and the exact request it was given for"""
+    digest = hashlib.sha256(tool_input_text(request).encode()).hexdigest()[:16]
+    return f"{node_id}:{digest}"
+
+
+class ApprovalRequired(Exception):
+    """
+    Raised by an approval tool to suspend the agent run
+
+    It propagates out of the agent executor (it is not a ToolException), so
+    the run ends and the worker persists a checkpoint instead of waiting.
+    """
+
+    def __init__(
+        self,
+        node_id: str,
+        message: str,
+        data: Optional[Dict[str, Any]] = None,
+        config: Optional[Dict[str, Any]] = None,
+        key: Optional[str] = None
+    ):
+        super().__init__(f"Approval required at node {node_id}")
+        self.node_id = node_id
+        self.message = message
+        self.data = data or {}
+        self.config = config or {}
+        self.key = key or node_id
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "node_id": self.node_id,
+            "key": self.key,
+            "message": self.message,
+            "data": self.data,
+            "config": self.config
+        }
+
+
+class CheckpointCallbackHandler(BaseCallbackHandler):
+    """
+    Records the tool calls an agent run completed, so a resumed run can be
+    told what already happened instead of repeating side effects
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._action: Optional[Dict[str, Any]] = None
+        self.steps: List[Dict[str, Any]] = []
+
+    def on_agent_action(self, action: AgentAction, *, run_id: Any, **kwargs: Any) -> None:
+        with self._lock:
+            self._action = {"tool": action.tool, "tool_input": action.tool_input}
+
+    def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        with self._lock:
+            if self._action is not None:
+                self.steps.append({**self._action, "output": str(output)[:MAX_STEP_OUTPUT_CHARS]})
+                self._action = None
+
+
+def format_steps(steps: List[Dict[str, Any]]) -> List[str]:
+    """Render checkpointed steps for the resumed run's context"""
+    return [f"{step['tool']}({step['tool_input']}) -> {step['output']}" for step in steps]
+
+
+class CompletedSteps:
+    """
+    Answers repeated tool calls of a resumed run from its checkpoint
+
+    A resumed run restarts the agent, which may call tools it already
+    called before the suspension. Each checkpointed call is replayed once
+    (same tool, same input) with its recorded output instead of running the
+    tool again, so side effects such as sent emails are not repeated.
+    """
+
+    def __init__(self, steps: Optional[List[Dict[str, Any]]] = None):
+        self._lock = threading.Lock()
+        self._tools: Dict[str, BaseTool] = {}
+        self._outputs: Dict[Tuple[str, str], deque] = defaultdict(deque)
+        for step in steps or []:
+            self._outputs[self._key(step["tool"], step["tool_input"])].append(step)
+
+    def _key(self, tool: str, tool_input: Any) -> Tuple[str, str]:
+        """
+        Replay key for a call: the input is parsed by the tool's args_schema
+        (as the tool run does) before normalizing, so a recorded call matches
+        the arguments the wrapped function receives
+        """
+        base_tool = self._tools.get(tool)
+        if base_tool is not None:
+            try:
+                tool_input = base_tool._parse_input(tool_input)
+            except Exception:
+                pass  # Invalid for the schema; the raw input is the best key
+        return tool, tool_input_text(tool_input)
+
+    def take(self, tool: str, tool_input: Any) -> Optional[str]:
+        """Recorded output for this call, consumed once, or None if it was not completed before"""
+        with self._lock:
+            steps = self._outputs.get(self._key(tool, tool_input))
+            if not steps:
+                return None
+            return steps.popleft()["output"]
+
+    def unused(self) -> List[Dict[str, Any]]:
+        """Checkpointed steps the resumed run has not repeated (still to be kept in the checkpoint)"""
+        with self._lock:
+            return [step for steps in self._outputs.values() for step in steps]
+
+    def wrap(self, tools: List[BaseTool]) -> List[BaseTool]:
+        """Tools that replay completed calls and run only new ones"""
+        with self._lock:
+            self._tools.update({tool.name: tool for tool in tools})
+            # Re-key recorded calls now that their tools' schemas are known
+            steps = [step for steps in self._outputs.values() for step in steps]
+            self._outputs = defaultdict(deque)
+            for step in steps:
+                self._outputs[self._key(step["tool"], step["tool_input"])].append(step)
+        return [self._wrap(tool) for tool in tools]
+
+    def _wrap(self, tool: BaseTool) -> BaseTool:
+        """
+        Copy of the tool with its functions wrapped
+
+        The copy keeps the tool's class and args_schema, so structured tools
+        are still called with keyword arguments.
+        """
+        def call_input(args: Tuple, kwargs: Dict[str, Any]) -> Any:
+            return args[0] if len(args) == 1 and not kwargs else kwargs
+
+        def func(*args: Any, **kwargs: Any) -> Any:
+            output = self.take(tool.name, call_input(args, kwargs))
+            return output if output is not None else tool.func(*args, **kwargs)
+
+        async def coroutine(*args: Any, **kwargs: Any) -> Any:
+            output = self.take(tool.name, call_input(args, kwargs))
+            if output is not None:
+                return output
+            if tool.coroutine is not None:
+                return await tool.coroutine(*args, **kwargs)
+            return await asyncio.to_thread(tool.func, *args, **kwargs)
+
+        # copy() would drop the exclude=True fields (callbacks, metadata...)
+        return type(tool)(**{**tool.__dict__, "func": func, "coroutine": coroutine})
@@ -0,0 +1,116 @@
+"""
+Conversation memory for agents
+"""
+from functools import lru_cache
+from typing import Dict, Any, Optional
+from langchain.memory import ConversationBufferMemory, ConversationSummaryBufferMemory
+from langchain_core.memory import BaseMemory
+from langchain_core.messages import get_buffer_string
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
+from backend.shared.config import settings
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except ImportError:
+        return None
+    except Exception as e:
+        # The encoding is downloaded on first use; offline hosts count words instead
+        print(f"tiktoken encoding unavailable, counting words: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens locally, without asking the model provider
+    Uses tiktoken when its encoding is available, otherwise whitespace-delimited words
+    """
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return len(text.split())
+
+
+class TrackedSummaryBufferMemory(ConversationSummaryBufferMemory):
+    """
+    Token-window memory that keeps recent turns verbatim up to max_token_limit
+    and rolls older turns into a running summary, tracking prompt tokens saved
+
+    Tokens are counted locally, so pruning never calls the provider's token
+    counting endpoint.
+    """
+
+    pruned_tokens: int = 0
+    summaries_written: int = 0
+
+    def prune(self) -> None:
+        """Roll turns beyond the token window into the summary"""
+        buffer = self.chat_memory.messages
+        sizes = [count_tokens(get_buffer_string([message])) for message in buffer]
+        remaining = sum(sizes)
+        if remaining <= self.max_token_limit:
+            return
+
+        pruned = []
+        while buffer and remaining > self.max_token_limit:
+            pruned.append(buffer.pop(0))
+            remaining -= sizes[len(pruned) - 1]
+
+        self.moving_summary_buffer = self.predict_new_summary(pruned, self.moving_summary_buffer)
+        self.pruned_tokens += sum(sizes) - remaining
+        self.summaries_written += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get memory window metrics"""
+        summary_tokens = count_tokens(self.moving_summary_buffer) if self.moving_summary_buffer else 0
+        return {
+            "strategy": "summary_buffer",
+            "max_token_limit": self.max_token_limit,
+            "pruned_tokens": self.pruned_tokens,
+            # Tokens the next prompt saves versus sending the unbounded history
+            "prompt_tokens_saved": max(0, self.pruned_tokens - summary_tokens),
+            "summaries_written": self.summaries_written
+        }
+
+
+def create_conversation_memory(
+    summary_llm_factory,
+    memory_config: Optional[Dict[str, Any]] = None
+) -> BaseMemory:
+    """
+    Create agent conversation memory from a workflow's memory settings
+
+    Args:
+        summary_llm_factory: Callable returning the (cheap) LLM used for summaries
+        memory_config: Workflow "memory" settings: strategy ("buffer" or
+            "summary_buffer") and max_token_limit
+
+    Returns:
+        LangChain memory instance
+    """
+    memory_config = memory_config or {}
+    strategy = memory_config.get("strategy", settings.agent_memory_strategy)
+
+    if strategy == "buffer":
+        return ConversationBufferMemory(
+            memory_key="chat_history",
+            input_key="input",
+            return_messages=True
+        )
+
+    if strategy != "summary_buffer":
+        raise ValueError(f"Unsupported memory strategy: {strategy}")
+
+    return TrackedSummaryBufferMemory(
+        llm=summary_llm_factory(),
+        max_token_limit=memory_config.get("max_token_limit", settings.agent_memory_max_tokens),
+        memory_key="chat_history",
+        input_key="input",
+        return_messages=True
+    )
@@ -1,9 +1,11 @@
 """
 Factory for creating LangChain tools from workflow node definitions
 """
-from typing import List, Dict, Any, Callable, Optional
+import re
+from typing import List, Dict, Any, Awaitable, Callable, Optional, Tuple
 from langchain_core.tools import Tool
 from pydantic import BaseModel, Field
+from .checkpoint import ApprovalRequired, approval_key
 
 
 class EmailToolInput(BaseModel):
@@ -31,6 +33,10 @@ class HTTPToolInput(BaseModel):
     password: Optional[str] = Field(default=None, description="Password for basic auth")
 
 
+# Node types create_tools_from_workflow turns into tools
+TOOL_NODE_TYPES = frozenset({"email", "slack", "http", "google_calendar", "hubspot", "humanApproval", "knowledge_base"})
+
+
 class ToolFactory:
     """
     Factory class for creating LangChain tools from workflow configurations
@@ -284,13 +290,211 @@ class ToolFactory:
         )
 
     @staticmethod
-    def create_tools_from_workflow(workflow_data: Dict[str, Any], credentials: Dict[str, Any]) -> List[Tool]:
+    def create_approval_tool(
+        node_id: str,
+        config: Dict[str, Any],
+        decisions: Optional[Dict[str, Dict[str, Any]]] = None,
+        name: str = "request_human_approval"
+    ) -> Tool:
+        """
+        Create a human approval gate
+
+        A decision applies only to the request it was given for (node plus
+        a hash of the request text) and is consumed by the first call that
+        uses it; any other request suspends the run (ApprovalRequired) for
+        a new decision.
+
+        Args:
+            node_id: Approval node ID in the workflow
+            config: Node configuration (label, message, approver_user_id, approver_email, expires_in_hours)
+            decisions: Unused decisions from earlier runs of this execution, keyed by approval_key()
+            name: Tool name
+
+        Returns:
+            LangChain Tool instance
+        """
+        decisions = decisions if decisions is not None else {}
+        label = config.get("label") or "Human approval"
+
+        def request_approval(request: str) -> str:
+            """Ask a human to approve an action"""
+            key = approval_key(node_id, request)
+            decision = decisions.pop(key, None)
+            if decision is None:
+                raise ApprovalRequired(
+                    node_id,
+                    message=config.get("message") or request,
+                    data={"request": request},
+                    config=config,
+                    key=key
+                )
+
+            notes = f" Notes: {decision['notes']}" if decision.get("notes") else ""
+            if decision["status"] == "approved":
+                return f"Approved by the reviewer.{notes}"
+            return f"Rejected by the reviewer; do not perform the action.{notes}"
+
+        return Tool(
+            name=name,
+            description=(
+                f"{label}: request human approval before acting. Input: a description of the action "
+                "and the details the reviewer needs. Returns the reviewer's decision."
+            ),
+            func=request_approval
+        )
+
+    @staticmethod
+    def create_knowledge_base_tool(
+        config: Dict[str, Any],
+        name: str = "search_knowledge_base",
+        context: Optional[Dict[str, Any]] = None
+    ) -> Tool:
+        """
+        Create a knowledge base retrieval tool
+
+        Returns only the most relevant snippets, trimmed to a token budget,
+        so documents don't have to be pasted into the prompt. Namespaces may
+        be templates such as "tenant-{tenant}", filled from the execution
+        context; a list of namespaces (e.g. shared + private) is searched
+        concurrently and merged. Only the caller's own tenant-/user-
+        namespaces and the shared allowlist (rag_shared_namespaces) may be
+        searched.
+
+        Args:
+            config: Node configuration (namespace or namespaces, filter, top_k, max_context_tokens, description)
+            name: Tool name (unique per workflow)
+            context: Values for namespace templates (user_id, tenant)
+
+        Returns:
+            LangChain Tool instance
+        """
+        search, asearch = ToolFactory.create_knowledge_base_search(config, context)
+
+        def search_knowledge_base(query: str) -> str:
+            """Search the knowledge base"""
+            try:
+                return search(query) or "No relevant documents found."
+            except Exception as e:
+                return f"Error searching knowledge base: {str(e)}"
+
+        async def asearch_knowledge_base(query: str) -> str:
+            """Search the knowledge base without blocking the event loop"""
+            try:
+                return await asearch(query) or "No relevant documents found."
+            except Exception as e:
+                return f"Error searching knowledge base: {str(e)}"
+
+        return Tool(
+            name=name,
+            description=config.get("description") or (
+                "Search the knowledge base for passages relevant to a question. "
+                "Input should be a focused search query."
+            ),
+            func=search_knowledge_base,
+            coroutine=asearch_knowledge_base
+        )
+
+    @staticmethod
+    def create_knowledge_base_search(
+        config: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Callable[[str], str], Callable[[str], Awaitable[str]]]:
+        """
+        Create sync and async knowledge base search functions for a node
+
+        Each returns the formatted snippets, or an empty string when nothing
+        matches. Errors are raised to the caller.
+
+        Args:
+            config: Node configuration (see create_knowledge_base_tool)
+            context: Values for namespace templates (user_id, tenant)
+
+        Returns:
+            (search, asearch) functions taking a query
+        """
+        import sys
+        import os
+        sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
+        from backend.shared.config import settings
+        from backend.shared.integrations.vector_rag import get_rag_system
+        from backend.shared.integrations.rag_namespaces import authorize_namespaces
+
+        top_k = int(config.get("top_k") or settings.rag_tool_top_k)
+        max_context_tokens = int(config.get("max_context_tokens") or settings.rag_tool_max_context_tokens)
+        search_kwargs = {"top_k": top_k, "filter": config.get("filter") or None}
+
+        namespaces = config.get("namespaces") or [config.get("namespace") or ""]
+        if isinstance(namespaces, str):
+            namespaces = [namespaces]
+        try:
+            # An unresolved placeholder must fail rather than fall back to a shared namespace
+            namespaces = [namespace.format(**(context or {})) for namespace in namespaces]
+        except KeyError as e:
+            raise ValueError(f"Knowledge base namespace references unknown context value: {e}")
+        # Names are client-supplied, so a literal foreign tenant namespace is refused here
+        namespaces = authorize_namespaces(
+            namespaces,
+            context,
+            shared_namespaces=[namespace.strip() for namespace in settings.rag_shared_namespaces.split(",") if namespace.strip()],
+            allow_default=settings.rag_default_namespace_shared
+        )
+
+        rag_system = get_rag_system()
+        if len(namespaces) > 1:
+            retrieve = lambda query: rag_system.search_namespaces(query, namespaces, **search_kwargs)
+            aretrieve = lambda query: rag_system.asearch_namespaces(query, namespaces, **search_kwargs)
+        else:
+            search_kwargs["namespace"] = namespaces[0]
+            retrieve = lambda query: rag_system.search(query, **search_kwargs)
+            aretrieve = lambda query: rag_system.asearch(query, **search_kwargs)
+
+        def format_results(results: List[Dict[str, Any]]) -> str:
+            """Format snippets within the context budget (~4 characters per token)"""
+            if not results:
+                return ""
+
+            budget = max_context_tokens * 4
+            snippets = []
+            for index, result in enumerate(results, start=1):
+                source = result.get("metadata", {}).get("source")
+                header = f"[{index}] ({source})" if source else f"[{index}]"
+                snippet = f"{header} {result.get('text', '').strip()}"
+
+                if len(snippet) > budget:
+                    if not snippets:
+                        snippets.append(snippet[:budget])
+                    break
+                snippets.append(snippet)
+                budget -= len(snippet) + 2
+
+            return "\n\n".join(snippets)
+
+        def search(query: str) -> str:
+            return format_results(retrieve(query))
+
+        async def asearch(query: str) -> str:
+            return format_results(await aretrieve(query))
+
+        return search, asearch
+
+    @staticmethod
+    def has_tool_nodes(workflow_data: Dict[str, Any]) -> bool:
+        """Whether create_tools_from_workflow would create any tools (without building them)"""
+        return any(node.get("type") in TOOL_NODE_TYPES for node in workflow_data.get("nodes", []))
+
+    @staticmethod
+    def create_tools_from_workflow(
+        workflow_data: Dict[str, Any],
+        credentials: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None
+    ) -> List[Tool]:
         """
         Create a list of tools based on workflow definition
 
         Args:
             workflow_data: Workflow data containing node definitions
             credentials: User credentials for various services
+            context: Execution context (user_id, tenant) for per-tenant tools
 
         Returns:
             List of LangChain Tool instances
@@ -312,5 +516,31 @@ class ToolFactory:
                 tools.append(ToolFactory.create_google_calendar_tool(credentials.get("google", {})))
             elif node_type == "hubspot":
                 tools.append(ToolFactory.create_hubspot_tool(credentials.get("hubspot", {})))
+            elif node_type == "humanApproval":
+                tools.append(ToolFactory.create_approval_tool(
+                    node.get("id"),
+                    node_data,
+                    decisions=(context or {}).get("approvals"),
+                    name=ToolFactory._unique_tool_name("request_human_approval", {tool.name for tool in tools})
+                ))
+            elif node_type == "knowledge_base":
+                tools.append(ToolFactory.create_knowledge_base_tool(
+                    node_data,
+                    name=ToolFactory._unique_tool_name(
+                        f"search_{node_data.get('name') or 'knowledge_base'}",
+                        {tool.name for tool in tools}
+                    ),
+                    context=context
+                ))
 
         return tools
+
+    @staticmethod
+    def _unique_tool_name(name: str, taken: set) -> str:
+        """Sanitize a tool name and suffix it if already used in this workflow"""
+        base = re.sub(r"[^a-zA-Z0-9_-]+", "_", name).strip("_").lower()[:60] or "tool"
+        candidate, suffix = base, 2
+        while candidate in taken:
+            candidate = f"{base}_{suffix}"
+            suffix += 1
+        return candidate
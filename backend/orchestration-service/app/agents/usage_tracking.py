@@ -0,0 +1,63 @@
+"""
+Token usage tracking for agent runs
+"""
+import threading
+from typing import Dict, Any
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+
+class TokenUsageCallbackHandler(BaseCallbackHandler):
+    """
+    Accumulates token usage across every LLM call of a single agent run,
+    including Anthropic prompt-cache reads and writes
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.usage = {
+            "llm_calls": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0
+        }
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        """Add the usage reported for one LLM call"""
+        usage = self._extract_usage(response)
+
+        with self._lock:
+            self.usage["llm_calls"] += 1
+            for key, value in usage.items():
+                self.usage[key] += value
+
+    def _extract_usage(self, response: LLMResult) -> Dict[str, int]:
+        """Normalize Anthropic and OpenAI usage payloads"""
+        llm_output = response.llm_output or {}
+        raw = llm_output.get("usage") or llm_output.get("token_usage")
+
+        if raw is None:
+            # Newer LangChain versions report usage on the message instead
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    metadata = getattr(message, "response_metadata", None) or {}
+                    raw = metadata.get("usage") or metadata.get("token_usage")
+                    if raw:
+                        break
+                if raw:
+                    break
+
+        if raw is None:
+            return {}
+
+        if not isinstance(raw, dict):
+            raw = raw.dict() if hasattr(raw, "dict") else vars(raw)
+
+        return {
+            "input_tokens": raw.get("input_tokens", raw.get("prompt_tokens")) or 0,
+            "output_tokens": raw.get("output_tokens", raw.get("completion_tokens")) or 0,
+            "cache_creation_input_tokens": raw.get("cache_creation_input_tokens") or 0,
+            "cache_read_input_tokens": raw.get("cache_read_input_tokens") or 0
+        }
@@ -2,14 +2,17 @@
 Orchestration API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from uuid import UUID
+import json
 import sys
 import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
 from backend.shared.auth import get_current_user_id
+from backend.shared.config import settings
 from ..services.orchestration_service import OrchestrationService
 
 router = APIRouter(prefix="/orchestration", tags=["orchestration"])
@@ -18,6 +21,14 @@ router = APIRouter(prefix="/orchestration", tags=["orchestration"])
 class WorkflowExecutionRequest(BaseModel):
     workflow_data: Dict[str, Any]
     input_data: Dict[str, Any]
+    hedge: Optional[bool] = None  # Hedge slow tool-less steps to the fallback model (defaults to settings)
+
+
+class BatchExecutionRequest(BaseModel):
+    workflow_data: Dict[str, Any]
+    inputs: List[Dict[str, Any]]
+    max_concurrency: Optional[int] = None
+    mode: str = "interactive"  # interactive, provider_batch
 
 
 class WorkflowValidationRequest(BaseModel):
@@ -37,7 +48,8 @@ async def execute_workflow(
     result = await OrchestrationService.execute_workflow(
         workflow_data=request.workflow_data,
         input_data=request.input_data,
-        user_id=UUID(current_user_id)
+        user_id=UUID(current_user_id),
+        hedge=request.hedge
     )
 
     if result["status"] == "failed":
@@ -49,6 +61,93 @@ async def execute_workflow(
     return result
 
 
+@router.post("/execute-batch")
+async def execute_batch(
+    request: BatchExecutionRequest,
+    current_user_id: str = Depends(get_current_user_id)
+):
+    """
+    Execute a workflow over many inputs
+
+    Interactive mode streams per-item results as NDJSON while they complete.
+    Provider batch mode submits tool-less workflows to the LLM provider's
+    batch API and returns a batch ID to poll.
+    """
+    if len(request.inputs) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch exceeds the maximum of {settings.batch_max_items} inputs"
+        )
+
+    if request.mode == "provider_batch":
+        try:
+            return await OrchestrationService.submit_provider_batch(
+                workflow_data=request.workflow_data,
+                inputs=request.inputs,
+                user_id=UUID(current_user_id)
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if request.mode != "interactive":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported batch mode: {request.mode}"
+        )
+
+    # Setup failures get an error status; once streaming starts the status is sent
+    try:
+        records = await OrchestrationService.execute_batch(
+            workflow_data=request.workflow_data,
+            inputs=request.inputs,
+            user_id=UUID(current_user_id),
+            max_concurrency=request.max_concurrency
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch setup failed: {str(e)}"
+        )
+
+    async def stream_results():
+        async for record in records:
+            yield json.dumps(record, default=str) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@router.get("/batches/{batch_id}")
+def get_provider_batch(
+    batch_id: str,
+    current_user_id: str = Depends(get_current_user_id)
+):
+    """
+    Get the status of a provider batch job
+    """
+    if not OrchestrationService.owns_provider_batch(batch_id, UUID(current_user_id)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Batch not found")
+
+    return OrchestrationService.get_provider_batch(batch_id)
+
+
+@router.get("/batches/{batch_id}/results")
+def get_provider_batch_results(
+    batch_id: str,
+    current_user_id: str = Depends(get_current_user_id)
+):
+    """
+    Stream the results of an ended provider batch job as NDJSON
+    """
+    if not OrchestrationService.owns_provider_batch(batch_id, UUID(current_user_id)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Batch not found")
+
+    def stream_results():
+        for record in OrchestrationService.iter_provider_batch_results(batch_id):
+            yield json.dumps(record, default=str) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
 @router.post("/validate")
 def validate_workflow(request: WorkflowValidationRequest):
     """
@@ -1,15 +1,26 @@
 """
 Orchestration service for executing workflows with LangChain agents
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator, Iterator, Optional
 from uuid import UUID
+import asyncio
 import sys
 import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
 from ..agents.base_agent import BaseAgent
+from ..agents.checkpoint import ApprovalRequired, CheckpointCallbackHandler, CompletedSteps, format_steps
 from ..agents.tool_factory import ToolFactory
 from backend.shared.aws_utils import secrets_manager
+from backend.shared.config import settings
+from backend.shared.integrations.llm_batch import get_batch_client, get_batch_owners
+from backend.shared.integrations.memory_buffer import get_memory_buffer
+from backend.shared.integrations.memory_systems import get_memory_system, ZepMemorySystem
+
+DEFAULT_SYSTEM_PROMPT = (
+    "You are a helpful AI assistant that helps users automate their workflows. "
+    "Use the available tools to complete the user's request."
+)
 
 
 class OrchestrationService:
@@ -21,7 +32,9 @@ class OrchestrationService:
     async def execute_workflow(
         workflow_data: Dict[str, Any],
         input_data: Dict[str, Any],
-        user_id: UUID
+        user_id: UUID,
+        checkpoint: Optional[Dict[str, Any]] = None,
+        hedge: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         Execute a workflow using LangChain agents
@@ -30,43 +43,57 @@ class OrchestrationService:
             workflow_data: The workflow definition (React Flow nodes/edges)
             input_data: Input data for the workflow
             user_id: User ID for retrieving credentials
+            checkpoint: State of a run suspended for approval (steps, approvals) to resume from
+            hedge: Hedge tool-less steps through the LiteLLM router (defaults to
+                workflow_data["hedge"], then settings.llm_hedging_enabled)
 
         Returns:
-            Execution result with output and logs
+            Execution result with output and logs; status "awaiting_approval"
+            with approval and checkpoint if an approval node suspended the run
         """
         execution_logs = []
+        prefetch = None
+        checkpoint = checkpoint or {}
+        checkpoint_handler = CheckpointCallbackHandler()
+        completed_steps = CompletedSteps(checkpoint.get("steps"))
 
         try:
+            user_input = input_data.get("input", "Please execute the workflow")
+            tool_context = OrchestrationService._tool_context(user_id)
+            # Approval tools consume the decisions they use from this copy
+            tool_context["approvals"] = dict(checkpoint.get("approvals", {}))
+
+            # Memory and knowledge base lookups only need the input, so they run
+            # while credentials are fetched and the agent is built
+            if settings.context_prefetch_enabled:
+                prefetch = asyncio.create_task(OrchestrationService._prefetch_context(
+                    workflow_data, user_input, user_id, input_data, tool_context, execution_logs
+                ))
+
             # Retrieve user credentials from AWS Secrets Manager
-            credentials = {}
-            if secrets_manager:
-                try:
-                    credentials = secrets_manager.get_secret(f"user/{user_id}/credentials")
-                except Exception as e:
-                    execution_logs.append({
-                        "level": "warning",
-                        "message": f"Could not retrieve credentials: {str(e)}"
-                    })
+            credentials = await asyncio.to_thread(
+                OrchestrationService._get_credentials, user_id, execution_logs
+            )
 
             # Create tools from workflow definition
-            tools = ToolFactory.create_tools_from_workflow(workflow_data, credentials)
+            tools = ToolFactory.create_tools_from_workflow(workflow_data, credentials, tool_context)
+            if checkpoint:
+                # Calls completed before the suspension return their recorded output instead of running again
+                tools = completed_steps.wrap(tools)
 
             execution_logs.append({
                 "level": "info",
                 "message": f"Created {len(tools)} tools for workflow execution"
             })
 
-            # Extract system prompt from workflow or use default
-            system_prompt = workflow_data.get("system_prompt",
-                "You are a helpful AI assistant that helps users automate their workflows. "
-                "Use the available tools to complete the user's request."
-            )
-
             # Create agent
             agent = BaseAgent(
-                system_prompt=system_prompt,
+                system_prompt=workflow_data.get("system_prompt", DEFAULT_SYSTEM_PROMPT),
                 tools=tools,
-                memory_enabled=True
+                memory_enabled=True,
+                memory_config=workflow_data.get("memory"),
+                hedge=workflow_data.get("hedge") if hedge is None else hedge,
+                complexity_routing=workflow_data.get("complexity_routing")
             )
 
             execution_logs.append({
@@ -74,9 +101,28 @@ class OrchestrationService:
                 "message": "Agent initialized, starting execution"
             })
 
+            context = await OrchestrationService._await_prefetch(prefetch, execution_logs)
+            if checkpoint:
+                context = {**(context or {}), **OrchestrationService._resume_context(checkpoint)}
+
             # Execute workflow
-            user_input = input_data.get("input", "Please execute the workflow")
-            result = await agent.aexecute(user_input)
+            try:
+                result = await agent.aexecute(user_input, context=context, callbacks=[checkpoint_handler])
+            except ApprovalRequired as approval:
+                execution_logs.append({
+                    "level": "info",
+                    "message": f"Waiting for approval at node {approval.node_id}"
+                })
+                return {
+                    "status": "awaiting_approval",
+                    "approval": approval.to_dict(),
+                    "checkpoint": {
+                        "steps": completed_steps.unused() + checkpoint_handler.steps,
+                        "approvals": tool_context["approvals"]
+                    },
+                    "output": None,
+                    "logs": execution_logs
+                }
 
             if result["success"]:
                 execution_logs.append({
@@ -84,11 +130,20 @@ class OrchestrationService:
                     "message": "Workflow completed successfully"
                 })
 
+                if (workflow_data.get("memory") or {}).get("long_term"):
+                    OrchestrationService._remember_exchange(
+                        user_id, input_data, user_input, result["output"], execution_logs
+                    )
+
                 return {
                     "status": "completed",
                     "output": result["output"],
                     "logs": execution_logs,
-                    "intermediate_steps": result.get("intermediate_steps", [])
+                    "intermediate_steps": result.get("intermediate_steps", []),
+                    "model_tier": result.get("model_tier"),
+                    "usage": result.get("usage", {}),
+                    "memory": result.get("memory"),
+                    "hedged": result.get("hedged", False)
                 }
             else:
                 execution_logs.append({
@@ -104,6 +159,8 @@ class OrchestrationService:
                 }
 
         except Exception as e:
+            if prefetch is not None:
+                prefetch.cancel()
             execution_logs.append({
                 "level": "error",
                 "message": f"Unexpected error: {str(e)}"
@@ -116,6 +173,303 @@ class OrchestrationService:
                 "logs": execution_logs
             }
 
+    @staticmethod
+    def _get_credentials(user_id: UUID, execution_logs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Retrieve user credentials, logging a warning if they are unavailable"""
+        if not secrets_manager:
+            return {}
+
+        try:
+            return secrets_manager.get_secret(f"user/{user_id}/credentials")
+        except Exception as e:
+            execution_logs.append({
+                "level": "warning",
+                "message": f"Could not retrieve credentials: {str(e)}"
+            })
+            return {}
+
+    @staticmethod
+    async def _prefetch_context(
+        workflow_data: Dict[str, Any],
+        user_input: str,
+        user_id: UUID,
+        input_data: Dict[str, Any],
+        tool_context: Dict[str, Any],
+        execution_logs: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Retrieve long-term memories and knowledge base passages for the input
+
+        Memory is searched when the workflow enables long_term memory;
+        knowledge_base nodes are searched unless their config sets
+        prefetch to false. Lookups run concurrently and a failed lookup
+        is logged and left out.
+        """
+        lookups = {}
+
+        if (workflow_data.get("memory") or {}).get("long_term"):
+            session_id = OrchestrationService._session_id(user_id, input_data)
+            lookups["memories"] = asyncio.to_thread(
+                OrchestrationService._search_memory, user_input, str(user_id), session_id
+            )
+
+        for node in workflow_data.get("nodes", []):
+            node_data = node.get("data", {})
+            if node.get("type") != "knowledge_base" or node_data.get("prefetch") is False:
+                continue
+            try:
+                _, asearch = ToolFactory.create_knowledge_base_search(node_data, tool_context)
+            except (ValueError, PermissionError):
+                # Tool construction reports the same configuration error
+                continue
+            lookups[f"documents_{len(lookups)}"] = asearch(user_input)
+
+        results = await asyncio.gather(*lookups.values(), return_exceptions=True)
+
+        context = {"memories": [], "documents": []}
+        for key, result in zip(lookups, results):
+            if isinstance(result, Exception):
+                execution_logs.append({
+                    "level": "warning",
+                    "message": f"Context prefetch failed ({key.split('_')[0]}): {str(result)}"
+                })
+            elif key == "memories":
+                context["memories"] = result
+            elif result:
+                context["documents"].append(result)
+
+        context["documents"] = "\n\n".join(context["documents"])
+        return context
+
+    @staticmethod
+    def _search_memory(query: str, user_id: str, session_id: str) -> List[str]:
+        """Search the configured memory backend, returning memory texts"""
+        memory_system = get_memory_system()
+        limit = settings.context_prefetch_memory_limit
+
+        if isinstance(memory_system, ZepMemorySystem):
+            # Zep memory is per session: its summary plus the matching messages
+            summary = memory_system.get_memory(session_id).get("summary")
+            results = memory_system.search_memory(session_id, query, limit=limit)
+            return ([summary] if summary else []) + [result["content"] for result in results]
+
+        results = memory_system.search_memory(query, user_id=user_id, limit=limit)
+        return [result.get("memory") or result.get("content", "") for result in results]
+
+    @staticmethod
+    async def _await_prefetch(
+        prefetch: Optional[asyncio.Task],
+        execution_logs: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Wait for prefetched context within the budget; run without it otherwise"""
+        if prefetch is None:
+            return None
+
+        try:
+            return await asyncio.wait_for(prefetch, timeout=settings.context_prefetch_timeout_seconds)
+        except asyncio.TimeoutError:
+            execution_logs.append({
+                "level": "warning",
+                "message": "Context prefetch timed out; continuing without it"
+            })
+            return None
+
+    @staticmethod
+    def _remember_exchange(
+        user_id: UUID,
+        input_data: Dict[str, Any],
+        user_input: str,
+        output: str,
+        execution_logs: List[Dict[str, Any]]
+    ):
+        """Queue the exchange for long-term memory; the write happens off the request path"""
+        session_id = OrchestrationService._session_id(user_id, input_data)
+        try:
+            buffer = get_memory_buffer()
+            backend = buffer.memory_system
+            if hasattr(backend, "add_memory"):
+                buffer.add_memory(
+                    f"User: {user_input}\nAssistant: {output}",
+                    user_id=str(user_id),
+                    metadata={"session_id": session_id},
+                    session_id=session_id
+                )
+            if hasattr(backend, "add_message"):
+                buffer.add_message(session_id, "user", user_input)
+                buffer.add_message(session_id, "assistant", output)
+        except Exception as e:
+            execution_logs.append({
+                "level": "warning",
+                "message": f"Could not queue long-term memory: {str(e)}"
+            })
+
+    @staticmethod
+    def _session_id(user_id: UUID, input_data: Dict[str, Any]) -> str:
+        """Memory session for a run, scoped to the user so a client-chosen session_id cannot reach another user's"""
+        session_id = input_data.get("session_id")
+        return f"{user_id}:{session_id}" if session_id else str(user_id)
+
+    @staticmethod
+    def _resume_context(checkpoint: Dict[str, Any]) -> Dict[str, Any]:
+        """Tell a resumed run what it already did and what reviewers decided (each decision applies to the quoted request only)"""
+        decisions = [
+            f"{decision.get('request', key)!r}: {decision['status']}" + (f" ({decision['notes']})" if decision.get("notes") else "")
+            for key, decision in checkpoint.get("approvals", {}).items()
+        ]
+        return {
+            "steps_completed_before_approval": format_steps(checkpoint.get("steps", [])),
+            "approval_decisions": decisions
+        }
+
+    @staticmethod
+    def _tool_context(user_id: UUID) -> Dict[str, Any]:
+        """Context for per-tenant tool configuration (each user is its own tenant)"""
+        return {"user_id": str(user_id), "tenant": str(user_id)}
+
+    @staticmethod
+    async def execute_batch(
+        workflow_data: Dict[str, Any],
+        inputs: List[Dict[str, Any]],
+        user_id: UUID,
+        max_concurrency: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute one workflow over many inputs with a single shared agent
+
+        Credentials, tools and the agent are built once, before this returns,
+        so setup errors are raised to the caller instead of ending a stream
+        that has already started. Items run with bounded concurrency and are
+        yielded as soon as each one finishes, followed by a final summary record.
+
+        Args:
+            workflow_data: The workflow definition (React Flow nodes/edges)
+            inputs: Input data for each item
+            user_id: User ID for retrieving credentials
+            max_concurrency: Maximum items in flight (defaults to settings)
+
+        Returns:
+            Iterator of per-item result records, then a summary record
+        """
+        execution_logs = []
+        credentials = await asyncio.to_thread(
+            OrchestrationService._get_credentials, user_id, execution_logs
+        )
+        tools = ToolFactory.create_tools_from_workflow(
+            workflow_data, credentials, OrchestrationService._tool_context(user_id)
+        )
+
+        # Items are independent, so conversation memory is not shared between them
+        agent = BaseAgent(
+            system_prompt=workflow_data.get("system_prompt", DEFAULT_SYSTEM_PROMPT),
+            tools=tools,
+            memory_enabled=False,
+            # Batches are throughput work; hedging would only add duplicate calls
+            hedge=False,
+            complexity_routing=workflow_data.get("complexity_routing")
+        )
+        return OrchestrationService._run_batch(agent, inputs, max_concurrency, execution_logs)
+
+    @staticmethod
+    async def _run_batch(
+        agent: BaseAgent,
+        inputs: List[Dict[str, Any]],
+        max_concurrency: Optional[int],
+        execution_logs: List[Dict[str, Any]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Run batch items on a built agent, yielding records as they finish"""
+        concurrency = max(1, min(max_concurrency or settings.batch_max_concurrency, len(inputs) or 1))
+        pending_items = iter(enumerate(inputs))
+        results = asyncio.Queue()
+
+        async def run_items():
+            # Workers share one iterator, so each item is taken exactly once
+            # Every item puts exactly one record, or the consumer below would wait forever
+            for index, input_data in pending_items:
+                try:
+                    user_input = input_data.get("input", "Please execute the workflow")
+                    result = await agent.aexecute(user_input)
+                except ApprovalRequired as approval:
+                    # Batch items cannot be suspended; run approval workflows as executions
+                    result = {"success": False, "error": f"Approval required at node {approval.node_id}"}
+                except Exception as e:
+                    result = {"success": False, "error": f"Unexpected error: {str(e)}"}
+
+                item = {
+                    "type": "item",
+                    "index": index,
+                    "status": "completed" if result.get("success") else "failed",
+                    "output": result.get("output"),
+                    "usage": result.get("usage") or {}
+                }
+                if not result.get("success"):
+                    item["error"] = result.get("error")
+
+                await results.put(item)
+
+        workers = [asyncio.create_task(run_items()) for _ in range(concurrency)]
+        summary = {"type": "summary", "total": len(inputs), "completed": 0, "failed": 0, "usage": {}, "logs": execution_logs}
+
+        try:
+            for _ in range(len(inputs)):
+                item = await results.get()
+                summary[item["status"]] += 1
+                for key, value in item["usage"].items():
+                    summary["usage"][key] = summary["usage"].get(key, 0) + value
+                yield item
+        finally:
+            # Stop remaining work if the client goes away mid-stream
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        yield summary
+
+    @staticmethod
+    async def submit_provider_batch(
+        workflow_data: Dict[str, Any],
+        inputs: List[Dict[str, Any]],
+        user_id: UUID
+    ) -> Dict[str, Any]:
+        """
+        Submit a non-interactive job to the provider batch API
+
+        Only tool-less workflows qualify: agent tool loops need multiple
+        round trips, which a provider batch cannot do.
+
+        Args:
+            workflow_data: The workflow definition (React Flow nodes/edges)
+            inputs: Input data for each item
+            user_id: Submitting user (the only one who can read the batch)
+
+        Returns:
+            Provider batch ID and status
+        """
+        if ToolFactory.has_tool_nodes(workflow_data):
+            raise ValueError("Provider batch mode only supports workflows without tool nodes")
+
+        batch = await asyncio.to_thread(
+            get_batch_client().submit,
+            system_prompt=workflow_data.get("system_prompt", DEFAULT_SYSTEM_PROMPT),
+            inputs=[item.get("input", "Please execute the workflow") for item in inputs]
+        )
+        await asyncio.to_thread(get_batch_owners().record, batch["batch_id"], str(user_id))
+        return batch
+
+    @staticmethod
+    def owns_provider_batch(batch_id: str, user_id: UUID) -> bool:
+        """Whether the user submitted the provider batch"""
+        return get_batch_owners().is_owner(batch_id, str(user_id))
+
+    @staticmethod
+    def get_provider_batch(batch_id: str) -> Dict[str, Any]:
+        """Get provider batch status (check owns_provider_batch first)"""
+        return get_batch_client().get_status(batch_id)
+
+    @staticmethod
+    def iter_provider_batch_results(batch_id: str) -> Iterator[Dict[str, Any]]:
+        """Stream results of an ended provider batch (check owns_provider_batch first)"""
+        return get_batch_client().iter_results(batch_id)
+
     @staticmethod
     def validate_workflow(workflow_data: Dict[str, Any]) -> Dict[str, Any]:
         """
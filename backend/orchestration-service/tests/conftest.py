@@ -0,0 +1,9 @@
+"""
+Test configuration - run from anywhere with: pytest backend/orchestration-service/tests
+"""
+import os
+import sys
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(SERVICE_DIR, '../..'))
+sys.path.insert(0, SERVICE_DIR)
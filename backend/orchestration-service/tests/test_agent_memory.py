@@ -0,0 +1,32 @@
+"""
+Tests for agent conversation memory
+"""
+from langchain.memory import ConversationBufferMemory
+from langchain.llms.fake import FakeListLLM
+
+from app.agents.memory import TrackedSummaryBufferMemory, create_conversation_memory
+
+
+def summary_llm():
+    return FakeListLLM(responses=["short summary"] * 10)
+
+
+def test_buffer_is_the_default_strategy():
+    assert isinstance(create_conversation_memory(summary_llm), ConversationBufferMemory)
+
+
+def test_summary_buffer_prunes_with_local_counts_and_reports_savings_once():
+    memory = create_conversation_memory(summary_llm, {"strategy": "summary_buffer", "max_token_limit": 20})
+    assert isinstance(memory, TrackedSummaryBufferMemory)
+
+    for turn in range(5):
+        memory.save_context({"input": f"question {turn} " + "word " * 10}, {"output": "answer " * 10})
+
+    first = memory.get_metrics()
+    memory.load_memory_variables({"input": "next"})
+    memory.load_memory_variables({"input": "next"})
+
+    assert first["summaries_written"] >= 1
+    assert first["prompt_tokens_saved"] > 0
+    assert memory.get_metrics() == first
+    assert memory.moving_summary_buffer == "short summary"
@@ -0,0 +1,101 @@
+"""
+Tests for approval decisions and completed-step replay in resumed runs
+"""
+import asyncio
+
+import pytest
+
+from app.agents.checkpoint import ApprovalRequired, CompletedSteps, approval_key
+from app.agents.tool_factory import ToolFactory
+from langchain_core.tools import StructuredTool, Tool
+
+
+def test_undecided_request_suspends_with_its_key():
+    tool = ToolFactory.create_approval_tool("approve", {}, decisions={})
+    with pytest.raises(ApprovalRequired) as raised:
+        tool.func("Send the invoice to ACME")
+    assert raised.value.key == approval_key("approve", "Send the invoice to ACME")
+
+
+def test_decision_applies_to_its_own_request_once():
+    key = approval_key("approve", "Send the invoice to ACME")
+    decisions = {key: {"status": "approved", "notes": None}}
+    tool = ToolFactory.create_approval_tool("approve", {}, decisions=decisions)
+
+    assert tool.func("Send  the invoice to ACME").startswith("Approved")
+    assert decisions == {}
+
+    # The same decision cannot approve a second call...
+    with pytest.raises(ApprovalRequired):
+        tool.func("Send the invoice to ACME")
+
+
+def test_decision_does_not_approve_a_different_request():
+    decisions = {approval_key("approve", "Send the invoice to ACME"): {"status": "approved", "notes": None}}
+    tool = ToolFactory.create_approval_tool("approve", {}, decisions=decisions)
+
+    with pytest.raises(ApprovalRequired):
+        tool.func("Delete the customer record")
+    assert len(decisions) == 1
+
+
+def test_decisions_are_per_node():
+    decisions = {approval_key("first", "Ship it"): {"status": "approved", "notes": None}}
+    tool = ToolFactory.create_approval_tool("second", {}, decisions=decisions)
+    with pytest.raises(ApprovalRequired):
+        tool.func("Ship it")
+
+
+def counting_tool(calls):
+    def send(text):
+        calls.append(text)
+        return f"sent {text}"
+    return Tool(name="send_email", description="Send an email", func=send)
+
+
+def test_completed_calls_are_replayed_not_repeated():
+    calls = []
+    completed = CompletedSteps([{"tool": "send_email", "tool_input": "hello", "output": "sent hello"}])
+    tool = completed.wrap([counting_tool(calls)])[0]
+
+    assert tool.func("hello") == "sent hello"
+    assert calls == []
+    # Each completed call is replayed once; a further identical call runs
+    assert tool.func("hello") == "sent hello"
+    assert calls == ["hello"]
+
+
+def test_new_calls_run_and_unused_steps_are_kept():
+    calls = []
+    steps = [
+        {"tool": "send_email", "tool_input": {"__arg1": "a"}, "output": "sent a"},
+        {"tool": "send_email", "tool_input": "b", "output": "sent b"}
+    ]
+    completed = CompletedSteps(steps)
+    tool = completed.wrap([counting_tool(calls)])[0]
+
+    assert asyncio.run(tool.coroutine("a")) == "sent a"
+    assert asyncio.run(tool.coroutine("c")) == "sent c"
+    assert calls == ["c"]
+    assert completed.unused() == [steps[1]]
+
+
+def test_structured_tools_keep_their_schema_and_replay_by_arguments():
+    calls = []
+
+    def send(to: str, subject: str) -> str:
+        calls.append((to, subject))
+        return f"sent {subject} to {to}"
+
+    original = StructuredTool.from_function(send, name="send_email", description="Send an email")
+    completed = CompletedSteps([
+        {"tool": "send_email", "tool_input": {"subject": "hi", "to": "a@x.io"}, "output": "sent hi to a@x.io"}
+    ])
+    tool = completed.wrap([original])[0]
+
+    assert isinstance(tool, StructuredTool)
+    assert tool.args_schema is original.args_schema
+    assert tool.run({"to": "a@x.io", "subject": "hi"}) == "sent hi to a@x.io"
+    assert calls == []
+    assert asyncio.run(tool.arun({"to": "b@x.io", "subject": "hi"})) == "sent hi to b@x.io"
+    assert calls == [("b@x.io", "hi")]
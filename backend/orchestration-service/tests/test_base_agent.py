@@ -0,0 +1,99 @@
+"""
+Tests for model construction and routing in BaseAgent
+"""
+import asyncio
+
+import pytest
+from langchain_anthropic import ChatAnthropic
+
+from backend.shared.config import settings
+from app.agents import base_agent
+from app.agents.base_agent import BaseAgent
+
+
+@pytest.fixture(autouse=True)
+def api_keys(monkeypatch):
+    monkeypatch.setattr(settings, "anthropic_api_key", "test-key")
+    monkeypatch.setattr(settings, "default_llm_provider", "anthropic")
+
+
+class RecordingRouter:
+    def __init__(self):
+        self.calls = []
+
+    async def acomplete(self, messages, model, **kwargs):
+        self.calls.append({"messages": messages, "model": model, **kwargs})
+        return {"content": "done", "usage": {"prompt_tokens": 3, "completion_tokens": 1}, "hedged": True}
+
+
+def test_hedged_tool_less_steps_go_through_the_router(monkeypatch):
+    router = RecordingRouter()
+    monkeypatch.setattr(base_agent, "get_litellm_router", lambda: router)
+    agent = BaseAgent("Be brief", tools=[], memory_enabled=False, hedge=True, complexity_routing=False)
+
+    result = asyncio.run(agent.aexecute("Summarize this", context={"memories": ["likes tea"]}))
+
+    assert result["success"] and result["output"] == "done" and result["hedged"] is True
+    assert router.calls[0]["model"] == "claude-3-5-sonnet" and router.calls[0]["hedge"] is True
+    assert router.calls[0]["messages"][0] == {"role": "system", "content": "Be brief"}
+    assert router.calls[0]["messages"][-1]["content"].endswith("Summarize this")
+
+
+def test_hedging_is_off_unless_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "llm_hedging_enabled", False)
+    agent = BaseAgent("Be brief", tools=[], memory_enabled=False)
+
+    assert agent._uses_router() is False
+
+
+def test_complexity_routing_is_off_unless_enabled():
+    agent = BaseAgent("Be brief", tools=[], memory_enabled=False)
+
+    assert agent.complexity_routing is False
+    assert agent._select_tier("Extract the date") == "default"
+
+
+def test_complexity_routing_classifies_only_the_user_input(monkeypatch):
+    classified = []
+    monkeypatch.setattr(
+        base_agent.complexity_classifier, "classify",
+        lambda messages, tool_count=0: classified.append(messages) or "low"
+    )
+    agent = BaseAgent("A very long system prompt " * 50, tools=[], memory_enabled=False, complexity_routing=True)
+
+    assert agent._select_tier("Extract the date") == "fast"
+    assert classified == [[{"role": "user", "content": "Extract the date"}]]
+
+
+def test_prompt_caching_is_off_by_default():
+    agent = BaseAgent("Be brief", tools=[], memory_enabled=False)
+
+    assert isinstance(agent.llm, ChatAnthropic)
+    assert "default_headers" not in agent.llm.model_kwargs
+    assert agent._system_message() == ("system", "Be brief")
+
+
+def test_prompt_caching_needs_a_chat_anthropic_with_default_headers(monkeypatch):
+    monkeypatch.setattr(settings, "anthropic_prompt_caching_enabled", True)
+    monkeypatch.setattr(base_agent, "ANTHROPIC_SUPPORTS_HEADERS", False)
+
+    agent = BaseAgent("Be brief", tools=[], memory_enabled=False)
+
+    assert "default_headers" not in agent.llm.model_kwargs
+    assert agent._system_message() == ("system", "Be brief")
+
+
+def test_prompt_caching_sends_the_beta_header_when_supported(monkeypatch):
+    monkeypatch.setattr(settings, "anthropic_prompt_caching_enabled", True)
+    monkeypatch.setattr(base_agent, "ANTHROPIC_SUPPORTS_HEADERS", True)
+    constructed = []
+
+    def chat_anthropic(**kwargs):
+        constructed.append(kwargs)
+        return ChatAnthropic(**{key: value for key, value in kwargs.items() if key != "default_headers"})
+
+    monkeypatch.setattr(base_agent, "ChatAnthropic", chat_anthropic)
+    agent = BaseAgent("Be brief", tools=[], memory_enabled=False)
+
+    assert constructed[0]["default_headers"] == {"anthropic-beta": "prompt-caching-2024-07-31"}
+    assert agent._system_message().content[0]["cache_control"] == {"type": "ephemeral"}
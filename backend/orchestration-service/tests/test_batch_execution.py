@@ -0,0 +1,105 @@
+"""
+Tests for batch execution streaming and provider batch ownership
+"""
+import asyncio
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.shared.auth import get_current_user_id
+from backend.shared.integrations import llm_batch
+from app.api import orchestration
+from app.services import orchestration_service
+from app.services.orchestration_service import OrchestrationService
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class FlakyAgent:
+    """Agent whose odd items raise instead of returning a result"""
+
+    def __init__(self, **kwargs):
+        pass
+
+    async def aexecute(self, user_input, **kwargs):
+        if int(user_input) % 2:
+            raise RuntimeError("tool crashed")
+        return {"success": True, "output": user_input, "usage": {"total_tokens": 1}}
+
+
+def collect(batch):
+    async def run():
+        return [record async for record in await batch]
+    return asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+
+def test_failing_items_are_reported_instead_of_hanging(monkeypatch):
+    monkeypatch.setattr(orchestration_service, "BaseAgent", FlakyAgent)
+    monkeypatch.setattr(OrchestrationService, "_get_credentials", staticmethod(lambda user_id, logs: {}))
+
+    records = collect(OrchestrationService.execute_batch(
+        {"nodes": []}, [{"input": str(index)} for index in range(6)], uuid.uuid4(), max_concurrency=2
+    ))
+
+    items = sorted((record for record in records if record["type"] == "item"), key=lambda record: record["index"])
+    assert [item["status"] for item in items] == ["completed", "failed"] * 3
+    assert items[1]["error"] == "Unexpected error: tool crashed"
+    assert records[-1] == {**records[-1], "type": "summary", "completed": 3, "failed": 3}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(llm_batch, "_batch_client", llm_batch.MockAnthropicBatchClient())
+    monkeypatch.setattr(llm_batch, "_batch_owners", llm_batch.BatchOwners(fakeredis.FakeRedis(decode_responses=True)))
+
+    app = FastAPI()
+    app.include_router(orchestration.router)
+    user = {"id": str(uuid.uuid4())}
+    app.dependency_overrides[get_current_user_id] = lambda: user["id"]
+    client = TestClient(app)
+    client.user = user
+    return client
+
+
+def test_batch_is_only_visible_to_its_submitter(client):
+    owner = client.user["id"]
+    response = client.post("/orchestration/execute-batch", json={
+        "workflow_data": {"nodes": []}, "inputs": [{"input": "a"}], "mode": "provider_batch"
+    })
+    batch_id = response.json()["batch_id"]
+
+    assert client.get(f"/orchestration/batches/{batch_id}").status_code == 200
+    assert client.get(f"/orchestration/batches/{batch_id}/results").status_code == 200
+
+    client.user["id"] = str(uuid.uuid4())
+    assert client.get(f"/orchestration/batches/{batch_id}").status_code == 404
+    assert client.get(f"/orchestration/batches/{batch_id}/results").status_code == 404
+
+    client.user["id"] = owner
+    assert client.get("/orchestration/batches/mock_batch_0").status_code == 404
+
+
+def test_setup_errors_fail_the_request_before_streaming(client, monkeypatch):
+    def unavailable(user_id, logs):
+        raise ConnectionError("secrets unavailable")
+    monkeypatch.setattr(OrchestrationService, "_get_credentials", staticmethod(unavailable))
+
+    response = client.post("/orchestration/execute-batch", json={
+        "workflow_data": {"nodes": []}, "inputs": [{"input": "a"}], "mode": "interactive"
+    })
+
+    assert response.status_code == 500
+    assert "secrets unavailable" in response.json()["detail"]
+
+
+def test_provider_batches_reject_knowledge_base_nodes(client):
+    response = client.post("/orchestration/execute-batch", json={
+        "workflow_data": {"nodes": [{"id": "kb", "type": "knowledge_base", "data": {"name": "docs"}}]},
+        "inputs": [{"input": "a"}],
+        "mode": "provider_batch"
+    })
+
+    assert response.status_code == 400
+    assert "tool nodes" in response.json()["detail"]
@@ -0,0 +1,76 @@
+"""
+Tests for knowledge base namespace authorization
+"""
+import pytest
+
+from backend.shared.config import settings
+from backend.shared.integrations import vector_rag
+from backend.shared.integrations.rag_namespaces import authorize_namespaces
+from app.agents.tool_factory import ToolFactory
+
+OWN = {"user_id": "1111", "tenant": "1111"}
+
+
+class RecordingRAG:
+    """RAG backend that records the namespaces it is asked to search"""
+
+    def __init__(self):
+        self.namespaces = []
+
+    def search(self, query, top_k=5, filter=None, namespace=""):
+        self.namespaces.append([namespace])
+        return [{"text": "passage", "score": 1.0, "metadata": {}}]
+
+    def search_namespaces(self, query, namespaces, top_k=5, filter=None):
+        self.namespaces.append(list(namespaces))
+        return []
+
+
+@pytest.fixture
+def rag(monkeypatch):
+    rag = RecordingRAG()
+    monkeypatch.setattr(vector_rag, "get_rag_system", lambda: rag)
+    monkeypatch.setattr(settings, "rag_shared_namespaces", "handbook, policies")
+    monkeypatch.setattr(settings, "rag_default_namespace_shared", True)
+    return rag
+
+
+def test_own_templated_namespace_is_searched(rag):
+    search, _ = ToolFactory.create_knowledge_base_search({"namespace": "tenant-{tenant}"}, OWN)
+    assert search("q")
+    assert rag.namespaces == [["tenant-1111"]]
+
+
+def test_foreign_tenant_namespace_is_refused(rag):
+    with pytest.raises(PermissionError):
+        ToolFactory.create_knowledge_base_search({"namespace": "tenant-2222"}, OWN)
+    assert rag.namespaces == []
+
+
+def test_foreign_namespace_in_list_refuses_whole_search(rag):
+    with pytest.raises(PermissionError):
+        ToolFactory.create_knowledge_base_search({"namespaces": ["handbook", "user-{user_id}", "user-2222"]}, OWN)
+
+
+def test_shared_and_own_namespaces_are_allowed(rag):
+    search, _ = ToolFactory.create_knowledge_base_search(
+        {"namespaces": ["handbook", "tenant-{tenant}.contracts", ""]}, OWN
+    )
+    search("q")
+    assert rag.namespaces == [["handbook", "tenant-1111.contracts", ""]]
+
+
+def test_prefix_of_own_namespace_is_not_owned():
+    with pytest.raises(PermissionError):
+        authorize_namespaces(["tenant-11110"], OWN)
+
+
+def test_default_namespace_can_be_private():
+    with pytest.raises(PermissionError):
+        authorize_namespaces([""], OWN, allow_default=False)
+
+
+def test_without_context_only_shared_namespaces_are_allowed():
+    assert authorize_namespaces(["handbook"], None, shared_namespaces=["handbook"]) == ["handbook"]
+    with pytest.raises(PermissionError):
+        authorize_namespaces(["tenant-1111"], None)
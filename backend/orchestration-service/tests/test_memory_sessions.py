@@ -0,0 +1,52 @@
+"""
+Tests for user scoping of memory sessions
+"""
+import asyncio
+import uuid
+
+from app.services import orchestration_service
+from app.services.orchestration_service import OrchestrationService
+
+
+class RecordingBuffer:
+    """Write-behind buffer over a session-based backend that records queued writes"""
+
+    def __init__(self):
+        self.memory_system = type("SessionBackend", (), {"add_message": None})()
+        self.messages = []
+
+    def add_message(self, session_id, role, content):
+        self.messages.append(session_id)
+
+
+def test_client_session_id_is_scoped_to_the_user():
+    user_id = uuid.uuid4()
+    assert OrchestrationService._session_id(user_id, {"session_id": "victim"}) == f"{user_id}:victim"
+    assert OrchestrationService._session_id(user_id, {}) == str(user_id)
+
+
+def test_exchange_is_written_to_the_users_own_session(monkeypatch):
+    buffer = RecordingBuffer()
+    monkeypatch.setattr(orchestration_service, "get_memory_buffer", lambda: buffer)
+    user_id = uuid.uuid4()
+
+    OrchestrationService._remember_exchange(user_id, {"session_id": "other-users-session"}, "hi", "hello", [])
+
+    assert buffer.messages == [f"{user_id}:other-users-session"] * 2
+
+
+def test_prefetch_reads_only_the_users_own_session(monkeypatch):
+    searched = []
+
+    def search_memory(query, user_id, session_id):
+        searched.append(session_id)
+        return []
+
+    monkeypatch.setattr(OrchestrationService, "_search_memory", staticmethod(search_memory))
+    user_id = uuid.uuid4()
+
+    asyncio.run(OrchestrationService._prefetch_context(
+        {"memory": {"long_term": True}, "nodes": []}, "hi", user_id, {"session_id": "other-users-session"}, {}, []
+    ))
+
+    assert searched == [f"{user_id}:other-users-session"]
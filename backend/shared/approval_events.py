@@ -0,0 +1,55 @@
+"""
+Approval events - wake executions suspended for approval when a decision is made
+"""
+import json
+from typing import Optional, Any
+from .config import settings
+
+APPROVAL_CHANNEL = "approvals:decided"
+
+_redis = None
+
+
+def get_redis():
+    """Get the process-wide Redis client for approval events"""
+    global _redis
+    if _redis is None:
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("redis package required. Install with: pip install redis")
+        _redis = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+    return _redis
+
+
+def publish_approval_decision(
+    approval_id: Any,
+    execution_id: Any,
+    status: str,
+    redis_client: Optional[Any] = None
+) -> bool:
+    """
+    Announce a decided (or cancelled) approval; call after the decision is committed
+
+    A message missed while no listener is connected is not lost: listeners
+    reconcile decided approvals from the database whenever they (re)subscribe.
+
+    Args:
+        approval_id: Approval request ID
+        execution_id: Execution waiting on the approval
+        status: approved, rejected or cancelled
+        redis_client: Redis client (defaults to the shared one)
+
+    Returns:
+        True if published
+    """
+    try:
+        (redis_client or get_redis()).publish(APPROVAL_CHANNEL, json.dumps({
+            "approval_id": str(approval_id),
+            "execution_id": str(execution_id),
+            "status": status
+        }))
+        return True
+    except Exception as e:
+        print(f"Could not publish approval decision {approval_id}: {e}")
+        return False
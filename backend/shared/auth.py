@@ -60,3 +60,8 @@ async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> str:
             headers={"WWW-Authenticate": "Bearer"},
         )
     return user_id
+
+
+async def get_current_user(user_id: str = Depends(get_current_user_id)) -> dict:
+    """Get the current user (user_id) from the JWT token"""
+    return {"user_id": user_id}
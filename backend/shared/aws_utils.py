@@ -3,7 +3,7 @@ AWS utilities for interacting with AWS services
 """
 import json
 import boto3
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 from botocore.exceptions import ClientError
 from .config import settings
 
@@ -164,6 +164,25 @@ class AWSS3Manager:
         except ClientError as e:
             raise Exception(f"Error deleting file from S3: {str(e)}")
 
+    def list_keys(self, prefix: str = "") -> Iterator[str]:
+        """
+        Stream object keys under a prefix, one page at a time
+
+        Args:
+            prefix: S3 key prefix
+
+        Yields:
+            Object keys
+        """
+        try:
+            paginator = self.client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+                for obj in page.get('Contents', []):
+                    if not obj['Key'].endswith('/'):
+                        yield obj['Key']
+        except ClientError as e:
+            raise Exception(f"Error listing S3 prefix {prefix}: {str(e)}")
+
 
 class AWSSESManager:
     """
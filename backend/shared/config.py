@@ -43,6 +43,112 @@ class Settings(BaseSettings):
     default_llm_provider: str = "anthropic"  # anthropic, openai, bedrock
     anthropic_api_key: Optional[str] = None
     openai_api_key: Optional[str] = None
+    anthropic_prompt_caching_enabled: bool = False  # Cache system prompt + tool definitions (needs langchain-anthropic with default_headers)
+
+    # LLM Routing
+    llm_hedging_enabled: bool = False  # Hedge slow interactive calls to the fallback model
+    llm_hedge_default_delay_ms: int = 2000  # Hedge delay until enough latency samples exist
+    llm_latency_window_size: int = 200
+    llm_latency_min_samples: int = 20
+    complexity_routing_enabled: bool = False  # Run simple agent steps on the fast model (or per workflow: "complexity_routing")
+    complexity_model_path: Optional[str] = None  # Optional sklearn model for the complexity classifier
+    complexity_record_path: Optional[str] = None  # JSONL file to record prompts for offline evaluation
+
+    # Agent Memory
+    agent_memory_strategy: str = "buffer"  # buffer, summary_buffer (opt-in: summarizes with an extra LLM call)
+    agent_memory_max_tokens: int = 2000  # Recent history kept verbatim before summarizing
+    memory_backend: str = "local"  # local (Redis + Postgres), mem0, zep
+    local_memory_vector_search: str = "local_index"  # local_index, pgvector
+    local_memory_embeddings: str = "hashing"  # hashing (in-process), openai
+    local_memory_hot_size: int = 20  # Recent memories per user kept in Redis
+    local_memory_consolidation_interval_seconds: float = 2.0
+    local_memory_dedupe_threshold: float = 0.95  # Similarity above which a new memory updates an existing one
+    local_memory_sync_interval_seconds: float = 5.0  # Local index refresh from Postgres per user
+    local_memory_index_max_users: int = 1000  # Users kept in the local index (least recently searched are dropped)
+    local_memory_processing_timeout_seconds: float = 300.0  # Requeue a stopped instance's consolidation batch after this
+    memory_buffer_max_batch_size: int = 50  # Buffered memory writes per session that trigger a flush
+    memory_buffer_flush_interval_seconds: float = 1.0
+    memory_buffer_max_pending: int = 10000  # Above this, callers flush inline (backpressure)
+    context_prefetch_enabled: bool = True  # Fetch memories/knowledge base context while the agent is built
+    context_prefetch_memory_limit: int = 5
+    context_prefetch_timeout_seconds: float = 2.0  # Run without prefetched context past this
+
+    # RAG / Vector Search
+    rag_backend: str = "pinecone"  # pinecone, local
+    local_rag_storage_dir: Optional[str] = None  # Memory-mapped vector store directory (in-memory if unset)
+    local_rag_index_type: str = "flat"  # flat, ivf, hnsw
+    local_rag_journal_max_entries: int = 1000  # Journaled writes before the manifest is rewritten
+    local_rag_compact_deleted_ratio: float = 0.25  # Deleted-row fraction that triggers compaction
+    local_rag_embeddings: str = "openai"  # openai, hashing (offline)
+    embedding_cache_size: int = 50000  # In-process content-hash embedding cache entries
+    embedding_cache_redis_enabled: bool = False  # Share the embedding cache through Redis
+    embedding_batch_size: int = 256  # Texts per embedding request
+    embedding_max_concurrency: int = 4
+    rag_upsert_batch_size: int = 100  # Vectors per upsert request
+    rag_query_cache_size: int = 2048  # Cached query embeddings per process
+    rag_result_cache_size: int = 1024  # Cached search result lists per process
+    rag_shared_namespaces: str = ""  # Comma-separated namespaces every tenant may search (others must be tenant-{tenant}/user-{user_id})
+    rag_default_namespace_shared: bool = True  # Tenants may search the default ("") namespace
+    rag_result_cache_ttl_seconds: float = 60.0
+    rag_tool_top_k: int = 5  # Snippets returned by the knowledge_base agent tool
+    rag_tool_max_context_tokens: int = 1500  # Context budget per knowledge_base tool call
+    rag_chunk_tokens: int = 400  # Knowledge base chunk size in tokens
+    rag_chunk_overlap_tokens: int = 50  # Tokens shared between consecutive chunks
+    hybrid_search_enabled: bool = False  # Fuse BM25 keyword results into RAG searches (Pinecone needs a serverless index)
+    hybrid_keyword_refresh_seconds: float = 600.0  # Keyword indexes are rebuilt from the vector store this often (0 = only on first use)
+    hybrid_candidate_k: int = 50  # Candidates per index before rank fusion
+    hybrid_rrf_k: int = 60  # Reciprocal-rank fusion constant
+    rerank_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    rerank_latency_budget_ms: float = 150.0
+
+    # Batch Execution
+    batch_max_items: int = 10000
+    batch_max_concurrency: int = 8
+
+    # Webhooks
+    webhook_cache_size: int = 10000  # Cached endpoint configs per process
+    webhook_cache_ttl_seconds: float = 300.0
+    webhook_negative_cache_size: int = 100000  # Cached unknown trigger tokens per process
+    webhook_negative_cache_ttl_seconds: float = 60.0
+    webhook_cache_pubsub_enabled: bool = True  # Invalidate other processes' caches through Redis
+    webhook_stream_maxlen: int = 1000000  # Triggers get 503 while the ingest stream holds this many entries
+    webhook_default_requests_per_minute: int = 60  # When an endpoint's rate_limit sets none
+    webhook_idempotency_default_header: str = "Idempotency-Key"
+    webhook_idempotency_ttl_seconds: int = 86400  # Providers retry for up to a day or more
+    webhook_idempotency_bloom_capacity: int = 1000000  # Keys per fallback filter generation
+    webhook_idempotency_bloom_error_rate: float = 0.001
+    webhook_max_body_bytes: int = 1048576  # Larger deliveries get 413 before parsing
+    webhook_offload_threshold_bytes: int = 65536  # Larger payloads are stored in S3 (needs AWS_S3_BUCKET; 0 disables)
+    webhook_ingest_batch_size: int = 500  # Stream entries per consumer batch
+    webhook_ingest_block_ms: int = 1000
+    webhook_ingest_claim_idle_ms: int = 60000  # Reclaim entries left by a crashed consumer after this
+    webhook_ingest_max_deliveries: int = 5  # Entries failing this often are moved to the dead-letter stream
+    webhook_replay_chunk_size: int = 500  # Logs read, inserted and queued per replay chunk
+    webhook_replay_requests_per_minute: int = 600  # Default replay queueing rate
+    webhook_replay_max_requests_per_minute: int = 6000
+
+    # Approvals
+    approval_default_expiry_hours: int = 72  # Approval requests from workflow nodes without expires_in_hours (0 = never)
+    approval_expiry_sweep_interval_seconds: float = 60.0  # Beat interval of the expiry sweeper
+    approval_expiry_batch_size: int = 500  # Approvals expired per transaction
+    approval_expiry_max_batches: int = 100  # Batches per sweep
+    approval_notification_interval_seconds: float = 10.0  # Beat interval of the notification sweep; approvals created in between are batched per approver
+    approval_notification_batch_size: int = 500  # Pending approvals notified per sweep
+    approval_notification_timeout_seconds: float = 10.0  # Per-channel send timeout
+    approval_notification_digest_max_items: int = 20  # Approvals listed in one digest (the rest are counted)
+    approval_notification_max_attempts: int = 5  # Sweeps that retry a failing channel before giving up on it
+    approval_notification_claim_timeout_seconds: float = 300.0  # Approvals claimed by a sweep that died are retried after this
+    approval_slack_channel: Optional[str] = None  # Slack channel for approval nodes without slack_channel/slack_user_id
+
+    # Partitioning / Retention
+    partition_premake_months: int = 2  # Monthly partitions created ahead of the current month
+    webhook_log_retention_months: int = 3  # Older webhook_logs partitions are archived and dropped
+    execution_retention_months: int = 12  # Older workflow_executions partitions are archived and dropped
+    partition_archive_enabled: bool = True  # Archive to S3 before dropping (expired partitions are kept without AWS_S3_BUCKET)
+    partition_archive_read_max_months: int = 3  # Archived months one log request reads (older ones are paged with next_end)
+
+    # Metrics
+    metrics_flush_interval_seconds: float = 10.0  # Batched counters are written to Redis this often
 
     # Application
     environment: str = "development"
@@ -54,6 +160,9 @@ class Settings(BaseSettings):
     mock_slack_enabled: bool = True
     mock_google_enabled: bool = True
     mock_hubspot_enabled: bool = True
+    mock_teams_enabled: bool = True
+    mock_discord_enabled: bool = True
+    mock_sms_enabled: bool = True
     mock_llm_enabled: bool = False  # Set to True to mock LLM calls too
 
     class Config:
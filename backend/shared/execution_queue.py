@@ -0,0 +1,86 @@
+"""
+Execution queue - dispatch workflow executions to the Celery worker by task name
+"""
+import threading
+from typing import Optional, Dict, Any
+from .config import settings
+
+EXECUTE_WORKFLOW_TASK = "worker.execute_workflow"
+RESUME_WORKFLOW_TASK = "worker.resume_workflow"
+
+_celery_client = None
+_celery_client_lock = threading.Lock()
+
+
+def get_celery_client():
+    """
+    Get a Celery client bound to the worker's broker
+
+    Services send tasks by name, so they don't import the worker package.
+    """
+    global _celery_client
+    with _celery_client_lock:
+        if _celery_client is None:
+            try:
+                from celery import Celery
+            except ImportError:
+                raise ImportError("celery package required. Install with: pip install celery")
+            _celery_client = Celery(
+                "agentic_workflow_client",
+                broker=settings.celery_broker_url,
+                backend=settings.celery_result_backend
+            )
+        return _celery_client
+
+
+def enqueue_execution(
+    execution_id: str,
+    workflow_data: Dict[str, Any],
+    input_data: Dict[str, Any],
+    user_id: str,
+    countdown: Optional[float] = None
+) -> str:
+    """
+    Queue a workflow execution on the worker
+
+    Args:
+        execution_id: ID of an existing workflow_executions row
+        workflow_data: Workflow definition (nodes/edges)
+        input_data: Input data for the workflow
+        user_id: Workflow owner
+        countdown: Seconds to wait before the task may run
+
+    Returns:
+        Celery task ID
+    """
+    result = get_celery_client().send_task(
+        EXECUTE_WORKFLOW_TASK,
+        kwargs={
+            "execution_id": str(execution_id),
+            "workflow_data": workflow_data,
+            "input_data": input_data,
+            "user_id": str(user_id)
+        },
+        countdown=countdown
+    )
+    return result.id
+
+
+def enqueue_resume(execution_id: str) -> str:
+    """
+    Queue the resume of an execution suspended for approval
+
+    The task loads the checkpoint and decisions itself and does nothing if
+    the execution is no longer waiting, so duplicate wake-ups are harmless.
+
+    Args:
+        execution_id: ID of the suspended execution
+
+    Returns:
+        Celery task ID
+    """
+    result = get_celery_client().send_task(
+        RESUME_WORKFLOW_TASK,
+        kwargs={"execution_id": str(execution_id)}
+    )
+    return result.id
@@ -0,0 +1,234 @@
+"""
+Idempotency store - claim delivery keys once and remember the execution they started
+"""
+import math
+import time
+import hashlib
+import threading
+from typing import Optional, Dict, Any
+from .config import settings
+from .lru_cache import LRUCache
+
+# Marks a fallback claim that was released (Bloom filters cannot remove keys)
+RELEASED = object()
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over a bytearray (double hashing with blake2b)
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Initialize Bloom filter
+
+        Args:
+            capacity: Expected number of keys
+            error_rate: Target false-positive rate at capacity
+        """
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RotatingBloomFilter:
+    """
+    Two-generation Bloom filter whose entries age out
+
+    Keys are added to the current generation; lookups check both. Every
+    rotate_seconds the older generation is dropped, so a key is remembered
+    for between one and two rotation periods.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, rotate_seconds: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rotate_seconds = rotate_seconds
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous = BloomFilter(capacity, error_rate)
+        self._rotated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _maybe_rotate(self):
+        if time.monotonic() - self._rotated_at >= self.rotate_seconds:
+            self._previous = self._current
+            self._current = BloomFilter(self.capacity, self.error_rate)
+            self._rotated_at = time.monotonic()
+
+    def add(self, key: str):
+        with self._lock:
+            self._maybe_rotate()
+            self._current.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._maybe_rotate()
+            return key in self._current or key in self._previous
+
+
+class IdempotencyStore:
+    """
+    Records which execution each idempotency key started
+
+    claim() is a single SET NX GET against Redis: it both records a new key
+    and returns the execution of an earlier delivery, so every replica
+    agrees on the first delivery. While Redis is unreachable, claims fall
+    back to this process: a rotating Bloom filter answers "never seen"
+    in constant memory, and a bounded LRU supplies the original
+    execution_id for recent keys.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        ttl_seconds: Optional[int] = None,
+        bloom_capacity: Optional[int] = None,
+        recent_size: int = 100000,
+        redis_retry_seconds: float = 5.0
+    ):
+        """
+        Initialize idempotency store
+
+        Args:
+            redis_client: asyncio Redis client (in-process only if None)
+            ttl_seconds: Default key lifetime
+            bloom_capacity: Keys per Bloom filter generation
+            recent_size: Execution IDs kept for fallback duplicates
+            redis_retry_seconds: Time to stay on the fallback after a Redis error
+        """
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds or settings.webhook_idempotency_ttl_seconds
+        self.redis_retry_seconds = redis_retry_seconds
+        self.bloom = RotatingBloomFilter(
+            bloom_capacity or settings.webhook_idempotency_bloom_capacity,
+            settings.webhook_idempotency_bloom_error_rate,
+            self.ttl_seconds
+        )
+        self._recent = LRUCache(maxsize=recent_size, ttl_seconds=self.ttl_seconds)
+        self._redis_down_until = 0.0
+
+    @staticmethod
+    def key(scope: str, idempotency_key: str) -> str:
+        """Storage key; the delivery key is hashed to bound its size"""
+        digest = hashlib.sha256(idempotency_key.encode("utf-8")).hexdigest()[:32]
+        return f"idempotency:{scope}:{digest}"
+
+    async def claim(
+        self,
+        scope: str,
+        idempotency_key: str,
+        execution_id: str,
+        ttl_seconds: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Claim a delivery key for a new execution
+
+        Args:
+            scope: Key namespace (e.g. the webhook ID)
+            idempotency_key: Provider delivery/event ID
+            execution_id: Execution this delivery would start
+            ttl_seconds: Key lifetime (defaults to the store TTL)
+
+        Returns:
+            None if the claim succeeded, otherwise the original execution_id
+            ("" if the original is known only to the fallback filter)
+        """
+        key = self.key(scope, idempotency_key)
+
+        if self.redis is not None and time.monotonic() >= self._redis_down_until:
+            try:
+                previous = await self.redis.set(
+                    key, execution_id, nx=True, get=True, ex=ttl_seconds or self.ttl_seconds
+                )
+                if previous is None:
+                    self._remember(key, execution_id)
+                return previous.decode() if isinstance(previous, bytes) else previous
+            except Exception as e:
+                print(f"Idempotency store falling back to in-process state: {e}")
+                self._redis_down_until = time.monotonic() + self.redis_retry_seconds
+
+        if key in self.bloom:
+            previous = self._recent.get(key)
+            if previous is not RELEASED:
+                return previous or ""
+
+        self._remember(key, execution_id)
+        return None
+
+    async def release(self, scope: str, idempotency_key: str):
+        """Forget a claim whose execution was never queued, so a retry can proceed"""
+        key = self.key(scope, idempotency_key)
+        if key in self.bloom:
+            self._recent.set(key, RELEASED)
+        if self.redis is not None:
+            try:
+                await self.redis.delete(key)
+            except Exception as e:
+                print(f"Could not release idempotency key {key}: {e}")
+
+    def _remember(self, key: str, execution_id: str):
+        self.bloom.add(key)
+        self._recent.set(key, execution_id)
+
+
+def extract_idempotency_key(
+    config: Optional[Dict[str, Any]],
+    headers: Any,
+    body: Any
+) -> Optional[str]:
+    """
+    Read a delivery's idempotency key
+
+    Args:
+        config: Endpoint idempotency config: {"header": name} or {"json_path": "data.id"}
+        headers: Request headers (case-insensitive mapping)
+        body: Parsed JSON body
+
+    Returns:
+        The key as a string, or None if the delivery has none
+    """
+    config = config or {}
+
+    if config.get("json_path"):
+        value = body
+        for part in config["json_path"].split("."):
+            if isinstance(value, dict):
+                value = value.get(part)
+            elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+                value = value[int(part)]
+            else:
+                return None
+        return str(value) if value not in (None, "") else None
+
+    value = headers.get(config.get("header") or settings.webhook_idempotency_default_header)
+    return value or None
+
+
+_idempotency_store = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Get the process-wide idempotency store"""
+    global _idempotency_store
+    if _idempotency_store is None:
+        redis_client = None
+        try:
+            import redis.asyncio as aioredis
+            redis_client = aioredis.Redis.from_url(settings.redis_url, decode_responses=True)
+        except ImportError:
+            print("redis package not installed; webhook deliveries are deduplicated per process")
+        _idempotency_store = IdempotencyStore(redis_client=redis_client)
+    return _idempotency_store
@@ -8,10 +8,11 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from backend.shared.database import engine, Base
+from backend.shared.partitioning import PARTITIONED_TABLES, is_partitioned, ensure_partitions
+from backend.shared.schema_upgrades import import_models, upgrade_schema
 
 # Import all models to register them with SQLAlchemy
-from backend.user-service.app.models.user import User
-from backend.workflow-service.app.models.workflow import WorkflowTemplate, Workflow, WorkflowExecution
+import_models()
 
 
 def init_database():
@@ -22,6 +23,14 @@ def init_database():
 
     try:
         Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            # Tables from earlier releases get columns and indexes added since
+            for statement in upgrade_schema(conn):
+                print(f"Applied: {statement}")
+            # Partitioned tables accept rows only once a partition covers them
+            for table in PARTITIONED_TABLES:
+                if is_partitioned(conn, table):
+                    ensure_partitions(conn, table)
         print("Database tables created successfully!")
     except Exception as e:
         print(f"Error creating database tables: {e}")
@@ -1,80 +1,253 @@
 """
-Approval notification service - sends Slack/Email notifications for approval requests
+Approval notification service - fans approval requests out to email, Slack, Teams, Discord and SMS
 """
 import os
-from typing import Optional, Dict, Any
-from .slack_client import SlackClient
-from ..aws_utils import AWSSESManager
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Callable
+from ..config import settings
+from .mock_clients import get_ses_manager, get_slack_client, get_teams_client, get_discord_client, get_sms_client
+
+CHANNELS = ("email", "slack", "teams", "discord", "sms")
+
+# Characters of the approval message kept in an SMS
+SMS_MESSAGE_CHARS = 100
+
+# Sends in flight at once (one thread each)
+MAX_CONCURRENT_SENDS = 30
+
+
+def notification_targets(config: Dict[str, Any], approver_email: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Channels to notify for an approval, from its node config
+
+    Args:
+        config: Approval node config (slack_channel, slack_user_id, teams, discord, sms_to)
+        approver_email: Approver email address
+
+    Returns:
+        Dict of channel -> target (address, Slack channel/user, phone number, or True
+        for the configured Teams/Discord webhook)
+    """
+    targets: Dict[str, Any] = {}
+    if approver_email:
+        targets["email"] = approver_email
+    slack_target = config.get("slack_channel") or config.get("slack_user_id") or settings.approval_slack_channel
+    if slack_target:
+        targets["slack"] = slack_target
+    if config.get("teams"):
+        targets["teams"] = True
+    if config.get("discord"):
+        targets["discord"] = True
+    if config.get("sms_to"):
+        targets["sms"] = config["sms_to"]
+    return targets
+
+
+def absolute_url(path: str) -> str:
+    """Frontend link for an approval URL stored as a path"""
+    if path.startswith("http"):
+        return path
+    return f"{os.getenv('FRONTEND_URL', 'http://localhost:3000').rstrip('/')}{path}"
 
 
 class ApprovalNotificationService:
     """
-    Handles sending notifications for approval requests via Slack and Email
+    Sends approval notifications to every target channel concurrently
+
+    The channel clients are blocking, so each send runs on the service's
+    thread pool under its own timeout; a slow or failing channel never
+    delays or fails the others. Several approvals for the same approver are
+    sent as one digest per channel instead of one message each.
     """
 
-    def __init__(self):
-        self.slack_client = SlackClient()
-        self.ses_manager = AWSSESManager()
+    def __init__(
+        self,
+        ses_manager: Optional[Any] = None,
+        slack_client: Optional[Any] = None,
+        teams_client: Optional[Any] = None,
+        discord_client: Optional[Any] = None,
+        sms_client: Optional[Any] = None,
+        timeout_seconds: Optional[float] = None
+    ):
+        """
+        Initialize approval notification service
+
+        Args:
+            ses_manager: Email sender (defaults to get_ses_manager())
+            slack_client: Slack client (defaults to get_slack_client())
+            teams_client: MS Teams client (defaults to get_teams_client())
+            discord_client: Discord client (defaults to get_discord_client())
+            sms_client: Twilio client (defaults to get_sms_client())
+            timeout_seconds: Per-channel send timeout
+        """
+        self.ses_manager = ses_manager or get_ses_manager()
+        self.slack_client = slack_client or get_slack_client()
+        self.teams_client = teams_client or get_teams_client()
+        self.discord_client = discord_client or get_discord_client()
+        self.sms_client = sms_client or get_sms_client()
+        self.timeout_seconds = timeout_seconds or settings.approval_notification_timeout_seconds
+        self._executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SENDS, thread_name_prefix="approval-notify")
 
     async def send_approval_notification(
         self,
         approval_id: str,
         approval_url: str,
-        approver_email: Optional[str] = None,
-        slack_user_id: Optional[str] = None,
-        slack_channel: Optional[str] = None,
+        targets: Dict[str, Any],
         message: str = "You have a new approval request",
         data: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, bool]:
+    ) -> Dict[str, Dict[str, Any]]:
         """
-        Send approval notification via available channels
+        Send one approval notification to every target channel
 
         Args:
             approval_id: UUID of the approval request
-            approval_url: URL to approval interface
-            approver_email: Email address to notify
-            slack_user_id: Slack user ID to DM
-            slack_channel: Slack channel to post to
+            approval_url: URL (or path) of the approval interface
+            targets: Channel targets (see notification_targets)
             message: Approval message/context
             data: Data to review (shown in notification)
 
         Returns:
-            Dict with status of each notification channel
+            Dict of channel -> {"sent": bool, "error": str (on failure)}
+        """
+        url = absolute_url(approval_url)
+        senders = {
+            "email": lambda: self._check(self.ses_manager.send_email(
+                to=targets["email"],
+                subject="🔔 New Approval Request",
+                body=self._format_email_body(approval_id, url, message, data),
+                html_body=self._format_email_html(approval_id, url, message, data)
+            )),
+            "slack": lambda: self._check(self.slack_client.send_message(
+                channel=targets["slack"],
+                text=f"New Approval Request: {message}",
+                blocks=self._format_slack_blocks(approval_id, url, message, data)
+            )),
+            "teams": lambda: self.teams_client.send_message(
+                text=message,
+                title="🔔 New Approval Request",
+                facts=[{"name": str(key), "value": str(value)} for key, value in list((data or {}).items())[:10]],
+                actions=[{"@type": "OpenUri", "name": "Review Approval", "targets": [{"os": "default", "uri": url}]}]
+            ),
+            "discord": lambda: self.discord_client.send_embed(
+                title="🔔 New Approval Request",
+                description=f"{message}\n\n[Review Approval]({url})",
+                fields=[{"name": str(key), "value": str(value), "inline": True} for key, value in list((data or {}).items())[:10]],
+                footer=f"Approval ID: {approval_id}"
+            ),
+            "sms": lambda: self.sms_client.send_sms(
+                to=targets["sms"],
+                message=f"Approval needed: {message[:SMS_MESSAGE_CHARS]} {url}"
+            )
+        }
+        return await self._fan_out({channel: senders[channel] for channel in CHANNELS if targets.get(channel)})
+
+    async def send_digest(
+        self,
+        targets: Dict[str, Any],
+        approvals: List[Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Send several approvals for one approver as a single message per channel
+
+        Args:
+            targets: Channel targets shared by the approvals
+            approvals: Approvals (id, approval_url, message, data), oldest first
+
+        Returns:
+            Dict of channel -> {"sent": bool, "error": str (on failure)}
+        """
+        if len(approvals) == 1:
+            approval = approvals[0]
+            return await self.send_approval_notification(
+                str(approval["id"]),
+                approval["approval_url"],
+                targets,
+                approval.get("message") or "You have a new approval request",
+                approval.get("data")
+            )
+
+        listed = [
+            {**approval, "url": absolute_url(approval["approval_url"])}
+            for approval in approvals[:settings.approval_notification_digest_max_items]
+        ]
+        more = len(approvals) - len(listed)
+        pending_url = absolute_url("/approvals")
+        title = f"🔔 {len(approvals)} New Approval Requests"
+        text = self._format_digest_text(listed, more, pending_url)
+
+        senders = {
+            "email": lambda: self._check(self.ses_manager.send_email(
+                to=targets["email"],
+                subject=title,
+                body=text,
+                html_body=self._format_digest_html(title, listed, more, pending_url)
+            )),
+            "slack": lambda: self._check(self.slack_client.send_message(
+                channel=targets["slack"],
+                text=f"{len(approvals)} new approval requests",
+                blocks=self._format_digest_slack_blocks(title, listed, more, pending_url)
+            )),
+            "teams": lambda: self.teams_client.send_message(
+                text=text,
+                title=title,
+                actions=[{"@type": "OpenUri", "name": "Review Approvals", "targets": [{"os": "default", "uri": pending_url}]}]
+            ),
+            "discord": lambda: self.discord_client.send_embed(title=title, description=text),
+            "sms": lambda: self.sms_client.send_sms(
+                to=targets["sms"],
+                message=f"{len(approvals)} approval requests are waiting for you: {pending_url}"
+            )
+        }
+        return await self._fan_out({channel: senders[channel] for channel in CHANNELS if targets.get(channel)})
+
+    async def send_digests(self, groups: List[Dict[str, Any]]) -> List[Dict[str, Dict[str, Any]]]:
+        """
+        Send digests for several approvers concurrently
+
+        At most MAX_CONCURRENT_SENDS sends are in flight, so no send waits
+        for a thread while its timeout runs.
+
+        Args:
+            groups: Dicts with targets and approvals (see send_digest)
+
+        Returns:
+            Per-channel results for each group, in order
         """
-        results = {"email_sent": False, "slack_sent": False}
-
-        # Send email notification
-        if approver_email:
-            try:
-                email_subject = "🔔 New Approval Request"
-                email_body = self._format_email_body(approval_id, approval_url, message, data)
-
-                self.ses_manager.send_email(
-                    to_addresses=[approver_email],
-                    subject=email_subject,
-                    body=email_body,
-                    body_html=self._format_email_html(approval_id, approval_url, message, data)
-                )
-                results["email_sent"] = True
-            except Exception as e:
-                print(f"Failed to send approval email: {e}")
-
-        # Send Slack notification
-        if slack_user_id or slack_channel:
-            try:
-                slack_blocks = self._format_slack_blocks(approval_id, approval_url, message, data)
-                target = slack_channel if slack_channel else slack_user_id
-
-                self.slack_client.post_message(
-                    channel=target,
-                    text=f"New Approval Request: {message}",
-                    blocks=slack_blocks
-                )
-                results["slack_sent"] = True
-            except Exception as e:
-                print(f"Failed to send Slack approval notification: {e}")
-
-        return results
+        slots = asyncio.Semaphore(max(1, MAX_CONCURRENT_SENDS // len(CHANNELS)))
+
+        async def send(group: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+            async with slots:
+                return await self.send_digest(group["targets"], group["approvals"])
+
+        return await asyncio.gather(*(send(group) for group in groups))
+
+    async def _fan_out(self, senders: Dict[str, Callable[[], Any]]) -> Dict[str, Dict[str, Any]]:
+        """Run every channel's send concurrently and collect per-channel results"""
+        channels = list(senders)
+        results = await asyncio.gather(*(self._deliver(channel, senders[channel]) for channel in channels))
+        return dict(zip(channels, results))
+
+    async def _deliver(self, channel: str, send: Callable[[], Any]) -> Dict[str, Any]:
+        """Send on one channel in a pool thread, bounded by the channel timeout"""
+        try:
+            # On timeout the thread is abandoned; the clients' own HTTP timeouts end it
+            await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(self._executor, send), self.timeout_seconds)
+            return {"sent": True}
+        except asyncio.TimeoutError:
+            print(f"Approval notification via {channel} timed out after {self.timeout_seconds}s")
+            return {"sent": False, "error": f"Timed out after {self.timeout_seconds}s"}
+        except Exception as e:
+            print(f"Failed to send approval notification via {channel}: {e}")
+            return {"sent": False, "error": str(e)}
+
+    @staticmethod
+    def _check(response: Dict[str, Any]) -> Dict[str, Any]:
+        """Raise for clients that report failure in the response instead of raising"""
+        if not response.get("success", True):
+            raise RuntimeError(response.get("error", "Unknown error"))
+        return response
 
     def _format_email_body(
         self,
@@ -204,3 +377,79 @@ You have a new approval request.
         })
 
         return blocks
+
+    def _format_digest_text(self, approvals: List[Dict[str, Any]], more: int, pending_url: str) -> str:
+        """Format a digest as plain text"""
+        lines = [f"- {approval.get('message') or 'Approval request'}: {approval['url']}" for approval in approvals]
+        if more:
+            lines.append(f"...and {more} more")
+        return "You have new approval requests.\n\n" + "\n".join(lines) + f"\n\nReview all pending approvals:\n{pending_url}"
+
+    def _format_digest_html(self, title: str, approvals: List[Dict[str, Any]], more: int, pending_url: str) -> str:
+        """Format a digest as an HTML email body"""
+        items = "".join(
+            f"<li><a href=\"{approval['url']}\">{approval.get('message') or 'Approval request'}</a></li>"
+            for approval in approvals
+        )
+        if more:
+            items += f"<li>...and {more} more</li>"
+
+        return f"""
+        <html>
+        <body>
+            <h2>{title}</h2>
+            <ul>{items}</ul>
+            <p><a href="{pending_url}" style="background-color: #4CAF50; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; display: inline-block; margin-top: 20px;">Review Approvals</a></p>
+        </body>
+        </html>
+        """
+
+    def _format_digest_slack_blocks(self, title: str, approvals: List[Dict[str, Any]], more: int, pending_url: str) -> list:
+        """Format a digest as Slack message blocks"""
+        lines = [f"• <{approval['url']}|{approval.get('message') or 'Approval request'}>" for approval in approvals]
+        if more:
+            lines.append(f"…and {more} more")
+
+        return [
+            {
+                "type": "header",
+                "text": {
+                    "type": "plain_text",
+                    "text": title
+                }
+            },
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": "\n".join(lines)
+                }
+            },
+            {
+                "type": "actions",
+                "elements": [
+                    {
+                        "type": "button",
+                        "text": {
+                            "type": "plain_text",
+                            "text": "Review Approvals"
+                        },
+                        "style": "primary",
+                        "url": pending_url
+                    }
+                ]
+            }
+        ]
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_approval_notification_service() -> ApprovalNotificationService:
+    """Get the process-wide approval notification service"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ApprovalNotificationService()
+        return _service
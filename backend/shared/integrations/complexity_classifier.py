@@ -0,0 +1,291 @@
+"""
+Complexity Classifier - Cheap local task complexity estimation for model routing
+Picks the "low" / "medium" / "high" tier used by LiteLLMRouter.route_by_complexity
+"""
+import re
+import json
+import argparse
+import threading
+from typing import Optional, Dict, Any, List, Iterable
+
+
+COMPLEXITY_TIERS = ["low", "medium", "high"]
+
+# Feature order used by the optional sklearn model
+FEATURE_NAMES = [
+    "prompt_tokens",
+    "tool_count",
+    "message_count",
+    "extraction_hits",
+    "reasoning_hits",
+    "code_blocks",
+    "question_count"
+]
+
+EXTRACTION_PATTERN = re.compile(
+    r"\b(extract|parse|classify|categori[sz]e|tag|label|translate|format|convert|"
+    r"look ?up|fill in|pull out|list the|what is the)\b",
+    re.IGNORECASE
+)
+REASONING_PATTERN = re.compile(
+    r"\b(analy[sz]e|plan|design|compare|evaluate|reason|strategy|debug|refactor|"
+    r"investigate|architect|negotiate|implement|optimi[sz]e|step[- ]by[- ]step|trade-?offs?)\b",
+    re.IGNORECASE
+)
+CODE_BLOCK_PATTERN = re.compile(r"```")
+
+
+class ComplexityClassifier:
+    """
+    Heuristic task complexity classifier with an optional tiny sklearn model
+    Runs locally in microseconds, so it can be called before every LLM step
+    """
+
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        low_token_threshold: int = 400,
+        high_token_threshold: int = 2000
+    ):
+        """
+        Initialize complexity classifier
+
+        Args:
+            model_path: Optional path to a joblib-pickled sklearn classifier
+            low_token_threshold: Prompts above this size are at least "medium"
+            high_token_threshold: Prompts above this size lean towards "high"
+        """
+        self.low_token_threshold = low_token_threshold
+        self.high_token_threshold = high_token_threshold
+        self.model = None
+        self._record_lock = threading.Lock()
+
+        if model_path:
+            self._load_model(model_path)
+
+    def _load_model(self, model_path: str):
+        """Load a trained sklearn model"""
+        try:
+            import joblib
+            self.model = joblib.load(model_path)
+        except ImportError:
+            raise ImportError("scikit-learn required. Install with: pip install scikit-learn")
+
+    def extract_features(
+        self,
+        messages: List[Dict[str, str]],
+        tool_count: int = 0
+    ) -> Dict[str, int]:
+        """
+        Extract cheap prompt features
+
+        Args:
+            messages: Chat messages
+            tool_count: Number of tools available to the step
+
+        Returns:
+            Feature dict keyed by FEATURE_NAMES
+        """
+        text = "\n".join(str(m.get("content", "")) for m in messages)
+
+        return {
+            "prompt_tokens": len(text) // 4,  # ~4 characters per token
+            "tool_count": tool_count,
+            "message_count": len(messages),
+            "extraction_hits": len(EXTRACTION_PATTERN.findall(text)),
+            "reasoning_hits": len(REASONING_PATTERN.findall(text)),
+            "code_blocks": len(CODE_BLOCK_PATTERN.findall(text)) // 2,
+            "question_count": text.count("?")
+        }
+
+    def classify(
+        self,
+        messages: List[Dict[str, str]],
+        tool_count: int = 0
+    ) -> str:
+        """
+        Classify task complexity
+
+        Args:
+            messages: Chat messages
+            tool_count: Number of tools available to the step
+
+        Returns:
+            One of "low", "medium", "high"
+        """
+        features = self.extract_features(messages, tool_count)
+
+        if self.model is not None:
+            prediction = self.model.predict([[features[name] for name in FEATURE_NAMES]])[0]
+            if prediction in COMPLEXITY_TIERS:
+                return prediction
+
+        return self._classify_heuristic(features)
+
+    def _classify_heuristic(self, features: Dict[str, int]) -> str:
+        """Score features into a tier"""
+        score = 0
+
+        if features["prompt_tokens"] > self.high_token_threshold:
+            score += 2
+        elif features["prompt_tokens"] > self.low_token_threshold:
+            score += 1
+
+        if features["tool_count"] >= 4:
+            score += 2
+        elif features["tool_count"] >= 2:
+            score += 1
+
+        score += min(features["reasoning_hits"], 2)
+
+        if features["code_blocks"]:
+            score += 1
+
+        if features["question_count"] > 3:
+            score += 1
+
+        # Simple extractions with no reasoning cues go to the fast model
+        if features["extraction_hits"] and not features["reasoning_hits"]:
+            score -= 1
+
+        if score <= 0:
+            return "low"
+        if score <= 2:
+            return "medium"
+        return "high"
+
+    def record(
+        self,
+        messages: List[Dict[str, str]],
+        tool_count: int,
+        complexity: str,
+        path: str
+    ):
+        """
+        Append a prompt and its predicted tier to a JSONL file for offline evaluation
+
+        Add a "label" field to recorded lines to use them with evaluate()
+        """
+        line = json.dumps({
+            "messages": messages,
+            "tool_count": tool_count,
+            "predicted": complexity
+        })
+        with self._record_lock:
+            with open(path, "a") as f:
+                f.write(line + "\n")
+
+    def evaluate(self, records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Evaluate the classifier against labelled prompts
+
+        Args:
+            records: Dicts with "messages" (or "prompt"), "tool_count" and "label"
+
+        Returns:
+            Accuracy, confusion matrix and per-tier precision/recall
+        """
+        confusion = {label: {predicted: 0 for predicted in COMPLEXITY_TIERS} for label in COMPLEXITY_TIERS}
+        predicted_counts = {tier: 0 for tier in COMPLEXITY_TIERS}
+        total = 0
+        correct = 0
+
+        for record in records:
+            predicted = self.classify(_record_messages(record), record.get("tool_count", 0))
+            predicted_counts[predicted] += 1
+
+            label = record.get("label")
+            if label not in COMPLEXITY_TIERS:
+                continue
+
+            total += 1
+            confusion[label][predicted] += 1
+            if label == predicted:
+                correct += 1
+
+        per_tier = {}
+        for tier in COMPLEXITY_TIERS:
+            true_positive = confusion[tier][tier]
+            predicted_as_tier = sum(confusion[label][tier] for label in COMPLEXITY_TIERS)
+            labelled_as_tier = sum(confusion[tier].values())
+            per_tier[tier] = {
+                "precision": true_positive / predicted_as_tier if predicted_as_tier else None,
+                "recall": true_positive / labelled_as_tier if labelled_as_tier else None,
+                "support": labelled_as_tier
+            }
+
+        return {
+            "labelled": total,
+            "accuracy": correct / total if total else None,
+            "confusion": confusion,
+            "per_tier": per_tier,
+            "predicted_distribution": predicted_counts
+        }
+
+    def train(self, records: Iterable[Dict[str, Any]], output_path: Optional[str] = None):
+        """
+        Fit a small decision tree on labelled prompts
+
+        Args:
+            records: Labelled records (see evaluate)
+            output_path: Optional path to save the trained model with joblib
+        """
+        try:
+            import joblib
+            from sklearn.tree import DecisionTreeClassifier
+        except ImportError:
+            raise ImportError("scikit-learn required. Install with: pip install scikit-learn")
+
+        X = []
+        y = []
+        for record in records:
+            if record.get("label") not in COMPLEXITY_TIERS:
+                continue
+            features = self.extract_features(_record_messages(record), record.get("tool_count", 0))
+            X.append([features[name] for name in FEATURE_NAMES])
+            y.append(record["label"])
+
+        if not X:
+            raise ValueError("No labelled records to train on")
+
+        self.model = DecisionTreeClassifier(max_depth=4, min_samples_leaf=5)
+        self.model.fit(X, y)
+
+        if output_path:
+            joblib.dump(self.model, output_path)
+
+
+def _record_messages(record: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Get chat messages from a recorded prompt"""
+    if "messages" in record:
+        return record["messages"]
+    return [{"role": "user", "content": record.get("prompt", "")}]
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    """Load recorded prompts from a JSONL file"""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    """Offline evaluation harness: evaluate or train over recorded prompts"""
+    parser = argparse.ArgumentParser(description="Evaluate the task complexity classifier")
+    parser.add_argument("command", choices=["evaluate", "train"])
+    parser.add_argument("records", help="JSONL file of recorded prompts with labels")
+    parser.add_argument("--model", help="sklearn model to evaluate, or output path when training")
+    args = parser.parse_args()
+
+    records = load_records(args.records)
+
+    if args.command == "train":
+        classifier = ComplexityClassifier()
+        classifier.train(records, output_path=args.model)
+        print(json.dumps(classifier.evaluate(records), indent=2))
+    else:
+        classifier = ComplexityClassifier(model_path=args.model)
+        print(json.dumps(classifier.evaluate(records), indent=2))
+
+
+if __name__ == "__main__":
+    main()
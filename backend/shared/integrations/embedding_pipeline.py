@@ -0,0 +1,352 @@
+"""
+Embedding Pipeline - Batched, cached embedding and vector upsert for RAG ingestion
+"""
+import os
+import copy
+import json
+import array
+import hashlib
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Optional, Dict, Any, List, Iterable, Callable, Tuple
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from backend.shared.config import settings
+from backend.shared.lru_cache import LRUCache
+
+# Pinecone rejects upsert requests over 2MB; keep headroom for request framing
+MAX_UPSERT_BYTES = 1_800_000
+
+
+class EmbeddingCache:
+    """
+    Content-hash embedding cache
+    In-process LRU in front of an optional shared Redis tier
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        maxsize: Optional[int] = None,
+        redis_url: Optional[str] = None,
+        ttl_seconds: int = 30 * 24 * 3600
+    ):
+        """
+        Initialize embedding cache
+
+        Args:
+            model_name: Embedding model name (part of every cache key)
+            maxsize: In-process LRU size
+            redis_url: Redis URL for the shared tier (disabled if None)
+            ttl_seconds: Redis entry TTL
+        """
+        self.model_name = model_name
+        self.ttl_seconds = ttl_seconds
+        self.local = LRUCache(maxsize=maxsize or settings.embedding_cache_size)
+        self.redis = None
+
+        if redis_url:
+            import redis
+            self.redis = redis.Redis.from_url(redis_url)
+
+    def key(self, text: str) -> str:
+        """Cache key for a text under this model"""
+        digest = hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+        return f"emb:{digest}"
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up embeddings; missing entries are None"""
+        keys = [self.key(text) for text in texts]
+        vectors = [self.local.get(key) for key in keys]
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if self.redis is not None and missing:
+            for i, raw in zip(missing, self.redis.mget([keys[i] for i in missing])):
+                if raw is not None:
+                    vector = array.array("f", raw).tolist()
+                    vectors[i] = vector
+                    self.local.set(keys[i], vector)
+
+        return vectors
+
+    def set_many(self, texts: List[str], vectors: List[List[float]]):
+        """Store embeddings in both tiers"""
+        keys = [self.key(text) for text in texts]
+        for key, vector in zip(keys, vectors):
+            self.local.set(key, vector)
+
+        if self.redis is not None and keys:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, vector in zip(keys, vectors):
+                pipe.set(key, array.array("f", vector).tobytes(), ex=self.ttl_seconds)
+            pipe.execute()
+
+
+_embedding_caches: Dict[str, EmbeddingCache] = {}
+_embedding_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name: str) -> EmbeddingCache:
+    """Get the process-wide embedding cache for a model"""
+    with _embedding_caches_lock:
+        if model_name not in _embedding_caches:
+            _embedding_caches[model_name] = EmbeddingCache(
+                model_name,
+                redis_url=settings.redis_url if settings.embedding_cache_redis_enabled else None
+            )
+        return _embedding_caches[model_name]
+
+
+class QueryCache:
+    """
+    Search-time caches for a RAG backend
+
+    Query embeddings are kept in an LRU keyed by query text; search results
+    live in a short-TTL LRU keyed by (namespace, query embedding hash,
+    filter, top_k) and are dropped whenever the namespace is written to.
+    """
+
+    def __init__(
+        self,
+        embedding_cache_size: Optional[int] = None,
+        result_cache_size: Optional[int] = None,
+        result_ttl_seconds: Optional[float] = None
+    ):
+        """
+        Initialize query cache
+
+        Args:
+            embedding_cache_size: Query embeddings kept
+            result_cache_size: Result lists kept
+            result_ttl_seconds: Result lifetime (bounds staleness across processes)
+        """
+        self.embeddings = LRUCache(maxsize=embedding_cache_size or settings.rag_query_cache_size)
+        self.results = LRUCache(
+            maxsize=result_cache_size or settings.rag_result_cache_size,
+            ttl_seconds=result_ttl_seconds or settings.rag_result_cache_ttl_seconds
+        )
+
+    def embed_query(self, embeddings: Any, query: str) -> List[float]:
+        """Embed a query string, reusing a cached vector when available"""
+        vector = self.embeddings.get(query)
+        if vector is None:
+            vector = embeddings.embed_query(query)
+            self.embeddings.set(query, vector)
+        return vector
+
+    def result_key(
+        self,
+        vector: List[float],
+        filter: Optional[Dict[str, Any]],
+        top_k: int,
+        namespace: str = ""
+    ) -> Tuple[str, str, str, int]:
+        """Cache key for one search"""
+        vector_hash = hashlib.sha1(array.array("f", vector).tobytes()).hexdigest()
+        return namespace, vector_hash, json.dumps(filter, sort_keys=True, default=str), top_k
+
+    def get_results(self, key: Tuple[str, str, str, int]) -> Optional[List[Dict[str, Any]]]:
+        results = self.results.get(key)
+        return copy.deepcopy(results) if results is not None else None
+
+    def set_results(self, key: Tuple[str, str, str, int], results: List[Dict[str, Any]]):
+        self.results.set(key, copy.deepcopy(results))
+
+    def invalidate(self, namespace: str = ""):
+        """Drop cached results for a namespace after a write"""
+        self.results.delete_where(lambda key: key[0] == namespace)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"query_embeddings": self.embeddings.get_stats(), "results": self.results.get_stats()}
+
+
+def iter_batches(items: Iterable[Any], max_items: int, max_bytes: int, size_fn: Callable[[Any], int]):
+    """
+    Group items into batches bounded by count and estimated size
+
+    An item larger than max_bytes is emitted as a batch of its own.
+    """
+    batch = []
+    batch_bytes = 0
+
+    for item in items:
+        item_bytes = size_fn(item)
+        if batch and (len(batch) >= max_items or batch_bytes + item_bytes > max_bytes):
+            yield batch
+            batch = []
+            batch_bytes = 0
+        batch.append(item)
+        batch_bytes += item_bytes
+
+    if batch:
+        yield batch
+
+
+class EmbeddingPipeline:
+    """
+    Embeds texts with in-call dedupe, cache lookup, size-aware batching
+    and bounded concurrency
+    """
+
+    def __init__(
+        self,
+        embeddings: Any,
+        cache: Optional[EmbeddingCache] = None,
+        max_batch_items: Optional[int] = None,
+        max_batch_chars: int = 400_000,
+        max_concurrency: Optional[int] = None
+    ):
+        """
+        Initialize embedding pipeline
+
+        Args:
+            embeddings: Embedding model with embed_documents
+            cache: Embedding cache (defaults to the shared cache for the model)
+            max_batch_items: Texts per embedding request
+            max_batch_chars: Characters per embedding request
+            max_concurrency: Embedding requests in flight
+        """
+        self.embeddings = embeddings
+        model_name = getattr(embeddings, "model", None) or embeddings.__class__.__name__
+        self.cache = cache or get_embedding_cache(model_name)
+        self.max_batch_items = max_batch_items or settings.embedding_batch_size
+        self.max_batch_chars = max_batch_chars
+        self.max_concurrency = max_concurrency or settings.embedding_max_concurrency
+
+    def embed(self, texts: List[str]) -> Tuple[List[List[float]], Dict[str, int]]:
+        """
+        Embed texts, only calling the model for uncached unique texts
+
+        Returns:
+            Tuple of (vectors aligned with texts, stats)
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        cached = self.cache.get_many(unique_texts)
+        vectors = {text: vector for text, vector in zip(unique_texts, cached) if vector is not None}
+        to_embed = [text for text in unique_texts if text not in vectors]
+
+        batches = list(iter_batches(to_embed, self.max_batch_items, self.max_batch_chars, len))
+
+        def embed_batch(batch: List[str]) -> List[List[float]]:
+            batch_vectors = self.embeddings.embed_documents(batch)
+            self.cache.set_many(batch, batch_vectors)
+            return batch_vectors
+
+        if len(batches) > 1 and self.max_concurrency > 1:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                results = list(executor.map(embed_batch, batches))
+        else:
+            results = [embed_batch(batch) for batch in batches]
+
+        for batch, batch_vectors in zip(batches, results):
+            vectors.update(zip(batch, batch_vectors))
+
+        stats = {
+            "texts": len(texts),
+            "cache_hits": len(unique_texts) - len(to_embed),
+            "embedded": len(to_embed),
+            "embedding_requests": len(batches)
+        }
+        return [vectors[text] for text in texts], stats
+
+
+class IngestionPipeline:
+    """
+    Streaming document ingestion: embed in chunks, then upsert in
+    request-size-bounded batches with bounded concurrency
+    """
+
+    def __init__(
+        self,
+        embedding_pipeline: EmbeddingPipeline,
+        upsert_fn: Callable[[List[Tuple[str, List[float], Dict[str, Any]]]], Any],
+        upsert_max_vectors: Optional[int] = None,
+        upsert_max_bytes: int = MAX_UPSERT_BYTES,
+        max_concurrency: Optional[int] = None,
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None
+    ):
+        """
+        Initialize ingestion pipeline
+
+        Args:
+            embedding_pipeline: Pipeline used to embed document texts
+            upsert_fn: Writes one batch of (id, vector, metadata) records
+            upsert_max_vectors: Records per upsert request
+            upsert_max_bytes: Estimated bytes per upsert request
+            max_concurrency: Upsert requests in flight
+            progress_callback: Called with running totals after each chunk
+        """
+        self.embedding_pipeline = embedding_pipeline
+        self.upsert_fn = upsert_fn
+        self.upsert_max_vectors = upsert_max_vectors or settings.rag_upsert_batch_size
+        self.upsert_max_bytes = upsert_max_bytes
+        self.max_concurrency = max_concurrency or settings.embedding_max_concurrency
+        self.progress_callback = progress_callback
+
+    def ingest(
+        self,
+        documents: Iterable[Tuple[str, str, Dict[str, Any]]],
+        chunk_size: int = 1000
+    ) -> Dict[str, int]:
+        """
+        Ingest (id, text, metadata) documents from any iterable
+
+        Documents are consumed chunk by chunk, so arbitrarily large streams
+        never have to fit in memory at once.
+
+        Returns:
+            Totals for documents, cache hits, embedding and upsert requests
+        """
+        progress = {
+            "documents_processed": 0,
+            "cache_hits": 0,
+            "embedded": 0,
+            "embedding_requests": 0,
+            "vectors_upserted": 0,
+            "upsert_requests": 0
+        }
+        documents = iter(documents)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            in_flight = set()
+
+            while True:
+                chunk = list(itertools.islice(documents, chunk_size))
+                if not chunk:
+                    break
+
+                vectors, stats = self.embedding_pipeline.embed([text for _, text, _ in chunk])
+                for key in ("cache_hits", "embedded", "embedding_requests"):
+                    progress[key] += stats[key]
+
+                records = [
+                    (doc_id, vector, {**metadata, "text": text})
+                    for (doc_id, text, metadata), vector in zip(chunk, vectors)
+                ]
+
+                for batch in iter_batches(records, self.upsert_max_vectors, self.upsert_max_bytes, _record_size):
+                    # Bound in-flight upserts so memory stays flat on large streams
+                    if len(in_flight) >= self.max_concurrency:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    in_flight.add(executor.submit(self.upsert_fn, batch))
+                    progress["vectors_upserted"] += len(batch)
+                    progress["upsert_requests"] += 1
+
+                progress["documents_processed"] += len(chunk)
+                if self.progress_callback:
+                    self.progress_callback(dict(progress))
+
+            for future in in_flight:
+                future.result()
+
+        return progress
+
+
+def _record_size(record: Tuple[str, List[float], Dict[str, Any]]) -> int:
+    """Estimate the serialized size of an upsert record"""
+    doc_id, vector, metadata = record
+    return len(doc_id) + len(vector) * 12 + len(json.dumps(metadata, default=str))
@@ -0,0 +1,528 @@
+"""
+Hybrid Search - BM25 keyword scoring fused with dense vector search
+Reciprocal-rank fusion with an optional cross-encoder rerank stage
+"""
+import os
+import re
+import math
+import time
+import asyncio
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Tuple
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from backend.shared.config import settings
+from backend.shared.integrations.local_vector_index import matches_filter
+from backend.shared.integrations.rag_namespaces import merge_results, fan_out
+
+# Keeps identifiers such as "SKU-10293", "INC_4411" or "v2.3.1" as single tokens
+TERM_PATTERN = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase keyword tokenizer
+
+    Compound identifiers are emitted whole and as their parts, so
+    "SKU-10293" matches both exact lookups and a bare "10293".
+    """
+    terms = []
+    for term in TERM_PATTERN.findall(text.lower()):
+        terms.append(term)
+        parts = re.split(r"[-_./]", term)
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+class BM25Index:
+    """
+    In-process inverted index with Okapi BM25 scoring
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize BM25 index
+
+        Args:
+            k1: Term-frequency saturation
+            b: Document-length normalisation
+        """
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._documents: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._total_length = 0
+
+    def add(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]] = None):
+        """Index (or re-index) a document"""
+        terms = defaultdict(int)
+        for term in tokenize(text):
+            terms[term] += 1
+
+        with self._lock:
+            self.remove(doc_id)
+            for term, tf in terms.items():
+                self._postings[term][doc_id] = tf
+            self._doc_terms[doc_id] = dict(terms)
+            self._doc_lengths[doc_id] = sum(terms.values())
+            self._documents[doc_id] = (text, metadata or {})
+            self._total_length += self._doc_lengths[doc_id]
+
+    def remove(self, doc_id: str) -> bool:
+        """Remove a document; returns True if it was indexed"""
+        with self._lock:
+            terms = self._doc_terms.pop(doc_id, None)
+            if terms is None:
+                return False
+
+            for term in terms:
+                postings = self._postings[term]
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+            self._total_length -= self._doc_lengths.pop(doc_id)
+            del self._documents[doc_id]
+            return True
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Keyword search
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            filter: Metadata filters (Pinecone filter syntax)
+
+        Returns:
+            List of matching documents with BM25 scores
+        """
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if doc_count == 0:
+                return []
+
+            avg_length = self._total_length / doc_count
+            scores = defaultdict(float)
+
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = 1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            results = []
+            for doc_id, score in ranked:
+                text, metadata = self._documents[doc_id]
+                if not matches_filter(metadata, filter):
+                    continue
+                results.append({"id": doc_id, "score": score, "text": text, "metadata": dict(metadata)})
+                if len(results) == top_k:
+                    break
+
+            return results
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict[str, Any]]], k: int = 60) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists with reciprocal-rank fusion
+
+    Each document scores sum(1 / (k + rank)) over the lists it appears in.
+
+    Args:
+        result_lists: Ranked result dicts with id, text and metadata
+        k: Rank smoothing constant
+
+    Returns:
+        Fused results ordered by RRF score
+    """
+    fused: Dict[str, Dict[str, Any]] = {}
+
+    for list_index, results in enumerate(result_lists):
+        for rank, result in enumerate(results, start=1):
+            entry = fused.get(result["id"])
+            if entry is None:
+                entry = fused[result["id"]] = {
+                    "id": result["id"],
+                    "score": 0.0,
+                    "text": result.get("text", ""),
+                    "metadata": result.get("metadata", {}),
+                    "ranks": [None] * len(result_lists)
+                }
+            entry["score"] += 1.0 / (k + rank)
+            entry["ranks"][list_index] = rank
+
+    return sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)
+
+
+class CrossEncoderReranker:
+    """
+    CPU cross-encoder rerank stage with a latency budget
+
+    Candidates are scored in batches; once the budget is spent the
+    remaining candidates keep their fused order after the scored ones.
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        latency_budget_ms: Optional[float] = None,
+        batch_size: int = 16
+    ):
+        """
+        Initialize cross-encoder reranker
+
+        Args:
+            model_name: sentence-transformers cross-encoder model
+            latency_budget_ms: Time allowed for scoring per query
+            batch_size: Candidates scored per model call
+        """
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError:
+            raise ImportError("sentence-transformers required. Install with: pip install sentence-transformers")
+
+        self.model_name = model_name or settings.rerank_model
+        self.latency_budget_ms = latency_budget_ms or settings.rerank_latency_budget_ms
+        self.batch_size = batch_size
+        self.model = CrossEncoder(self.model_name, device="cpu")
+
+    def rerank(self, query: str, results: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+        """Rerank results by cross-encoder relevance within the latency budget"""
+        deadline = time.perf_counter() + self.latency_budget_ms / 1000
+        scored = []
+
+        for start in range(0, len(results), self.batch_size):
+            if scored and time.perf_counter() >= deadline:
+                break
+            batch = results[start:start + self.batch_size]
+            scores = self.model.predict([(query, result["text"]) for result in batch])
+            for result, score in zip(batch, scores):
+                scored.append({**result, "rerank_score": float(score)})
+
+        scored.sort(key=lambda result: result["rerank_score"], reverse=True)
+        return (scored + results[len(scored):])[:top_k]
+
+
+class HybridSearcher:
+    """
+    Combines a dense RAG backend with a local BM25 index
+
+    Exposes the RAG system API, so it can be used anywhere a
+    PineconeRAGSystem or LocalVectorRAGSystem is expected (including
+    KnowledgeBaseIndexer and the knowledge base tool) while keeping both
+    indexes in sync.
+
+    Keyword indexes are in memory, so each namespace's index is rebuilt from
+    the vector store (iter_documents) by a background builder: on first use
+    and again every keyword_refresh_seconds, picking up writes made by other
+    processes. Until a namespace's first build finishes, hybrid searches
+    there return dense results only; a stale index keeps serving meanwhile.
+    """
+
+    def __init__(
+        self,
+        rag_system: Any,
+        bm25_index: Optional[BM25Index] = None,
+        reranker: Optional[CrossEncoderReranker] = None,
+        candidate_k: Optional[int] = None,
+        rrf_k: Optional[int] = None,
+        keyword_refresh_seconds: Optional[float] = None
+    ):
+        """
+        Initialize hybrid searcher
+
+        Args:
+            rag_system: Dense backend (PineconeRAGSystem or LocalVectorRAGSystem)
+            bm25_index: Keyword index (a new empty index if None)
+            reranker: Optional cross-encoder rerank stage
+            candidate_k: Candidates retrieved from each index before fusion
+            rrf_k: Reciprocal-rank fusion constant
+            keyword_refresh_seconds: Rebuild interval for keyword indexes (0 = only on first use)
+        """
+        self.rag_system = rag_system
+        self.reranker = reranker
+        self.candidate_k = candidate_k or settings.hybrid_candidate_k
+        self.rrf_k = rrf_k or settings.hybrid_rrf_k
+        self.keyword_refresh_seconds = (
+            settings.hybrid_keyword_refresh_seconds if keyword_refresh_seconds is None else keyword_refresh_seconds
+        )
+        self._lock = threading.Lock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        # namespace -> (index, built_at); a supplied index is used as is and never rebuilt
+        self._keyword_indexes: Dict[str, Tuple[BM25Index, Optional[float]]] = {}
+        if bm25_index is not None:
+            self._keyword_indexes[""] = (bm25_index, None)
+        self._building: set = set()
+        self._rebuild: set = set()
+        self._builder: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def bm25(self) -> BM25Index:
+        """Keyword index of the default namespace (waits for its first build)"""
+        return self.wait_for_keyword_index("")
+
+    def keyword_index(self, namespace: str = "") -> Optional[BM25Index]:
+        """
+        Keyword index for a namespace, without blocking
+
+        A missing or stale index is (re)built in the background; returns
+        None until the namespace's first build has finished.
+        """
+        with self._lock:
+            entry = self._keyword_indexes.get(namespace)
+            if entry is None or self._is_stale(entry[1]):
+                self._schedule_build(namespace)
+        return entry[0] if entry is not None else None
+
+    def wait_for_keyword_index(self, namespace: str = "") -> BM25Index:
+        """Keyword index for a namespace, building it in this thread if there is none yet"""
+        index = self.keyword_index(namespace)
+        if index is not None:
+            return index
+
+        with self._build_lock(namespace):
+            with self._lock:
+                entry = self._keyword_indexes.get(namespace)
+            if entry is not None:
+                return entry[0]
+            return self._store_build(namespace)
+
+    def _build_lock(self, namespace: str) -> threading.Lock:
+        with self._lock:
+            return self._build_locks.setdefault(namespace, threading.Lock())
+
+    def _schedule_build(self, namespace: str):
+        """Queue a background build (caller holds self._lock)"""
+        if namespace in self._building:
+            return
+        self._building.add(namespace)
+        if self._builder is None:
+            self._builder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="keyword-index")
+        self._builder.submit(self._background_build, namespace)
+
+    def _background_build(self, namespace: str):
+        while True:
+            try:
+                with self._build_lock(namespace):
+                    self._store_build(namespace)
+            except Exception as e:
+                print(f"Keyword index build failed for namespace {namespace!r}: {e}")
+
+            with self._lock:
+                # Writes that raced with the build are picked up by one more pass
+                if namespace not in self._rebuild:
+                    self._building.discard(namespace)
+                    return
+                self._rebuild.discard(namespace)
+
+    def _store_build(self, namespace: str) -> BM25Index:
+        index = self._build_keyword_index(namespace)
+        with self._lock:
+            self._keyword_indexes[namespace] = (index, time.monotonic())
+        return index
+
+    def _note_write(self, namespace: str):
+        with self._lock:
+            if namespace in self._building:
+                self._rebuild.add(namespace)
+
+    def _is_stale(self, built_at: Optional[float]) -> bool:
+        if built_at is None or not self.keyword_refresh_seconds:
+            return False
+        return time.monotonic() - built_at >= self.keyword_refresh_seconds
+
+    def _build_keyword_index(self, namespace: str) -> BM25Index:
+        """Index every stored document of a namespace (empty if the backend cannot list them)"""
+        index = BM25Index()
+        iter_documents = getattr(self.rag_system, "iter_documents", None)
+        if iter_documents is None:
+            return index
+
+        try:
+            for doc_id, text, metadata in iter_documents(namespace=namespace):
+                index.add(doc_id, text, metadata)
+        except Exception as e:
+            # e.g. no Pinecone key, or a pod-based index without list(); searches stay dense-only
+            print(f"Could not build keyword index for namespace {namespace!r}: {e}")
+            return BM25Index()
+        return index
+
+    def add_documents(
+        self,
+        documents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None,
+        namespace: str = "",
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Add documents to both the dense and keyword indexes"""
+        result = self.rag_system.add_documents(documents, metadatas=metadatas, ids=ids, namespace=namespace, **kwargs)
+        self._note_write(namespace)
+        bm25 = self.keyword_index(namespace)
+        if bm25 is not None:
+            for doc_id, text, metadata in zip(result["ids"], documents, metadatas or [{}] * len(documents)):
+                bm25.add(doc_id, text, metadata)
+        return result
+
+    def add_documents_stream(
+        self,
+        documents: Iterable[Tuple[str, str, Dict[str, Any]]],
+        namespace: str = "",
+        **kwargs
+    ) -> Dict[str, int]:
+        """Stream (id, text, metadata) documents into both indexes"""
+        bm25 = self.keyword_index(namespace)
+        if bm25 is None:
+            # Not built yet; the pending build reads these from the store
+            result = self.rag_system.add_documents_stream(documents, namespace=namespace, **kwargs)
+            self._note_write(namespace)
+            return result
+
+        def tee() -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+            for doc_id, text, metadata in documents:
+                bm25.add(doc_id, text, metadata)
+                yield doc_id, text, metadata
+
+        result = self.rag_system.add_documents_stream(tee(), namespace=namespace, **kwargs)
+        self._note_write(namespace)
+        return result
+
+    def delete_documents(self, ids: List[str], namespace: str = "") -> Dict[str, Any]:
+        """Delete documents from both indexes"""
+        bm25 = self.keyword_index(namespace)
+        if bm25 is not None:
+            for doc_id in ids:
+                bm25.remove(doc_id)
+        result = self.rag_system.delete_documents(ids, namespace=namespace)
+        self._note_write(namespace)
+        return result
+
+    def list_ids(self, prefix: str = "", namespace: str = "") -> Iterator[str]:
+        return self.rag_system.list_ids(prefix=prefix, namespace=namespace)
+
+    def iter_documents(self, namespace: str = "", **kwargs) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        return self.rag_system.iter_documents(namespace=namespace, **kwargs)
+
+    def embed_query(self, query: str) -> List[float]:
+        return self.rag_system.embed_query(query)
+
+    def search_by_vector(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        return self.rag_system.search_by_vector(*args, **kwargs)
+
+    def get_index_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            keyword_count = sum(len(index) for index, _ in self._keyword_indexes.values())
+        return {**self.rag_system.get_index_stats(), "keyword_document_count": keyword_count}
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        mode: str = "hybrid",
+        rerank: Optional[bool] = None,
+        namespace: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        Search with dense, keyword or fused retrieval
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            filter: Metadata filters (Pinecone filter syntax)
+            mode: "hybrid", "dense" or "keyword" (hybrid is dense-only until the
+                namespace's keyword index is built; keyword waits for it)
+            rerank: Apply the cross-encoder stage (default: when configured)
+            namespace: Namespace to search
+
+        Returns:
+            List of relevant documents with scores
+        """
+        rerank = self.reranker is not None if rerank is None else rerank
+        if rerank and self.reranker is None:
+            raise ValueError("No reranker configured")
+
+        pool_k = max(self.candidate_k, top_k) if rerank or mode == "hybrid" else top_k
+
+        if mode == "dense":
+            results = self.rag_system.search(query, top_k=pool_k, filter=filter, namespace=namespace)
+        elif mode == "keyword":
+            results = self.wait_for_keyword_index(namespace).search(query, top_k=pool_k, filter=filter)
+        elif mode == "hybrid":
+            bm25 = self.keyword_index(namespace)
+            results = reciprocal_rank_fusion(
+                [
+                    self.rag_system.search(query, top_k=pool_k, filter=filter, namespace=namespace),
+                    bm25.search(query, top_k=pool_k, filter=filter) if bm25 is not None else []
+                ],
+                k=self.rrf_k
+            )
+        else:
+            raise ValueError(f"Unsupported search mode: {mode}")
+
+        if rerank:
+            return self.reranker.rerank(query, results, top_k)
+        return results[:top_k]
+
+    async def asearch(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = "",
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """Async search (runs the blocking backends in a worker thread)"""
+        return await asyncio.to_thread(self.search, query, top_k, filter, namespace=namespace, **kwargs)
+
+    def search_namespaces(
+        self,
+        query: str,
+        namespaces: List[str],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Hybrid search in several namespaces, merged into one global top-k
+
+        Fused scores are rank-based, so they are comparable across namespaces.
+        Namespaces are searched concurrently on a thread pool.
+        """
+        return merge_results(
+            fan_out(lambda namespace: self.search(query, top_k=top_k, filter=filter, namespace=namespace), namespaces),
+            top_k
+        )
+
+    async def asearch_namespaces(
+        self,
+        query: str,
+        namespaces: List[str],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Async variant of search_namespaces, one worker thread per namespace"""
+        namespaces = list(dict.fromkeys(namespaces))
+        results = await asyncio.gather(*(
+            self.asearch(query, top_k=top_k, filter=filter, namespace=namespace) for namespace in namespaces
+        ))
+        return merge_results(dict(zip(namespaces, results)), top_k)
@@ -0,0 +1,196 @@
+"""
+Knowledge Base Indexing - Token-aware chunking and incremental re-indexing for RAG
+"""
+import os
+import re
+import hashlib
+from typing import Optional, Dict, Any, List, Iterator, Callable
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from backend.shared.config import settings
+
+WORD_PATTERN = re.compile(r"\S+\s*")
+
+
+class TextChunker:
+    """
+    Splits text into overlapping token windows
+    Uses tiktoken when installed, otherwise whitespace-delimited words
+    """
+
+    def __init__(self, chunk_tokens: Optional[int] = None, overlap_tokens: Optional[int] = None):
+        """
+        Initialize text chunker
+
+        Args:
+            chunk_tokens: Maximum tokens per chunk
+            overlap_tokens: Tokens shared between consecutive chunks
+        """
+        self.chunk_tokens = chunk_tokens or settings.rag_chunk_tokens
+        self.overlap_tokens = settings.rag_chunk_overlap_tokens if overlap_tokens is None else overlap_tokens
+
+        if self.overlap_tokens >= self.chunk_tokens:
+            raise ValueError("overlap_tokens must be smaller than chunk_tokens")
+
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding("cl100k_base")
+        except ImportError:
+            self._encoding = None
+
+    def chunk(self, text: str) -> List[str]:
+        """Split text into chunks"""
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text)
+            return [self._encoding.decode(window).strip() for window in self._windows(tokens)]
+
+        words = WORD_PATTERN.findall(text)
+        return ["".join(window).strip() for window in self._windows(words)]
+
+    def _windows(self, tokens: List[Any]) -> Iterator[List[Any]]:
+        step = self.chunk_tokens - self.overlap_tokens
+        for start in range(0, max(len(tokens) - self.overlap_tokens, 1), step):
+            window = tokens[start:start + self.chunk_tokens]
+            if window:
+                yield window
+
+
+def chunk_id(source: str, text: str) -> str:
+    """Stable chunk ID derived from the document source and chunk content"""
+    return f"{source}#{hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]}"
+
+
+class KnowledgeBaseIndexer:
+    """
+    Incrementally indexes documents into a RAG backend
+
+    Each chunk's ID is derived from its source and content hash, so
+    re-ingesting a changed document only upserts new chunks and deletes
+    chunks that no longer exist. Unchanged chunks are left untouched.
+    """
+
+    def __init__(self, rag_system: Any, chunker: Optional[TextChunker] = None, namespace: str = ""):
+        """
+        Initialize knowledge base indexer
+
+        Args:
+            rag_system: PineconeRAGSystem or LocalVectorRAGSystem
+            chunker: Text chunker (defaults from settings)
+            namespace: Namespace the knowledge base lives in (e.g. per tenant)
+        """
+        self.rag_system = rag_system
+        self.chunker = chunker or TextChunker()
+        self.namespace = namespace
+
+    def index_document(
+        self,
+        source: str,
+        text: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Index or re-index one document
+
+        Args:
+            source: Stable document identifier (e.g. S3 URI or file path)
+            text: Document text
+            metadata: Metadata attached to new chunks
+
+        Returns:
+            Counts of chunks upserted, deleted and unchanged
+        """
+        chunks = {}
+        for chunk in self.chunker.chunk(text):
+            if chunk:
+                chunks.setdefault(chunk_id(source, chunk), chunk)
+
+        existing = set(self.rag_system.list_ids(prefix=f"{source}#", namespace=self.namespace))
+        new_ids = [doc_id for doc_id in chunks if doc_id not in existing]
+        stale_ids = list(existing - set(chunks))
+
+        if new_ids:
+            chunk_metadata = {**(metadata or {}), "source": source}
+            self.rag_system.add_documents_stream(
+                ((doc_id, chunks[doc_id], dict(chunk_metadata)) for doc_id in new_ids),
+                namespace=self.namespace
+            )
+
+        if stale_ids:
+            self.rag_system.delete_documents(stale_ids, namespace=self.namespace)
+
+        return {
+            "source": source,
+            "chunks": len(chunks),
+            "upserted": len(new_ids),
+            "deleted": len(stale_ids),
+            "unchanged": len(chunks) - len(new_ids)
+        }
+
+    def delete_source(self, source: str) -> Dict[str, Any]:
+        """Remove every chunk of a document"""
+        ids = list(self.rag_system.list_ids(prefix=f"{source}#", namespace=self.namespace))
+        if ids:
+            self.rag_system.delete_documents(ids, namespace=self.namespace)
+        return {"source": source, "deleted": len(ids)}
+
+    def reindex_s3_prefix(
+        self,
+        prefix: str,
+        s3_manager: Optional[Any] = None,
+        prune_missing: bool = True,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Stream every object under an S3 prefix through the incremental indexer
+
+        Objects are listed page by page and downloaded one at a time, so the
+        prefix can be arbitrarily large.
+
+        Args:
+            prefix: S3 key prefix
+            s3_manager: AWSS3Manager (defaults to the shared instance)
+            prune_missing: Delete chunks of objects no longer under the prefix
+            progress_callback: Called with running totals after each object
+
+        Returns:
+            Totals for objects, chunks and failures
+        """
+        if s3_manager is None:
+            from backend.shared.aws_utils import s3_manager
+        if s3_manager is None:
+            raise ValueError("S3 is not configured")
+
+        totals = {"objects": 0, "failed": 0, "upserted": 0, "deleted": 0, "unchanged": 0, "errors": []}
+        seen_sources = set()
+
+        for key in s3_manager.list_keys(prefix):
+            source = f"s3://{s3_manager.bucket}/{key}"
+            seen_sources.add(source)
+
+            try:
+                text = s3_manager.download_file(key).decode("utf-8")
+                result = self.index_document(source, text, metadata={"s3_key": key})
+                for field in ("upserted", "deleted", "unchanged"):
+                    totals[field] += result[field]
+            except Exception as e:
+                totals["failed"] += 1
+                totals["errors"].append({"key": key, "error": str(e)})
+
+            totals["objects"] += 1
+            if progress_callback:
+                progress_callback({k: v for k, v in totals.items() if k != "errors"})
+
+        if prune_missing:
+            stale_ids = [
+                doc_id
+                for doc_id in self.rag_system.list_ids(
+                    prefix=f"s3://{s3_manager.bucket}/{prefix}", namespace=self.namespace
+                )
+                if doc_id.rsplit("#", 1)[0] not in seen_sources
+            ]
+            if stale_ids:
+                self.rag_system.delete_documents(stale_ids, namespace=self.namespace)
+            totals["deleted"] += len(stale_ids)
+
+        return totals
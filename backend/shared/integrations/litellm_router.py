@@ -2,18 +2,114 @@
 LiteLLM Router - Multi-LLM routing, fallbacks, and cost optimization
 """
 import os
+import time
+import asyncio
+import threading
+from collections import deque
 from typing import Optional, Dict, Any, List
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from backend.shared.config import settings
+from backend.shared.integrations.complexity_classifier import ComplexityClassifier
+
+
+# Fallback chains per model group (also used as hedge targets)
+MODEL_FALLBACKS = {
+    "claude-3-5-sonnet": ["gpt-4"],
+    "gpt-4": ["claude-3-5-sonnet", "gpt-3.5"],
+    "gpt-3.5": ["claude-3-haiku"]
+}
+
+
+class LatencyTracker:
+    """
+    Rolling latency window per model deployment
+    Provides a moving p95 used for latency-aware routing and request hedging
+    """
+
+    def __init__(self, window_size: int = 200, min_samples: int = 20):
+        """
+        Initialize latency tracker
+
+        Args:
+            window_size: Number of recent samples kept per model
+            min_samples: Samples required before a percentile is reported
+        """
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, latency_seconds: float):
+        """Record a successful call latency for a model"""
+        with self._lock:
+            samples = self._samples.get(model)
+            if samples is None:
+                samples = deque(maxlen=self.window_size)
+                self._samples[model] = samples
+            samples.append(latency_seconds)
+
+    def percentile(self, model: str, pct: float = 95.0) -> Optional[float]:
+        """
+        Get the latency percentile for a model
+
+        Returns:
+            Latency in seconds, or None if there are not enough samples yet
+        """
+        with self._lock:
+            samples = list(self._samples.get(model, ()))
+
+        return self._percentile(sorted(samples), pct)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get sample count, p50 and p95 for every tracked model"""
+        with self._lock:
+            snapshot = {model: sorted(samples) for model, samples in self._samples.items()}
+
+        return {
+            model: {
+                "samples": len(samples),
+                "p50_ms": self._to_ms(self._percentile(samples, 50.0)),
+                "p95_ms": self._to_ms(self._percentile(samples, 95.0))
+            }
+            for model, samples in snapshot.items()
+        }
+
+    def _percentile(self, samples: List[float], pct: float) -> Optional[float]:
+        """Percentile of sorted samples, or None below min_samples"""
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+        return samples[index]
+
+    @staticmethod
+    def _to_ms(value: Optional[float]) -> Optional[int]:
+        return int(value * 1000) if value is not None else None
 
 
 class LiteLLMRouter:
     """
     LiteLLM router for multi-model management
     Automatically routes to best model, handles fallbacks, tracks costs
+    Tracks per-model latency and can hedge slow interactive calls
     """
 
-    def __init__(self):
-        """Initialize LiteLLM router"""
+    def __init__(self, hedge_enabled: Optional[bool] = None):
+        """
+        Initialize LiteLLM router
+
+        Args:
+            hedge_enabled: Send a hedged request to the fallback model when the
+                primary exceeds its p95 latency (defaults to settings)
+        """
         self.router = None
+        self.hedge_enabled = settings.llm_hedging_enabled if hedge_enabled is None else hedge_enabled
+        self.latency_tracker = LatencyTracker(
+            window_size=settings.llm_latency_window_size,
+            min_samples=settings.llm_latency_min_samples
+        )
+        self.classifier = ComplexityClassifier(model_path=settings.complexity_model_path)
         self._init_router()
 
     def _init_router(self):
@@ -56,11 +152,8 @@ class LiteLLMRouter:
 
             self.router = Router(
                 model_list=model_list,
-                fallbacks=[
-                    {"claude-3-5-sonnet": ["gpt-4"]},
-                    {"gpt-4": ["claude-3-5-sonnet", "gpt-3.5"]},
-                    {"gpt-3.5": ["claude-3-haiku"]}
-                ],
+                fallbacks=[{model: chain} for model, chain in MODEL_FALLBACKS.items()],
+                routing_strategy="latency-based-routing",
                 set_verbose=True
             )
 
@@ -92,45 +185,188 @@ class LiteLLMRouter:
             raise ValueError("Router not initialized")
 
         try:
+            start_time = time.perf_counter()
             response = self.router.completion(
                 model=model,
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens
             )
+            latency = time.perf_counter() - start_time
+            self.latency_tracker.record(model, latency)
+
+            return self._format_response(response, latency)
 
+        except Exception as e:
             return {
-                "content": response.choices[0].message.content,
-                "model": response.model,
-                "usage": {
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens
-                },
-                "cost": self._calculate_cost(response)
+                "error": str(e),
+                "status": "failed"
             }
 
+    async def acomplete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "claude-3-5-sonnet",
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        hedge: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Async completion with optional request hedging for interactive calls
+
+        When hedging is enabled and the primary model has not answered within
+        its moving p95, a duplicate request is sent to the first fallback model.
+        The first successful response wins and the other request is cancelled.
+
+        Args:
+            messages: Chat messages
+            model: Preferred model name
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            hedge: Override the router-level hedging setting for this call
+
+        Returns:
+            Completion response with cost tracking and hedge metadata
+        """
+        if not self.router:
+            raise ValueError("Router not initialized")
+
+        hedge = self.hedge_enabled if hedge is None else hedge
+        fallback_chain = MODEL_FALLBACKS.get(model, [])
+
+        try:
+            if hedge and fallback_chain:
+                response, latency, hedged = await self._hedged_completion(
+                    messages, model, fallback_chain[0], temperature, max_tokens
+                )
+            else:
+                response, latency = await self._timed_acompletion(
+                    messages, model, temperature, max_tokens
+                )
+                hedged = False
+
+            result = self._format_response(response, latency)
+            result["hedged"] = hedged
+            return result
+
         except Exception as e:
             return {
                 "error": str(e),
                 "status": "failed"
             }
 
+    async def _timed_acompletion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: Optional[int]
+    ):
+        """
+        Run a single async completion and record its latency
+
+        Only completed calls are recorded: a cancelled hedge loser's elapsed
+        time is a lower bound, and counting it would drag the p95 (and so
+        the hedge delay) down towards the time the winner took.
+        """
+        start_time = time.perf_counter()
+        response = await self.router.acompletion(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        latency = time.perf_counter() - start_time
+        self.latency_tracker.record(model, latency)
+        return response, latency
+
+    async def _hedged_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        hedge_model: str,
+        temperature: float,
+        max_tokens: Optional[int]
+    ):
+        """Race the primary model against a delayed hedge request"""
+        primary = asyncio.create_task(
+            self._timed_acompletion(messages, model, temperature, max_tokens)
+        )
+
+        done, _ = await asyncio.wait({primary}, timeout=self._hedge_delay(model))
+        if done:
+            response, latency = primary.result()
+            return response, latency, False
+
+        hedge = asyncio.create_task(
+            self._timed_acompletion(messages, hedge_model, temperature, max_tokens)
+        )
+        pending = {primary, hedge}
+        last_error = None
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        response, latency = task.result()
+                        return response, latency, task is hedge
+                    last_error = task.exception()
+        finally:
+            # Cancel the loser so it stops consuming tokens
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        raise last_error
+
+    def _hedge_delay(self, model: str) -> float:
+        """Seconds to wait for the primary before hedging (moving p95)"""
+        p95 = self.latency_tracker.percentile(model, 95.0)
+        if p95 is None:
+            return settings.llm_hedge_default_delay_ms / 1000.0
+        return p95
+
+    def get_latency_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get moving latency percentiles per model"""
+        return self.latency_tracker.get_stats()
+
+    def _format_response(self, response, latency: float) -> Dict[str, Any]:
+        """Convert a LiteLLM response into the router result dict"""
+        return {
+            "content": response.choices[0].message.content,
+            "model": response.model,
+            "usage": {
+                "prompt_tokens": response.usage.prompt_tokens,
+                "completion_tokens": response.usage.completion_tokens,
+                "total_tokens": response.usage.total_tokens
+            },
+            "cost": self._calculate_cost(response),
+            "latency_ms": int(latency * 1000)
+        }
+
     def route_by_complexity(
         self,
         messages: List[Dict[str, str]],
-        complexity: str = "medium"
+        complexity: Optional[str] = None,
+        tool_count: int = 0
     ) -> Dict[str, Any]:
         """
         Route to appropriate model based on task complexity
 
         Args:
             messages: Chat messages
-            complexity: Task complexity ("low", "medium", "high")
+            complexity: Task complexity ("low", "medium", "high"); classified
+                automatically from the prompt when omitted
+            tool_count: Number of tools available to the step (used when classifying)
 
         Returns:
             Completion response
         """
+        if complexity is None:
+            complexity = self.classifier.classify(messages, tool_count=tool_count)
+
         # Map complexity to models
         model_mapping = {
             "low": "claude-3-haiku",  # Fast and cheap
@@ -140,7 +376,9 @@ class LiteLLMRouter:
 
         model = model_mapping.get(complexity, "gpt-3.5")
 
-        return self.complete(messages, model=model)
+        result = self.complete(messages, model=model)
+        result["complexity"] = complexity
+        return result
 
     def get_cost_tracking(self) -> Dict[str, Any]:
         """Get cost tracking information"""
@@ -186,13 +424,33 @@ class MockLiteLLMRouter:
             "cost": 0.0025
         }
 
+    async def acomplete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "claude-3-5-sonnet",
+        **kwargs
+    ) -> Dict[str, Any]:
+        print(f"[MOCK] LiteLLM acomplete with {model}")
+        result = self.complete(messages, model=model)
+        result["hedged"] = False
+        return result
+
+    def get_latency_stats(self) -> Dict[str, Dict[str, Any]]:
+        print("[MOCK] LiteLLM get_latency_stats")
+        return {}
+
     def route_by_complexity(
         self,
         messages: List[Dict[str, str]],
-        complexity: str = "medium"
+        complexity: Optional[str] = None,
+        tool_count: int = 0
     ) -> Dict[str, Any]:
+        if complexity is None:
+            complexity = ComplexityClassifier().classify(messages, tool_count=tool_count)
         print(f"[MOCK] LiteLLM route_by_complexity: {complexity}")
-        return self.complete(messages, model=f"model-for-{complexity}")
+        result = self.complete(messages, model=f"model-for-{complexity}")
+        result["complexity"] = complexity
+        return result
 
     def get_cost_tracking(self) -> Dict[str, Any]:
         print("[MOCK] LiteLLM get_cost_tracking")
@@ -200,3 +458,19 @@ class MockLiteLLMRouter:
             "total_cost": 1.25,
             "models_used": ["claude-3-5-sonnet", "gpt-4", "gpt-3.5"]
         }
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_litellm_router():
+    """Get the process-wide LiteLLM router (real or mock), shared so latency samples accumulate"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            if settings.mock_mode or settings.mock_llm_enabled:
+                _router = MockLiteLLMRouter()
+            else:
+                _router = LiteLLMRouter()
+        return _router
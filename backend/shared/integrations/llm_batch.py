@@ -0,0 +1,235 @@
+"""
+LLM Provider Batch APIs - Discounted asynchronous processing for non-interactive jobs
+Uses the Anthropic Message Batches API
+"""
+import os
+import uuid
+from typing import Optional, Dict, Any, List, Iterator
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from backend.shared.config import settings
+
+# Provider batch results are kept for 29 days
+BATCH_OWNER_TTL_SECONDS = 30 * 24 * 60 * 60
+
+
+class AnthropicBatchClient:
+    """
+    Submit many single-turn prompts as one Anthropic message batch
+    Results are ready within 24 hours at a reduced per-token price
+    """
+
+    def __init__(self, api_key: Optional[str] = None):
+        """
+        Initialize Anthropic batch client
+
+        Args:
+            api_key: Anthropic API key
+        """
+        self.api_key = api_key or settings.anthropic_api_key or os.getenv("ANTHROPIC_API_KEY")
+        self.client = None
+
+        if self.api_key:
+            self._init_client()
+
+    def _init_client(self):
+        """Initialize Anthropic client"""
+        try:
+            import anthropic
+            self.client = anthropic.Anthropic(api_key=self.api_key)
+        except ImportError:
+            raise ImportError("anthropic package required. Install with: pip install anthropic")
+
+    def submit(
+        self,
+        system_prompt: str,
+        inputs: List[str],
+        model: str = "claude-3-5-sonnet-20241022",
+        max_tokens: int = 1024
+    ) -> Dict[str, Any]:
+        """
+        Submit a batch of prompts sharing one system prompt
+
+        Args:
+            system_prompt: System prompt applied to every request
+            inputs: User inputs, one request each (custom_id is the input index)
+            model: Anthropic model ID
+            max_tokens: Maximum tokens to generate per request
+
+        Returns:
+            Batch ID and processing status
+        """
+        if not self.client:
+            raise ValueError("Anthropic client not initialized")
+
+        batch = self.client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": str(index),
+                    "params": {
+                        "model": model,
+                        "max_tokens": max_tokens,
+                        "system": system_prompt,
+                        "messages": [{"role": "user", "content": text}]
+                    }
+                }
+                for index, text in enumerate(inputs)
+            ]
+        )
+
+        return {
+            "batch_id": batch.id,
+            "status": batch.processing_status,
+            "request_count": len(inputs)
+        }
+
+    def get_status(self, batch_id: str) -> Dict[str, Any]:
+        """Get batch processing status and request counts"""
+        if not self.client:
+            raise ValueError("Anthropic client not initialized")
+
+        batch = self.client.messages.batches.retrieve(batch_id)
+        counts = batch.request_counts
+
+        return {
+            "batch_id": batch.id,
+            "status": batch.processing_status,
+            "request_counts": {
+                "processing": counts.processing,
+                "succeeded": counts.succeeded,
+                "errored": counts.errored,
+                "canceled": counts.canceled,
+                "expired": counts.expired
+            }
+        }
+
+    def iter_results(self, batch_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream results of an ended batch
+
+        Yields:
+            Per-input result dicts keyed by input index
+        """
+        if not self.client:
+            raise ValueError("Anthropic client not initialized")
+
+        for entry in self.client.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type == "succeeded":
+                yield {
+                    "index": int(entry.custom_id),
+                    "status": "completed",
+                    "output": "".join(
+                        block.text for block in result.message.content if block.type == "text"
+                    ),
+                    "usage": {
+                        "input_tokens": result.message.usage.input_tokens,
+                        "output_tokens": result.message.usage.output_tokens
+                    }
+                }
+            else:
+                error = getattr(result, "error", None)
+                yield {
+                    "index": int(entry.custom_id),
+                    "status": "failed",
+                    "error": str(error) if error else result.type,
+                    "output": None
+                }
+
+
+class MockAnthropicBatchClient:
+    """Mock Anthropic batch client"""
+
+    def __init__(self, *args, **kwargs):
+        self.batches = {}
+
+    def submit(self, system_prompt: str, inputs: List[str], **kwargs) -> Dict[str, Any]:
+        batch_id = f"mock_batch_{uuid.uuid4().hex}"
+        print(f"[MOCK] Anthropic batch submit: {len(inputs)} requests")
+        self.batches[batch_id] = inputs
+        return {"batch_id": batch_id, "status": "in_progress", "request_count": len(inputs)}
+
+    def get_status(self, batch_id: str) -> Dict[str, Any]:
+        print(f"[MOCK] Anthropic batch get_status: {batch_id}")
+        count = len(self.batches.get(batch_id, []))
+        return {
+            "batch_id": batch_id,
+            "status": "ended",
+            "request_counts": {
+                "processing": 0,
+                "succeeded": count,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0
+            }
+        }
+
+    def iter_results(self, batch_id: str) -> Iterator[Dict[str, Any]]:
+        print(f"[MOCK] Anthropic batch iter_results: {batch_id}")
+        for index, text in enumerate(self.batches.get(batch_id, [])):
+            yield {
+                "index": index,
+                "status": "completed",
+                "output": f"Mock batch response for: {text[:50]}",
+                "usage": {"input_tokens": 100, "output_tokens": 50}
+            }
+
+
+class BatchOwners:
+    """
+    Records which user submitted each provider batch
+
+    Batch IDs are visible to anyone who learns them, so status and results
+    are only served to the submitting user. Owners are kept in Redis so
+    every API process sees them.
+    """
+
+    def __init__(self, redis_client: Optional[Any] = None):
+        """
+        Initialize batch owner registry
+
+        Args:
+            redis_client: Redis client (defaults to settings.redis_url)
+        """
+        if redis_client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("redis package required. Install with: pip install redis")
+            redis_client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+        self.redis = redis_client
+
+    def record(self, batch_id: str, user_id: str):
+        """Remember the submitting user of a batch"""
+        self.redis.set(f"llm_batch:owner:{batch_id}", str(user_id), ex=BATCH_OWNER_TTL_SECONDS)
+
+    def is_owner(self, batch_id: str, user_id: str) -> bool:
+        """Whether the user submitted the batch (unknown batches belong to nobody)"""
+        owner = self.redis.get(f"llm_batch:owner:{batch_id}")
+        if isinstance(owner, bytes):
+            owner = owner.decode()
+        return owner is not None and owner == str(user_id)
+
+
+_batch_client = None
+_batch_owners = None
+
+
+def get_batch_client():
+    """Get the provider batch client (real or mock)"""
+    global _batch_client
+    if _batch_client is None:
+        if settings.mock_mode or settings.mock_llm_enabled:
+            _batch_client = MockAnthropicBatchClient()
+        else:
+            _batch_client = AnthropicBatchClient()
+    return _batch_client
+
+
+def get_batch_owners() -> BatchOwners:
+    """Get the process-wide batch owner registry"""
+    global _batch_owners
+    if _batch_owners is None:
+        _batch_owners = BatchOwners()
+    return _batch_owners
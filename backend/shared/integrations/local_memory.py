@@ -0,0 +1,644 @@
+"""
+Local Tiered Memory - Self-hosted agent memory with the Mem0MemorySystem API
+Hot recent memories in Redis, long-term memories in Postgres with pgvector
+or an in-process vector index, and background consolidation between them
+"""
+import os
+import time
+import json
+import uuid
+import array
+import base64
+import socket
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from backend.shared.config import settings
+from backend.shared.integrations.embedding_pipeline import QueryCache
+from backend.shared.integrations.local_vector_index import HashingEmbeddings
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HOT_KEY = "memory:hot:{user_id}"
+PENDING_KEY = "memory:pending"
+PROCESSING_KEY = "memory:processing:{consumer}"
+CONSUMERS_KEY = "memory:consumers"
+TOMBSTONE_KEY = "memory:tombstone:{memory_id}"
+SESSION_KEY = "memory:session:{session_id}"
+SESSION_META_KEY = "memory:session_meta:{session_id}"
+
+
+def _encode_vector(vector: List[float]) -> str:
+    return base64.b64encode(array.array("f", vector).tobytes()).decode("ascii")
+
+
+def _decode_vector(encoded: str) -> List[float]:
+    return array.array("f", base64.b64decode(encoded)).tolist()
+
+
+def _cosine(query: List[float], vectors: List[List[float]]) -> List[float]:
+    """Cosine similarity of one query against several vectors"""
+    if not vectors:
+        return []
+    if np is not None:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        q = np.asarray(query, dtype=np.float32)
+        norms = np.maximum(np.linalg.norm(matrix, axis=1) * max(float(np.linalg.norm(q)), 1e-12), 1e-12)
+        return (matrix @ q / norms).tolist()
+
+    q_norm = max(sum(x * x for x in query) ** 0.5, 1e-12)
+    scores = []
+    for vector in vectors:
+        v_norm = max(sum(x * x for x in vector) ** 0.5, 1e-12)
+        scores.append(sum(a * b for a, b in zip(query, vector)) / (q_norm * v_norm))
+    return scores
+
+
+class LocalTieredMemorySystem:
+    """
+    Self-hosted memory layer with the same interface as Mem0MemorySystem
+
+    add_memory writes to the Redis hot tier and a pending queue; a background
+    thread consolidates pending memories into Postgres, merging near-duplicates
+    into the existing memory. search_memory scores the hot tier and the
+    long-term tier locally, without calling an external memory service.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        engine: Optional[Any] = None,
+        embeddings: Optional[Any] = None,
+        vector_search: Optional[str] = None,
+        start_consolidation: bool = True,
+        consumer_name: Optional[str] = None
+    ):
+        """
+        Initialize local tiered memory system
+
+        Args:
+            redis_client: Redis client for the hot tier (defaults to settings.redis_url)
+            engine: SQLAlchemy engine for the long-term tier (defaults to the shared engine)
+            embeddings: Embedding model with embed_documents/embed_query
+            vector_search: "pgvector" or "local_index" for long-term similarity search
+            start_consolidation: Run the background consolidation thread
+            consumer_name: Name of this instance's pending-queue processing list
+        """
+        if redis_client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("redis package required. Install with: pip install redis")
+            redis_client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+
+        if engine is None:
+            from backend.shared.database import engine
+
+        self.redis = redis_client
+        self.engine = engine
+        self.embeddings = embeddings or self._init_embeddings()
+        self.vector_search = vector_search or settings.local_memory_vector_search
+        self.hot_size = settings.local_memory_hot_size
+        self.dedupe_threshold = settings.local_memory_dedupe_threshold
+        self.sync_interval = settings.local_memory_sync_interval_seconds
+        self.max_indexed_users = settings.local_memory_index_max_users
+        self.processing_timeout = settings.local_memory_processing_timeout_seconds
+        self.consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.query_cache = QueryCache()
+
+        if self.vector_search not in ("pgvector", "local_index"):
+            raise ValueError(f"Unsupported memory vector search: {self.vector_search}")
+
+        self._index = None
+        self._synced_at: Dict[str, Any] = {}
+        self._sync_checked: Dict[str, float] = {}
+        self._indexed_users: "OrderedDict[str, None]" = OrderedDict()
+        self._sync_lock = threading.Lock()
+        if self.vector_search == "local_index":
+            from backend.shared.integrations.local_vector_index import LocalVectorRAGSystem
+            # One namespace per user, so start small and let active users grow by doubling
+            self._index = LocalVectorRAGSystem(index_type="flat", embeddings=self.embeddings, initial_capacity=16)
+
+        # The schema is created on first use, so constructing the system does no I/O
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+        self._stop = threading.Event()
+        self._consolidator = None
+        if start_consolidation:
+            self._consolidator = threading.Thread(target=self._consolidation_loop, daemon=True)
+            self._consolidator.start()
+
+    def _init_embeddings(self):
+        """Initialize embedding model"""
+        if settings.local_memory_embeddings == "hashing":
+            return HashingEmbeddings()
+
+        try:
+            from langchain_openai import OpenAIEmbeddings
+            return OpenAIEmbeddings(model="text-embedding-3-small")
+        except ImportError:
+            raise ImportError("langchain-openai required")
+
+    def _ensure_schema(self):
+        """Create the long-term memory table on first use"""
+        if self._schema_ready:
+            return
+
+        with self._schema_lock:
+            if not self._schema_ready:
+                self._create_schema()
+                self._schema_ready = True
+
+    def _create_schema(self):
+        """Create the long-term memory table if it does not exist"""
+        from sqlalchemy import text
+
+        if self.vector_search == "pgvector":
+            dimension = len(self.embeddings.embed_query("dimension probe"))
+            embedding_type = f"vector({dimension})"
+        else:
+            embedding_type = "REAL[]"
+
+        with self.engine.begin() as conn:
+            if self.vector_search == "pgvector":
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            conn.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS agent_memories (
+                    id UUID PRIMARY KEY,
+                    user_id VARCHAR(255) NOT NULL,
+                    memory TEXT NOT NULL,
+                    metadata JSONB NOT NULL DEFAULT '{{}}',
+                    embedding {embedding_type} NOT NULL,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    deleted_at TIMESTAMPTZ
+                )
+            """))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_agent_memories_user_updated "
+                "ON agent_memories (user_id, updated_at)"
+            ))
+            if self.vector_search == "pgvector":
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_agent_memories_embedding "
+                    "ON agent_memories USING hnsw (embedding vector_cosine_ops)"
+                ))
+
+    # ------------------------------------------------------------------
+    # Mem0MemorySystem API
+    # ------------------------------------------------------------------
+
+    def add_memory(
+        self,
+        text: str,
+        user_id: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Add a memory to the hot tier and queue it for consolidation
+
+        Args:
+            text: Memory text
+            user_id: User identifier
+            metadata: Additional metadata
+
+        Returns:
+            Memory ID and status
+        """
+        result = self.add_memories([text], user_id, [metadata or {}])
+        return {"memory_id": result["memory_ids"][0], "extracted_memories": [text], "status": "added"}
+
+    def add_memories(
+        self,
+        texts: List[str],
+        user_id: str,
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Add several memories with one embedding call and one Redis round trip
+
+        Args:
+            texts: Memory texts
+            user_id: User identifier
+            metadatas: Metadata per memory
+
+        Returns:
+            Memory IDs and status
+        """
+        created_at = datetime.now(timezone.utc).isoformat()
+        vectors = self.embeddings.embed_documents(texts)
+        payloads = [
+            json.dumps({
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "memory": text,
+                "metadata": metadata or {},
+                "created_at": created_at,
+                "embedding": _encode_vector(vector)
+            })
+            for text, vector, metadata in zip(texts, vectors, metadatas or [{}] * len(texts))
+        ]
+        hot_key = HOT_KEY.format(user_id=user_id)
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.lpush(hot_key, *payloads)
+        pipe.ltrim(hot_key, 0, self.hot_size - 1)
+        pipe.rpush(PENDING_KEY, *payloads)
+        pipe.execute()
+
+        return {"memory_ids": [json.loads(payload)["id"] for payload in payloads], "status": "added"}
+
+    def search_memory(
+        self,
+        query: str,
+        user_id: str,
+        limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Search hot and long-term memories by similarity
+
+        Args:
+            query: Search query
+            user_id: User identifier
+            limit: Max number of results
+
+        Returns:
+            List of relevant memories
+        """
+        query_vector = self.query_cache.embed_query(self.embeddings, query)
+
+        results = self._search_hot(query_vector, user_id, limit) + self._search_long_term(query_vector, user_id, limit)
+
+        seen = set()
+        merged = []
+        for result in sorted(results, key=lambda r: r["score"], reverse=True):
+            key = (result["id"], result["memory"])
+            if result["id"] in seen or key in seen:
+                continue
+            seen.update([result["id"], key])
+            merged.append(result)
+            if len(merged) == limit:
+                break
+        return merged
+
+    def get_all_memories(self, user_id: str) -> List[Dict[str, Any]]:
+        """Get all memories for a user (long-term plus not yet consolidated)"""
+        from sqlalchemy import text
+
+        self._ensure_schema()
+        with self.engine.connect() as conn:
+            rows = conn.execute(text(
+                "SELECT id, memory, created_at FROM agent_memories "
+                "WHERE user_id = :user_id AND deleted_at IS NULL ORDER BY created_at"
+            ), {"user_id": user_id}).fetchall()
+
+        memories = [{"id": str(row.id), "memory": row.memory, "created_at": str(row.created_at)} for row in rows]
+        known = {memory["id"] for memory in memories}
+
+        for record in self._hot_records(user_id):
+            if record["id"] not in known:
+                memories.append({"id": record["id"], "memory": record["memory"], "created_at": record["created_at"]})
+
+        return memories
+
+    def delete_memory(self, memory_id: str) -> Dict[str, str]:
+        """Delete a specific memory from every tier"""
+        from sqlalchemy import text
+
+        # Stops a still-pending copy from being consolidated and hides it from hot search
+        self.redis.set(TOMBSTONE_KEY.format(memory_id=memory_id), 1, ex=7 * 24 * 3600)
+
+        self._ensure_schema()
+        with self.engine.begin() as conn:
+            row = conn.execute(text(
+                "UPDATE agent_memories SET deleted_at = now(), updated_at = now() "
+                "WHERE id = CAST(:id AS uuid) AND deleted_at IS NULL RETURNING user_id"
+            ), {"id": memory_id}).fetchone()
+
+        if row is not None and self._index is not None:
+            self._index.delete_documents([memory_id], namespace=self._user_namespace(row.user_id))
+
+        return {"status": "deleted", "memory_id": memory_id}
+
+    # ------------------------------------------------------------------
+    # Session API (conversation history, as ZepMemorySystem)
+    # ------------------------------------------------------------------
+
+    def create_session(self, session_id: str, user_id: str) -> Dict[str, Any]:
+        """Create a memory session"""
+        self.redis.hset(SESSION_META_KEY.format(session_id=session_id), mapping={"user_id": user_id})
+        return {"session_id": session_id, "user_id": user_id, "status": "created"}
+
+    def add_message(
+        self,
+        session_id: str,
+        role: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, str]:
+        """Append a message to the session history"""
+        self.add_messages(session_id, [{"role": role, "content": content, "metadata": metadata}])
+        return {"status": "added", "session_id": session_id}
+
+    def add_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Append several messages to the session history in one round trip"""
+        key = SESSION_KEY.format(session_id=session_id)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.rpush(key, *[
+            json.dumps({"role": m["role"], "content": m["content"], "metadata": m.get("metadata") or {}})
+            for m in messages
+        ])
+        pipe.ltrim(key, -settings.local_memory_hot_size * 10, -1)
+        pipe.execute()
+        return {"status": "added", "session_id": session_id, "count": len(messages)}
+
+    def get_memory(self, session_id: str) -> Dict[str, Any]:
+        """Get session history and the user's most recent memories as facts"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.lrange(SESSION_KEY.format(session_id=session_id), 0, -1)
+        pipe.hget(SESSION_META_KEY.format(session_id=session_id), "user_id")
+        messages, user_id = pipe.execute()
+
+        return {
+            "session_id": session_id,
+            "messages": [
+                {"role": message["role"], "content": message["content"]}
+                for message in map(json.loads, messages)
+            ],
+            "summary": None,
+            "facts": [record["memory"] for record in self._hot_records(user_id)] if user_id else []
+        }
+
+    # ------------------------------------------------------------------
+    # Tiers
+    # ------------------------------------------------------------------
+
+    def _hot_records(self, user_id: str) -> List[Dict[str, Any]]:
+        """Recent memories from Redis, excluding deleted ones"""
+        records = [json.loads(raw) for raw in self.redis.lrange(HOT_KEY.format(user_id=user_id), 0, -1)]
+        if not records:
+            return []
+
+        tombstones = self.redis.mget([TOMBSTONE_KEY.format(memory_id=record["id"]) for record in records])
+        return [record for record, tombstone in zip(records, tombstones) if tombstone is None]
+
+    def _search_hot(self, query_vector: List[float], user_id: str, limit: int) -> List[Dict[str, Any]]:
+        records = self._hot_records(user_id)
+        scores = _cosine(query_vector, [_decode_vector(record["embedding"]) for record in records])
+
+        ranked = sorted(zip(records, scores), key=lambda item: item[1], reverse=True)[:limit]
+        return [
+            {"id": record["id"], "memory": record["memory"], "score": float(score), "metadata": record["metadata"]}
+            for record, score in ranked
+        ]
+
+    def _search_long_term(self, query_vector: List[float], user_id: str, limit: int) -> List[Dict[str, Any]]:
+        self._ensure_schema()
+        if self.vector_search == "pgvector":
+            from sqlalchemy import text
+
+            with self.engine.connect() as conn:
+                rows = conn.execute(text(
+                    "SELECT id, memory, metadata, 1 - (embedding <=> CAST(:embedding AS vector)) AS score "
+                    "FROM agent_memories WHERE user_id = :user_id AND deleted_at IS NULL "
+                    "ORDER BY embedding <=> CAST(:embedding AS vector) LIMIT :limit"
+                ), {"embedding": str(list(query_vector)), "user_id": user_id, "limit": limit}).fetchall()
+
+            return [
+                {"id": str(row.id), "memory": row.memory, "score": float(row.score), "metadata": row.metadata}
+                for row in rows
+            ]
+
+        self._sync_user(user_id)
+        return [
+            {
+                "id": match["id"],
+                "memory": match["text"],
+                "score": match["score"],
+                "metadata": match["metadata"]
+            }
+            for match in self._index.search_by_vector(
+                query_vector, top_k=limit, namespace=self._user_namespace(user_id)
+            )
+        ]
+
+    @staticmethod
+    def _user_namespace(user_id: str) -> str:
+        return "u" + hashlib.sha1(str(user_id).encode("utf-8")).hexdigest()[:24]
+
+    def _sync_user(self, user_id: str, force: bool = False):
+        """
+        Pull a user's changed long-term memories into the local index
+
+        Runs at most once per sync interval per user, so most searches never
+        touch Postgres. Memories written since then are still found in the
+        Redis hot tier. Only the most recently searched users stay indexed;
+        the least recently used one is dropped and reloaded on its next search.
+        """
+        now = time.monotonic()
+        with self._sync_lock:
+            self._indexed_users[user_id] = None
+            self._indexed_users.move_to_end(user_id)
+            evicted = []
+            while len(self._indexed_users) > self.max_indexed_users:
+                stale_user, _ = self._indexed_users.popitem(last=False)
+                self._synced_at.pop(stale_user, None)
+                self._sync_checked.pop(stale_user, None)
+                evicted.append(stale_user)
+
+            due = force or now - self._sync_checked.get(user_id, float("-inf")) >= self.sync_interval
+            if due:
+                self._sync_checked[user_id] = now
+            since = self._synced_at.get(user_id)
+
+        for stale_user in evicted:
+            self._index.drop_namespace(self._user_namespace(stale_user))
+
+        if not due:
+            return
+
+        from sqlalchemy import text
+
+        with self.engine.connect() as conn:
+            # Overlap the cursor so rows committed slightly out of order are not missed
+            rows = conn.execute(text(
+                "SELECT id, memory, metadata, embedding, updated_at, deleted_at FROM agent_memories "
+                "WHERE user_id = :user_id AND (CAST(:since AS timestamptz) IS NULL "
+                "OR updated_at > CAST(:since AS timestamptz) - interval '5 seconds') ORDER BY updated_at"
+            ), {"user_id": user_id, "since": since}).fetchall()
+
+        if not rows:
+            return
+
+        namespace = self._user_namespace(user_id)
+        live = [row for row in rows if row.deleted_at is None]
+        deleted = [str(row.id) for row in rows if row.deleted_at is not None]
+
+        if live:
+            self._index.upsert(
+                [str(row.id) for row in live],
+                [list(row.embedding) for row in live],
+                [{**(row.metadata or {}), "text": row.memory} for row in live],
+                namespace=namespace
+            )
+        if deleted:
+            self._index.delete_documents(deleted, namespace=namespace)
+
+        with self._sync_lock:
+            self._synced_at[user_id] = rows[-1].updated_at.isoformat()
+
+    def _is_indexed(self, user_id: str) -> bool:
+        with self._sync_lock:
+            return user_id in self._indexed_users
+
+    # ------------------------------------------------------------------
+    # Consolidation
+    # ------------------------------------------------------------------
+
+    def _consolidation_loop(self):
+        interval = settings.local_memory_consolidation_interval_seconds
+        while not self._stop.wait(interval):
+            try:
+                while self.consolidate():
+                    pass
+            except Exception as e:
+                print(f"Memory consolidation failed: {e}")
+
+    def consolidate(self, batch_size: int = 100) -> int:
+        """
+        Move pending memories into the long-term tier
+
+        A memory nearly identical to an existing one, or to an earlier memory
+        in the same batch (similarity above the dedupe threshold), updates that
+        memory instead of adding a new row. The batch is moved to this
+        instance's processing list and only removed once it is committed, so
+        a crash mid-batch leaves it to be retried.
+
+        Returns:
+            Number of pending memories processed
+        """
+        from sqlalchemy import text
+
+        self._recover_stale_consumers()
+        raw = self._claim(batch_size)
+        if not raw:
+            return 0
+
+        self._ensure_schema()
+        records = [json.loads(item) for item in raw]
+        tombstones = self.redis.mget([TOMBSTONE_KEY.format(memory_id=record["id"]) for record in records])
+        records = [record for record, tombstone in zip(records, tombstones) if tombstone is None]
+
+        # A failure leaves the batch on the processing list, so the next pass retries it
+        inserted: Dict[str, List[Any]] = {}
+        with self.engine.begin() as conn:
+            for record in records:
+                vector = _decode_vector(record["embedding"])
+                duplicate_id = self._find_duplicate(vector, record["user_id"], inserted.get(record["user_id"], []))
+
+                if duplicate_id is not None:
+                    conn.execute(text(
+                        "UPDATE agent_memories SET memory = :memory, metadata = metadata || CAST(:metadata AS jsonb), "
+                        "updated_at = now() WHERE id = CAST(:id AS uuid)"
+                    ), {
+                        "id": duplicate_id,
+                        "memory": record["memory"],
+                        "metadata": json.dumps(record["metadata"])
+                    })
+                    record["id"] = duplicate_id
+                else:
+                    conn.execute(text(
+                        "INSERT INTO agent_memories (id, user_id, memory, metadata, embedding, created_at) "
+                        f"VALUES (CAST(:id AS uuid), :user_id, :memory, CAST(:metadata AS jsonb), "
+                        f"{'CAST(:embedding AS vector)' if self.vector_search == 'pgvector' else ':embedding'}, "
+                        "CAST(:created_at AS timestamptz)) ON CONFLICT (id) DO NOTHING"
+                    ), {
+                        "id": record["id"],
+                        "user_id": record["user_id"],
+                        "memory": record["memory"],
+                        "metadata": json.dumps(record["metadata"]),
+                        "embedding": str(vector) if self.vector_search == "pgvector" else vector,
+                        "created_at": record["created_at"]
+                    })
+                    inserted.setdefault(record["user_id"], []).append((record["id"], vector))
+
+        self.redis.delete(PROCESSING_KEY.format(consumer=self.consumer_name))
+
+        if self._index is not None:
+            for record in records:
+                # Users not currently indexed load these rows from Postgres on their next search
+                if not self._is_indexed(record["user_id"]):
+                    continue
+                self._index.upsert(
+                    [record["id"]],
+                    [_decode_vector(record["embedding"])],
+                    [{**record["metadata"], "text": record["memory"]}],
+                    namespace=self._user_namespace(record["user_id"])
+                )
+
+        return len(raw)
+
+    def _find_duplicate(self, vector: List[float], user_id: str, batch: List[Any]) -> Optional[str]:
+        """ID of a memory above the dedupe threshold, checking this batch before the long-term tier"""
+        if batch:
+            scores = _cosine(vector, [batch_vector for _, batch_vector in batch])
+            best = max(range(len(scores)), key=scores.__getitem__)
+            if scores[best] >= self.dedupe_threshold:
+                return batch[best][0]
+
+        duplicate = self._search_long_term(vector, user_id, 1)
+        if duplicate and duplicate[0]["score"] >= self.dedupe_threshold:
+            return duplicate[0]["id"]
+        return None
+
+    def _claim(self, batch_size: int) -> List[str]:
+        """Move up to batch_size pending memories onto this instance's processing list"""
+        processing = PROCESSING_KEY.format(consumer=self.consumer_name)
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zadd(CONSUMERS_KEY, {self.consumer_name: time.time()})
+        pipe.lrange(processing, 0, -1)
+        _, unfinished = pipe.execute()
+        if unfinished:
+            return unfinished
+
+        pipe = self.redis.pipeline(transaction=False)
+        for _ in range(batch_size):
+            pipe.lmove(PENDING_KEY, processing, "LEFT", "RIGHT")
+        return [item for item in pipe.execute() if item is not None]
+
+    def _recover_stale_consumers(self):
+        """
+        Requeue batches left on the processing lists of instances that stopped
+
+        An instance that has not claimed for processing_timeout is presumed
+        dead. Consolidation is idempotent (inserts ignore existing IDs), so a
+        batch that was in fact still running is only written twice.
+        """
+        cutoff = time.time() - self.processing_timeout
+        for consumer in self.redis.zrangebyscore(CONSUMERS_KEY, "-inf", cutoff):
+            if consumer == self.consumer_name:
+                continue
+            processing = PROCESSING_KEY.format(consumer=consumer)
+            # Back to the head of the queue, in the original order
+            while self.redis.lmove(processing, PENDING_KEY, "RIGHT", "LEFT") is not None:
+                pass
+            self.redis.zrem(CONSUMERS_KEY, consumer)
+
+    def close(self):
+        """Stop background consolidation after a final pass"""
+        self._stop.set()
+        if self._consolidator is not None:
+            self._consolidator.join(timeout=5)
+        while self.consolidate():
+            pass
+        self.redis.zrem(CONSUMERS_KEY, self.consumer_name)
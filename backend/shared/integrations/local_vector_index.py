@@ -0,0 +1,924 @@
+"""
+Local Vector Index - In-process RAG backend with the PineconeRAGSystem API
+NumPy cosine search over memory-mapped vectors with optional IVF or HNSW indexing
+"""
+import os
+import re
+import asyncio
+import json
+import uuid
+import hashlib
+import shutil
+import threading
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Tuple, Callable
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from backend.shared.config import settings
+from backend.shared.integrations.embedding_pipeline import EmbeddingPipeline, IngestionPipeline, QueryCache
+from backend.shared.integrations.rag_namespaces import validate_namespace, search_namespaces, asearch_namespaces
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class HashingEmbeddings:
+    """
+    Deterministic feature-hashing embeddings
+    No network or model download; useful for on-prem, offline and benchmark runs
+    """
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimension
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimension
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign
+        return vector
+
+
+def matches_filter(metadata: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    """
+    Evaluate a Pinecone-style metadata filter
+
+    Supports field equality, $eq, $ne, $gt, $gte, $lt, $lte, $in, $nin, $exists,
+    and the logical operators $and / $or.
+    """
+    if not filter:
+        return True
+
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for operator, operand in condition.items():
+                if not _compare(value, operator, operand, key in metadata):
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+
+    return True
+
+
+def _compare(value: Any, operator: str, operand: Any, present: bool) -> bool:
+    """Apply one filter operator"""
+    if operator == "$exists":
+        return present == bool(operand)
+    if operator == "$eq":
+        return value == operand
+    if operator == "$ne":
+        return value != operand
+    if operator == "$in":
+        return value in operand
+    if operator == "$nin":
+        return value not in operand
+    if value is None:
+        return False
+    if operator == "$gt":
+        return value > operand
+    if operator == "$gte":
+        return value >= operand
+    if operator == "$lt":
+        return value < operand
+    if operator == "$lte":
+        return value <= operand
+    raise ValueError(f"Unsupported filter operator: {operator}")
+
+
+class _IVFIndex:
+    """
+    Inverted-file coarse quantizer
+    Vectors are bucketed by nearest k-means centroid; queries scan nprobe buckets
+    """
+
+    def __init__(self, nlist: int, nprobe: int):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.centroids = None
+        self.lists: List[set] = []
+        self.row_list: Dict[int, int] = {}
+        self.trained_size = 0
+
+    def needs_training(self, live_count: int) -> bool:
+        """Train once there is enough data, retrain when the data doubles"""
+        if live_count < self.nlist * 4:
+            return False
+        return self.centroids is None or live_count >= self.trained_size * 2
+
+    def train(self, vectors, rows, iterations: int = 10):
+        """Fit centroids with spherical k-means and assign all rows"""
+        rng = np.random.default_rng(0)
+        sample_rows = rows if len(rows) <= 20000 else rng.choice(rows, 20000, replace=False)
+        sample = np.asarray(vectors[sample_rows])
+
+        k = min(self.nlist, len(sample))
+        centroids = sample[rng.choice(len(sample), k, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for j in range(k):
+                members = sample[assignment == j]
+                if len(members):
+                    centroids[j] = members.mean(axis=0)
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+        self.centroids = centroids
+        self.lists = [set() for _ in range(k)]
+        self.row_list = {}
+        self.trained_size = len(rows)
+
+        assignment = np.argmax(np.asarray(vectors[rows]) @ centroids.T, axis=1)
+        for row, list_id in zip(rows.tolist(), assignment.tolist()):
+            self.lists[list_id].add(row)
+            self.row_list[row] = list_id
+
+    def add(self, row: int, vector):
+        if self.centroids is None:
+            return
+        self.remove(row)
+        list_id = int(np.argmax(self.centroids @ vector))
+        self.lists[list_id].add(row)
+        self.row_list[row] = list_id
+
+    def remove(self, row: int):
+        list_id = self.row_list.pop(row, None)
+        if list_id is not None:
+            self.lists[list_id].discard(row)
+
+    def candidates(self, query):
+        """Rows in the nprobe buckets closest to the query"""
+        nprobe = min(self.nprobe, len(self.lists))
+        probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        rows = set()
+        for list_id in probe.tolist():
+            rows.update(self.lists[list_id])
+        return np.fromiter(rows, dtype=np.int64, count=len(rows))
+
+
+class LocalVectorRAGSystem:
+    """
+    In-process vector RAG system with the same API as PineconeRAGSystem
+    Vectors live in a memory-mapped float32 file, metadata in a JSON manifest
+    plus an append-only journal of writes since the last checkpoint
+
+    The instance itself holds the default namespace; every other namespace is
+    a separate child store under <storage_dir>/namespaces/<name>, so searches
+    in a small namespace never scan a large one.
+    """
+
+    def __init__(
+        self,
+        storage_dir: Optional[str] = None,
+        index_type: Optional[str] = None,
+        embeddings: Optional[Any] = None,
+        nlist: int = 256,
+        nprobe: int = 8,
+        initial_capacity: int = 1024
+    ):
+        """
+        Initialize local vector RAG system
+
+        Args:
+            storage_dir: Directory for the memory-mapped store (in-memory if None)
+            index_type: "flat" (exact), "ivf" or "hnsw" (requires hnswlib)
+            embeddings: Embedding model with embed_documents/embed_query
+            nlist: Number of IVF buckets
+            nprobe: IVF buckets scanned per query
+            initial_capacity: Rows allocated on first write (then doubled as needed)
+        """
+        if np is None:
+            raise ImportError("numpy required. Install with: pip install numpy")
+
+        self.storage_dir = storage_dir
+        self.index_type = index_type or settings.local_rag_index_type
+        self.embeddings = embeddings
+        self.dimension = None
+
+        if self.index_type not in ("flat", "ivf", "hnsw"):
+            raise ValueError(f"Unsupported index type: {self.index_type}")
+
+        self._lock = threading.RLock()
+        self._vectors = None
+        self._capacity = 0
+        self._count = 0
+        self._live = np.zeros(0, dtype=bool)
+        self._ids: List[Optional[str]] = []
+        self._metadata: List[Optional[Dict[str, Any]]] = []
+        self._id_to_row: Dict[str, int] = {}
+        self._nlist = nlist
+        self._nprobe = nprobe
+        self._initial_capacity = initial_capacity
+        self._ivf = _IVFIndex(nlist, nprobe) if self.index_type == "ivf" else None
+        self._hnsw = None
+        self._generation = 0
+        self._vectors_file = "vectors.f32"
+        self._hnsw_file = "hnsw.bin"
+        self._journal_file = None
+        self._journal_entries = 0
+        self.query_cache = QueryCache()
+        self.namespace = ""
+        self._namespaces: Dict[str, "LocalVectorRAGSystem"] = {}
+
+        if storage_dir:
+            os.makedirs(storage_dir, exist_ok=True)
+            self._load()
+
+            namespaces_dir = self._path("namespaces")
+            if os.path.isdir(namespaces_dir):
+                for name in os.listdir(namespaces_dir):
+                    self._namespace_store(name)
+
+    def _init_embeddings(self):
+        """Initialize embedding model"""
+        if settings.local_rag_embeddings == "hashing":
+            self.embeddings = HashingEmbeddings()
+            return
+
+        try:
+            from langchain_openai import OpenAIEmbeddings
+            self.embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+        except ImportError:
+            raise ImportError("langchain-openai required")
+
+    def _namespace_store(self, namespace: str) -> "LocalVectorRAGSystem":
+        """Get (or create) the store holding a namespace"""
+        if not namespace or self.namespace:
+            return self
+
+        with self._lock:
+            store = self._namespaces.get(namespace)
+            if store is None:
+                validate_namespace(namespace)
+                store = LocalVectorRAGSystem(
+                    storage_dir=os.path.join(self.storage_dir, "namespaces", namespace) if self.storage_dir else None,
+                    index_type=self.index_type,
+                    embeddings=self.embeddings,
+                    nlist=self._nlist,
+                    nprobe=self._nprobe,
+                    initial_capacity=self._initial_capacity
+                )
+                store.namespace = namespace
+                store.query_cache = self.query_cache
+                self._namespaces[namespace] = store
+            return store
+
+    def drop_namespace(self, namespace: str):
+        """Release a namespace's store and delete its files"""
+        with self._lock:
+            store = self._namespaces.pop(namespace, None)
+        if store is None:
+            return
+
+        self.query_cache.invalidate(namespace)
+        with store._lock:
+            if store._journal_file is not None:
+                store._journal_file.close()
+                store._journal_file = None
+        if store.storage_dir:
+            shutil.rmtree(store.storage_dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.storage_dir, name)
+
+    def _load(self):
+        """Open an existing store from storage_dir and replay its journal"""
+        manifest_path = self._path("index.json")
+        journal = self._read_journal()
+        if not os.path.exists(manifest_path) and not journal:
+            return
+
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+
+        self._generation = manifest.get("generation", 0)
+        self._vectors_file = manifest.get("vectors_file", "vectors.f32")
+        self._hnsw_file = manifest.get("hnsw_file", "hnsw.bin")
+        self.dimension = manifest.get("dimension")
+        self._capacity = manifest.get("capacity", 0)
+        self._count = manifest.get("count", 0)
+        self._ids = manifest.get("ids", [])
+        self._metadata = manifest.get("metadata", [])
+        self._id_to_row = {doc_id: row for row, doc_id in enumerate(self._ids) if doc_id is not None}
+
+        # Entries from before the last checkpoint are already in the manifest
+        journal = [entry for entry in journal if entry["generation"] == self._generation]
+        for entry in journal:
+            self._replay(entry)
+        self._journal_entries = len(journal)
+
+        if self.dimension is None:
+            return
+
+        self._vectors = np.memmap(
+            self._path(self._vectors_file), dtype=np.float32, mode="r+",
+            shape=(self._capacity, self.dimension)
+        )
+        self._live = np.zeros(self._capacity, dtype=bool)
+        self._live[list(self._id_to_row.values())] = True
+
+        if self.index_type == "hnsw":
+            # The saved graph predates journaled writes, so rebuild it from the vectors
+            self._init_hnsw(load=not journal)
+        elif self._ivf is not None:
+            self._maybe_train_ivf()
+
+    def _read_journal(self) -> List[Dict[str, Any]]:
+        journal_path = self._path("journal.jsonl")
+        if not os.path.exists(journal_path):
+            return []
+
+        entries = []
+        with open(journal_path) as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A write torn by a crash; nothing after it was acknowledged
+                    break
+        return entries
+
+    def _replay(self, entry: Dict[str, Any]):
+        """Apply one journaled write to the ids and metadata"""
+        if entry["op"] == "upsert":
+            self.dimension = entry["dimension"]
+            self._capacity = entry["capacity"]
+            self._count = entry["count"]
+            missing = self._count - len(self._ids)
+            self._ids.extend([None] * missing)
+            self._metadata.extend([None] * missing)
+            for row, doc_id, metadata in entry["rows"]:
+                self._ids[row] = doc_id
+                self._metadata[row] = metadata
+                self._id_to_row[doc_id] = row
+        else:
+            for doc_id in entry["ids"]:
+                row = self._id_to_row.pop(doc_id, None)
+                if row is not None:
+                    self._ids[row] = None
+                    self._metadata[row] = None
+
+    def _journal(self, entry: Dict[str, Any]):
+        """
+        Append a write to the journal instead of rewriting the manifest
+
+        Vectors are flushed first, so a journaled row always has its vector
+        on disk. The manifest is rewritten only every
+        local_rag_journal_max_entries writes and on close.
+        """
+        if not self.storage_dir or self._vectors is None:
+            return
+
+        self._vectors.flush()
+
+        if self._journal_file is None:
+            self._journal_file = open(self._path("journal.jsonl"), "a")
+        self._journal_file.write(json.dumps({**entry, "generation": self._generation}) + "\n")
+        self._journal_file.flush()
+        self._journal_entries += 1
+
+        if self._journal_entries >= settings.local_rag_journal_max_entries:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        """Write the manifest (and HNSW graph) and start an empty journal"""
+        if not self.storage_dir or self._vectors is None:
+            return
+
+        self._vectors.flush()
+        generation = self._generation + 1
+
+        hnsw_file = self._hnsw_file
+        if self._hnsw is not None:
+            hnsw_file = f"hnsw.{generation}.bin"
+            self._hnsw.save_index(self._path(hnsw_file))
+
+        manifest_tmp = self._path("index.json.tmp")
+        with open(manifest_tmp, "w") as f:
+            json.dump({
+                "generation": generation,
+                "dimension": self.dimension,
+                "capacity": self._capacity,
+                "count": self._count,
+                "index_type": self.index_type,
+                "vectors_file": self._vectors_file,
+                "hnsw_file": hnsw_file,
+                "ids": self._ids,
+                "metadata": self._metadata
+            }, f)
+        os.replace(manifest_tmp, self._path("index.json"))
+
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+        open(self._path("journal.jsonl"), "w").close()
+
+        # Files the new manifest no longer references
+        for name in os.listdir(self.storage_dir):
+            if (
+                (name.startswith("vectors.") and name.endswith(".f32") and name != self._vectors_file)
+                or (name.startswith("hnsw.") and name.endswith(".bin") and name != hnsw_file)
+            ):
+                os.remove(self._path(name))
+
+        self._generation = generation
+        self._hnsw_file = hnsw_file
+        self._journal_entries = 0
+
+    def _should_compact(self) -> bool:
+        deleted = self._count - len(self._id_to_row)
+        return deleted > 0 and deleted >= self._count * settings.local_rag_compact_deleted_ratio
+
+    def _compact(self):
+        """Rewrite the store without deleted rows and rebuild the ANN index"""
+        live_rows = np.flatnonzero(self._live[:self._count])
+        count = len(live_rows)
+
+        if self.storage_dir:
+            # A new file, so the previous manifest stays valid until the checkpoint replaces it
+            vectors_file = f"vectors.{self._generation + 1}.f32"
+            vectors = np.memmap(
+                self._path(vectors_file), dtype=np.float32, mode="w+", shape=(self._capacity, self.dimension)
+            )
+            self._vectors_file = vectors_file
+        else:
+            vectors = np.zeros((self._capacity, self.dimension), dtype=np.float32)
+        vectors[:count] = self._vectors[live_rows]
+
+        self._vectors = vectors
+        self._ids = [self._ids[row] for row in live_rows.tolist()]
+        self._metadata = [self._metadata[row] for row in live_rows.tolist()]
+        self._id_to_row = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self._count = count
+        self._live = np.zeros(self._capacity, dtype=bool)
+        self._live[:count] = True
+
+        if self._ivf is not None:
+            self._ivf = _IVFIndex(self._nlist, self._nprobe)
+            self._maybe_train_ivf()
+        if self._hnsw is not None:
+            self._init_hnsw()
+
+        self._checkpoint()
+
+    def close(self):
+        """Checkpoint this store and every namespace, then close the journals"""
+        with self._lock:
+            stores = [self] + list(self._namespaces.values())
+
+        for store in stores:
+            with store._lock:
+                if store._journal_entries:
+                    store._checkpoint()
+                if store._journal_file is not None:
+                    store._journal_file.close()
+                    store._journal_file = None
+
+    def _ensure_capacity(self, rows_needed: int):
+        """Grow the vector store by doubling"""
+        if rows_needed <= self._capacity:
+            return
+
+        new_capacity = max(self._initial_capacity, self._capacity * 2, rows_needed)
+
+        if self.storage_dir:
+            tmp_path = self._path(self._vectors_file + ".tmp")
+            vectors = np.memmap(tmp_path, dtype=np.float32, mode="w+", shape=(new_capacity, self.dimension))
+        else:
+            vectors = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+
+        if self._vectors is not None and self._count:
+            vectors[:self._count] = self._vectors[:self._count]
+
+        if self.storage_dir:
+            vectors.flush()
+            os.replace(tmp_path, self._path(self._vectors_file))
+
+        live = np.zeros(new_capacity, dtype=bool)
+        live[:len(self._live)] = self._live
+
+        self._vectors = vectors
+        self._live = live
+        self._capacity = new_capacity
+
+        if self._hnsw is not None:
+            self._hnsw.resize_index(new_capacity)
+
+    def _init_hnsw(self, load: bool = False):
+        """Create or load the HNSW graph"""
+        try:
+            import hnswlib
+        except ImportError:
+            raise ImportError("hnswlib required for index_type='hnsw'. Install with: pip install hnswlib")
+
+        self._hnsw = hnswlib.Index(space="ip", dim=self.dimension)
+        hnsw_path = self._path(self._hnsw_file) if self.storage_dir else None
+
+        if load and hnsw_path and os.path.exists(hnsw_path):
+            self._hnsw.load_index(hnsw_path, max_elements=max(self._capacity, self._initial_capacity))
+        else:
+            self._hnsw.init_index(max_elements=max(self._capacity, self._initial_capacity), ef_construction=200, M=16)
+            live_rows = np.flatnonzero(self._live[:self._count])
+            if len(live_rows):
+                self._hnsw.add_items(np.asarray(self._vectors[live_rows]), live_rows)
+
+        self._hnsw.set_ef(64)
+
+    def _maybe_train_ivf(self):
+        live_rows = np.flatnonzero(self._live[:self._count])
+        if self._ivf.needs_training(len(live_rows)):
+            self._ivf.train(self._vectors, live_rows)
+
+    # ------------------------------------------------------------------
+    # PineconeRAGSystem API
+    # ------------------------------------------------------------------
+
+    def add_documents(
+        self,
+        documents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None,
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None,
+        namespace: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Add documents to vector store (existing IDs are overwritten)
+
+        Args:
+            documents: List of document texts
+            metadatas: Optional metadata for each document
+            ids: Optional IDs for documents
+            progress_callback: Called with running ingestion totals
+            namespace: Namespace to write to (e.g. one per tenant)
+
+        Returns:
+            Status dict
+        """
+        if not ids:
+            ids = [str(uuid.uuid4()) for _ in documents]
+
+        if not metadatas:
+            metadatas = [{} for _ in documents]
+
+        ingestion = self.add_documents_stream(zip(ids, documents, metadatas), progress_callback, namespace)
+
+        return {
+            "status": "success",
+            "documents_added": len(documents),
+            "ids": ids,
+            "ingestion": ingestion
+        }
+
+    def add_documents_stream(
+        self,
+        documents: Iterable[Tuple[str, str, Dict[str, Any]]],
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None,
+        namespace: str = ""
+    ) -> Dict[str, int]:
+        """
+        Ingest (id, text, metadata) documents from any iterable
+
+        Returns:
+            Ingestion totals (documents, cache hits, requests)
+        """
+        if not self.embeddings:
+            self._init_embeddings()
+
+        store = self._namespace_store(namespace)
+        if store is not self:
+            store.embeddings = store.embeddings or self.embeddings
+            return store.add_documents_stream(documents, progress_callback)
+
+        # Local writes are serialized and journaled, so use few large batches
+        pipeline = IngestionPipeline(
+            EmbeddingPipeline(self.embeddings),
+            upsert_fn=lambda batch: self.upsert(
+                [record[0] for record in batch],
+                [record[1] for record in batch],
+                [record[2] for record in batch]
+            ),
+            upsert_max_vectors=1000,
+            upsert_max_bytes=sys.maxsize,
+            max_concurrency=1,
+            progress_callback=progress_callback
+        )
+        return pipeline.ingest(documents)
+
+    def upsert(
+        self,
+        ids: List[str],
+        vectors: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+        namespace: str = ""
+    ):
+        """Write pre-computed vectors (mirrors Pinecone index.upsert)"""
+        store = self._namespace_store(namespace)
+        if store is not self:
+            return store.upsert(ids, vectors, metadatas)
+
+        if not ids:
+            return
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = matrix.shape[1]
+            elif matrix.shape[1] != self.dimension:
+                raise ValueError(f"Vector dimension {matrix.shape[1]} does not match index dimension {self.dimension}")
+
+            new_ids = [doc_id for doc_id in dict.fromkeys(ids) if doc_id not in self._id_to_row]
+            self._ensure_capacity(self._count + len(new_ids))
+
+            if self.index_type == "hnsw" and self._hnsw is None:
+                self._init_hnsw()
+
+            rows = []
+            for doc_id, vector, metadata in zip(ids, matrix, metadatas):
+                row = self._id_to_row.get(doc_id)
+                if row is None:
+                    row = self._count
+                    self._count += 1
+                    self._ids.append(doc_id)
+                    self._metadata.append(metadata)
+                    self._id_to_row[doc_id] = row
+                else:
+                    self._metadata[row] = metadata
+
+                self._vectors[row] = vector
+                self._live[row] = True
+                rows.append(row)
+
+                if self._ivf is not None:
+                    self._ivf.add(row, vector)
+
+            if self._hnsw is not None:
+                self._hnsw.add_items(matrix, rows)
+            elif self._ivf is not None:
+                self._maybe_train_ivf()
+
+            self._journal({
+                "op": "upsert",
+                "dimension": self.dimension,
+                "capacity": self._capacity,
+                "count": self._count,
+                "rows": [[row, self._ids[row], self._metadata[row]] for row in rows]
+            })
+            self.query_cache.invalidate(self.namespace)
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        Semantic search for relevant documents
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            filter: Metadata filters (Pinecone filter syntax)
+            namespace: Namespace to search
+
+        Returns:
+            List of relevant documents with scores
+        """
+        return self.search_by_vector(self.embed_query(query), top_k=top_k, filter=filter, namespace=namespace)
+
+    async def asearch(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = ""
+    ) -> List[Dict[str, Any]]:
+        """Async search (runs the scan in a worker thread)"""
+        return await asyncio.to_thread(self.search, query, top_k, filter, namespace)
+
+    def search_namespaces(
+        self,
+        query: str,
+        namespaces: List[str],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search several namespaces concurrently (e.g. shared + tenant corpora)
+
+        Returns:
+            Global top-k across namespaces, each result tagged with its namespace
+        """
+        return search_namespaces(self, query, namespaces, top_k=top_k, filter=filter)
+
+    async def asearch_namespaces(
+        self,
+        query: str,
+        namespaces: List[str],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Async variant of search_namespaces"""
+        return await asearch_namespaces(self, query, namespaces, top_k=top_k, filter=filter)
+
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query string (cached)"""
+        if not self.embeddings:
+            self._init_embeddings()
+        return self.query_cache.embed_query(self.embeddings, query)
+
+    def search_by_vector(
+        self,
+        vector: List[float],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = ""
+    ) -> List[Dict[str, Any]]:
+        """Search with a pre-computed query embedding"""
+        if namespace and not self.namespace:
+            if namespace not in self._namespaces:
+                return []
+            return self._namespaces[namespace].search_by_vector(vector, top_k=top_k, filter=filter)
+
+        cache_key = self.query_cache.result_key(vector, filter, top_k, self.namespace)
+        cached = self.query_cache.get_results(cache_key)
+        if cached is not None:
+            return cached
+
+        query = np.asarray(vector, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+
+        with self._lock:
+            if self._count == 0:
+                return []
+
+            rows, scores = [], []
+            if self._hnsw is not None:
+                rows, scores = self._search_hnsw(query, top_k, filter)
+            if len(rows) < top_k and (self._hnsw is None or filter):
+                # Selective filters can starve the graph search; scan exactly instead
+                rows, scores = self._search_exact(query, top_k, filter)
+
+            matches = [
+                {
+                    "id": self._ids[row],
+                    "score": float(score),
+                    "text": self._metadata[row].get("text", ""),
+                    "metadata": {k: v for k, v in self._metadata[row].items() if k != "text"}
+                }
+                for row, score in zip(rows, scores)
+            ]
+            self.query_cache.set_results(cache_key, matches)
+            return matches
+
+    def _search_exact(self, query, top_k: int, filter: Optional[Dict[str, Any]]):
+        """Vectorised cosine scan over all rows, or over IVF candidate buckets"""
+        if self._ivf is not None and self._ivf.centroids is not None:
+            rows, scores = self._scan(query, self._ivf.candidates(query), top_k, filter)
+            if len(rows) == top_k or not filter:
+                return rows, scores
+            # A selective filter can empty the probed buckets; fall back to a full scan
+
+        return self._scan(query, np.arange(self._count), top_k, filter)
+
+    def _scan(self, query, rows, top_k: int, filter: Optional[Dict[str, Any]]):
+        """Score candidate rows and return the top_k"""
+        mask = self._live[rows]
+        if filter:
+            mask &= np.fromiter(
+                (matches_filter(self._metadata[row], filter) for row in rows.tolist()),
+                dtype=bool, count=len(rows)
+            )
+        rows = rows[mask]
+
+        if len(rows) == 0:
+            return [], []
+
+        # IVF candidates come from a set, so rows are not in row order
+        scores = np.asarray(self._vectors[rows]) @ query
+
+        k = min(top_k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return rows[top].tolist(), scores[top].tolist()
+
+    def _search_hnsw(self, query, top_k: int, filter: Optional[Dict[str, Any]]):
+        """Approximate graph search, over-fetching when a filter is applied"""
+        live_count = int(self._live[:self._count].sum())
+        if live_count == 0:
+            return [], []
+
+        fetch = min(live_count, top_k * 10 if filter else top_k)
+        labels, distances = self._hnsw.knn_query(query, k=fetch)
+
+        rows = []
+        scores = []
+        for row, distance in zip(labels[0].tolist(), distances[0].tolist()):
+            if not self._live[row] or not matches_filter(self._metadata[row], filter):
+                continue
+            rows.append(row)
+            scores.append(1.0 - distance)
+            if len(rows) == top_k:
+                break
+
+        return rows, scores
+
+    def delete_documents(self, ids: List[str], namespace: str = "") -> Dict[str, Any]:
+        """Delete documents by IDs"""
+        store = self._namespace_store(namespace)
+        if store is not self:
+            return store.delete_documents(ids)
+
+        deleted = 0
+
+        with self._lock:
+            for doc_id in ids:
+                row = self._id_to_row.pop(doc_id, None)
+                if row is None:
+                    continue
+
+                self._live[row] = False
+                self._ids[row] = None
+                self._metadata[row] = None
+                deleted += 1
+
+                if self._ivf is not None:
+                    self._ivf.remove(row)
+                if self._hnsw is not None:
+                    self._hnsw.mark_deleted(row)
+
+            if self._should_compact():
+                self._compact()
+            elif deleted:
+                self._journal({"op": "delete", "ids": ids})
+            self.query_cache.invalidate(self.namespace)
+
+        return {"status": "deleted", "count": deleted}
+
+    def list_ids(self, prefix: str = "", namespace: str = "") -> Iterator[str]:
+        """Iterate document IDs starting with prefix"""
+        if namespace and not self.namespace:
+            store = self._namespaces.get(namespace)
+            return store.list_ids(prefix) if store else iter([])
+
+        with self._lock:
+            ids = [doc_id for doc_id in self._id_to_row if doc_id.startswith(prefix)]
+        return iter(ids)
+
+    def iter_documents(self, namespace: str = "") -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Iterate stored (id, text, metadata) documents, e.g. to rebuild a keyword index"""
+        if namespace and not self.namespace:
+            store = self._namespaces.get(namespace)
+            return store.iter_documents() if store else iter([])
+
+        with self._lock:
+            documents = [
+                (doc_id, self._metadata[row].get("text", ""), {k: v for k, v in self._metadata[row].items() if k != "text"})
+                for doc_id, row in self._id_to_row.items()
+            ]
+        return iter(documents)
+
+    def get_index_stats(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        with self._lock:
+            namespaces = {"": {"vector_count": len(self._id_to_row)}} if self._id_to_row else {}
+            for name, store in self._namespaces.items():
+                namespaces[name] = {"vector_count": len(store._id_to_row)}
+
+            return {
+                "total_vector_count": sum(summary["vector_count"] for summary in namespaces.values()),
+                "dimension": self.dimension or next(
+                    (store.dimension for store in self._namespaces.values() if store.dimension), None
+                ),
+                "index_fullness": self._count / self._capacity if self._capacity else 0.0,
+                "index_type": self.index_type,
+                "namespaces": namespaces,
+                "cache": self.query_cache.get_stats()
+            }
@@ -0,0 +1,260 @@
+"""
+Write-Behind Memory Buffer - Batched, asynchronous memory persistence
+Keeps memory writes off the agent's critical path
+"""
+import os
+import time
+import atexit
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from backend.shared.config import settings
+
+# Longest wait between retries of a failed batch
+MAX_RETRY_BACKOFF_SECONDS = 60.0
+
+
+class WriteBehindMemoryBuffer:
+    """
+    Buffers memory additions per session and flushes them in batches
+
+    A session is flushed when it reaches max_batch_size records or when its
+    oldest record is older than flush_interval_seconds. Flushing happens on a
+    background thread; drain() flushes everything synchronously and is
+    registered to run at process exit and Celery worker shutdown. A failed
+    batch is retried with exponential backoff, then dropped.
+    """
+
+    def __init__(
+        self,
+        memory_system: Any,
+        max_batch_size: Optional[int] = None,
+        flush_interval_seconds: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        max_attempts: int = 3
+    ):
+        """
+        Initialize write-behind buffer
+
+        Args:
+            memory_system: Memory backend (local, Mem0, Zep or mock)
+            max_batch_size: Records per session that trigger a flush
+            flush_interval_seconds: Maximum time a record waits before flushing
+            max_pending: Buffered records above which callers flush inline (backpressure)
+            max_attempts: Flush attempts before a batch is dropped
+        """
+        self.memory_system = memory_system
+        self.max_batch_size = max_batch_size or settings.memory_buffer_max_batch_size
+        self.flush_interval = flush_interval_seconds or settings.memory_buffer_flush_interval_seconds
+        self.max_pending = max_pending or settings.memory_buffer_max_pending
+        self.max_attempts = max_attempts
+
+        # session key -> {"memories": [...], "messages": [...], "since": monotonic, "attempts": int}
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._stats = {"flushes": 0, "records_written": 0, "records_dropped": 0, "errors": 0}
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add_memory(
+        self,
+        text: str,
+        user_id: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None
+    ):
+        """Queue a long-term memory (Mem0MemorySystem.add_memory)"""
+        key = f"memory:{user_id}:{session_id or ''}"
+        self._enqueue(key, "memories", {"text": text, "user_id": user_id, "metadata": metadata or {}})
+
+    def add_message(
+        self,
+        session_id: str,
+        role: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """Queue a session message (ZepMemorySystem.add_message)"""
+        key = f"session:{session_id}"
+        self._enqueue(key, "messages", {
+            "session_id": session_id,
+            "role": role,
+            "content": content,
+            "metadata": metadata or {}
+        })
+
+    def _enqueue(self, key: str, kind: str, record: Dict[str, Any]):
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = {
+                    "memories": [],
+                    "messages": [],
+                    "since": time.monotonic(),
+                    "attempts": 0
+                }
+            session[kind].append(record)
+            self._pending += 1
+            size = len(session["memories"]) + len(session["messages"])
+            overloaded = self._pending > self.max_pending
+
+        if overloaded:
+            # The backend is not keeping up; the caller pays for this session's flush,
+            # but never by blocking an event loop
+            try:
+                asyncio.get_running_loop().run_in_executor(None, self._flush_session, key)
+            except RuntimeError:
+                self._flush_session(key)
+        elif size >= self.max_batch_size:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(timeout=self.flush_interval / 2)
+            self._wakeup.clear()
+            self.flush(only_due=True)
+
+    def flush(self, only_due: bool = False) -> int:
+        """
+        Flush buffered sessions
+
+        Sessions waiting to retry a failed batch are skipped until their backoff ends.
+
+        Args:
+            only_due: Only flush sessions that are full or past the flush interval
+
+        Returns:
+            Number of records written
+        """
+        now = time.monotonic()
+        with self._lock:
+            keys = [
+                key for key, session in self._sessions.items()
+                if session.get("retry_at", 0) <= now and (
+                    not only_due
+                    or now - session["since"] >= self.flush_interval
+                    or len(session["memories"]) + len(session["messages"]) >= self.max_batch_size
+                )
+            ]
+
+        return sum(self._flush_session(key) for key in keys)
+
+    def _flush_session(self, key: str) -> int:
+        with self._lock:
+            session = self._sessions.pop(key, None)
+            if session is None:
+                return 0
+            count = len(session["memories"]) + len(session["messages"])
+            self._pending -= count
+
+        try:
+            if session["memories"]:
+                self._write_memories(session["memories"])
+            if session["messages"]:
+                self._write_messages(session["messages"])
+        except Exception as e:
+            session["attempts"] += 1
+            with self._lock:
+                self._stats["errors"] += 1
+                if session["attempts"] >= self.max_attempts:
+                    self._stats["records_dropped"] += count
+            if session["attempts"] >= self.max_attempts:
+                print(f"Dropping {count} buffered memory records for {key} after {session['attempts']} attempts: {e}")
+                return 0
+
+            # Retry on a later flush, ahead of anything queued since
+            with self._lock:
+                queued = self._sessions.pop(key, None)
+                if queued:
+                    session["memories"] += queued["memories"]
+                    session["messages"] += queued["messages"]
+                    self._pending -= len(queued["memories"]) + len(queued["messages"])
+                session["since"] = time.monotonic()
+                session["retry_at"] = session["since"] + min(
+                    self.flush_interval * 2 ** (session["attempts"] - 1), MAX_RETRY_BACKOFF_SECONDS
+                )
+                self._sessions[key] = session
+                self._pending += len(session["memories"]) + len(session["messages"])
+            return 0
+
+        with self._lock:
+            self._stats["flushes"] += 1
+            self._stats["records_written"] += count
+        return count
+
+    def _write_memories(self, records: List[Dict[str, Any]]):
+        user_id = records[0]["user_id"]
+        if hasattr(self.memory_system, "add_memories"):
+            self.memory_system.add_memories(
+                [record["text"] for record in records],
+                user_id=user_id,
+                metadatas=[record["metadata"] for record in records]
+            )
+        else:
+            for record in records:
+                self.memory_system.add_memory(record["text"], user_id=user_id, metadata=record["metadata"])
+
+    def _write_messages(self, records: List[Dict[str, Any]]):
+        session_id = records[0]["session_id"]
+        if hasattr(self.memory_system, "add_messages"):
+            self.memory_system.add_messages(session_id, [
+                {"role": record["role"], "content": record["content"], "metadata": record["metadata"]}
+                for record in records
+            ])
+        else:
+            for record in records:
+                self.memory_system.add_message(session_id, record["role"], record["content"], metadata=record["metadata"])
+
+    def drain(self, timeout: float = 10.0) -> int:
+        """
+        Stop the background thread and synchronously flush everything buffered
+
+        Returns:
+            Number of records written
+        """
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join(timeout=timeout)
+
+        written = 0
+        deadline = time.monotonic() + timeout
+        while self._sessions and time.monotonic() < deadline:
+            written += self.flush()
+            with self._lock:
+                retry_at = min((session.get("retry_at", 0) for session in self._sessions.values()), default=0)
+            # Wait out the earliest backoff instead of retrying failed batches in a tight loop
+            time.sleep(max(0.0, min(retry_at, deadline) - time.monotonic()))
+        return written
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "pending_records": self._pending, "pending_sessions": len(self._sessions)}
+
+
+_memory_buffer = None
+_memory_buffer_lock = threading.Lock()
+
+
+def get_memory_buffer() -> WriteBehindMemoryBuffer:
+    """Get the process-wide write-behind buffer for the configured memory backend"""
+    global _memory_buffer
+    with _memory_buffer_lock:
+        if _memory_buffer is None:
+            from backend.shared.integrations.memory_systems import get_memory_system
+            _memory_buffer = WriteBehindMemoryBuffer(get_memory_system())
+            atexit.register(_memory_buffer.drain)
+        return _memory_buffer
+
+
+def drain_memory_buffer():
+    """Flush the process-wide buffer if one was created (shutdown hook)"""
+    if _memory_buffer is not None:
+        _memory_buffer.drain()
@@ -1,10 +1,14 @@
 """
 Agent Memory Systems - Persistent memory across conversations
-Integrates Mem0 and Zep for long-term agent memory
+Integrates Mem0 and Zep for long-term agent memory, or a self-hosted tiered store
 """
 import os
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from backend.shared.config import settings
 
 
 class Mem0MemorySystem:
@@ -66,6 +70,42 @@ class Mem0MemorySystem:
             "status": "added"
         }
 
+    def add_memories(
+        self,
+        texts: List[str],
+        user_id: str,
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Add several conversation texts in one extraction call
+
+        Args:
+            texts: Conversation texts to extract memories from
+            user_id: User identifier
+            metadatas: Metadata per text (merged into one)
+
+        Returns:
+            Memory extraction result
+        """
+        if not self.client:
+            raise ValueError("Mem0 client not initialized")
+
+        metadata = {}
+        for item in metadatas or []:
+            metadata.update(item)
+
+        result = self.client.add(
+            [{"role": "user", "content": text} for text in texts],
+            user_id=user_id,
+            metadata=metadata
+        )
+
+        return {
+            "memory_id": result.get("id"),
+            "extracted_memories": result.get("memories", []),
+            "status": "added"
+        }
+
     def search_memory(
         self,
         query: str,
@@ -208,6 +248,29 @@ class ZepMemorySystem:
 
         return {"status": "added", "session_id": session_id}
 
+    def add_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Add several messages to session memory in one request
+
+        Args:
+            session_id: Session identifier
+            messages: Message dicts with role, content and optional metadata
+
+        Returns:
+            Status dict
+        """
+        if not self.client:
+            raise ValueError("Zep client not initialized")
+
+        from zep_python.models import Memory, Message
+
+        self.client.memory.add_memory(session_id, Memory(messages=[
+            Message(role=m["role"], content=m["content"], metadata=m.get("metadata") or {})
+            for m in messages
+        ]))
+
+        return {"status": "added", "session_id": session_id, "count": len(messages)}
+
     def get_memory(self, session_id: str) -> Dict[str, Any]:
         """
         Get memory for a session
@@ -270,6 +333,12 @@ class MockMemorySystem:
         self.memories[memory_id] = {"text": text, "user_id": user_id}
         return {"memory_id": memory_id, "extracted_memories": [text], "status": "added"}
 
+    def add_memories(self, texts: List[str], user_id: str, **kwargs) -> Dict[str, Any]:
+        print(f"[MOCK] Memory add_memories: {len(texts)} for user {user_id}")
+        for text in texts:
+            self.memories[f"mem_{len(self.memories)}"] = {"text": text, "user_id": user_id}
+        return {"memory_id": None, "extracted_memories": texts, "status": "added"}
+
     def search_memory(self, query: str, user_id: str, **kwargs) -> List[Dict[str, Any]]:
         print(f"[MOCK] Memory search_memory: {query}")
         return [{"memory": "Mock memory result", "score": 0.95, "metadata": {}}]
@@ -286,6 +355,10 @@ class MockMemorySystem:
         print(f"[MOCK] Memory add_message: {role} - {content[:50]}")
         return {"status": "added", "session_id": session_id}
 
+    def add_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        print(f"[MOCK] Memory add_messages: {len(messages)} to {session_id}")
+        return {"status": "added", "session_id": session_id, "count": len(messages)}
+
     def get_memory(self, session_id: str) -> Dict[str, Any]:
         print(f"[MOCK] Memory get_memory: {session_id}")
         return {
@@ -294,3 +367,22 @@ class MockMemorySystem:
             "summary": "Mock summary",
             "facts": ["Mock fact 1", "Mock fact 2"]
         }
+
+
+_memory_system = None
+
+
+def get_memory_system():
+    """Get the configured agent memory backend (local, Mem0, Zep or mock)"""
+    global _memory_system
+    if _memory_system is None:
+        if settings.mock_mode:
+            _memory_system = MockMemorySystem()
+        elif settings.memory_backend == "mem0":
+            _memory_system = Mem0MemorySystem()
+        elif settings.memory_backend == "zep":
+            _memory_system = ZepMemorySystem()
+        else:
+            from backend.shared.integrations.local_memory import LocalTieredMemorySystem
+            _memory_system = LocalTieredMemorySystem()
+    return _memory_system
@@ -411,3 +411,33 @@ def get_hubspot_client():
     else:
         from backend.shared.integrations.hubspot_client import hubspot_client
         return hubspot_client
+
+
+def get_teams_client():
+    """Get MS Teams client (real or mock)"""
+    if settings.mock_mode or settings.mock_teams_enabled:
+        from backend.shared.integrations.ms_teams_client import MockMSTeamsClient
+        return MockMSTeamsClient()
+    else:
+        from backend.shared.integrations.ms_teams_client import MSTeamsClient
+        return MSTeamsClient()
+
+
+def get_discord_client():
+    """Get Discord client (real or mock)"""
+    if settings.mock_mode or settings.mock_discord_enabled:
+        from backend.shared.integrations.discord_client import MockDiscordClient
+        return MockDiscordClient()
+    else:
+        from backend.shared.integrations.discord_client import DiscordClient
+        return DiscordClient()
+
+
+def get_sms_client():
+    """Get Twilio SMS client (real or mock)"""
+    if settings.mock_mode or settings.mock_sms_enabled:
+        from backend.shared.integrations.twilio_client import MockTwilioClient
+        return MockTwilioClient()
+    else:
+        from backend.shared.integrations.twilio_client import TwilioClient
+        return TwilioClient()
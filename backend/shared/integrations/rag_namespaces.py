@@ -0,0 +1,145 @@
+"""
+Multi-namespace RAG search - embed once, query namespaces concurrently, merge top-k
+"""
+import re
+import heapq
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Iterable, Callable
+
+NAMESPACE_PATTERN = re.compile(r"^[A-Za-z0-9_][A-Za-z0-9_.-]{0,127}$")
+
+
+def validate_namespace(namespace: str) -> str:
+    """Reject namespace names that are unsafe as storage keys"""
+    if namespace and not NAMESPACE_PATTERN.match(namespace):
+        raise ValueError(f"Invalid namespace: {namespace!r}")
+    return namespace
+
+
+def owned_namespace_prefixes(context: Optional[Dict[str, Any]]) -> List[str]:
+    """Namespaces belonging to the caller: tenant-{tenant} and user-{user_id}"""
+    context = context or {}
+    prefixes = []
+    if context.get("tenant"):
+        prefixes.append(f"tenant-{context['tenant']}")
+    if context.get("user_id"):
+        prefixes.append(f"user-{context['user_id']}")
+    return prefixes
+
+
+def authorize_namespaces(
+    namespaces: List[str],
+    context: Optional[Dict[str, Any]],
+    shared_namespaces: Iterable[str] = (),
+    allow_default: bool = True
+) -> List[str]:
+    """
+    Reject namespaces the caller may not search
+
+    Namespace names come from client-supplied workflow definitions, so a
+    literal "tenant-<someone else>" must not reach the store. Allowed are
+    the caller's own namespaces (and "<own>.<suffix>" sub-namespaces), the
+    server-side shared allowlist, and the default namespace if enabled.
+
+    Args:
+        namespaces: Resolved namespace names
+        context: Execution context (user_id, tenant) set by the server
+        shared_namespaces: Namespaces every tenant may search
+        allow_default: Whether the default ("") namespace is shared
+
+    Returns:
+        The namespaces, validated
+
+    Raises:
+        PermissionError: If any namespace belongs to someone else
+    """
+    shared = set(shared_namespaces)
+    owned = owned_namespace_prefixes(context)
+    for namespace in namespaces:
+        validate_namespace(namespace)
+        if namespace == "":
+            if allow_default:
+                continue
+        elif namespace in shared or any(
+            namespace == prefix or namespace.startswith(f"{prefix}.") for prefix in owned
+        ):
+            continue
+        raise PermissionError(f"Namespace not accessible: {namespace!r}")
+    return namespaces
+
+
+def merge_results(results_by_namespace: Dict[str, List[Dict[str, Any]]], top_k: int) -> List[Dict[str, Any]]:
+    """Merge per-namespace result lists into one global top-k by score"""
+    tagged = (
+        {**result, "namespace": namespace}
+        for namespace, results in results_by_namespace.items()
+        for result in results
+    )
+    return heapq.nlargest(top_k, tagged, key=lambda result: result["score"])
+
+
+def search_namespaces(
+    rag_system: Any,
+    query: str,
+    namespaces: List[str],
+    top_k: int = 5,
+    filter: Optional[Dict[str, Any]] = None,
+    max_workers: int = 8
+) -> List[Dict[str, Any]]:
+    """
+    Search several namespaces of one RAG backend concurrently
+
+    The query is embedded once; each namespace is searched independently, so
+    a large namespace only delays its own partial result, not the merge of
+    small ones beyond its own latency.
+
+    Args:
+        rag_system: PineconeRAGSystem or LocalVectorRAGSystem
+        query: Search query
+        namespaces: Namespaces to search ("" is the default namespace)
+        top_k: Number of merged results to return
+        filter: Metadata filters applied in every namespace
+        max_workers: Namespaces searched in parallel
+
+    Returns:
+        Merged results, each tagged with its namespace
+    """
+    vector = rag_system.embed_query(query)
+
+    def search(namespace: str) -> List[Dict[str, Any]]:
+        return rag_system.search_by_vector(vector, top_k=top_k, filter=filter, namespace=namespace)
+
+    return merge_results(fan_out(search, namespaces, max_workers), top_k)
+
+
+def fan_out(
+    search: Callable[[str], List[Dict[str, Any]]],
+    namespaces: List[str],
+    max_workers: int = 8
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Run a per-namespace search for each (distinct) namespace on a thread pool"""
+    namespaces = list(dict.fromkeys(namespaces))
+    if len(namespaces) == 1:
+        return {namespaces[0]: search(namespaces[0])}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(namespaces))) as executor:
+        return dict(zip(namespaces, executor.map(search, namespaces)))
+
+
+async def asearch_namespaces(
+    rag_system: Any,
+    query: str,
+    namespaces: List[str],
+    top_k: int = 5,
+    filter: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """Async variant of search_namespaces using worker threads per namespace"""
+    namespaces = list(dict.fromkeys(namespaces))
+    vector = await asyncio.to_thread(rag_system.embed_query, query)
+
+    results = await asyncio.gather(*(
+        asyncio.to_thread(rag_system.search_by_vector, vector, top_k, filter, namespace)
+        for namespace in namespaces
+    ))
+    return merge_results(dict(zip(namespaces, results)), top_k)
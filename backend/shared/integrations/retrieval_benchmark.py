@@ -0,0 +1,155 @@
+"""
+Retrieval Benchmark - Recall@k and latency for dense, keyword and hybrid search
+Runs offline over a synthetic ticket/SKU corpus using the local vector index
+"""
+import os
+import json
+import time
+import random
+import argparse
+from typing import Dict, Any, List, Tuple
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from backend.shared.integrations.local_vector_index import LocalVectorRAGSystem, HashingEmbeddings
+from backend.shared.integrations.hybrid_search import HybridSearcher, CrossEncoderReranker
+
+TOPICS = {
+    "billing": "invoice refund charge payment card declined subscription renewal receipt tax credit balance overdue",
+    "shipping": "delivery courier tracking parcel delayed warehouse dispatch address customs package lost express",
+    "login": "password reset account locked sign-in authentication token expired session mfa email verification",
+    "hardware": "device battery screen cracked charger overheating firmware power button speaker replacement warranty",
+    "network": "wifi router connection dropped latency outage bandwidth vpn dns packet loss modem",
+    "returns": "return label exchange damaged defective wrong size item unopened restocking policy",
+}
+FILLER = "customer reports issue please help urgent since yesterday thanks team update".split()
+
+
+def build_corpus(size: int, seed: int = 7) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Build a synthetic support-ticket corpus and labelled queries
+
+    Half of the queries look up a ticket or SKU identifier, half describe
+    the ticket in topic words; each has exactly one relevant document.
+
+    Returns:
+        Tuple of (documents, queries)
+    """
+    rng = random.Random(seed)
+    vocab = {topic: words.split() for topic, words in TOPICS.items()}
+    documents, queries = [], []
+
+    for i in range(size):
+        topic = rng.choice(list(vocab))
+        ticket = f"INC-{100000 + i}"
+        sku = f"SKU-{rng.randint(10000, 99999)}-{rng.choice('ABCDEF')}"
+        words = rng.sample(vocab[topic], 6)
+        text = f"Ticket {ticket} for {sku}: {' '.join(words + rng.sample(FILLER, 4))}"
+        doc_id = f"doc-{i}"
+
+        documents.append({"id": doc_id, "text": text, "metadata": {"topic": topic}})
+        if rng.random() < 0.5:
+            queries.append({"query": f"status of {rng.choice([ticket, sku])}", "relevant": doc_id, "kind": "identifier"})
+        else:
+            queries.append({"query": " ".join(rng.sample(words, 4)), "relevant": doc_id, "kind": "semantic"})
+
+    return documents, queries
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_benchmark(
+    corpus_size: int = 5000,
+    query_count: int = 500,
+    k_values: Tuple[int, ...] = (1, 5, 10),
+    rerank: bool = False,
+    index_type: str = "flat"
+) -> Dict[str, Any]:
+    """
+    Index a synthetic corpus and measure recall@k and latency per search mode
+
+    Args:
+        corpus_size: Number of synthetic documents
+        query_count: Number of labelled queries to run
+        k_values: Cut-offs for recall@k
+        rerank: Also benchmark hybrid + cross-encoder rerank
+        index_type: Local vector index type
+
+    Returns:
+        Per-mode recall@k (overall and per query kind) and p50/p99 latency in ms
+    """
+    documents, queries = build_corpus(corpus_size)
+    queries = queries[:query_count]
+
+    searcher = HybridSearcher(
+        LocalVectorRAGSystem(index_type=index_type, embeddings=HashingEmbeddings()),
+        reranker=CrossEncoderReranker() if rerank else None
+    )
+    searcher.add_documents(
+        [doc["text"] for doc in documents],
+        metadatas=[doc["metadata"] for doc in documents],
+        ids=[doc["id"] for doc in documents]
+    )
+
+    modes = [("dense", False), ("keyword", False), ("hybrid", False)]
+    if rerank:
+        modes.append(("hybrid", True))
+
+    max_k = max(k_values)
+    report = {"corpus_size": corpus_size, "queries": len(queries), "index_type": index_type, "modes": {}}
+
+    for mode, use_rerank in modes:
+        latencies = []
+        hits = {kind: {k: 0 for k in k_values} for kind in ("all", "identifier", "semantic")}
+        totals = {"all": 0, "identifier": 0, "semantic": 0}
+
+        for query in queries:
+            start = time.perf_counter()
+            results = searcher.search(query["query"], top_k=max_k, mode=mode, rerank=use_rerank)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            ids = [result["id"] for result in results]
+            for kind in ("all", query["kind"]):
+                totals[kind] += 1
+                for k in k_values:
+                    if query["relevant"] in ids[:k]:
+                        hits[kind][k] += 1
+
+        name = f"{mode}+rerank" if use_rerank else mode
+        report["modes"][name] = {
+            "recall": {
+                kind: {f"@{k}": round(hits[kind][k] / totals[kind], 4) if totals[kind] else None for k in k_values}
+                for kind in hits
+            },
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50), 3),
+                "p99": round(percentile(latencies, 99), 3)
+            }
+        }
+
+    return report
+
+
+def main():
+    """Run the retrieval benchmark and print a JSON report"""
+    parser = argparse.ArgumentParser(description="Benchmark dense, keyword and hybrid retrieval")
+    parser.add_argument("--corpus-size", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--index-type", default="flat", choices=["flat", "ivf", "hnsw"])
+    parser.add_argument("--rerank", action="store_true", help="Include the cross-encoder rerank stage")
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        corpus_size=args.corpus_size,
+        query_count=args.queries,
+        rerank=args.rerank,
+        index_type=args.index_type
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
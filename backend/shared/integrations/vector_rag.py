@@ -2,7 +2,16 @@
 Vector Database RAG System - Pinecone for document embeddings and retrieval
 """
 import os
-from typing import Optional, Dict, Any, List
+import uuid
+import atexit
+import asyncio
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Tuple, Callable
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from backend.shared.config import settings
+from backend.shared.integrations.embedding_pipeline import EmbeddingPipeline, IngestionPipeline, QueryCache
+from backend.shared.integrations.rag_namespaces import search_namespaces, asearch_namespaces
 
 
 class PineconeRAGSystem:
@@ -30,6 +39,7 @@ class PineconeRAGSystem:
         self.index_name = index_name
         self.index = None
         self.embeddings = None
+        self.query_cache = QueryCache()
 
         if self.api_key:
             self._init_pinecone()
@@ -72,7 +82,9 @@ class PineconeRAGSystem:
         self,
         documents: List[str],
         metadatas: Optional[List[Dict[str, Any]]] = None,
-        ids: Optional[List[str]] = None
+        ids: Optional[List[str]] = None,
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None,
+        namespace: str = ""
     ) -> Dict[str, Any]:
         """
         Add documents to vector store
@@ -81,50 +93,64 @@ class PineconeRAGSystem:
             documents: List of document texts
             metadatas: Optional metadata for each document
             ids: Optional IDs for documents
+            progress_callback: Called with running ingestion totals
+            namespace: Pinecone namespace (e.g. one per tenant)
 
         Returns:
             Status dict
         """
-        if not self.index:
-            raise ValueError("Pinecone not initialized")
-
-        if not self.embeddings:
-            self._init_embeddings()
-
-        # Generate embeddings
-        vectors = self.embeddings.embed_documents(documents)
-
-        # Prepare upsert data
         if not ids:
-            import uuid
             ids = [str(uuid.uuid4()) for _ in documents]
 
         if not metadatas:
-            metadatas = [{}] * len(documents)
-
-        # Add text to metadata
-        for i, doc in enumerate(documents):
-            metadatas[i]["text"] = doc
-
-        # Upsert to Pinecone
-        upsert_data = [
-            (ids[i], vectors[i], metadatas[i])
-            for i in range(len(documents))
-        ]
+            metadatas = [{} for _ in documents]
 
-        self.index.upsert(vectors=upsert_data)
+        ingestion = self.add_documents_stream(zip(ids, documents, metadatas), progress_callback, namespace)
 
         return {
             "status": "success",
             "documents_added": len(documents),
-            "ids": ids
+            "ids": ids,
+            "ingestion": ingestion
         }
 
+    def add_documents_stream(
+        self,
+        documents: Iterable[Tuple[str, str, Dict[str, Any]]],
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None,
+        namespace: str = ""
+    ) -> Dict[str, int]:
+        """
+        Ingest (id, text, metadata) documents from any iterable
+
+        Embeddings are cached by content hash and requested in size-bounded
+        batches; upserts are split to stay under Pinecone's request limit.
+
+        Returns:
+            Ingestion totals (documents, cache hits, requests)
+        """
+        if not self.index:
+            raise ValueError("Pinecone not initialized")
+
+        if not self.embeddings:
+            self._init_embeddings()
+
+        pipeline = IngestionPipeline(
+            EmbeddingPipeline(self.embeddings),
+            upsert_fn=lambda batch: self.index.upsert(vectors=batch, namespace=namespace),
+            progress_callback=progress_callback
+        )
+        try:
+            return pipeline.ingest(documents)
+        finally:
+            self.query_cache.invalidate(namespace)
+
     def search(
         self,
         query: str,
         top_k: int = 5,
-        filter: Optional[Dict[str, Any]] = None
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = ""
     ) -> List[Dict[str, Any]]:
         """
         Semantic search for relevant documents
@@ -133,6 +159,7 @@ class PineconeRAGSystem:
             query: Search query
             top_k: Number of results to return
             filter: Metadata filters
+            namespace: Pinecone namespace ("" is the default namespace)
 
         Returns:
             List of relevant documents with scores
@@ -140,21 +167,74 @@ class PineconeRAGSystem:
         if not self.index:
             raise ValueError("Pinecone not initialized")
 
+        return self.search_by_vector(self.embed_query(query), top_k=top_k, filter=filter, namespace=namespace)
+
+    async def asearch(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = ""
+    ) -> List[Dict[str, Any]]:
+        """Async search (runs the blocking client in a worker thread)"""
+        return await asyncio.to_thread(self.search, query, top_k, filter, namespace)
+
+    def search_namespaces(
+        self,
+        query: str,
+        namespaces: List[str],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search several namespaces concurrently (e.g. shared + tenant corpora)
+
+        Returns:
+            Global top-k across namespaces, each result tagged with its namespace
+        """
+        return search_namespaces(self, query, namespaces, top_k=top_k, filter=filter)
+
+    async def asearch_namespaces(
+        self,
+        query: str,
+        namespaces: List[str],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Async variant of search_namespaces"""
+        return await asearch_namespaces(self, query, namespaces, top_k=top_k, filter=filter)
+
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query string (cached)"""
         if not self.embeddings:
             self._init_embeddings()
+        return self.query_cache.embed_query(self.embeddings, query)
 
-        # Generate query embedding
-        query_vector = self.embeddings.embed_query(query)
+    def search_by_vector(
+        self,
+        vector: List[float],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = ""
+    ) -> List[Dict[str, Any]]:
+        """Search with a pre-computed query embedding"""
+        if not self.index:
+            raise ValueError("Pinecone not initialized")
+
+        cache_key = self.query_cache.result_key(vector, filter, top_k, namespace)
+        cached = self.query_cache.get_results(cache_key)
+        if cached is not None:
+            return cached
 
-        # Search Pinecone
         results = self.index.query(
-            vector=query_vector,
+            vector=vector,
             top_k=top_k,
             include_metadata=True,
-            filter=filter
+            filter=filter,
+            namespace=namespace
         )
 
-        return [
+        matches = [
             {
                 "id": match.id,
                 "score": match.score,
@@ -163,16 +243,38 @@ class PineconeRAGSystem:
             }
             for match in results.matches
         ]
+        self.query_cache.set_results(cache_key, matches)
+        return matches
 
-    def delete_documents(self, ids: List[str]) -> Dict[str, str]:
+    def delete_documents(self, ids: List[str], namespace: str = "") -> Dict[str, str]:
         """Delete documents by IDs"""
         if not self.index:
             raise ValueError("Pinecone not initialized")
 
-        self.index.delete(ids=ids)
+        self.index.delete(ids=ids, namespace=namespace)
+        self.query_cache.invalidate(namespace)
 
         return {"status": "deleted", "count": len(ids)}
 
+    def list_ids(self, prefix: str = "", namespace: str = "") -> Iterator[str]:
+        """Stream document IDs starting with prefix (serverless indexes only)"""
+        if not self.index:
+            raise ValueError("Pinecone not initialized")
+
+        for page in self.index.list(prefix=prefix, namespace=namespace):
+            yield from page
+
+    def iter_documents(self, namespace: str = "", batch_size: int = 100) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Stream stored (id, text, metadata) documents page by page, e.g. to rebuild a keyword index"""
+        if not self.index:
+            raise ValueError("Pinecone not initialized")
+
+        for page in self.index.list(namespace=namespace, limit=batch_size):
+            vectors = self.index.fetch(ids=list(page), namespace=namespace).vectors
+            for doc_id, vector in vectors.items():
+                metadata = dict(vector.metadata or {})
+                yield doc_id, metadata.pop("text", ""), metadata
+
     def get_index_stats(self) -> Dict[str, Any]:
         """Get index statistics"""
         if not self.index:
@@ -183,7 +285,12 @@ class PineconeRAGSystem:
         return {
             "total_vector_count": stats.total_vector_count,
             "dimension": stats.dimension,
-            "index_fullness": stats.index_fullness
+            "index_fullness": stats.index_fullness,
+            "namespaces": {
+                name: {"vector_count": summary.vector_count}
+                for name, summary in (stats.namespaces or {}).items()
+            },
+            "cache": self.query_cache.get_stats()
         }
 
 
@@ -202,6 +309,12 @@ class MockPineconeRAG:
             "ids": [f"mock_id_{i}" for i in range(len(documents))]
         }
 
+    def add_documents_stream(self, documents: Iterable[Tuple[str, str, Dict[str, Any]]], **kwargs) -> Dict[str, int]:
+        texts = [text for _, text, _ in documents]
+        print(f"[MOCK] Pinecone add_documents_stream: {len(texts)} documents")
+        self.documents.extend(texts)
+        return {"documents_processed": len(texts), "vectors_upserted": len(texts)}
+
     def search(self, query: str, top_k: int = 5, **kwargs) -> List[Dict[str, Any]]:
         print(f"[MOCK] Pinecone search: {query}")
         return [
@@ -219,10 +332,28 @@ class MockPineconeRAG:
             }
         ]
 
-    def delete_documents(self, ids: List[str]) -> Dict[str, str]:
+    async def asearch(self, query: str, top_k: int = 5, **kwargs) -> List[Dict[str, Any]]:
+        return self.search(query, top_k=top_k, **kwargs)
+
+    def search_namespaces(self, query: str, namespaces: List[str], top_k: int = 5, **kwargs) -> List[Dict[str, Any]]:
+        print(f"[MOCK] Pinecone search_namespaces: {query} in {namespaces}")
+        return [{**result, "namespace": namespaces[0]} for result in self.search(query, top_k=top_k)][:top_k]
+
+    async def asearch_namespaces(self, query: str, namespaces: List[str], top_k: int = 5, **kwargs) -> List[Dict[str, Any]]:
+        return self.search_namespaces(query, namespaces, top_k=top_k, **kwargs)
+
+    def delete_documents(self, ids: List[str], **kwargs) -> Dict[str, str]:
         print(f"[MOCK] Pinecone delete_documents: {len(ids)} documents")
         return {"status": "deleted", "count": len(ids)}
 
+    def list_ids(self, prefix: str = "", **kwargs) -> Iterator[str]:
+        print(f"[MOCK] Pinecone list_ids: {prefix}")
+        return iter([])
+
+    def iter_documents(self, namespace: str = "", **kwargs) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        print(f"[MOCK] Pinecone iter_documents: {namespace}")
+        return iter([])
+
     def get_index_stats(self) -> Dict[str, Any]:
         print("[MOCK] Pinecone get_index_stats")
         return {
@@ -230,3 +361,33 @@ class MockPineconeRAG:
             "dimension": 1536,
             "index_fullness": 0.15
         }
+
+
+_rag_system = None
+
+
+def get_rag_system():
+    """
+    Get the configured RAG backend (Pinecone, local or mock)
+    Shared per process so query and result caches are reused across requests
+
+    With hybrid_search_enabled the backend is wrapped in a HybridSearcher,
+    so searches fuse dense and BM25 keyword results.
+    """
+    global _rag_system
+    if _rag_system is None:
+        if settings.mock_mode:
+            _rag_system = MockPineconeRAG()
+        else:
+            if settings.rag_backend == "local":
+                from backend.shared.integrations.local_vector_index import LocalVectorRAGSystem
+                rag_system = LocalVectorRAGSystem(storage_dir=settings.local_rag_storage_dir)
+                atexit.register(rag_system.close)
+            else:
+                rag_system = PineconeRAGSystem()
+
+            if settings.hybrid_search_enabled:
+                from backend.shared.integrations.hybrid_search import HybridSearcher
+                rag_system = HybridSearcher(rag_system)
+            _rag_system = rag_system
+    return _rag_system
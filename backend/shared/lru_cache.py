@@ -0,0 +1,91 @@
+"""
+Thread-safe in-process LRU cache with optional per-entry TTL
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Hashable
+
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache
+    Entries may expire after a TTL; expired entries are dropped on access
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: Optional[float] = None):
+        """
+        Initialize the cache
+
+        Args:
+            maxsize: Maximum number of entries
+            ttl_seconds: Default time-to-live per entry (None = no expiry)
+        """
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value, refreshing its recency"""
+        with self._lock:
+            entry = self._data.get(key, MISSING)
+            if entry is MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a value, evicting the least recently used entry when full"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove a key; returns True if it was present"""
+        with self._lock:
+            return self._data.pop(key, MISSING) is not MISSING
+
+    def delete_where(self, predicate) -> int:
+        """Remove every key matching predicate(key); returns the number removed"""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self):
+        """Get size and hit-rate statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
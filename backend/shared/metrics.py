@@ -0,0 +1,116 @@
+"""
+Batched metrics - in-process counters flushed to Redis periodically
+"""
+import time
+import threading
+from collections import defaultdict
+from typing import Optional, Dict, Any
+from .config import settings
+
+
+class BatchedCounter:
+    """
+    Labelled counter aggregated in memory and flushed in one pipeline
+
+    Counts are stored in per-minute Redis hashes (metrics:{name}:{minute},
+    field = label), so hot paths cost a dict increment instead of a write.
+    Counts buffered when a process dies are lost; use for metrics, not
+    for anything that must be exact.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        redis_client: Optional[Any] = None,
+        flush_interval_seconds: Optional[float] = None,
+        retention_seconds: int = 7 * 24 * 3600
+    ):
+        """
+        Initialize batched counter
+
+        Args:
+            name: Metric name
+            redis_client: Redis client (counts stay in-process if None)
+            flush_interval_seconds: Time between flushes
+            retention_seconds: Lifetime of each per-minute hash
+        """
+        self.name = name
+        self.redis = redis_client
+        self.flush_interval = flush_interval_seconds or settings.metrics_flush_interval_seconds
+        self.retention_seconds = retention_seconds
+        self._counts: Dict[tuple, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+        self._thread = None
+        if self.redis is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def incr(self, label: str, amount: int = 1):
+        """Count an event for a label"""
+        minute = int(time.time() // 60)
+        with self._lock:
+            self._counts[(minute, label)] += amount
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self) -> int:
+        """Write buffered counts to Redis; returns the number of counters written"""
+        with self._lock:
+            counts, self._counts = self._counts, defaultdict(int)
+
+        if not counts or self.redis is None:
+            return 0
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for (minute, label), amount in counts.items():
+                key = f"metrics:{self.name}:{minute}"
+                pipe.hincrby(key, label, amount)
+                pipe.expire(key, self.retention_seconds)
+            pipe.execute()
+        except Exception as e:
+            # Put the counts back so the next flush retries them
+            with self._lock:
+                for counter, amount in counts.items():
+                    self._counts[counter] += amount
+            print(f"Metrics flush for {self.name} failed: {e}")
+            return 0
+
+        return len(counts)
+
+    def read(self, label: str, minutes: int = 60) -> int:
+        """Total for a label over the last N minutes (flushed counts only)"""
+        if self.redis is None:
+            return 0
+
+        current = int(time.time() // 60)
+        pipe = self.redis.pipeline(transaction=False)
+        for minute in range(current - minutes + 1, current + 1):
+            pipe.hget(f"metrics:{self.name}:{minute}", label)
+        return sum(int(value) for value in pipe.execute() if value)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"name": self.name, "pending_counters": len(self._counts)}
+
+
+_counters: Dict[str, BatchedCounter] = {}
+_counters_lock = threading.Lock()
+
+
+def get_counter(name: str) -> BatchedCounter:
+    """Get the process-wide batched counter for a metric"""
+    with _counters_lock:
+        if name not in _counters:
+            redis_client = None
+            try:
+                import redis
+                redis_client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+            except ImportError:
+                print(f"redis package not installed; metric {name} is not persisted")
+            _counters[name] = BatchedCounter(name, redis_client=redis_client)
+        return _counters[name]
@@ -0,0 +1,421 @@
+"""
+Monthly range partitioning and retention for append-heavy tables
+
+Run with: python -m backend.shared.partitioning [migrate|maintain]
+"""
+import re
+import sys
+import gzip
+import json
+import tempfile
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterator, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Engine, Connection
+from .config import settings
+from .aws_utils import s3_manager
+
+# Partition key, indexed columns and foreign keys of each partitioned table
+PARTITIONED_TABLES = {
+    "webhook_logs": {
+        "key": "created_at",
+        "indexes": ["webhook_id", "created_at"],
+        "foreign_keys": {"webhook_id": "webhook_endpoints(id)"}
+    },
+    "workflow_executions": {
+        "key": "started_at",
+        "indexes": ["workflow_id", "user_id"],
+        "foreign_keys": {"workflow_id": "workflows(id)"}
+    }
+}
+
+# Foreign keys into partitioned tables cannot reference id alone
+DROPPED_FOREIGN_KEYS = {
+    "workflow_executions": [("approval_requests", "approval_requests_execution_id_fkey")]
+}
+
+ARCHIVE_PREFIX = "archive"
+ARCHIVE_KEY_PATTERN = re.compile(r"/(min|\d{6})_(\d{6})\.jsonl\.gz$")
+
+# Serializes maintenance runs across workers
+MAINTENANCE_LOCK_ID = 460046
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def archive_key(table: str, lower: Optional[datetime], upper: datetime) -> str:
+    """S3 key of an archived partition; bounds are encoded so reads can skip by name"""
+    return f"{ARCHIVE_PREFIX}/{table}/{f'{lower:%Y%m}' if lower else 'min'}_{upper:%Y%m}.jsonl.gz"
+
+
+def retention_months(table: str) -> int:
+    return {
+        "webhook_logs": settings.webhook_log_retention_months,
+        "workflow_executions": settings.execution_retention_months
+    }[table]
+
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+        {"table": table}
+    ).first() is not None
+
+
+def list_partitions(conn: Connection, table: str) -> List[Dict[str, Any]]:
+    """
+    Partitions of a table with their range bounds
+
+    Returns:
+        List of dicts with name, lower (None for MINVALUE), upper and detach_pending, oldest first
+    """
+    rows = conn.execute(text("""
+        SELECT child.relname AS name,
+               pg_get_expr(child.relpartbound, child.oid) AS bound,
+               inh.inhdetachpending AS detach_pending
+        FROM pg_inherits inh
+        JOIN pg_class child ON child.oid = inh.inhrelid
+        WHERE inh.inhparent = to_regclass(:table)
+    """), {"table": table})
+
+    partitions = []
+    for row in rows:
+        match = re.search(r"FROM \((.+?)\) TO \((.+?)\)", row.bound or "")
+        if not match:
+            continue  # DEFAULT partition
+        lower, upper = (value.strip("'") for value in match.groups())
+        partitions.append({
+            "name": row.name,
+            "lower": None if lower == "MINVALUE" else datetime.fromisoformat(lower),
+            "upper": datetime.fromisoformat(upper),
+            "detach_pending": row.detach_pending
+        })
+    return sorted(partitions, key=lambda partition: partition["upper"])
+
+
+def ensure_partitions(conn: Connection, table: str, months_ahead: Optional[int] = None, now: Optional[datetime] = None) -> List[str]:
+    """
+    Create monthly partitions from the current month through months_ahead
+
+    Args:
+        conn: Connection (in a transaction)
+        table: Partitioned table
+        months_ahead: Future months to create (defaults to settings)
+        now: Current time
+
+    Returns:
+        Names of partitions created
+    """
+    months_ahead = settings.partition_premake_months if months_ahead is None else months_ahead
+    current = month_start(now or datetime.utcnow())
+    partitions = list_partitions(conn, table)
+    covered_until = partitions[-1]["upper"] if partitions else None
+
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if covered_until and month < covered_until:
+            continue
+        name = partition_name(table, month)
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        ))
+        created.append(name)
+    return created
+
+
+def migrate_to_partitioned(conn: Connection, table: str, now: Optional[datetime] = None) -> bool:
+    """
+    Convert an existing table into a monthly partitioned one
+
+    Existing rows are not copied: the old table becomes a single partition
+    covering everything up to next month, and is archived and dropped as a
+    whole once it ages past retention. Run once, in a maintenance window;
+    the NOT NULL/primary key changes and the attach scan the old table
+    under an exclusive lock.
+
+    Args:
+        conn: Connection (in a transaction)
+        table: Table in PARTITIONED_TABLES
+        now: Current time
+
+    Returns:
+        True if the table was converted, False if it already was partitioned
+    """
+    if is_partitioned(conn, table):
+        return False
+
+    spec = PARTITIONED_TABLES[table]
+    key = spec["key"]
+    legacy = f"{table}_legacy"
+    boundary = add_months(month_start(now or datetime.utcnow()), 1)
+
+    for referencing_table, constraint in DROPPED_FOREIGN_KEYS.get(table, []):
+        conn.execute(text(f"ALTER TABLE {referencing_table} DROP CONSTRAINT IF EXISTS {constraint}"))
+
+    # The partition key must be part of the primary key, so it cannot be NULL
+    conn.execute(text(f"UPDATE {table} SET {key} = 'epoch' WHERE {key} IS NULL"))
+    conn.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+    conn.execute(text(f"ALTER TABLE {legacy} ALTER COLUMN {key} SET NOT NULL"))
+    conn.execute(text(f"ALTER TABLE {legacy} DROP CONSTRAINT {table}_pkey"))
+    conn.execute(text(f"ALTER TABLE {legacy} ADD PRIMARY KEY (id, {key})"))
+    # Free every index name for the new parent (upgrade_schema recreates the ones not listed in spec)
+    index_names = conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE tablename = :table"), {"table": legacy}
+    ).scalars().all()
+    for name in index_names:
+        if name.startswith(f"ix_{table}_"):
+            conn.execute(text(f"ALTER INDEX {name} RENAME TO ix_{legacy}_{name[len(f'ix_{table}_'):]}"))
+
+    conn.execute(text(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE ({key})"))
+    conn.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {key})"))
+    for column in spec["indexes"]:
+        conn.execute(text(f"CREATE INDEX ix_{table}_{column} ON {table} ({column})"))
+    for column, reference in spec["foreign_keys"].items():
+        conn.execute(text(f"ALTER TABLE {table} ADD FOREIGN KEY ({column}) REFERENCES {reference}"))
+
+    # Matching indexes on the old table are adopted rather than rebuilt
+    conn.execute(text(
+        f"ALTER TABLE {table} ATTACH PARTITION {legacy} "
+        f"FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat()}')"
+    ))
+    ensure_partitions(conn, table, now=now)
+    return True
+
+
+def archive_partition(engine: Engine, table: str, partition: Dict[str, Any], batch_size: int = 5000) -> Dict[str, Any]:
+    """
+    Stream a partition's rows to S3 as gzip-compressed JSON lines
+
+    Args:
+        engine: Database engine
+        table: Parent table
+        partition: Partition from list_partitions()
+        batch_size: Rows fetched per round trip from the server-side cursor
+
+    Returns:
+        Dict with key and rows
+    """
+    if s3_manager is None:
+        raise ValueError("Archiving partitions requires AWS_S3_BUCKET")
+
+    key = archive_key(table, partition["lower"], partition["upper"])
+    rows = 0
+    with tempfile.TemporaryFile() as buffer:
+        with gzip.GzipFile(fileobj=buffer, mode="wb") as archive:
+            with engine.connect() as conn:
+                result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(
+                    text(f"SELECT * FROM {partition['name']}")
+                )
+                for row in result.mappings():
+                    archive.write(json.dumps(dict(row), default=str).encode("utf-8") + b"\n")
+                    rows += 1
+
+        buffer.seek(0)
+        # Multipart upload from the spooled file; the archive is never held in memory
+        s3_manager.client.upload_fileobj(
+            buffer, s3_manager.bucket, key,
+            ExtraArgs={"ContentType": "application/x-ndjson", "ContentEncoding": "gzip", "Metadata": {"rows": str(rows)}}
+        )
+
+    return {"key": key, "rows": rows}
+
+
+def drop_partition(engine: Engine, table: str, partition: Dict[str, Any]):
+    """
+    Detach and drop a partition
+
+    DETACH ... CONCURRENTLY only briefly locks the parent, so inserts and
+    reads on current partitions continue. It cannot run in a transaction,
+    and an interrupted detach is completed with FINALIZE on the next run.
+    """
+    name = partition["name"]
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        mode = "FINALIZE" if partition.get("detach_pending") else "CONCURRENTLY"
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name} {mode}"))
+        conn.execute(text(f"DROP TABLE {name}"))
+
+
+def run_maintenance(engine: Engine, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Create upcoming partitions, then archive and drop those past retention
+
+    A partition is dropped only after its archive upload succeeds; without
+    AWS_S3_BUCKET, expired partitions are kept unless archiving is disabled.
+
+    Args:
+        engine: Database engine
+        now: Current time
+
+    Returns:
+        Per-table dict with created, archived and dropped partitions
+    """
+    now = now or datetime.utcnow()
+    report = {}
+
+    # Autocommit, so holding the lock does not keep a transaction (and old row versions) open
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        if not lock_conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": MAINTENANCE_LOCK_ID}).scalar():
+            return {"skipped": "maintenance already running"}
+
+        try:
+            for table in PARTITIONED_TABLES:
+                with engine.begin() as conn:
+                    if not is_partitioned(conn, table):
+                        report[table] = {"skipped": "not partitioned (run: python -m backend.shared.partitioning migrate)"}
+                        continue
+                    created = ensure_partitions(conn, table, now=now)
+                    partitions = list_partitions(conn, table)
+
+                cutoff = add_months(month_start(now), -retention_months(table))
+                archived, dropped, kept = [], [], []
+                for partition in partitions:
+                    if partition["upper"] > cutoff:
+                        continue
+                    if settings.partition_archive_enabled:
+                        if s3_manager is None:
+                            kept.append(partition["name"])
+                            continue
+                        if not partition["detach_pending"]:
+                            archived.append(archive_partition(engine, table, partition))
+                    drop_partition(engine, table, partition)
+                    dropped.append(partition["name"])
+
+                report[table] = {"created": created, "archived": archived, "dropped": dropped}
+                if kept:
+                    report[table]["kept"] = kept
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MAINTENANCE_LOCK_ID})
+
+    return report
+
+
+def archived_ranges(table: str) -> List[Tuple[Optional[datetime], datetime, str]]:
+    """Archived (lower, upper, key) ranges of a table, oldest first"""
+    if s3_manager is None:
+        return []
+
+    ranges = []
+    for key in s3_manager.list_keys(f"{ARCHIVE_PREFIX}/{table}/"):
+        match = ARCHIVE_KEY_PATTERN.search(key)
+        if not match:
+            continue
+        lower, upper = match.groups()
+        ranges.append((
+            None if lower == "min" else datetime.strptime(lower, "%Y%m"),
+            datetime.strptime(upper, "%Y%m"),
+            key
+        ))
+    return sorted(ranges, key=lambda item: item[1])
+
+
+def archive_read_range(
+    start: datetime,
+    end: datetime,
+    live_from: Optional[datetime],
+    max_months: Optional[int] = None
+) -> Optional[Tuple[datetime, datetime]]:
+    """
+    Part of [start, end) to read from archives, at most max_months before its end
+
+    Args:
+        start: Requested range start
+        end: Requested range end
+        live_from: Lower bound of the oldest live partition (None if unpartitioned)
+        max_months: Whole months read before the month the archived part ends in
+
+    Returns:
+        (start, end) to read, or None if the range is entirely live; a start
+        later than the requested one means older archives were left out
+    """
+    if live_from is None or start >= live_from:
+        return None
+    archive_end = min(end, live_from)
+    if max_months:
+        start = max(start, add_months(month_start(archive_end), -max_months))
+    return (start, archive_end) if start < archive_end else None
+
+
+def read_archived(
+    table: str,
+    start: datetime,
+    end: datetime,
+    filters: Optional[Dict[str, Any]] = None,
+    limit: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Read archived rows in a time range
+
+    Only archives whose bounds overlap [start, end) are downloaded, and
+    each is decompressed and filtered line by line.
+
+    Args:
+        table: Partitioned table
+        start: Range start (inclusive)
+        end: Range end (exclusive)
+        filters: Column equality filters (compared as strings)
+        limit: Maximum rows
+
+    Yields:
+        Rows as dicts (timestamps and UUIDs as strings)
+    """
+    key_column = PARTITIONED_TABLES[table]["key"]
+    filters = {column: str(value) for column, value in (filters or {}).items()}
+    start_value, end_value = start.isoformat(sep=" "), end.isoformat(sep=" ")
+    count = 0
+
+    for lower, upper, key in archived_ranges(table):
+        if upper <= start or (lower is not None and lower >= end):
+            continue
+
+        body = s3_manager.client.get_object(Bucket=s3_manager.bucket, Key=key)["Body"]
+        with gzip.GzipFile(fileobj=body) as archive:
+            for line in archive:
+                row = json.loads(line)
+                # str(datetime) sorts correctly as text
+                if not (start_value <= (row.get(key_column) or "") < end_value):
+                    continue
+                if any(str(row.get(column)) != value for column, value in filters.items()):
+                    continue
+                yield row
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+
+def main(argv: List[str]):
+    from .database import engine
+    from .schema_upgrades import upgrade_schema
+
+    command = argv[1] if len(argv) > 1 else "maintain"
+    if command == "migrate":
+        # Columns first, so the partitioned tables copy them; indexes again on the new parents
+        with engine.begin() as conn:
+            upgrade_schema(conn)
+        for table in PARTITIONED_TABLES:
+            with engine.begin() as conn:
+                converted = migrate_to_partitioned(conn, table)
+            print(f"{table}: {'converted to monthly partitions' if converted else 'already partitioned'}")
+        with engine.begin() as conn:
+            for statement in upgrade_schema(conn):
+                print(f"Applied: {statement}")
+    elif command == "maintain":
+        print(json.dumps(run_maintenance(engine), indent=2, default=str))
+    else:
+        raise SystemExit(f"Unknown command: {command} (expected migrate or maintain)")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
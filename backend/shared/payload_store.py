@@ -0,0 +1,69 @@
+"""
+Payload store - keep large request payloads in S3 and pass references around
+"""
+import json
+import hashlib
+from datetime import datetime
+from typing import Optional, Dict, Any
+from .aws_utils import s3_manager
+
+PAYLOAD_REF_KEY = "_payload_ref"
+
+
+def offload_payload(raw_body: bytes, prefix: str, name: str) -> Dict[str, Any]:
+    """
+    Upload a raw payload to S3
+
+    Args:
+        raw_body: Payload bytes as received
+        prefix: Key prefix (e.g. "webhooks/<webhook id>")
+        name: Object name (e.g. the execution ID)
+
+    Returns:
+        Reference dict to store instead of the payload
+    """
+    if s3_manager is None:
+        raise ValueError("Payload offload requires AWS_S3_BUCKET")
+
+    key = f"{prefix}/{datetime.utcnow():%Y/%m/%d}/{name}"
+    s3_manager.upload_file(raw_body, key)
+    return {
+        PAYLOAD_REF_KEY: {
+            "bucket": s3_manager.bucket,
+            "key": key,
+            "size": len(raw_body),
+            "sha256": hashlib.sha256(raw_body).hexdigest()
+        }
+    }
+
+
+def is_payload_ref(value: Any) -> bool:
+    return isinstance(value, dict) and PAYLOAD_REF_KEY in value
+
+
+def load_payload(value: Any) -> Any:
+    """Fetch and parse an offloaded payload; other values are returned unchanged"""
+    if not is_payload_ref(value):
+        return value
+
+    if s3_manager is None:
+        raise ValueError("Loading an offloaded payload requires AWS_S3_BUCKET")
+
+    raw_body = s3_manager.download_file(value[PAYLOAD_REF_KEY]["key"])
+    try:
+        return json.loads(raw_body)
+    except ValueError:
+        return raw_body.decode("utf-8", errors="replace")
+
+
+def resolve_input_payload(input_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Replace an offloaded "payload" in workflow input with its content"""
+    if not input_data or not is_payload_ref(input_data.get("payload")):
+        return input_data
+
+    payload = load_payload(input_data["payload"])
+    return {
+        **input_data,
+        "payload": payload,
+        "input": json.dumps(payload, sort_keys=True) if not isinstance(payload, str) else payload
+    }
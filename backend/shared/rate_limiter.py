@@ -0,0 +1,131 @@
+"""
+Distributed rate limiter - GCRA in Redis with an in-process fallback
+"""
+import time
+import threading
+from typing import Optional, Dict, Any
+from .config import settings
+from .lru_cache import LRUCache
+
+# GCRA: one key per limit holding the theoretical arrival time (ms, Redis clock)
+GCRA_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local emission = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3] or 1)
+
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+
+local new_tat = tat + emission * cost
+local allow_at = new_tat - tolerance
+if allow_at > now then
+    return {0, math.ceil(allow_at - now)}
+end
+
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {1, 0}
+"""
+
+
+class RateLimiter:
+    """
+    Generic cell rate algorithm limiter
+
+    A limit of N per minute with burst B admits B requests at once, then
+    one every 60/N seconds. State is a single Redis key per limited entity,
+    updated atomically by a Lua script using the Redis clock, so every API
+    replica shares the limit. If Redis is unreachable the limiter falls
+    back to per-process state until Redis recovers.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        prefix: str = "ratelimit",
+        fallback_size: int = 100000,
+        redis_retry_seconds: float = 5.0
+    ):
+        """
+        Initialize rate limiter
+
+        Args:
+            redis_client: asyncio Redis client (in-process only if None)
+            prefix: Key prefix
+            fallback_size: Limited entities tracked in-process
+            redis_retry_seconds: Time to stay on the fallback after a Redis error
+        """
+        self.redis = redis_client
+        self.prefix = prefix
+        self.redis_retry_seconds = redis_retry_seconds
+        self._script = redis_client.register_script(GCRA_SCRIPT) if redis_client is not None else None
+        self._local = LRUCache(maxsize=fallback_size)
+        self._local_lock = threading.Lock()
+        self._redis_down_until = 0.0
+
+    async def hit(
+        self,
+        key: str,
+        requests_per_minute: float,
+        burst: Optional[int] = None,
+        cost: int = 1
+    ) -> Dict[str, Any]:
+        """
+        Count one request against a limit
+
+        Args:
+            key: Limited entity (e.g. webhook ID)
+            requests_per_minute: Sustained rate
+            burst: Requests admitted at once (defaults to requests_per_minute)
+            cost: Requests this call counts as (at most burst, or it is never admitted)
+
+        Returns:
+            Dict with allowed and retry_after (seconds until a request would be admitted)
+        """
+        emission_ms = 60000.0 / requests_per_minute
+        tolerance_ms = emission_ms * max(1, burst or int(requests_per_minute))
+
+        if self._script is not None and time.monotonic() >= self._redis_down_until:
+            try:
+                allowed, wait_ms = await self._script(
+                    keys=[f"{self.prefix}:{key}"],
+                    args=[emission_ms, tolerance_ms, cost]
+                )
+                return {"allowed": bool(allowed), "retry_after": float(wait_ms) / 1000}
+            except Exception as e:
+                print(f"Rate limiter falling back to in-process state: {e}")
+                self._redis_down_until = time.monotonic() + self.redis_retry_seconds
+
+        return self._hit_local(key, emission_ms * cost, tolerance_ms)
+
+    def _hit_local(self, key: str, emission_ms: float, tolerance_ms: float) -> Dict[str, Any]:
+        now = time.monotonic() * 1000
+        with self._local_lock:
+            tat = max(self._local.get(key, now), now)
+            new_tat = tat + emission_ms
+            allow_at = new_tat - tolerance_ms
+            if allow_at > now:
+                return {"allowed": False, "retry_after": (allow_at - now) / 1000}
+
+            self._local.set(key, new_tat)
+            return {"allowed": True, "retry_after": 0.0}
+
+
+_rate_limiter = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        redis_client = None
+        try:
+            import redis.asyncio as aioredis
+            redis_client = aioredis.Redis.from_url(settings.redis_url)
+        except ImportError:
+            print("redis package not installed; rate limits are enforced per process")
+        _rate_limiter = RateLimiter(redis_client=redis_client)
+    return _rate_limiter
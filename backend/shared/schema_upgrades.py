@@ -0,0 +1,100 @@
+"""
+Idempotent upgrades for tables created by earlier releases
+
+create_all only creates missing tables, so columns and indexes added to
+existing models are applied here. Run by init_db and the partitioning
+migration; every statement is safe to repeat.
+"""
+import importlib
+from typing import List, Tuple
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex
+from .database import Base
+
+# Service directories are hyphenated, so models are imported by module name
+MODEL_MODULES = (
+    "backend.user-service.app.models.user",
+    "backend.workflow-service.app.models.workflow",
+    "backend.workflow-service.app.models.webhook",
+    "backend.workflow-service.app.models.approval"
+)
+
+# Columns added to existing tables (types and nullability come from the models)
+ADDED_COLUMNS = {
+    "workflow_executions": ["checkpoint"],
+    "webhook_endpoints": ["signature_scheme", "idempotency_config"]
+}
+
+# Indexes added to existing tables (definitions come from the models)
+ADDED_INDEXES = {
+    "workflow_executions": ["ix_workflow_executions_awaiting_approval"],
+    "approval_requests": ["ix_approval_requests_status_expires_at", "ix_approval_requests_unnotified"]
+}
+
+# Columns whose type changed: (table, column, old data_type, conversion)
+CHANGED_COLUMNS = [
+    (
+        "webhook_endpoints", "trigger_count", "json",
+        "ALTER TABLE webhook_endpoints ALTER COLUMN trigger_count TYPE INTEGER "
+        "USING NULLIF(trigger_count::text, 'null')::integer"
+    )
+]
+
+
+def import_models():
+    """Register every model with Base.metadata"""
+    for module in MODEL_MODULES:
+        importlib.import_module(module)
+
+
+def upgrade_statements() -> List[Tuple[str, str]]:
+    """(table, DDL) pairs bringing existing tables up to the current models"""
+    import_models()
+    dialect = postgresql.dialect()
+    statements = []
+
+    for table_name, columns in ADDED_COLUMNS.items():
+        table = Base.metadata.tables[table_name]
+        for name in columns:
+            column = table.columns[name]
+            statements.append((
+                table_name,
+                f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS {name} {column.type.compile(dialect=dialect)}"
+            ))
+
+    for table_name, indexes in ADDED_INDEXES.items():
+        by_name = {index.name: index for index in Base.metadata.tables[table_name].indexes}
+        for name in indexes:
+            statements.append((table_name, str(CreateIndex(by_name[name], if_not_exists=True).compile(dialect=dialect))))
+
+    return statements
+
+
+def upgrade_schema(conn: Connection) -> List[str]:
+    """
+    Apply upgrade_statements() to tables that exist, and convert
+    CHANGED_COLUMNS still of their old type
+
+    Args:
+        conn: Connection (in a transaction)
+
+    Returns:
+        Statements executed
+    """
+    executed = []
+    for table_name, statement in upgrade_statements():
+        if conn.execute(text("SELECT to_regclass(:table)"), {"table": table_name}).scalar() is None:
+            continue  # Not created yet; create_all uses the current definition
+        conn.execute(text(statement))
+        executed.append(statement)
+
+    for table_name, column, old_type, statement in CHANGED_COLUMNS:
+        data_type = conn.execute(text(
+            "SELECT data_type FROM information_schema.columns WHERE table_name = :table AND column_name = :column"
+        ), {"table": table_name, "column": column}).scalar()
+        if data_type == old_type:
+            conn.execute(text(statement))
+            executed.append(statement)
+    return executed
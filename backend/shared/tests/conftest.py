@@ -0,0 +1,7 @@
+"""
+Test configuration - run from anywhere with: pytest backend/shared/tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../..'))
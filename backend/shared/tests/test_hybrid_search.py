@@ -0,0 +1,131 @@
+"""
+Tests for hybrid (dense + BM25) search over the RAG backends
+"""
+import asyncio
+import threading
+
+from backend.shared.config import settings
+from backend.shared.integrations import vector_rag
+from backend.shared.integrations.hybrid_search import HybridSearcher, tokenize
+from backend.shared.integrations.local_vector_index import LocalVectorRAGSystem, HashingEmbeddings
+
+
+def local_store():
+    return LocalVectorRAGSystem(index_type="flat", embeddings=HashingEmbeddings())
+
+
+def test_tokenize_keeps_identifiers_whole_and_split():
+    assert tokenize("Order SKU-10293 shipped") == ["order", "sku-10293", "sku", "10293", "shipped"]
+
+
+def test_keyword_index_is_rebuilt_from_the_store():
+    store = local_store()
+    # Written directly to the store, as another process would
+    store.add_documents(["Refund policy for SKU-10293", "Shipping times"], ids=["a", "b"], namespace="tenant-1")
+    searcher = HybridSearcher(store, keyword_refresh_seconds=0)
+
+    results = searcher.search("10293", top_k=1, mode="keyword", namespace="tenant-1")
+
+    assert [result["id"] for result in results] == ["a"]
+    assert searcher.search("10293", mode="keyword") == []
+
+
+def test_writes_through_the_searcher_update_both_indexes():
+    searcher = HybridSearcher(local_store(), keyword_refresh_seconds=0)
+    searcher.add_documents(["Invoice INC_4411 overdue"], ids=["x"], namespace="tenant-1")
+
+    assert searcher.search("INC_4411", top_k=1, mode="keyword", namespace="tenant-1")[0]["id"] == "x"
+    assert searcher.search("INC_4411", top_k=1, namespace="tenant-1")[0]["id"] == "x"
+
+    searcher.delete_documents(["x"], namespace="tenant-1")
+    assert searcher.search("INC_4411", mode="keyword", namespace="tenant-1") == []
+
+
+def test_namespace_search_merges_fused_results():
+    store = local_store()
+    store.add_documents(["Alpha runbook"], ids=["shared-1"], namespace="shared")
+    store.add_documents(["Alpha escalation for tenant"], ids=["own-1"], namespace="tenant-1")
+    searcher = HybridSearcher(store)
+
+    results = asyncio.run(searcher.asearch_namespaces("alpha", ["shared", "tenant-1"], top_k=2))
+
+    assert {(result["id"], result["namespace"]) for result in results} == {("shared-1", "shared"), ("own-1", "tenant-1")}
+
+
+def test_get_rag_system_wraps_the_backend(monkeypatch):
+    monkeypatch.setattr(vector_rag, "_rag_system", None)
+    monkeypatch.setattr(settings, "mock_mode", False)
+    monkeypatch.setattr(settings, "rag_backend", "local")
+    monkeypatch.setattr(settings, "local_rag_storage_dir", None)
+    monkeypatch.setattr(settings, "hybrid_search_enabled", True)
+
+    rag_system = vector_rag.get_rag_system()
+
+    assert isinstance(rag_system, HybridSearcher)
+    assert isinstance(rag_system.rag_system, LocalVectorRAGSystem)
+
+
+class UnlistableStore:
+    """Dense backend whose documents cannot be listed (e.g. a pod-based Pinecone index)"""
+
+    def __init__(self):
+        self.listed = 0
+
+    def search(self, query, top_k=5, filter=None, namespace=""):
+        return [{"id": "d1", "score": 0.9, "text": "dense hit", "metadata": {}}]
+
+    def iter_documents(self, namespace=""):
+        self.listed += 1
+        raise RuntimeError("list() is only supported on serverless indexes")
+
+
+def test_dense_mode_never_builds_a_keyword_index():
+    store = UnlistableStore()
+    searcher = HybridSearcher(store)
+
+    assert [result["id"] for result in searcher.search("q", mode="dense")] == ["d1"]
+    assert store.listed == 0
+
+
+def test_hybrid_search_falls_back_to_dense_when_listing_fails():
+    store = UnlistableStore()
+    searcher = HybridSearcher(store, keyword_refresh_seconds=0)
+
+    assert [result["id"] for result in searcher.search("q")] == ["d1"]
+
+    searcher._builder.shutdown(wait=True)
+    assert store.listed == 1
+    assert [result["id"] for result in searcher.search("q")] == ["d1"]
+    assert len(searcher.keyword_index("")) == 0
+
+
+def test_first_hybrid_search_does_not_wait_for_the_keyword_build():
+    store = local_store()
+    store.add_documents(["Refund policy for SKU-10293"], ids=["a"], namespace="tenant-1")
+    searcher = HybridSearcher(store, keyword_refresh_seconds=0)
+    build_lock = searcher._build_lock("tenant-1")
+
+    with build_lock:
+        # The background build is blocked; the search is served from the dense index alone
+        results = searcher.search("10293", top_k=1, namespace="tenant-1")
+        assert [result["id"] for result in results] == ["a"]
+        assert results[0]["ranks"] == [1, None]
+
+    searcher._builder.shutdown(wait=True)
+    assert searcher.search("10293", top_k=1, namespace="tenant-1")[0]["ranks"] == [1, 1]
+
+
+def test_sync_namespace_search_runs_namespaces_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    class BarrierStore(UnlistableStore):
+        def search(self, query, top_k=5, filter=None, namespace=""):
+            # Both namespaces must be searching at once for the barrier to open
+            barrier.wait()
+            return [{"id": namespace, "score": 0.9, "text": "", "metadata": {}}]
+
+    searcher = HybridSearcher(BarrierStore())
+
+    results = searcher.search_namespaces("q", ["shared", "tenant-1"], top_k=2)
+
+    assert {result["namespace"] for result in results} == {"shared", "tenant-1"}
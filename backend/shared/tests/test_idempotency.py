@@ -0,0 +1,88 @@
+"""
+Tests for the idempotency store and its Bloom filter fallback
+"""
+import asyncio
+
+import pytest
+
+from backend.shared import idempotency
+from backend.shared.idempotency import BloomFilter, RotatingBloomFilter, IdempotencyStore, extract_idempotency_key
+
+
+class FailingRedis:
+    """Redis client whose commands always fail"""
+
+    async def set(self, *args, **kwargs):
+        raise ConnectionError("redis down")
+
+    async def delete(self, *args):
+        raise ConnectionError("redis down")
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"key-{i}")
+
+    assert all(f"key-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_rotating_bloom_filter_forgets_after_two_periods(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(idempotency.time, "monotonic", lambda: now[0])
+    bloom = RotatingBloomFilter(capacity=100, error_rate=0.001, rotate_seconds=10)
+    bloom.add("a")
+
+    now[0] += 10
+    assert "a" in bloom
+    now[0] += 10
+    assert "a" not in bloom
+
+
+def test_fallback_claims_return_the_original_execution_and_release_allows_retry():
+    store = IdempotencyStore(ttl_seconds=60, bloom_capacity=1000)
+
+    async def run():
+        first = await store.claim("webhook", "evt_1", "exec-1")
+        duplicate = await store.claim("webhook", "evt_1", "exec-2")
+        await store.release("webhook", "evt_1")
+        retried = await store.claim("webhook", "evt_1", "exec-3")
+        after_retry = await store.claim("webhook", "evt_1", "exec-4")
+        return first, duplicate, retried, after_retry
+
+    assert asyncio.run(run()) == (None, "exec-1", None, "exec-3")
+
+
+def test_redis_errors_fall_back_to_the_local_filter():
+    store = IdempotencyStore(redis_client=FailingRedis(), ttl_seconds=60, bloom_capacity=1000)
+
+    async def run():
+        return [await store.claim("webhook", "evt_1", f"exec-{i}") for i in range(2)]
+
+    assert asyncio.run(run()) == [None, "exec-0"]
+
+
+def test_redis_claims_are_shared_between_stores():
+    fakeredis = pytest.importorskip("fakeredis")
+    redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    first, second = (IdempotencyStore(redis_client=redis_client, ttl_seconds=60, bloom_capacity=1000) for _ in range(2))
+
+    async def run():
+        claimed = await first.claim("webhook", "evt_1", "exec-1")
+        duplicate = await second.claim("webhook", "evt_1", "exec-2")
+        await first.release("webhook", "evt_1")
+        retried = await second.claim("webhook", "evt_1", "exec-3")
+        return claimed, duplicate, retried
+
+    assert asyncio.run(run()) == (None, "exec-1", None)
+
+
+def test_extract_idempotency_key():
+    body = {"data": {"items": [{"id": 7}]}}
+
+    assert extract_idempotency_key({"json_path": "data.items.0.id"}, {}, body) == "7"
+    assert extract_idempotency_key({"json_path": "data.missing"}, {}, body) is None
+    assert extract_idempotency_key({"header": "X-GitHub-Delivery"}, {"X-GitHub-Delivery": "d1"}, body) == "d1"
+    assert extract_idempotency_key({}, {}, body) is None
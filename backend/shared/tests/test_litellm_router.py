@@ -0,0 +1,62 @@
+"""
+Tests for latency tracking and request hedging in the LiteLLM router
+"""
+import asyncio
+from types import SimpleNamespace
+
+from backend.shared.integrations.litellm_router import LatencyTracker, LiteLLMRouter
+
+
+class SlowPrimaryRouter:
+    """LiteLLM Router stand-in: the primary model hangs, the fallback answers"""
+
+    def __init__(self, primary_seconds=5.0):
+        self.primary_seconds = primary_seconds
+        self.cancelled = []
+
+    async def acompletion(self, model, messages, temperature, max_tokens):
+        try:
+            await asyncio.sleep(self.primary_seconds if model == "claude-3-5-sonnet" else 0.01)
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"from {model}"))],
+            usage=SimpleNamespace(prompt_tokens=1, completion_tokens=1, total_tokens=2)
+        )
+
+
+def make_router(backend, tracker):
+    # Built without __init__ so no litellm install or API keys are needed
+    router = LiteLLMRouter.__new__(LiteLLMRouter)
+    router.router = backend
+    router.hedge_enabled = True
+    router.latency_tracker = tracker
+    router._calculate_cost = lambda response: 0.0
+    return router
+
+
+def test_stats_need_min_samples_and_use_one_snapshot():
+    tracker = LatencyTracker(window_size=10, min_samples=3)
+    for latency in (0.1, 0.2):
+        tracker.record("gpt-4", latency)
+    assert tracker.get_stats() == {"gpt-4": {"samples": 2, "p50_ms": None, "p95_ms": None}}
+
+    for latency in (0.3, 0.4, 0.5):
+        tracker.record("gpt-4", latency)
+    assert tracker.get_stats()["gpt-4"] == {"samples": 5, "p50_ms": 300, "p95_ms": 500}
+
+
+def test_a_cancelled_hedge_loser_is_not_recorded():
+    tracker = LatencyTracker(min_samples=1)
+    tracker.record("claude-3-5-sonnet", 0.05)  # p95 of 50ms, so the hedge fires quickly
+    backend = SlowPrimaryRouter()
+    router = make_router(backend, tracker)
+
+    result = asyncio.run(router.acomplete([{"role": "user", "content": "hi"}]))
+
+    assert result["hedged"] is True and result["content"] == "from gpt-4"
+    assert backend.cancelled == ["claude-3-5-sonnet"]
+    assert tracker.get_stats()["claude-3-5-sonnet"]["samples"] == 1
+    assert tracker.get_stats()["gpt-4"]["samples"] == 1
@@ -0,0 +1,130 @@
+"""
+Tests for local tiered memory consolidation and the per-user index
+"""
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from backend.shared.config import settings
+from backend.shared.integrations.local_memory import (
+    LocalTieredMemorySystem, PENDING_KEY, PROCESSING_KEY, CONSUMERS_KEY
+)
+from backend.shared.integrations.local_vector_index import HashingEmbeddings
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class RecordingEngine:
+    """Engine that records statements; reads return no rows"""
+
+    def __init__(self, fail_times=0):
+        self.statements = []
+        self.fail_times = fail_times
+
+    @contextmanager
+    def begin(self):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise ConnectionError("database down")
+        yield self
+
+    connect = begin
+
+    def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+        return SimpleNamespace(fetchall=lambda: [], fetchone=lambda: None)
+
+    def writes(self, verb):
+        return [params for sql, params in self.statements if sql.strip().startswith(verb)]
+
+
+class CountingEmbeddings(HashingEmbeddings):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        return super().embed_query(text)
+
+
+def make_memory(engine, redis_client=None, **kwargs):
+    return LocalTieredMemorySystem(
+        redis_client=redis_client or fakeredis.FakeRedis(decode_responses=True),
+        engine=engine,
+        embeddings=CountingEmbeddings(),
+        vector_search="local_index",
+        start_consolidation=False,
+        **kwargs
+    )
+
+
+def test_constructor_does_no_io():
+    engine = RecordingEngine()
+    memory = make_memory(engine)
+
+    assert engine.statements == []
+    assert memory.embeddings.calls == 0
+
+
+def test_duplicates_within_one_batch_are_merged():
+    engine = RecordingEngine()
+    memory = make_memory(engine)
+    first_id = memory.add_memories(["likes tea", "likes tea", "lives in Oslo"], user_id="u")["memory_ids"][0]
+
+    assert memory.consolidate() == 3
+
+    inserts, updates = engine.writes("INSERT INTO agent_memories"), engine.writes("UPDATE agent_memories")
+    assert [params["memory"] for params in inserts] == ["likes tea", "lives in Oslo"]
+    assert [params["id"] for params in updates] == [first_id]
+
+
+def test_failed_batch_stays_on_the_processing_list():
+    engine = RecordingEngine(fail_times=1)
+    memory = make_memory(engine, consumer_name="a")
+    memory.add_memories(["one", "two"], user_id="u")
+
+    with pytest.raises(ConnectionError):
+        memory.consolidate()
+
+    processing = PROCESSING_KEY.format(consumer="a")
+    assert memory.redis.llen(PENDING_KEY) == 0
+    assert memory.redis.llen(processing) == 2
+
+    assert memory.consolidate() == 2
+    assert memory.redis.llen(processing) == 0
+    assert len(engine.writes("INSERT INTO agent_memories")) == 2
+
+
+def test_stale_consumer_batches_are_requeued():
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    crashed = make_memory(RecordingEngine(), redis_client, consumer_name="crashed")
+    crashed.add_memories(["one", "two"], user_id="u")
+    assert crashed._claim(10)
+    redis_client.zadd(CONSUMERS_KEY, {"crashed": time.time() - crashed.processing_timeout - 1})
+
+    engine = RecordingEngine()
+    survivor = make_memory(engine, redis_client, consumer_name="survivor")
+
+    assert survivor.consolidate() == 2
+    assert [params["memory"] for params in engine.writes("INSERT INTO agent_memories")] == ["one", "two"]
+    assert redis_client.llen(PROCESSING_KEY.format(consumer="crashed")) == 0
+    assert redis_client.zscore(CONSUMERS_KEY, "crashed") is None
+
+
+def test_least_recently_searched_users_are_evicted(monkeypatch):
+    monkeypatch.setattr(settings, "local_memory_index_max_users", 2)
+    memory = make_memory(RecordingEngine())
+    memory.add_memories(["likes tea"], user_id="a")
+    memory.add_memories(["likes coffee"], user_id="b")
+    memory.consolidate()
+
+    store = memory._index._namespaces[memory._user_namespace("a")]
+    assert store._capacity == 16
+
+    memory.search_memory("drinks", user_id="c")
+
+    assert set(memory._index._namespaces) == {memory._user_namespace("b")}
+    assert list(memory._indexed_users) == ["b", "c"]
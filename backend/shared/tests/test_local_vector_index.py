@@ -0,0 +1,73 @@
+"""
+Tests for local vector index persistence and scanning
+"""
+import os
+
+import numpy as np
+
+from backend.shared.config import settings
+from backend.shared.integrations.local_vector_index import LocalVectorRAGSystem, HashingEmbeddings
+
+
+def make_store(storage_dir=None, **kwargs):
+    return LocalVectorRAGSystem(
+        storage_dir=str(storage_dir) if storage_dir else None, embeddings=HashingEmbeddings(), **kwargs
+    )
+
+
+def test_writes_are_journaled_and_replayed_without_close(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "local_rag_compact_deleted_ratio", 0.9)
+    store = make_store(tmp_path)
+    store.add_documents(["red apples", "green pears", "blue berries"], ids=["a", "b", "c"])
+    store.delete_documents(["b"])
+
+    assert not os.path.exists(tmp_path / "index.json")
+    assert len((tmp_path / "journal.jsonl").read_text().splitlines()) == 2
+
+    reopened = make_store(tmp_path)
+    assert sorted(reopened.list_ids()) == ["a", "c"]
+    assert reopened.search("red apples", top_k=1)[0]["id"] == "a"
+
+
+def test_checkpoint_after_max_entries_and_on_close(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "local_rag_journal_max_entries", 2)
+    store = make_store(tmp_path)
+    store.upsert(["a"], [[1.0, 0.0]], [{"text": "a"}])
+    store.upsert(["b"], [[0.0, 1.0]], [{"text": "b"}])
+
+    assert os.path.exists(tmp_path / "index.json")
+    assert (tmp_path / "journal.jsonl").read_text() == ""
+
+    store.upsert(["c"], [[1.0, 1.0]], [{"text": "c"}])
+    store.close()
+
+    assert (tmp_path / "journal.jsonl").read_text() == ""
+    assert sorted(make_store(tmp_path).list_ids()) == ["a", "b", "c"]
+
+
+def test_deletes_compact_tombstones(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "local_rag_compact_deleted_ratio", 0.5)
+    store = make_store(tmp_path)
+    ids = [str(i) for i in range(8)]
+    store.upsert(ids, np.eye(8).tolist(), [{"text": doc_id} for doc_id in ids])
+
+    store.delete_documents(ids[:3])
+    assert store._count == 8
+
+    store.delete_documents(ids[3:4])
+    assert store._count == 4
+    assert store.search_by_vector(np.eye(8)[6].tolist(), top_k=1)[0]["id"] == "6"
+
+    reopened = make_store(tmp_path)
+    assert sorted(reopened.list_ids()) == ids[4:]
+    assert reopened.search_by_vector(np.eye(8)[5].tolist(), top_k=1)[0]["id"] == "5"
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".f32")] == [reopened._vectors_file]
+
+
+def test_scan_scores_rows_in_the_order_given():
+    store = make_store()
+    store.upsert(["a", "b", "c"], np.eye(3).tolist(), [{}, {}, {}])
+
+    rows, _ = store._scan(np.eye(3, dtype=np.float32)[0], np.array([2, 0, 1]), 1, None)
+
+    assert rows == [0]
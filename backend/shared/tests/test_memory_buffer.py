@@ -0,0 +1,67 @@
+"""
+Tests for the write-behind memory buffer
+"""
+import asyncio
+import time
+
+from backend.shared.integrations.memory_buffer import WriteBehindMemoryBuffer
+
+
+class RecordingMemory:
+    """Memory backend that records writes, optionally failing or slow"""
+
+    def __init__(self, fail=False, delay=0.0):
+        self.fail = fail
+        self.delay = delay
+        self.calls = []
+
+    def add_memories(self, texts, user_id, metadatas=None):
+        self.calls.append(list(texts))
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("backend down")
+
+
+def test_failed_batch_waits_for_backoff_before_retry():
+    memory = RecordingMemory(fail=True)
+    buffer = WriteBehindMemoryBuffer(memory, flush_interval_seconds=30, max_pending=100)
+    try:
+        buffer.add_memory("a", user_id="u")
+        buffer.flush()
+        buffer.flush()
+        assert len(memory.calls) == 1
+        assert buffer.get_stats()["pending_records"] == 1
+    finally:
+        buffer._stop.set()
+
+
+def test_drain_retries_with_backoff_then_drops():
+    memory = RecordingMemory(fail=True)
+    buffer = WriteBehindMemoryBuffer(memory, flush_interval_seconds=0.05, max_pending=100, max_attempts=3)
+    buffer._stop.set()
+    buffer.add_memory("a", user_id="u")
+
+    started = time.monotonic()
+    buffer.drain(timeout=5)
+
+    assert len(memory.calls) == 3
+    # Two backoffs (0.05s, 0.1s) between the three attempts
+    assert time.monotonic() - started >= 0.15
+    assert buffer.get_stats()["records_dropped"] == 1
+
+
+def test_backpressure_flush_does_not_block_the_event_loop():
+    memory = RecordingMemory(delay=0.5)
+    buffer = WriteBehindMemoryBuffer(memory, flush_interval_seconds=30, max_pending=1)
+
+    async def enqueue():
+        started = time.monotonic()
+        buffer.add_memory("a", user_id="u")
+        buffer.add_memory("b", user_id="u")
+        return time.monotonic() - started
+
+    try:
+        assert asyncio.run(enqueue()) < 0.2
+    finally:
+        buffer.drain()
+    assert sum(len(call) for call in memory.calls) == 2
@@ -0,0 +1,65 @@
+"""
+Tests for partition naming, archive lookup and archived reads
+"""
+import gzip
+import io
+import json
+from datetime import datetime
+
+from backend.shared import partitioning
+from backend.shared.partitioning import (
+    add_months, month_start, partition_name, archive_key, archived_ranges, archive_read_range, read_archived
+)
+
+
+def test_month_arithmetic_crosses_years():
+    assert month_start(datetime(2026, 3, 17, 12)) == datetime(2026, 3, 1)
+    assert add_months(datetime(2026, 11, 1), 3) == datetime(2027, 2, 1)
+    assert add_months(datetime(2026, 1, 1), -1) == datetime(2025, 12, 1)
+    assert partition_name("webhook_logs", datetime(2026, 2, 1)) == "webhook_logs_p202602"
+
+
+def test_archive_read_range_is_capped_to_recent_months():
+    live_from = datetime(2026, 7, 1)
+
+    assert archive_read_range(datetime(2026, 7, 2), datetime(2026, 8, 1), live_from, 3) is None
+    assert archive_read_range(datetime(2026, 5, 10), datetime(2026, 8, 1), live_from, 3) == (datetime(2026, 5, 10), live_from)
+    assert archive_read_range(datetime(2020, 1, 1), datetime(2026, 8, 1), live_from, 3) == (datetime(2026, 4, 1), live_from)
+    # Paging back with end = the previous start reads the three months before it
+    assert archive_read_range(datetime(2020, 1, 1), datetime(2026, 4, 1), live_from, 3) == (datetime(2026, 1, 1), datetime(2026, 4, 1))
+
+
+class FakeS3:
+    def __init__(self, archives):
+        self.archives = archives
+        self.bucket = "bucket"
+        self.client = self
+        self.downloaded = []
+
+    def list_keys(self, prefix):
+        return [key for key in self.archives if key.startswith(prefix)] + [f"{prefix}notes.txt"]
+
+    def get_object(self, Bucket, Key):
+        self.downloaded.append(Key)
+        lines = b"".join(json.dumps(row).encode() + b"\n" for row in self.archives[Key])
+        return {"Body": io.BytesIO(gzip.compress(lines))}
+
+
+def test_read_archived_downloads_only_overlapping_archives(monkeypatch):
+    march = archive_key("webhook_logs", datetime(2026, 3, 1), datetime(2026, 4, 1))
+    oldest = archive_key("webhook_logs", None, datetime(2026, 3, 1))
+    s3 = FakeS3({
+        oldest: [{"id": "0", "webhook_id": "a", "created_at": "2026-02-01 00:00:00"}],
+        march: [
+            {"id": "1", "webhook_id": "a", "created_at": "2026-03-05 00:00:00"},
+            {"id": "2", "webhook_id": "b", "created_at": "2026-03-06 00:00:00"},
+            {"id": "3", "webhook_id": "a", "created_at": "2026-03-20 00:00:00"}
+        ]
+    })
+    monkeypatch.setattr(partitioning, "s3_manager", s3)
+
+    assert [key for _, _, key in archived_ranges("webhook_logs")] == [oldest, march]
+    rows = list(read_archived("webhook_logs", datetime(2026, 3, 1), datetime(2026, 3, 10), {"webhook_id": "a"}))
+
+    assert [row["id"] for row in rows] == ["1"]
+    assert s3.downloaded == [march]
@@ -0,0 +1,74 @@
+"""
+Tests for the GCRA rate limiter
+"""
+import asyncio
+
+import pytest
+
+from backend.shared.rate_limiter import RateLimiter
+
+
+class FailingRedis:
+    """Redis client whose scripts always fail"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def register_script(self, script):
+        async def run(keys, args):
+            self.calls += 1
+            raise ConnectionError("redis down")
+        return run
+
+
+def hits(limiter, count, **kwargs):
+    async def run():
+        return [await limiter.hit("webhook", **kwargs) for _ in range(count)]
+    return asyncio.run(run())
+
+
+def test_burst_is_admitted_then_requests_are_spaced():
+    results = hits(RateLimiter(), 4, requests_per_minute=60, burst=3)
+
+    assert [result["allowed"] for result in results] == [True, True, True, False]
+    assert 0.9 < results[-1]["retry_after"] <= 1.0
+
+
+def test_cost_counts_as_several_requests():
+    limiter = RateLimiter()
+
+    assert hits(limiter, 1, requests_per_minute=60, burst=3, cost=3)[0]["allowed"]
+    assert not hits(limiter, 1, requests_per_minute=60, burst=3)[0]["allowed"]
+
+
+def test_limits_are_per_key():
+    limiter = RateLimiter()
+
+    async def run():
+        first = await limiter.hit("a", requests_per_minute=60, burst=1)
+        second = await limiter.hit("b", requests_per_minute=60, burst=1)
+        return first["allowed"], second["allowed"]
+
+    assert asyncio.run(run()) == (True, True)
+
+
+def test_redis_errors_fall_back_to_local_state_and_back_off():
+    redis_client = FailingRedis()
+    limiter = RateLimiter(redis_client=redis_client, redis_retry_seconds=60)
+
+    results = hits(limiter, 3, requests_per_minute=60, burst=2)
+
+    assert [result["allowed"] for result in results] == [True, True, False]
+    assert redis_client.calls == 1
+
+
+def test_redis_state_is_shared_between_limiters():
+    pytest.importorskip("lupa")  # fakeredis needs lupa to run Lua scripts
+    fakeredis = pytest.importorskip("fakeredis")
+    redis_client = fakeredis.FakeAsyncRedis()
+
+    first = hits(RateLimiter(redis_client=redis_client), 2, requests_per_minute=60, burst=2)
+    second = hits(RateLimiter(redis_client=redis_client), 1, requests_per_minute=60, burst=2)
+
+    assert [result["allowed"] for result in first + second] == [True, True, False]
+    assert second[0]["retry_after"] > 0
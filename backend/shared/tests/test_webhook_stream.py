@@ -0,0 +1,27 @@
+"""
+Tests for the webhook ingest stream
+"""
+import asyncio
+
+import pytest
+
+from backend.shared import webhook_stream
+from backend.shared.config import settings
+from backend.shared.webhook_stream import publish_webhook_event, webhook_stream_full, WEBHOOK_STREAM
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def test_publishing_never_trims_and_fullness_is_reported(monkeypatch):
+    redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(webhook_stream, "_async_redis", redis_client)
+    monkeypatch.setattr(settings, "webhook_stream_maxlen", 2)
+
+    async def run():
+        states = []
+        for n in range(3):
+            states.append(await webhook_stream_full())
+            await publish_webhook_event({"n": n})
+        return states, await redis_client.xlen(WEBHOOK_STREAM)
+
+    assert asyncio.run(run()) == ([False, False, True], 3)
@@ -0,0 +1,84 @@
+"""
+Webhook stream - durable Redis stream between webhook receipt and processing
+"""
+import json
+from typing import Optional, Dict, Any
+from .config import settings
+
+WEBHOOK_STREAM = "webhooks:ingest"
+WEBHOOK_CONSUMER_GROUP = "webhook-ingest"
+# Entries the ingest consumer gave up on, kept for inspection and manual replay
+WEBHOOK_DEAD_LETTER_STREAM = "webhooks:ingest:dead"
+# Seconds a sender is asked to wait while the stream is full
+WEBHOOK_STREAM_RETRY_AFTER_SECONDS = 30
+
+_async_redis = None
+
+
+def get_async_redis():
+    """Get the process-wide asyncio Redis client"""
+    global _async_redis
+    if _async_redis is None:
+        try:
+            import redis.asyncio as aioredis
+        except ImportError:
+            raise ImportError("redis package required. Install with: pip install redis")
+        _async_redis = aioredis.Redis.from_url(settings.redis_url, decode_responses=True)
+    return _async_redis
+
+
+def encode_event(event: Dict[str, Any]) -> Dict[str, str]:
+    """Stream entry fields for a webhook event"""
+    return {"event": json.dumps(event, default=str)}
+
+
+def decode_event(fields: Dict[str, str]) -> Dict[str, Any]:
+    """Webhook event from stream entry fields"""
+    return json.loads(fields["event"])
+
+
+async def publish_webhook_event(event: Dict[str, Any]) -> str:
+    """
+    Append a received webhook to the ingest stream
+
+    Entries are never trimmed here: an unread or unacknowledged entry is
+    a webhook the sender was told we accepted. The ingest consumer trims
+    acknowledged entries, and the trigger endpoint stops accepting while
+    webhook_stream_full() is true.
+
+    Args:
+        event: Webhook event (webhook_id, workflow_id, user_id, execution_id,
+            source_ip, body, status_code, message, received_at, processing_time_ms)
+
+    Returns:
+        Stream entry ID
+    """
+    return await get_async_redis().xadd(WEBHOOK_STREAM, encode_event(event))
+
+
+async def webhook_stream_full() -> bool:
+    """Whether the ingest stream holds webhook_stream_maxlen entries or more"""
+    return await get_async_redis().xlen(WEBHOOK_STREAM) >= settings.webhook_stream_maxlen
+
+
+def webhook_input(webhook_id: str, body: Any, replay_of: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Workflow input for a webhook-triggered execution
+
+    Args:
+        webhook_id: Webhook that received the payload
+        body: Parsed payload (or an offloaded payload reference)
+        replay_of: Webhook log ID when the payload is being replayed
+
+    Returns:
+        Input data for the execution
+    """
+    body = body or {}
+    input_data = {
+        "input": json.dumps(body, sort_keys=True),
+        "payload": body,
+        "webhook_id": str(webhook_id)
+    }
+    if replay_of:
+        input_data["replay_of"] = str(replay_of)
+    return input_data
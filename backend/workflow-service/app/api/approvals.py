@@ -2,6 +2,7 @@
 Approval request API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
@@ -11,7 +12,9 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
 from backend.shared.database import get_db
 from backend.shared.auth import get_current_user
+from backend.shared.approval_events import publish_approval_decision
 from app.models.approval import ApprovalRequest, ApprovalStatus
+from app.models.workflow import WorkflowExecution
 from app.schemas.approval import ApprovalRequestCreate, ApprovalRequestResponse, ApprovalDecision
 from datetime import datetime
 
@@ -26,7 +29,25 @@ async def create_approval_request(
 ):
     """
     Create a new approval request for a workflow execution
+
+    Only the execution's owner may open approvals on it.
     """
+    execution = db.query(WorkflowExecution).filter(
+        WorkflowExecution.id == approval.execution_id
+    ).first()
+
+    if not execution or str(execution.user_id) != str(current_user.get("user_id")):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Workflow execution not found"
+        )
+
+    if execution.workflow_id != approval.workflow_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Execution does not belong to this workflow"
+        )
+
     # Create approval request
     db_approval = ApprovalRequest(
         execution_id=approval.execution_id,
@@ -44,7 +65,7 @@ async def create_approval_request(
     db.commit()
     db.refresh(db_approval)
 
-    # TODO: Send notifications (Slack/Email) - implemented in separate service
+    # Notifications are sent (batched per approver) by the worker's notify-approvals sweep
 
     return db_approval
 
@@ -59,9 +80,11 @@ async def get_pending_approvals(
     """
     user_id = current_user.get("user_id")
 
+    # Overdue rows are cancelled by the expiry sweeper; hide any it has not reached yet
     approvals = db.query(ApprovalRequest).filter(
         ApprovalRequest.approver_user_id == user_id,
-        ApprovalRequest.status == ApprovalStatus.PENDING
+        ApprovalRequest.status == ApprovalStatus.PENDING,
+        or_(ApprovalRequest.expires_at.is_(None), ApprovalRequest.expires_at >= datetime.utcnow())
     ).order_by(ApprovalRequest.created_at.desc()).all()
 
     return approvals
@@ -128,8 +151,11 @@ async def decide_approval(
             detail="Approval request not found"
         )
 
-    # Check if user is authorized to approve
-    if approval.approver_user_id and approval.approver_user_id != user_id:
+    # Check if user is authorized to approve (the execution's owner when no approver is named)
+    approver_id = approval.approver_user_id or db.query(WorkflowExecution.user_id).filter(
+        WorkflowExecution.id == approval.execution_id
+    ).scalar()
+    if str(approver_id) != str(user_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not authorized to approve this request"
@@ -146,6 +172,7 @@ async def decide_approval(
     if approval.expires_at and approval.expires_at < datetime.utcnow():
         approval.status = ApprovalStatus.CANCELLED
         db.commit()
+        publish_approval_decision(approval.id, approval.execution_id, approval.status.value)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Approval request has expired"
@@ -160,7 +187,8 @@ async def decide_approval(
     db.commit()
     db.refresh(approval)
 
-    # TODO: Resume workflow execution - trigger Celery task
+    # Wakes the suspended execution; the approval listener queues its resume
+    publish_approval_decision(approval.id, approval.execution_id, approval.status.value)
 
     return approval
 
@@ -173,7 +201,11 @@ async def cancel_approval(
 ):
     """
     Cancel a pending approval request
+
+    Only the execution's owner or the designated approver may cancel it.
     """
+    user_id = str(current_user.get("user_id"))
+
     approval = db.query(ApprovalRequest).filter(
         ApprovalRequest.id == approval_id
     ).first()
@@ -184,6 +216,16 @@ async def cancel_approval(
             detail="Approval request not found"
         )
 
+    owner_id = db.query(WorkflowExecution.user_id).filter(
+        WorkflowExecution.id == approval.execution_id
+    ).scalar()
+
+    if user_id not in (str(owner_id), str(approval.approver_user_id)):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not authorized to cancel this request"
+        )
+
     if approval.status != ApprovalStatus.PENDING:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -193,4 +235,6 @@ async def cancel_approval(
     approval.status = ApprovalStatus.CANCELLED
     db.commit()
 
+    publish_approval_decision(approval.id, approval.execution_id, approval.status.value)
+
     return None
@@ -1,13 +1,17 @@
 """
 Webhook trigger API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional, Dict, Any
-from uuid import UUID
+from urllib.parse import parse_qsl
+from uuid import UUID, uuid4
+import asyncio
+import heapq
 import secrets
-import hmac
-import hashlib
+import json
+import math
 import time
 import sys
 import os
@@ -16,7 +20,19 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
 from backend.shared.database import get_db
 from backend.shared.auth import get_current_user
 from app.models.webhook import WebhookEndpoint, WebhookLog
-from datetime import datetime
+from app.models.workflow import Workflow
+from backend.shared.config import settings
+from backend.shared.idempotency import get_idempotency_store, extract_idempotency_key
+from backend.shared.metrics import get_counter
+from backend.shared.partitioning import list_partitions, read_archived, archive_read_range
+from backend.shared.payload_store import offload_payload
+from backend.shared.rate_limiter import get_rate_limiter
+from backend.shared.webhook_stream import publish_webhook_event, webhook_stream_full, WEBHOOK_STREAM_RETRY_AFTER_SECONDS
+from app.schemas.webhook import WebhookSignatureUpdate, WebhookReplayRequest, naive_utc
+from app.services.webhook_cache import get_webhook_resolver, webhook_token, WEBHOOK_URL_PREFIX
+from app.services.webhook_replay import WebhookReplayer
+from app.services.webhook_signatures import verify_signature, SignatureError, SELECTABLE_SCHEMES, DEFAULT_SCHEME
+from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/webhooks", tags=["webhooks"])
 
@@ -26,14 +42,28 @@ async def create_webhook(
     workflow_id: UUID,
     description: Optional[str] = None,
     allowed_ips: Optional[list] = None,
+    idempotency_header: Optional[str] = None,
+    idempotency_json_path: Optional[str] = None,
+    signature_scheme: str = DEFAULT_SCHEME,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Create a webhook endpoint for a workflow
+
+    Signatures are checked over the raw body with signature_scheme
+    (hmac_sha256, github, stripe or slack). For provider schemes, set the
+    provider's signing secret with POST /webhooks/{id}/signature.
+
+    Retried deliveries are deduplicated by idempotency_header (e.g.
+    X-GitHub-Delivery) or idempotency_json_path into the body (e.g. "id"
+    for Stripe events); without either, the Idempotency-Key header is used.
     """
     user_id = current_user.get("user_id")
 
+    if signature_scheme not in SELECTABLE_SCHEMES:
+        raise HTTPException(status_code=400, detail=f"Unsupported signature scheme: {signature_scheme}")
+
     # Generate unique webhook URL and secret
     webhook_id = secrets.token_urlsafe(32)
     webhook_secret = secrets.token_urlsafe(64)
@@ -41,84 +71,152 @@ async def create_webhook(
     webhook = WebhookEndpoint(
         workflow_id=workflow_id,
         user_id=user_id,
-        webhook_url=f"/webhooks/trigger/{webhook_id}",
+        webhook_url=f"{WEBHOOK_URL_PREFIX}{webhook_id}",
         webhook_secret=webhook_secret,
+        signature_scheme=signature_scheme,
         description=description,
-        allowed_ips=allowed_ips or []
+        allowed_ips=allowed_ips or [],
+        idempotency_config=(
+            {"json_path": idempotency_json_path} if idempotency_json_path
+            else {"header": idempotency_header} if idempotency_header
+            else None
+        )
     )
 
     db.add(webhook)
     db.commit()
     db.refresh(webhook)
+    get_webhook_resolver().invalidate(webhook_id)
 
     return {
         "webhook_id": webhook.id,
         "webhook_url": webhook.webhook_url,
         "webhook_secret": webhook_secret,  # Return once on creation
+        "signature_scheme": webhook.signature_scheme,
         "is_active": webhook.is_active
     }
 
 
-@router.post("/trigger/{webhook_id}")
+@router.post("/trigger/{webhook_id}", status_code=status.HTTP_202_ACCEPTED)
 async def trigger_webhook(
     webhook_id: str,
     request: Request,
-    x_webhook_signature: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
-    Receive webhook trigger and execute workflow
+    Receive webhook trigger and queue workflow execution
     Public endpoint - no auth required, uses signature verification
+
+    The request is verified and appended to the durable ingest stream;
+    logging, trigger counters and the execution record are written by the
+    ingest consumer, so the sender gets 202 without waiting on Postgres.
     """
     start_time = time.time()
+    received_at = datetime.utcnow()
 
-    # Get webhook configuration
-    webhook = db.query(WebhookEndpoint).filter(
-        WebhookEndpoint.webhook_url == f"/webhooks/trigger/{webhook_id}"
-    ).first()
+    # Get webhook configuration (cached, including unknown IDs)
+    webhook = get_webhook_resolver().resolve(webhook_id, db)
 
     if not webhook:
         raise HTTPException(status_code=404, detail="Webhook not found")
 
-    if not webhook.is_active:
+    if not webhook["is_active"]:
         raise HTTPException(status_code=403, detail="Webhook is disabled")
 
     # Verify IP whitelist
     client_ip = request.client.host
-    if webhook.allowed_ips and client_ip not in webhook.allowed_ips:
-        _log_webhook(db, webhook.id, client_ip, {}, "Unauthorized IP", 403)
+    if webhook["allowed_ips"] and client_ip not in webhook["allowed_ips"]:
+        await _record_rejection(webhook, client_ip, {}, "Unauthorized IP", 403, received_at)
         raise HTTPException(status_code=403, detail="IP not allowed")
 
-    # Parse request body
+    # Enforce the endpoint's rate limit before parsing or verifying the body
+    rate_limit = webhook["rate_limit"]
+    limit = await get_rate_limiter().hit(
+        f"webhook:{webhook['id']}",
+        rate_limit.get("requests_per_minute") or settings.webhook_default_requests_per_minute,
+        burst=rate_limit.get("burst")
+    )
+    if not limit["allowed"]:
+        # Counted in aggregate; a log row per rejection would amplify the flood
+        get_counter("webhook_rate_limited").incr(str(webhook["id"]))
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(max(1, math.ceil(limit["retry_after"])))}
+        )
+
+    # Shed load while the ingest consumer is behind; queued entries are never dropped
+    try:
+        queue_full = await webhook_stream_full()
+    except Exception:
+        raise HTTPException(status_code=503, detail="Webhook queue unavailable")
+    if queue_full:
+        get_counter("webhook_queue_full").incr(str(webhook["id"]))
+        raise HTTPException(
+            status_code=503,
+            detail="Webhook queue full",
+            headers={"Retry-After": str(WEBHOOK_STREAM_RETRY_AFTER_SECONDS)}
+        )
+
+    raw_body = await _read_body(request, settings.webhook_max_body_bytes)
+
+    # Providers sign the exact bytes they send, so verify before parsing
+    try:
+        verify_signature(webhook["signature_scheme"], webhook["webhook_secret"], raw_body, request.headers)
+    except SignatureError as e:
+        await _record_rejection(webhook, client_ip, {}, str(e), 401, received_at)
+        raise HTTPException(status_code=401, detail=str(e))
+
+    body = _parse_body(raw_body, request.headers.get("content-type", ""))
+
+    # The execution ID is assigned now so the sender can poll for it
+    execution_id = uuid4()
+
+    # A retried delivery gets the original execution instead of a new one
+    idempotency_key = extract_idempotency_key(webhook["idempotency_config"], request.headers, body)
+    if idempotency_key:
+        original_execution_id = await get_idempotency_store().claim(
+            str(webhook["id"]),
+            idempotency_key,
+            str(execution_id),
+            ttl_seconds=webhook["idempotency_config"].get("ttl_seconds")
+        )
+        if original_execution_id is not None:
+            get_counter("webhook_duplicates").incr(str(webhook["id"]))
+            return {
+                "status": "duplicate",
+                "workflow_id": str(webhook["workflow_id"]),
+                "execution_id": original_execution_id or None,
+                "message": "Delivery already received"
+            }
+
+    # Large payloads go to S3; the stream, log and execution carry a reference
+    offload_threshold = settings.webhook_offload_threshold_bytes
+    if settings.aws_s3_bucket and offload_threshold and len(raw_body) > offload_threshold:
+        try:
+            body = await asyncio.to_thread(
+                offload_payload, raw_body, f"webhooks/{webhook['id']}", str(execution_id)
+            )
+        except Exception as e:
+            print(f"Webhook payload offload failed, queueing inline: {e}")
+
     try:
-        body = await request.json()
-    except:
-        body = {}
-
-    # Verify signature if provided
-    if x_webhook_signature:
-        expected_sig = _compute_signature(webhook.webhook_secret, body)
-        if not hmac.compare_digest(x_webhook_signature, expected_sig):
-            _log_webhook(db, webhook.id, client_ip, body, "Invalid signature", 401)
-            raise HTTPException(status_code=401, detail="Invalid webhook signature")
-
-    # TODO: Trigger workflow execution via Celery
-    execution_id = None  # Would come from Celery task
-
-    # Log webhook invocation
-    processing_time = int((time.time() - start_time) * 1000)
-    _log_webhook(db, webhook.id, client_ip, body, "Success", 200, execution_id, processing_time)
-
-    # Update webhook stats
-    webhook.last_triggered_at = datetime.utcnow()
-    webhook.trigger_count += 1
-    db.commit()
+        await publish_webhook_event(_webhook_event(
+            webhook, client_ip, body, "Accepted", 202, received_at,
+            execution_id=execution_id,
+            processing_time_ms=int((time.time() - start_time) * 1000)
+        ))
+    except Exception:
+        # Not durably queued; the sender should retry, so the claim is released
+        if idempotency_key:
+            await get_idempotency_store().release(str(webhook["id"]), idempotency_key)
+        raise HTTPException(status_code=503, detail="Webhook queue unavailable")
 
     return {
-        "status": "success",
-        "workflow_id": str(webhook.workflow_id),
-        "execution_id": execution_id,
-        "message": "Workflow triggered successfully"
+        "status": "accepted",
+        "workflow_id": str(webhook["workflow_id"]),
+        "execution_id": str(execution_id),
+        "message": "Workflow execution queued"
     }
 
 
@@ -169,43 +267,292 @@ async def delete_webhook(
     if not webhook:
         raise HTTPException(status_code=404, detail="Webhook not found")
 
+    token = webhook_token(webhook.webhook_url)
     db.delete(webhook)
     db.commit()
+    get_webhook_resolver().invalidate(token)
 
     return {"status": "deleted"}
 
 
-def _compute_signature(secret: str, payload: Dict[str, Any]) -> str:
-    """Compute HMAC-SHA256 signature for webhook payload"""
-    import json
-    payload_bytes = json.dumps(payload, sort_keys=True).encode('utf-8')
-    signature = hmac.new(
-        secret.encode('utf-8'),
-        payload_bytes,
-        hashlib.sha256
-    ).hexdigest()
-    return signature
+@router.post("/{webhook_id}/signature")
+async def update_webhook_signature(
+    webhook_id: UUID,
+    update: WebhookSignatureUpdate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Set a webhook's signature scheme and signing secret
 
+    Provider schemes use the secret the provider issues (Stripe whsec_...,
+    Slack signing secret, GitHub webhook secret).
+    """
+    user_id = current_user.get("user_id")
+
+    if update.signature_scheme not in SELECTABLE_SCHEMES:
+        raise HTTPException(status_code=400, detail=f"Unsupported signature scheme: {update.signature_scheme}")
+
+    webhook = db.query(WebhookEndpoint).filter(
+        WebhookEndpoint.id == webhook_id,
+        WebhookEndpoint.user_id == user_id
+    ).first()
+
+    if not webhook:
+        raise HTTPException(status_code=404, detail="Webhook not found")
 
-def _log_webhook(
-    db: Session,
+    generated = update.signing_secret is None
+    webhook.signature_scheme = update.signature_scheme
+    webhook.webhook_secret = secrets.token_urlsafe(64) if generated else update.signing_secret
+    db.commit()
+    get_webhook_resolver().invalidate(webhook_token(webhook.webhook_url))
+
+    response = {"webhook_id": webhook.id, "signature_scheme": webhook.signature_scheme}
+    if generated:
+        response["webhook_secret"] = webhook.webhook_secret  # Returned once
+    return response
+
+
+@router.post("/{webhook_id}/deactivate")
+async def deactivate_webhook(
+    webhook_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Disable a webhook endpoint without deleting it
+    """
+    user_id = current_user.get("user_id")
+
+    webhook = db.query(WebhookEndpoint).filter(
+        WebhookEndpoint.id == webhook_id,
+        WebhookEndpoint.user_id == user_id
+    ).first()
+
+    if not webhook:
+        raise HTTPException(status_code=404, detail="Webhook not found")
+
+    webhook.is_active = False
+    db.commit()
+    get_webhook_resolver().invalidate(webhook_token(webhook.webhook_url))
+
+    return {"webhook_id": webhook.id, "is_active": webhook.is_active}
+
+
+@router.get("/{webhook_id}/logs")
+async def list_webhook_logs(
     webhook_id: UUID,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    List a webhook's invocation logs in a time range, newest first
+
+    Defaults to the last 24 hours. Parts of the range older than the live
+    partitions are read from the S3 archive written by the retention job,
+    at most partition_archive_read_max_months per request; when older
+    archives were left out, next_end is the end to request them with.
+    """
+    user_id = current_user.get("user_id")
+
+    webhook = db.query(WebhookEndpoint).filter(
+        WebhookEndpoint.id == webhook_id,
+        WebhookEndpoint.user_id == user_id
+    ).first()
+
+    if not webhook:
+        raise HTTPException(status_code=404, detail="Webhook not found")
+
+    end = naive_utc(end) or datetime.utcnow()
+    start = naive_utc(start) or end - timedelta(days=1)
+    limit = max(1, min(limit, 1000))
+
+    rows = db.query(WebhookLog).filter(
+        WebhookLog.webhook_id == webhook_id,
+        WebhookLog.created_at >= start,
+        WebhookLog.created_at < end
+    ).order_by(WebhookLog.created_at.desc()).limit(limit).all()
+
+    logs = [
+        {
+            "id": str(row.id),
+            "execution_id": str(row.execution_id) if row.execution_id else None,
+            "source_ip": row.source_ip,
+            "status_code": row.status_code,
+            "error_message": row.error_message,
+            "created_at": row.created_at.isoformat(sep=" "),
+            "processing_time_ms": row.processing_time_ms,
+            "archived": False
+        }
+        for row in rows
+    ]
+
+    partitions = list_partitions(db.connection(), WebhookLog.__tablename__)
+    live_from = partitions[0]["lower"] if partitions else None
+    archive_range = archive_read_range(start, end, live_from, settings.partition_archive_read_max_months)
+    next_end = None
+    if len(logs) < limit and archive_range is not None:
+        archive_start, archive_end = archive_range
+        if archive_start > start:
+            next_end = archive_start
+        archived = await asyncio.to_thread(
+            lambda: heapq.nlargest(
+                limit - len(logs),
+                read_archived(WebhookLog.__tablename__, archive_start, archive_end, {"webhook_id": webhook_id}),
+                key=lambda row: row["created_at"]
+            )
+        )
+        logs.extend(
+            {
+                "id": row["id"],
+                "execution_id": row.get("execution_id"),
+                "source_ip": row.get("source_ip"),
+                "status_code": row.get("status_code"),
+                "error_message": row.get("error_message"),
+                "created_at": row["created_at"],
+                "processing_time_ms": row.get("processing_time_ms"),
+                "archived": True
+            }
+            for row in archived
+        )
+
+    response = {"webhook_id": webhook.id, "start": start, "end": end, "logs": logs}
+    if next_end is not None:
+        response["next_end"] = next_end
+    return response
+
+
+@router.post("/{webhook_id}/replay")
+async def replay_webhook(
+    webhook_id: UUID,
+    replay: WebhookReplayRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Re-run logged deliveries of a webhook against its (current) workflow
+
+    Streams NDJSON progress after each chunk. Deliveries are replayed oldest
+    first, so an interrupted replay resumes from the last progress cursor
+    (its start and after_id), without repeating the last replayed delivery.
+    """
+    user_id = current_user.get("user_id")
+
+    webhook = db.query(WebhookEndpoint).filter(
+        WebhookEndpoint.id == webhook_id,
+        WebhookEndpoint.user_id == user_id
+    ).first()
+
+    if not webhook:
+        raise HTTPException(status_code=404, detail="Webhook not found")
+
+    workflow = db.query(Workflow).filter(Workflow.id == webhook.workflow_id).first()
+    if not workflow:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+
+    end = replay.end or datetime.utcnow()
+    if replay.start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    target = {"id": webhook.id, "workflow_id": webhook.workflow_id, "user_id": webhook.user_id}
+    workflow_data = workflow.workflow_data
+
+    async def stream_progress():
+        try:
+            async for progress in WebhookReplayer().replay(
+                target,
+                workflow_data,
+                replay.start,
+                end,
+                status_codes=replay.status_codes,
+                execution_status=replay.execution_status,
+                requests_per_minute=replay.requests_per_minute,
+                limit=replay.limit,
+                dry_run=replay.dry_run,
+                after_id=replay.after_id
+            ):
+                yield json.dumps(progress, default=str) + "\n"
+        except Exception as e:
+            yield json.dumps({"event": "error", "error": str(e)}) + "\n"
+
+    return StreamingResponse(stream_progress(), media_type="application/x-ndjson")
+
+
+async def _read_body(request: Request, max_bytes: int) -> bytes:
+    """Read the raw body, rejecting oversized payloads before buffering them"""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(status_code=413, detail="Payload too large")
+
+    # Chunked bodies have no Content-Length, so count while reading
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail="Payload too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _parse_body(raw_body: bytes, content_type: str) -> Any:
+    """Parse a JSON or form-encoded body (Slack sends payload=<json> forms)"""
+    if not raw_body:
+        return {}
+
+    if content_type.startswith("application/x-www-form-urlencoded"):
+        form = dict(parse_qsl(raw_body.decode("utf-8", errors="replace")))
+        if "payload" in form:
+            try:
+                form["payload"] = json.loads(form["payload"])
+            except ValueError:
+                pass
+        return form
+
+    try:
+        return json.loads(raw_body)
+    except ValueError:
+        return {"raw": raw_body.decode("utf-8", errors="replace")}
+
+
+def _webhook_event(
+    webhook: Dict[str, Any],
     source_ip: str,
     body: Dict[str, Any],
     message: str,
     status_code: int,
+    received_at: datetime,
     execution_id: Optional[UUID] = None,
     processing_time_ms: int = 0
+) -> Dict[str, Any]:
+    """Ingest stream event for a webhook invocation"""
+    return {
+        "webhook_id": str(webhook["id"]),
+        "workflow_id": str(webhook["workflow_id"]),
+        "user_id": str(webhook["user_id"]),
+        "execution_id": str(execution_id) if execution_id else None,
+        "source_ip": source_ip,
+        "body": body,
+        "message": message,
+        "status_code": status_code,
+        "received_at": received_at.isoformat(),
+        "processing_time_ms": processing_time_ms
+    }
+
+
+async def _record_rejection(
+    webhook: Dict[str, Any],
+    source_ip: str,
+    body: Dict[str, Any],
+    message: str,
+    status_code: int,
+    received_at: datetime
 ):
-    """Log webhook invocation"""
-    log = WebhookLog(
-        webhook_id=webhook_id,
-        execution_id=execution_id,
-        source_ip=source_ip,
-        request_body=body,
-        status_code=status_code,
-        response_body={"message": message},
-        processing_time_ms=processing_time_ms
-    )
-    db.add(log)
-    db.commit()
+    """Log a rejected invocation through the ingest stream (best effort)"""
+    try:
+        await publish_webhook_event(_webhook_event(webhook, source_ip, body, message, status_code, received_at))
+    except Exception as e:
+        print(f"Could not record rejected webhook {webhook['id']}: {e}")
@@ -1,7 +1,7 @@
 """
 Approval request database models for human-in-the-loop workflows
 """
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, DateTime, Index, Enum as SQLEnum, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from datetime import datetime
 import uuid
@@ -25,9 +25,20 @@ class ApprovalRequest(Base):
     Approval requests for human-in-the-loop workflow steps
     """
     __tablename__ = "approval_requests"
+    __table_args__ = (
+        # Expiry sweeper: pending rows in expires_at order
+        Index("ix_approval_requests_status_expires_at", "status", "expires_at"),
+        # Notification sweep: pending rows not yet notified, in creation order
+        Index(
+            "ix_approval_requests_unnotified",
+            "created_at",
+            postgresql_where=text("status = 'PENDING' AND NOT (notification_sent ? 'sent_at')")
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    execution_id = Column(UUID(as_uuid=True), ForeignKey("workflow_executions.id"), nullable=False, index=True)
+    # No foreign key: workflow_executions is partitioned, so id alone is not unique-constrained
+    execution_id = Column(UUID(as_uuid=True), nullable=False, index=True)
     workflow_id = Column(UUID(as_uuid=True), nullable=False, index=True)
     node_id = Column(String, nullable=False)  # The approval node ID in React Flow
 
@@ -44,7 +55,7 @@ class ApprovalRequest(Base):
     decided_at = Column(DateTime, nullable=True)
 
     # Notification tracking
-    notification_sent = Column(JSONB, default={})  # Track Slack/email notifications sent
+    notification_sent = Column(JSONB, default={})  # Notification targets, then per-channel results once sent
     approval_url = Column(String)  # URL for approval interface
 
     # Timestamps
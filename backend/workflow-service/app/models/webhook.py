@@ -1,7 +1,7 @@
 """
 Webhook trigger database models
 """
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Integer, JSON
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from datetime import datetime
 import uuid
@@ -25,16 +25,20 @@ class WebhookEndpoint(Base):
     # Webhook configuration
     webhook_url = Column(String, nullable=False, unique=True, index=True)  # /webhooks/{uuid}
     webhook_secret = Column(String, nullable=False)  # For signature verification
+    signature_scheme = Column(String, nullable=True)  # hmac_sha256, github, stripe, slack (NULL = legacy JSON signing)
     is_active = Column(Boolean, default=True)
 
     # Security
     allowed_ips = Column(JSONB, default=[])  # IP whitelist
     rate_limit = Column(JSON, default={"requests_per_minute": 60})
 
+    # Delivery deduplication: {"header": "X-GitHub-Delivery"} or {"json_path": "id"}, optional ttl_seconds
+    idempotency_config = Column(JSONB, nullable=True)
+
     # Metadata
     description = Column(Text)
     last_triggered_at = Column(DateTime, nullable=True)
-    trigger_count = Column(JSON, default=0)
+    trigger_count = Column(Integer, default=0)  # Incremented in batches by the ingest consumer
 
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -48,7 +52,10 @@ class WebhookLog(Base):
     Log of webhook invocations
     """
     __tablename__ = "webhook_logs"
+    # Monthly partitions; see backend/shared/partitioning.py
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
+    # The partition key has to be part of the primary key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     webhook_id = Column(UUID(as_uuid=True), ForeignKey("webhook_endpoints.id"), nullable=False, index=True)
     execution_id = Column(UUID(as_uuid=True), nullable=True)  # If workflow was triggered
@@ -65,7 +72,7 @@ class WebhookLog(Base):
     error_message = Column(Text)
 
     # Timing
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow, index=True)
     processing_time_ms = Column(JSON)
 
     def __repr__(self):
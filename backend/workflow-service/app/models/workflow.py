@@ -1,7 +1,7 @@
 """
 Workflow database models
 """
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Index, Enum as SQLEnum, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from datetime import datetime
 import uuid
@@ -66,16 +66,27 @@ class WorkflowExecution(Base):
     Records of workflow executions
     """
     __tablename__ = "workflow_executions"
+    # Monthly partitions; see backend/shared/partitioning.py
+    __table_args__ = (
+        # Finds suspended runs without scanning every partition
+        Index(
+            "ix_workflow_executions_awaiting_approval", "status",
+            postgresql_where=text("status = 'awaiting_approval'")
+        ),
+        {"postgresql_partition_by": "RANGE (started_at)"}
+    )
 
+    # The partition key has to be part of the primary key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     workflow_id = Column(UUID(as_uuid=True), ForeignKey("workflows.id"), nullable=False, index=True)
     user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
-    status = Column(String, nullable=False)  # running, completed, failed, cancelled
+    status = Column(String, nullable=False)  # pending, running, awaiting_approval, completed, failed, cancelled
     input_data = Column(JSONB)
     output_data = Column(JSONB)
     error_message = Column(Text)
     execution_logs = Column(JSONB, default=[])  # Array of log entries
-    started_at = Column(DateTime, default=datetime.utcnow)
+    checkpoint = Column(JSONB, nullable=True)  # Completed steps and approval decisions while awaiting approval
+    started_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
     completed_at = Column(DateTime)
 
     def __repr__(self):
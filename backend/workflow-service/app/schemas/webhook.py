@@ -0,0 +1,32 @@
+"""
+Webhook endpoint Pydantic schemas
+"""
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List
+from datetime import datetime, timezone
+from uuid import UUID
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to naive UTC, the form log timestamps are stored and compared in"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class WebhookSignatureUpdate(BaseModel):
+    signature_scheme: str  # hmac_sha256, github, stripe or slack
+    signing_secret: Optional[str] = None  # Provider-issued secret; a new one is generated if omitted
+
+
+class WebhookReplayRequest(BaseModel):
+    start: datetime
+    after_id: Optional[UUID] = None  # With start from a progress cursor: resume after this log (exclusive)
+    end: Optional[datetime] = None  # Defaults to now
+    status_codes: Optional[List[int]] = [202]  # Log status codes to replay; rejected deliveries have no stored body
+    execution_status: Optional[str] = None  # Only deliveries whose execution ended in this status (e.g. "failed")
+    requests_per_minute: Optional[int] = Field(None, ge=1)  # Queueing rate (capped by the server)
+    limit: Optional[int] = Field(None, ge=1)
+    dry_run: bool = False  # Count matching deliveries without queueing
+
+    _naive_utc = field_validator("start", "end")(naive_utc)
@@ -0,0 +1,215 @@
+"""
+Webhook endpoint resolver - cached lookups for the public trigger endpoint
+"""
+from sqlalchemy.orm import Session
+from typing import Optional, Dict, Any
+import re
+import time
+import threading
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
+from backend.shared.config import settings
+from backend.shared.lru_cache import LRUCache
+from ..models.webhook import WebhookEndpoint
+
+WEBHOOK_URL_PREFIX = "/webhooks/trigger/"
+INVALIDATION_CHANNEL = "webhooks:invalidate"
+
+# Tokens are secrets.token_urlsafe(32); anything else cannot exist
+WEBHOOK_TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,128}$")
+
+
+def webhook_token(webhook_url: str) -> str:
+    """Trigger token (last path segment) of a webhook URL"""
+    return webhook_url.rsplit("/", 1)[-1]
+
+
+class WebhookResolver:
+    """
+    Resolves trigger tokens to webhook configuration without a query per request
+
+    Known endpoints are held in an LRU with a TTL; unknown tokens go into a
+    separate negative cache so scanner traffic cannot evict hot endpoints.
+    Writes call invalidate(), which drops the entry locally and publishes
+    the token on Redis so every other worker process drops it too.
+
+    A lookup that was already reading the database when its token was
+    invalidated does not cache what it read: each token with a lookup in
+    flight has a generation that invalidation bumps, and the result is only
+    cached if the generation is unchanged.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        maxsize: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        negative_maxsize: Optional[int] = None,
+        negative_ttl_seconds: Optional[float] = None
+    ):
+        """
+        Initialize webhook resolver
+
+        Args:
+            redis_client: Redis client for invalidation pub/sub (TTL-only if None)
+            maxsize: Cached endpoints
+            ttl_seconds: Endpoint entry lifetime (bounds staleness if a message is missed)
+            negative_maxsize: Cached unknown tokens
+            negative_ttl_seconds: Unknown token entry lifetime
+        """
+        self.redis = redis_client
+        self.entries = LRUCache(
+            maxsize=maxsize or settings.webhook_cache_size,
+            ttl_seconds=ttl_seconds or settings.webhook_cache_ttl_seconds
+        )
+        self.missing = LRUCache(
+            maxsize=negative_maxsize or settings.webhook_negative_cache_size,
+            ttl_seconds=negative_ttl_seconds or settings.webhook_negative_cache_ttl_seconds
+        )
+        self.rejected = 0
+
+        # token -> [generation, lookups in flight]; only tokens being looked up are tracked
+        self._generations: Dict[str, list] = {}
+        self._generations_lock = threading.Lock()
+
+        self._listener = None
+        if self.redis is not None:
+            self._listener = threading.Thread(target=self._listen, daemon=True)
+            self._listener.start()
+
+    def resolve(self, token: str, db: Session) -> Optional[Dict[str, Any]]:
+        """
+        Look up a webhook by trigger token
+
+        Args:
+            token: Token from /webhooks/trigger/{token}
+            db: Session used only on a cache miss
+
+        Returns:
+            Endpoint config (id, workflow_id, user_id, webhook_secret, signature_scheme,
+            is_active, allowed_ips, rate_limit, idempotency_config) or None if no such webhook exists
+        """
+        if not WEBHOOK_TOKEN_PATTERN.match(token):
+            self.rejected += 1
+            return None
+
+        endpoint = self.entries.get(token)
+        if endpoint is not None:
+            return endpoint
+        if self.missing.get(token) is not None:
+            return None
+
+        generation = self._begin_lookup(token)
+        try:
+            webhook = db.query(WebhookEndpoint).filter(
+                WebhookEndpoint.webhook_url == f"{WEBHOOK_URL_PREFIX}{token}"
+            ).first()
+        finally:
+            current = self._end_lookup(token, generation)
+
+        if webhook is None:
+            if current:
+                self.missing.set(token, True)
+            return None
+
+        endpoint = {
+            "id": webhook.id,
+            "workflow_id": webhook.workflow_id,
+            "user_id": webhook.user_id,
+            "webhook_secret": webhook.webhook_secret,
+            "signature_scheme": webhook.signature_scheme,
+            "is_active": bool(webhook.is_active),
+            "allowed_ips": frozenset(webhook.allowed_ips or []),
+            "rate_limit": dict(webhook.rate_limit or {}),
+            "idempotency_config": dict(webhook.idempotency_config or {})
+        }
+        if current:
+            self.entries.set(token, endpoint)
+        return endpoint
+
+    def _begin_lookup(self, token: str) -> int:
+        with self._generations_lock:
+            state = self._generations.setdefault(token, [0, 0])
+            state[1] += 1
+            return state[0]
+
+    def _end_lookup(self, token: str, generation: int) -> bool:
+        """Whether the token was not invalidated since its lookup began"""
+        with self._generations_lock:
+            state = self._generations[token]
+            state[1] -= 1
+            if state[1] == 0:
+                del self._generations[token]
+            return state[0] == generation
+
+    def _bump(self, token: Optional[str] = None):
+        """Invalidate lookups in flight for a token (or for every token)"""
+        with self._generations_lock:
+            if token is None:
+                for state in self._generations.values():
+                    state[0] += 1
+            elif token in self._generations:
+                self._generations[token][0] += 1
+
+    def invalidate(self, token: str):
+        """Drop a token here and in every other process (call after commit)"""
+        self._drop(token)
+        if self.redis is None:
+            return
+
+        try:
+            self.redis.publish(INVALIDATION_CHANNEL, token)
+        except Exception as e:
+            # Other processes converge when their entry's TTL expires
+            print(f"Webhook cache invalidation publish failed: {e}")
+
+    def _drop(self, token: str):
+        self._bump(token)
+        self.entries.delete(token)
+        self.missing.delete(token)
+
+    def _listen(self):
+        """Apply invalidations published by other processes"""
+        while True:
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Messages sent while disconnected are lost, so start clean
+                self._bump()
+                self.entries.clear()
+                self.missing.clear()
+                for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._drop(message["data"])
+            except Exception as e:
+                print(f"Webhook cache invalidation listener error: {e}")
+                time.sleep(1.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "endpoints": self.entries.get_stats(),
+            "missing": self.missing.get_stats(),
+            "rejected": self.rejected
+        }
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_webhook_resolver() -> WebhookResolver:
+    """Get the process-wide webhook resolver"""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            redis_client = None
+            if settings.webhook_cache_pubsub_enabled:
+                try:
+                    import redis
+                    redis_client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+                except ImportError:
+                    print("redis package not installed; webhook cache relies on TTL expiry only")
+            _resolver = WebhookResolver(redis_client=redis_client)
+        return _resolver
@@ -0,0 +1,210 @@
+"""
+Webhook replay - re-run stored webhook payloads in rate-limited bulk chunks
+"""
+from sqlalchemy import select, insert, update, cast, tuple_, Text
+from sqlalchemy.engine import Engine
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
+import asyncio
+import time
+import uuid
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
+from backend.shared.config import settings
+from backend.shared.database import engine as default_engine
+from backend.shared.execution_queue import enqueue_execution
+from backend.shared.rate_limiter import RateLimiter, get_rate_limiter
+from backend.shared.webhook_stream import webhook_input
+from ..models.webhook import WebhookLog
+from ..models.workflow import WorkflowExecution
+
+
+class WebhookReplayer:
+    """
+    Replays logged webhook payloads against the webhook's workflow
+
+    Matching logs are read one chunk at a time with short keyset queries
+    on (created_at, id), so memory stays flat however many rows match and
+    no transaction stays open while the replay is paced. Each chunk becomes
+    one multi-row execution insert followed by queueing, paced by the
+    shared rate limiter so concurrent replays of a webhook share one budget.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        chunk_size: Optional[int] = None
+    ):
+        """
+        Initialize webhook replayer
+
+        Args:
+            engine: Database engine
+            rate_limiter: Limiter pacing the replay
+            chunk_size: Logs fetched, inserted and queued per chunk
+        """
+        self.engine = engine or default_engine
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.chunk_size = chunk_size or settings.webhook_replay_chunk_size
+
+    @staticmethod
+    def build_query(
+        webhook_id: uuid.UUID,
+        start: datetime,
+        end: datetime,
+        status_codes: Optional[List[int]] = None,
+        execution_status: Optional[str] = None,
+        limit: Optional[int] = None,
+        after_id: Optional[uuid.UUID] = None
+    ):
+        """
+        Select matching logs oldest first, in (created_at, id) order
+
+        With after_id, (start, after_id) is an exclusive cursor: only logs
+        after that one are selected, so a resumed replay does not repeat it.
+        """
+        query = select(WebhookLog.id, WebhookLog.request_body, WebhookLog.created_at).where(
+            WebhookLog.webhook_id == webhook_id,
+            WebhookLog.created_at >= start,
+            WebhookLog.created_at < end
+        )
+        if after_id is not None:
+            query = query.where(tuple_(WebhookLog.created_at, WebhookLog.id) > tuple_(start, after_id))
+        if status_codes:
+            # status_code is a JSON column
+            query = query.where(cast(WebhookLog.status_code, Text).in_([str(code) for code in status_codes]))
+        if execution_status:
+            query = query.join(WorkflowExecution, WorkflowExecution.id == WebhookLog.execution_id).where(
+                WorkflowExecution.status == execution_status
+            )
+        query = query.order_by(WebhookLog.created_at, WebhookLog.id)
+        return query.limit(limit) if limit else query
+
+    async def replay(
+        self,
+        webhook: Dict[str, Any],
+        workflow_data: Dict[str, Any],
+        start: datetime,
+        end: datetime,
+        status_codes: Optional[List[int]] = None,
+        execution_status: Optional[str] = None,
+        requests_per_minute: Optional[int] = None,
+        limit: Optional[int] = None,
+        dry_run: bool = False,
+        after_id: Optional[uuid.UUID] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Replay matching logs, yielding progress after every chunk
+
+        Args:
+            webhook: Webhook (id, workflow_id, user_id)
+            workflow_data: Workflow definition to run
+            start: Range start (inclusive)
+            end: Range end (exclusive)
+            status_codes: Log status codes to replay
+            execution_status: Only logs whose execution ended in this status
+            requests_per_minute: Queueing rate
+            limit: Maximum logs to replay
+            dry_run: Count matches without queueing anything
+            after_id: Resume after the log (start, after_id), exclusive
+
+        Yields:
+            Progress dicts (event "progress" per chunk, then "done"); "cursor"
+            is the (start, after_id) to resume from
+        """
+        rate = min(
+            requests_per_minute or settings.webhook_replay_requests_per_minute,
+            settings.webhook_replay_max_requests_per_minute
+        )
+        progress = {"matched": 0, "queued": 0, "failed": 0, "last_created_at": None, "cursor": None}
+        started = time.monotonic()
+
+        while limit is None or progress["matched"] < limit:
+            page_size = self.chunk_size if limit is None else min(self.chunk_size, limit - progress["matched"])
+            query = self.build_query(
+                webhook["id"], start, end, status_codes, execution_status, page_size, after_id
+            )
+            chunk = await asyncio.to_thread(self._fetch, query)
+            if not chunk:
+                break
+
+            start, after_id = chunk[-1].created_at, chunk[-1].id
+            progress["matched"] += len(chunk)
+            progress["last_created_at"] = start
+            progress["cursor"] = {"start": start, "after_id": after_id}
+            if not dry_run:
+                await self._acquire(f"replay:{webhook['id']}", rate, len(chunk))
+                queued, failed = await asyncio.to_thread(self._enqueue_chunk, webhook, workflow_data, chunk)
+                progress["queued"] += queued
+                progress["failed"] += failed
+
+            yield {
+                "event": "progress",
+                **progress,
+                "elapsed_seconds": round(time.monotonic() - started, 1)
+            }
+
+            if len(chunk) < page_size:
+                break
+
+        yield {
+            "event": "done",
+            **progress,
+            "dry_run": dry_run,
+            "elapsed_seconds": round(time.monotonic() - started, 1)
+        }
+
+    def _fetch(self, query) -> List[Any]:
+        """Read one page in its own short-lived connection"""
+        with self.engine.connect() as conn:
+            return conn.execute(query).all()
+
+    async def _acquire(self, key: str, requests_per_minute: int, count: int):
+        """Wait until the limiter admits a whole chunk"""
+        while True:
+            limit = await self.rate_limiter.hit(key, requests_per_minute, burst=self.chunk_size, cost=count)
+            if limit["allowed"]:
+                return
+            await asyncio.sleep(limit["retry_after"])
+
+    def _enqueue_chunk(self, webhook: Dict[str, Any], workflow_data: Dict[str, Any], chunk: List[Any]) -> Tuple[int, int]:
+        """Insert one execution per log in a single statement, then queue them"""
+        now = datetime.utcnow()
+        executions = [
+            {
+                "id": uuid.uuid4(),
+                "workflow_id": webhook["workflow_id"],
+                "user_id": webhook["user_id"],
+                "status": "pending",
+                "input_data": webhook_input(webhook["id"], row.request_body, replay_of=row.id),
+                "execution_logs": [],
+                "started_at": now
+            }
+            for row in chunk
+        ]
+
+        with self.engine.begin() as conn:
+            conn.execute(insert(WorkflowExecution.__table__).values(executions))
+
+        failed = []
+        for execution in executions:
+            try:
+                enqueue_execution(
+                    str(execution["id"]), workflow_data, execution["input_data"], str(webhook["user_id"])
+                )
+            except Exception as e:
+                print(f"Could not queue replayed execution {execution['id']}: {e}")
+                failed.append(execution["id"])
+
+        if failed:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    update(WorkflowExecution)
+                    .where(WorkflowExecution.id.in_(failed), WorkflowExecution.started_at == now)
+                    .values(status="failed", error_message="Could not queue replayed execution", completed_at=datetime.utcnow())
+                )
+
+        return len(executions) - len(failed), len(failed)
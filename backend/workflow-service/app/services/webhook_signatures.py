@@ -0,0 +1,146 @@
+"""
+Webhook signature verification over the raw request body, with provider presets
+"""
+from typing import Optional, Dict, Any, Callable
+import hmac
+import json
+import time
+import hashlib
+
+# Providers reject signatures older than this to stop replays; we do the same
+TIMESTAMP_TOLERANCE_SECONDS = 300
+
+DEFAULT_SCHEME = "hmac_sha256"
+LEGACY_SCHEME = "legacy_json"
+
+
+class SignatureError(Exception):
+    """Raised when a webhook signature is missing or does not verify"""
+
+
+def _hmac_hex(secret: str, payload: bytes) -> str:
+    return hmac.new(secret.encode("utf-8"), payload, hashlib.sha256).hexdigest()
+
+
+def _matches(signature: str, expected: str) -> bool:
+    """Constant-time comparison; bytes, so a non-ASCII header fails instead of raising"""
+    return hmac.compare_digest(signature.encode("utf-8"), expected.encode("utf-8"))
+
+
+def _check_timestamp(timestamp: Optional[str], now: float):
+    try:
+        age = abs(now - int(timestamp))
+    except (TypeError, ValueError):
+        raise SignatureError("Missing or invalid signature timestamp")
+    if age > TIMESTAMP_TOLERANCE_SECONDS:
+        raise SignatureError("Signature timestamp outside tolerance")
+
+
+def verify_hmac_sha256(secret: str, raw_body: bytes, headers: Any, now: float):
+    """X-Webhook-Signature: hex HMAC-SHA256 of the raw body (optionally "sha256=" prefixed)"""
+    signature = headers.get("x-webhook-signature")
+    if not signature:
+        raise SignatureError("Missing X-Webhook-Signature header")
+    if signature.startswith("sha256="):
+        signature = signature[len("sha256="):]
+    if not _matches(signature, _hmac_hex(secret, raw_body)):
+        raise SignatureError("Invalid webhook signature")
+
+
+def verify_github(secret: str, raw_body: bytes, headers: Any, now: float):
+    """X-Hub-Signature-256: sha256=<hex HMAC of the raw body>"""
+    signature = headers.get("x-hub-signature-256")
+    if not signature:
+        raise SignatureError("Missing X-Hub-Signature-256 header")
+    if not _matches(signature, f"sha256={_hmac_hex(secret, raw_body)}"):
+        raise SignatureError("Invalid webhook signature")
+
+
+def verify_stripe(secret: str, raw_body: bytes, headers: Any, now: float):
+    """Stripe-Signature: t=<ts>,v1=<hex HMAC of "<ts>.<raw body>">[,v1=...]"""
+    header = headers.get("stripe-signature")
+    if not header:
+        raise SignatureError("Missing Stripe-Signature header")
+
+    timestamp = None
+    candidates = []
+    for item in header.split(","):
+        name, _, value = item.strip().partition("=")
+        if name == "t":
+            timestamp = value
+        elif name == "v1":
+            candidates.append(value)
+
+    _check_timestamp(timestamp, now)
+    expected = _hmac_hex(secret, timestamp.encode("utf-8") + b"." + raw_body)
+    # Stripe sends one v1 per active secret while a secret is being rolled
+    if not any(_matches(candidate, expected) for candidate in candidates):
+        raise SignatureError("Invalid webhook signature")
+
+
+def verify_slack(secret: str, raw_body: bytes, headers: Any, now: float):
+    """X-Slack-Signature: v0=<hex HMAC of "v0:<X-Slack-Request-Timestamp>:<raw body>">"""
+    signature = headers.get("x-slack-signature")
+    timestamp = headers.get("x-slack-request-timestamp")
+    if not signature:
+        raise SignatureError("Missing X-Slack-Signature header")
+
+    _check_timestamp(timestamp, now)
+    expected = "v0=" + _hmac_hex(secret, b"v0:" + timestamp.encode("utf-8") + b":" + raw_body)
+    if not _matches(signature, expected):
+        raise SignatureError("Invalid webhook signature")
+
+
+def verify_legacy_json(secret: str, raw_body: bytes, headers: Any, now: float):
+    """
+    Pre-existing endpoints: hex HMAC of json.dumps(body, sort_keys=True)
+
+    The signature stays optional for these, as it was before schemes existed.
+    """
+    signature = headers.get("x-webhook-signature")
+    if not signature:
+        return
+    try:
+        body = json.loads(raw_body) if raw_body else {}
+    except ValueError:
+        body = {}
+    if not _matches(signature, _hmac_hex(secret, json.dumps(body, sort_keys=True).encode("utf-8"))):
+        raise SignatureError("Invalid webhook signature")
+
+
+SIGNATURE_SCHEMES: Dict[str, Callable[[str, bytes, Any, float], None]] = {
+    DEFAULT_SCHEME: verify_hmac_sha256,
+    "github": verify_github,
+    "stripe": verify_stripe,
+    "slack": verify_slack,
+    LEGACY_SCHEME: verify_legacy_json
+}
+
+# Schemes an endpoint can be configured with; legacy_json only covers endpoints created before schemes existed
+SELECTABLE_SCHEMES = tuple(name for name in SIGNATURE_SCHEMES if name != LEGACY_SCHEME)
+
+
+def verify_signature(
+    scheme: Optional[str],
+    secret: str,
+    raw_body: bytes,
+    headers: Any,
+    now: Optional[float] = None
+):
+    """
+    Verify a webhook delivery's signature
+
+    Args:
+        scheme: Signature scheme (None for endpoints created before schemes existed)
+        secret: Endpoint signing secret
+        raw_body: Request body exactly as received
+        headers: Request headers (case-insensitive mapping)
+        now: Current Unix time (for timestamped schemes)
+
+    Raises:
+        SignatureError: If the signature is missing or invalid
+    """
+    verifier = SIGNATURE_SCHEMES.get(scheme or LEGACY_SCHEME)
+    if verifier is None:
+        raise SignatureError(f"Unsupported signature scheme: {scheme}")
+    verifier(secret, raw_body, headers, time.time() if now is None else now)
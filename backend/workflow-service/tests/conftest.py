@@ -0,0 +1,36 @@
+"""
+Test configuration - run from anywhere with: pytest backend/workflow-service/tests
+"""
+import os
+import sys
+
+import pytest
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(SERVICE_DIR, '../..'))
+sys.path.insert(0, SERVICE_DIR)
+
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite engine with the service's tables (Postgres types mapped to SQLite ones)"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.dialects.postgresql import JSONB, UUID
+    from sqlalchemy.ext.compiler import compiles
+    from sqlalchemy.pool import StaticPool
+
+    @compiles(JSONB, "sqlite")
+    def compile_jsonb(type_, compiler, **kw):
+        return "JSON"
+
+    @compiles(UUID, "sqlite")
+    def compile_uuid(type_, compiler, **kw):
+        return "CHAR(32)"
+
+    from app.models.webhook import WebhookEndpoint, WebhookLog
+    from app.models.workflow import Workflow, WorkflowExecution
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    tables = [Workflow.__table__, WorkflowExecution.__table__, WebhookEndpoint.__table__, WebhookLog.__table__]
+    Workflow.metadata.create_all(engine, tables=tables)
+    return engine
@@ -0,0 +1,61 @@
+"""
+Tests for the cached webhook resolver
+"""
+import uuid
+from types import SimpleNamespace
+
+from app.services.webhook_cache import WebhookResolver
+
+TOKEN = "a" * 43
+
+
+class FakeDB:
+    """Session stand-in whose query runs a hook before returning the row"""
+
+    def __init__(self, row, during_query=None):
+        self.row = row
+        self.during_query = during_query
+        self.queries = 0
+
+    def query(self, model):
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    def first(self):
+        self.queries += 1
+        if self.during_query:
+            self.during_query()
+        return self.row
+
+
+def webhook_row(secret="old"):
+    return SimpleNamespace(
+        id=uuid.uuid4(), workflow_id=uuid.uuid4(), user_id=uuid.uuid4(), webhook_secret=secret,
+        signature_scheme="hmac_sha256", is_active=True, allowed_ips=[], rate_limit={}, idempotency_config={}
+    )
+
+
+def test_hits_are_served_from_the_cache():
+    resolver = WebhookResolver()
+    db = FakeDB(webhook_row())
+
+    assert resolver.resolve(TOKEN, db) == resolver.resolve(TOKEN, db)
+    assert db.queries == 1
+
+
+def test_a_read_overtaken_by_invalidate_is_not_cached():
+    resolver = WebhookResolver()
+    stale = FakeDB(webhook_row("old"), during_query=lambda: resolver.invalidate(TOKEN))
+
+    assert resolver.resolve(TOKEN, stale)["webhook_secret"] == "old"
+    assert resolver.resolve(TOKEN, FakeDB(webhook_row("new")))["webhook_secret"] == "new"
+    assert resolver._generations == {}
+
+
+def test_a_miss_overtaken_by_invalidate_is_not_cached():
+    resolver = WebhookResolver()
+
+    assert resolver.resolve(TOKEN, FakeDB(None, during_query=lambda: resolver.invalidate(TOKEN))) is None
+    assert resolver.resolve(TOKEN, FakeDB(webhook_row())) is not None
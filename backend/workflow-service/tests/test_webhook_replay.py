@@ -0,0 +1,81 @@
+"""
+Tests for replaying logged webhook deliveries
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import insert
+
+from app.schemas.webhook import WebhookReplayRequest
+from app.services import webhook_replay
+from app.services.webhook_replay import WebhookReplayer
+from app.models.webhook import WebhookLog
+
+START = datetime(2026, 1, 1)
+
+
+class AllowAll:
+    async def hit(self, key, requests_per_minute, burst=None, cost=1):
+        return {"allowed": True, "retry_after": 0}
+
+
+@pytest.fixture
+def webhook(engine):
+    webhook = {"id": uuid.uuid4(), "workflow_id": uuid.uuid4(), "user_id": uuid.uuid4()}
+    # Three deliveries share a timestamp, so paging has to break ties on id
+    times = [START, START + timedelta(seconds=1), START + timedelta(seconds=1), START + timedelta(seconds=1), START + timedelta(seconds=2)]
+    with engine.begin() as conn:
+        conn.execute(insert(WebhookLog.__table__).values([
+            {"id": uuid.uuid4(), "webhook_id": webhook["id"], "request_body": {"n": n}, "status_code": 202, "created_at": created_at}
+            for n, created_at in enumerate(times)
+        ]))
+    return webhook
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    queued = []
+    monkeypatch.setattr(webhook_replay, "enqueue_execution", lambda *args: queued.append(args[2]["payload"]["n"]))
+    return queued
+
+
+def run(replayer, webhook, **kwargs):
+    async def collect():
+        return [progress async for progress in replayer.replay(webhook, {}, kwargs.pop("start", START), START + timedelta(hours=1), **kwargs)]
+    return asyncio.run(collect())
+
+
+def test_pages_through_every_match_once(engine, webhook, queued):
+    events = run(WebhookReplayer(engine=engine, rate_limiter=AllowAll(), chunk_size=2), webhook)
+
+    assert sorted(queued) == [0, 1, 2, 3, 4]
+    assert [event["matched"] for event in events] == [2, 4, 5, 5]
+    assert events[-1]["event"] == "done" and events[-1]["queued"] == 5
+
+
+def test_resuming_from_the_cursor_skips_the_boundary_row(engine, webhook, queued):
+    replayer = WebhookReplayer(engine=engine, rate_limiter=AllowAll(), chunk_size=2)
+    cursor = run(replayer, webhook, limit=2)[-1]["cursor"]
+    first = list(queued)
+
+    run(replayer, webhook, start=cursor["start"], after_id=cursor["after_id"])
+
+    assert len(first) == 2
+    assert sorted(queued) == [0, 1, 2, 3, 4]
+
+
+def test_limit_and_rate_must_be_positive():
+    for field in ("limit", "requests_per_minute"):
+        with pytest.raises(ValidationError):
+            WebhookReplayRequest(start=START, **{field: 0})
+
+
+def test_aware_times_are_converted_to_naive_utc():
+    replay = WebhookReplayRequest(start="2026-01-01T02:00:00+02:00", end="2026-01-01T01:00:00Z")
+
+    assert replay.start == START
+    assert replay.end == START + timedelta(hours=1)
+    assert WebhookReplayRequest(start=START).start == START
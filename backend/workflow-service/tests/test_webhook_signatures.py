@@ -0,0 +1,78 @@
+"""
+Tests for webhook signature verification
+"""
+import hashlib
+import hmac
+import json
+
+import pytest
+
+from app.services.webhook_signatures import (
+    verify_signature, SignatureError, SELECTABLE_SCHEMES, LEGACY_SCHEME, TIMESTAMP_TOLERANCE_SECONDS
+)
+
+SECRET = "secret"
+BODY = b'{"b": 1, "a": 2}'
+NOW = 1_700_000_000
+
+
+def sign(payload: bytes) -> str:
+    return hmac.new(SECRET.encode("utf-8"), payload, hashlib.sha256).hexdigest()
+
+
+VALID_HEADERS = {
+    "hmac_sha256": {"x-webhook-signature": "sha256=" + sign(BODY)},
+    "github": {"x-hub-signature-256": "sha256=" + sign(BODY)},
+    "stripe": {"stripe-signature": f"t={NOW},v1=stale,v1={sign(f'{NOW}.'.encode() + BODY)}"},
+    "slack": {
+        "x-slack-signature": "v0=" + sign(f"v0:{NOW}:".encode() + BODY),
+        "x-slack-request-timestamp": str(NOW)
+    },
+    LEGACY_SCHEME: {"x-webhook-signature": sign(json.dumps(json.loads(BODY), sort_keys=True).encode())}
+}
+
+SIGNATURE_HEADERS = {
+    "hmac_sha256": "x-webhook-signature",
+    "github": "x-hub-signature-256",
+    "stripe": "stripe-signature",
+    "slack": "x-slack-signature",
+    LEGACY_SCHEME: "x-webhook-signature"
+}
+
+
+@pytest.mark.parametrize("scheme", list(VALID_HEADERS))
+def test_valid_signatures_verify(scheme):
+    verify_signature(scheme, SECRET, BODY, VALID_HEADERS[scheme], now=NOW)
+
+
+@pytest.mark.parametrize("scheme", list(VALID_HEADERS))
+def test_tampered_bodies_are_rejected(scheme):
+    with pytest.raises(SignatureError):
+        verify_signature(scheme, SECRET, b'{"a": 3}', VALID_HEADERS[scheme], now=NOW)
+
+
+@pytest.mark.parametrize("scheme", list(VALID_HEADERS))
+def test_non_ascii_signatures_are_rejected_not_raised(scheme):
+    header = SIGNATURE_HEADERS[scheme]
+    headers = {**VALID_HEADERS[scheme], header: VALID_HEADERS[scheme][header] + "é"}
+
+    with pytest.raises(SignatureError):
+        verify_signature(scheme, SECRET, BODY, headers, now=NOW)
+
+
+@pytest.mark.parametrize("scheme", ["stripe", "slack"])
+def test_stale_timestamps_are_rejected(scheme):
+    with pytest.raises(SignatureError, match="tolerance"):
+        verify_signature(scheme, SECRET, BODY, VALID_HEADERS[scheme], now=NOW + TIMESTAMP_TOLERANCE_SECONDS + 1)
+
+
+def test_legacy_endpoints_accept_unsigned_deliveries():
+    verify_signature(None, SECRET, BODY, {}, now=NOW)
+
+    with pytest.raises(SignatureError, match="Missing"):
+        verify_signature("hmac_sha256", SECRET, BODY, {}, now=NOW)
+
+
+def test_legacy_json_cannot_be_selected():
+    assert LEGACY_SCHEME not in SELECTABLE_SCHEMES
+    assert set(SELECTABLE_SCHEMES) == {"hmac_sha256", "github", "stripe", "slack"}
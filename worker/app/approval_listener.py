@@ -0,0 +1,506 @@
+"""
+Approval listener - resumes executions suspended for human approval when a decision is published,
+notifies approvers and expires approvals nobody decided
+
+Run with: python -m worker.app.approval_listener
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import importlib
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Callable, List
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from backend.shared.config import settings
+from backend.shared.approval_events import APPROVAL_CHANNEL, publish_approval_decision
+from backend.shared.execution_queue import enqueue_resume
+from backend.shared.integrations.approval_notifications import (
+    ApprovalNotificationService,
+    get_approval_notification_service,
+    notification_targets
+)
+
+approval_models = importlib.import_module("backend.workflow-service.app.models.approval")
+workflow_models = importlib.import_module("backend.workflow-service.app.models.workflow")
+
+ApprovalRequest = approval_models.ApprovalRequest
+ApprovalStatus = approval_models.ApprovalStatus
+Workflow = workflow_models.Workflow
+WorkflowExecution = workflow_models.WorkflowExecution
+
+AWAITING_APPROVAL = "awaiting_approval"
+
+
+def _default_engine():
+    from backend.shared.database import engine
+    return engine
+
+
+def suspend_execution(execution_id: str, result: Dict[str, Any], engine: Optional[Any] = None) -> Optional[uuid.UUID]:
+    """
+    Persist a run suspended by an approval node and open its approval request
+
+    The checkpoint and the approval request are written in one transaction,
+    so a decision can never arrive for an execution without a checkpoint.
+    The checkpoint records the approval's ID: only that request's decision
+    can resume the execution, not other rows naming the same execution.
+
+    Args:
+        execution_id: Suspended execution
+        result: Orchestration result with status "awaiting_approval"
+        engine: SQLAlchemy engine (defaults to the shared engine)
+
+    Returns:
+        Approval request ID, or None if the execution no longer exists
+    """
+    from sqlalchemy import update, insert
+
+    approval = result["approval"]
+    config = approval.get("config") or {}
+    now = datetime.utcnow()
+    expires_in_hours = config.get("expires_in_hours") or settings.approval_default_expiry_hours
+    approval_id = uuid.uuid4()
+    checkpoint = {
+        **result["checkpoint"],
+        "pending_approval": {"id": str(approval_id), "key": approval.get("key") or approval["node_id"]}
+    }
+
+    with (engine or _default_engine()).begin() as conn:
+        execution = conn.execute(
+            update(WorkflowExecution)
+            .where(WorkflowExecution.id == uuid.UUID(execution_id))
+            .values(status=AWAITING_APPROVAL, checkpoint=checkpoint, execution_logs=result.get("logs", []))
+            .returning(WorkflowExecution.workflow_id, WorkflowExecution.user_id)
+        ).first()
+        if execution is None:
+            return None
+
+        conn.execute(insert(ApprovalRequest.__table__).values(
+            id=approval_id,
+            execution_id=uuid.UUID(execution_id),
+            workflow_id=execution.workflow_id,
+            node_id=approval["node_id"],
+            approver_user_id=uuid.UUID(config["approver_user_id"]) if config.get("approver_user_id") else (
+                None if config.get("approver_email") else execution.user_id
+            ),
+            approver_email=config.get("approver_email"),
+            approval_message=approval["message"],
+            approval_data=approval.get("data"),
+            status=ApprovalStatus.PENDING,
+            # Targets only; the notification sweep adds the results once sent
+            notification_sent={"targets": notification_targets(config, config.get("approver_email"))},
+            approval_url=f"/approvals/{execution_id}",
+            created_at=now,
+            expires_at=now + timedelta(hours=expires_in_hours) if expires_in_hours else None
+        ))
+
+    return approval_id
+
+
+def claim_resume(execution_id: str, engine: Optional[Any] = None) -> Optional[Dict[str, Any]]:
+    """
+    Move a suspended execution back to running, once its approval is decided
+
+    Only the approval recorded in the checkpoint by suspend_execution is
+    honoured; other approval rows naming the execution are ignored. Only one
+    caller wins the status transition, so duplicate wake-ups are harmless.
+    An execution whose approval was cancelled (or expired) is marked
+    cancelled instead.
+
+    Args:
+        execution_id: Suspended execution
+        engine: SQLAlchemy engine (defaults to the shared engine)
+
+    Returns:
+        Dict with workflow_data, input_data, user_id, checkpoint (with the
+        unused approval decisions) and logs, or None if there is nothing to resume
+    """
+    from sqlalchemy import select, update
+
+    execution_uuid = uuid.UUID(execution_id)
+    with (engine or _default_engine()).begin() as conn:
+        suspended = conn.execute(
+            select(WorkflowExecution.checkpoint)
+            .where(WorkflowExecution.id == execution_uuid, WorkflowExecution.status == AWAITING_APPROVAL)
+        ).first()
+        pending = ((suspended.checkpoint or {}) if suspended else {}).get("pending_approval")
+        if not pending:
+            return None
+
+        approval = conn.execute(
+            select(ApprovalRequest.status, ApprovalRequest.decision_notes, ApprovalRequest.approval_data)
+            .where(ApprovalRequest.id == uuid.UUID(pending["id"]), ApprovalRequest.execution_id == execution_uuid)
+        ).first()
+        if approval is None or approval.status == ApprovalStatus.PENDING:
+            return None
+
+        if approval.status == ApprovalStatus.CANCELLED:
+            conn.execute(
+                update(WorkflowExecution)
+                .where(WorkflowExecution.id == execution_uuid, WorkflowExecution.status == AWAITING_APPROVAL)
+                .values(
+                    status="cancelled",
+                    checkpoint=None,
+                    error_message="Approval was cancelled or expired",
+                    completed_at=datetime.utcnow()
+                )
+            )
+            return None
+
+        execution = conn.execute(
+            update(WorkflowExecution)
+            .where(WorkflowExecution.id == execution_uuid, WorkflowExecution.status == AWAITING_APPROVAL)
+            .values(status="running")
+            .returning(
+                WorkflowExecution.workflow_id,
+                WorkflowExecution.user_id,
+                WorkflowExecution.input_data,
+                WorkflowExecution.checkpoint,
+                WorkflowExecution.execution_logs
+            )
+        ).first()
+        if execution is None:
+            return None
+
+        workflow_data = conn.execute(
+            select(Workflow.workflow_data).where(Workflow.id == execution.workflow_id)
+        ).scalar()
+
+    checkpoint = {key: value for key, value in (execution.checkpoint or {}).items() if key != "pending_approval"}
+    decision = {"status": approval.status.value, "notes": approval.decision_notes}
+    if (approval.approval_data or {}).get("request"):
+        decision["request"] = approval.approval_data["request"]
+    return {
+        "workflow_data": workflow_data,
+        "input_data": execution.input_data or {},
+        "user_id": str(execution.user_id),
+        "checkpoint": {**checkpoint, "approvals": {**checkpoint.get("approvals", {}), pending["key"]: decision}},
+        "logs": execution.execution_logs or []
+    }
+
+
+def expire_overdue_approvals(
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+    engine: Optional[Any] = None,
+    redis_client: Optional[Any] = None,
+    now: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Cancel pending approvals past expires_at, one batch per transaction
+
+    Each batch locks its rows with FOR UPDATE SKIP LOCKED (served by the
+    (status, expires_at) index), so concurrent sweeps and approvers deciding
+    at the same moment never block each other. Each expired approval is
+    published like a cancellation, which wakes its execution to be marked
+    cancelled.
+
+    Args:
+        batch_size: Approvals expired per transaction
+        max_batches: Batches per sweep (the rest waits for the next run)
+        engine: SQLAlchemy engine (defaults to the shared engine)
+        redis_client: Redis client for decision events (defaults to the shared one)
+        now: Current time
+
+    Returns:
+        Dict with expired count, batches run and per-workflow counts
+    """
+    from sqlalchemy import select, update
+
+    batch_size = batch_size or settings.approval_expiry_batch_size
+    max_batches = max_batches or settings.approval_expiry_max_batches
+    now = now or datetime.utcnow()
+    engine = engine or _default_engine()
+
+    expired = 0
+    batches = 0
+    per_workflow: Dict[str, int] = {}
+    while batches < max_batches:
+        with engine.begin() as conn:
+            overdue = conn.execute(
+                select(ApprovalRequest.id)
+                .where(ApprovalRequest.status == ApprovalStatus.PENDING, ApprovalRequest.expires_at < now)
+                .order_by(ApprovalRequest.expires_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+            if not overdue:
+                break
+
+            rows = conn.execute(
+                update(ApprovalRequest)
+                .where(ApprovalRequest.id.in_(overdue))
+                .values(status=ApprovalStatus.CANCELLED, decision_notes="Expired without a decision")
+                .returning(ApprovalRequest.id, ApprovalRequest.execution_id, ApprovalRequest.workflow_id)
+            ).all()
+
+        batches += 1
+        expired += len(rows)
+        for row in rows:
+            publish_approval_decision(row.id, row.execution_id, ApprovalStatus.CANCELLED.value, redis_client)
+            per_workflow[str(row.workflow_id)] = per_workflow.get(str(row.workflow_id), 0) + 1
+
+        if len(overdue) < batch_size:
+            break
+
+    return {"expired": expired, "batches": batches, "workflows": per_workflow}
+
+
+def notify_pending_approvals(
+    batch_size: Optional[int] = None,
+    engine: Optional[Any] = None,
+    service: Optional[ApprovalNotificationService] = None
+) -> Dict[str, Any]:
+    """
+    Notify approvers of pending approvals not yet notified, one digest per approver
+
+    Approvals created since the last sweep are grouped by approver and
+    targets, so a burst (e.g. a replay suspending hundreds of executions)
+    becomes one message per channel rather than hundreds. A short
+    transaction claims the batch (claimed_at, FOR UPDATE SKIP LOCKED so
+    concurrent sweeps take other rows); the digests are sent with no
+    transaction open, and a second one records the results. Failed channels
+    are retried by later sweeps until approval_notification_max_attempts;
+    a claim left by a sweep that died expires after the claim timeout.
+
+    Args:
+        batch_size: Approvals notified per sweep
+        engine: SQLAlchemy engine (defaults to the shared engine)
+        service: Notification service (defaults to the shared one)
+
+    Returns:
+        Dict with approvals notified, notifications (groups) sent and per-channel sent/failed counts
+    """
+    from sqlalchemy import select, update, or_, func, cast, bindparam
+    from sqlalchemy.dialects.postgresql import JSONB
+
+    engine = engine or _default_engine()
+    batch_size = batch_size or settings.approval_notification_batch_size
+    service = service or get_approval_notification_service()
+    claimed_at = datetime.utcnow().isoformat()
+    claim_expired = (datetime.utcnow() - timedelta(seconds=settings.approval_notification_claim_timeout_seconds)).isoformat()
+    notification = ApprovalRequest.notification_sent
+
+    with engine.begin() as conn:
+        rows = conn.execute(
+            select(
+                ApprovalRequest.id,
+                ApprovalRequest.approver_user_id,
+                ApprovalRequest.approver_email,
+                ApprovalRequest.approval_message,
+                ApprovalRequest.approval_data,
+                ApprovalRequest.approval_url,
+                ApprovalRequest.notification_sent
+            )
+            .where(
+                ApprovalRequest.status == ApprovalStatus.PENDING,
+                or_(notification.is_(None), ~notification.has_key("sent_at")),
+                or_(
+                    notification.is_(None),
+                    ~notification.has_key("claimed_at"),
+                    notification["claimed_at"].astext < claim_expired
+                )
+            )
+            .order_by(ApprovalRequest.created_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            return {"approvals": 0, "notifications": 0, "channels": {}}
+
+        conn.execute(
+            update(ApprovalRequest)
+            .where(ApprovalRequest.id.in_([row.id for row in rows]))
+            .values(notification_sent=func.coalesce(notification, cast({}, JSONB)).op("||")(
+                cast({"claimed_at": claimed_at}, JSONB)
+            ))
+        )
+
+    groups = group_by_approver(rows)
+    results = asyncio.run(service.send_digests(groups))
+
+    sent_at = datetime.utcnow().isoformat()
+    previous = {row.id: row.notification_sent for row in rows}
+    records = []
+    channels: Dict[str, Dict[str, int]] = {}
+    for group, result in zip(groups, results):
+        for approval in group["approvals"]:
+            records.append({
+                "approval_id": approval["id"],
+                "record": record_notification(
+                    previous[approval["id"]], group["targets"], result, len(group["approvals"]), sent_at
+                )
+            })
+        for channel, outcome in result.items():
+            counts = channels.setdefault(channel, {"sent": 0, "failed": 0})
+            counts["sent" if outcome["sent"] else "failed"] += 1
+
+    with engine.begin() as conn:
+        # Skipped if the claim expired and another sweep took the row over
+        conn.execute(
+            update(ApprovalRequest)
+            .where(
+                ApprovalRequest.id == bindparam("approval_id"),
+                notification["claimed_at"].astext == claimed_at
+            )
+            .values(notification_sent=bindparam("record", type_=JSONB)),
+            records
+        )
+
+    return {"approvals": len(rows), "notifications": len(groups), "channels": channels}
+
+
+def pending_targets(notification: Optional[Dict[str, Any]], approver_email: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Targets of an approval still to be notified
+
+    Rows without stored targets (e.g. created through the API) are sent to
+    the approver email and the default Slack channel. Channels that were
+    sent, or gave up after approval_notification_max_attempts, are left out.
+    """
+    notification = notification or {}
+    targets = notification.get("targets")
+    if targets is None:
+        targets = notification_targets({}, approver_email)
+    finished = {
+        channel for channel, outcome in (notification.get("channels") or {}).items()
+        if outcome.get("sent") or outcome.get("attempts", 1) >= settings.approval_notification_max_attempts
+    }
+    return {channel: target for channel, target in targets.items() if channel not in finished}
+
+
+def record_notification(
+    notification: Optional[Dict[str, Any]],
+    targets: Dict[str, Any],
+    result: Dict[str, Dict[str, Any]],
+    batch_size: int,
+    sent_at: str
+) -> Dict[str, Any]:
+    """
+    Notification state after one send attempt
+
+    Each channel keeps its attempt count; sent_at is set (ending retries)
+    only once every target channel was sent or reached the attempt cap.
+    The claim is released so later sweeps can retry the rest.
+    """
+    notification = dict(notification or {})
+    notification.pop("claimed_at", None)
+    notification.setdefault("targets", targets)
+    channels = dict(notification.get("channels") or {})
+    for channel, outcome in result.items():
+        attempts = channels.get(channel, {}).get("attempts", 0) + 1
+        channels[channel] = {**outcome, "attempts": attempts, "at": sent_at}
+    notification["channels"] = channels
+    notification["batch_size"] = batch_size
+
+    if not pending_targets(notification):
+        notification["sent_at"] = sent_at
+    return notification
+
+
+def group_by_approver(rows: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Group approval rows by approver and the targets still to notify, keeping creation order
+
+    Rows whose earlier attempt reached only some channels are grouped by
+    the channels left, so a retry does not notify the others again.
+    """
+    groups: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        targets = pending_targets(row.notification_sent, row.approver_email)
+        key = (str(row.approver_user_id or row.approver_email), json.dumps(targets, sort_keys=True))
+        group = groups.setdefault(key, {"targets": targets, "approvals": []})
+        group["approvals"].append({
+            "id": row.id,
+            "approval_url": row.approval_url or f"/approvals/{row.id}",
+            "message": row.approval_message,
+            "data": row.approval_data
+        })
+    return list(groups.values())
+
+
+class ApprovalListener:
+    """
+    Subscribes to approval decisions and queues the resume of each execution
+
+    Suspended executions hold no worker slot; this process only turns a
+    published decision into a resume task. Pub/sub does not keep messages
+    for absent subscribers, so every (re)subscribe first reconciles from
+    the database: suspended executions whose approval is decided are queued.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        engine: Optional[Any] = None,
+        dispatch: Callable[[str], Any] = enqueue_resume
+    ):
+        """
+        Initialize approval listener
+
+        Args:
+            redis_client: Redis client (defaults to settings.redis_url)
+            engine: SQLAlchemy engine (defaults to the shared engine)
+            dispatch: Function queuing a resume (enqueue_resume signature)
+        """
+        if redis_client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("redis package required. Install with: pip install redis")
+            redis_client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+
+        self.redis = redis_client
+        self.engine = engine or _default_engine()
+        self.dispatch = dispatch
+
+    def run(self):
+        """Listen until interrupted"""
+        while True:
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(APPROVAL_CHANNEL)
+                self.reconcile()
+                for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.handle(message["data"])
+            except Exception as e:
+                print(f"Approval listener error: {e}")
+                time.sleep(1.0)
+
+    def handle(self, data: str):
+        """Queue the resume for one published decision"""
+        try:
+            event = json.loads(data)
+            self.dispatch(event["execution_id"])
+        except (KeyError, ValueError):
+            print(f"Skipping malformed approval event: {data}")
+
+    def reconcile(self) -> int:
+        """Queue every suspended execution whose checkpointed approval has been decided"""
+        from sqlalchemy import select, cast
+        from sqlalchemy.dialects.postgresql import UUID
+
+        with self.engine.connect() as conn:
+            execution_ids = conn.execute(
+                select(WorkflowExecution.id)
+                .join(ApprovalRequest, ApprovalRequest.id == cast(
+                    WorkflowExecution.checkpoint["pending_approval"]["id"].astext, UUID(as_uuid=True)
+                ))
+                .where(
+                    WorkflowExecution.status == AWAITING_APPROVAL,
+                    ApprovalRequest.status != ApprovalStatus.PENDING
+                )
+            ).scalars().all()
+
+        for execution_id in execution_ids:
+            self.dispatch(str(execution_id))
+        return len(execution_ids)
+
+
+if __name__ == "__main__":
+    ApprovalListener().run()
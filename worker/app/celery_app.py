@@ -2,18 +2,21 @@
 Celery application configuration
 """
 from celery import Celery
+from celery.schedules import crontab
+from celery.signals import worker_shutdown
 import sys
 import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 from backend.shared.config import settings
+from backend.shared.integrations.memory_buffer import drain_memory_buffer
 
 # Create Celery app
 celery_app = Celery(
     "agentic_workflow_worker",
     broker=settings.celery_broker_url,
     backend=settings.celery_result_backend,
-    include=['worker.app.tasks.workflow_tasks']
+    include=['worker.app.tasks.workflow_tasks', 'worker.app.tasks.maintenance_tasks']
 )
 
 # Configure Celery
@@ -28,7 +31,32 @@ celery_app.conf.update(
     task_soft_time_limit=25 * 60,  # 25 minutes
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=100,
+    beat_schedule={
+        # Notify approvers, batching approvals created since the last run
+        'notify-approvals': {
+            'task': 'worker.notify_approvals',
+            'schedule': settings.approval_notification_interval_seconds,
+        },
+        # Cancel overdue approvals and wake their executions
+        'expire-approvals': {
+            'task': 'worker.expire_approvals',
+            'schedule': settings.approval_expiry_sweep_interval_seconds,
+        },
+        # Pre-create next months' partitions and archive/drop expired ones
+        'partition-maintenance': {
+            'task': 'worker.partition_maintenance',
+            'schedule': crontab(hour=3, minute=15),
+        },
+    },
 )
 
+
+
+@worker_shutdown.connect
+def flush_memory_writes(**kwargs):
+    """Persist buffered agent memory writes before the worker exits"""
+    drain_memory_buffer()
+
+
 if __name__ == '__main__':
     celery_app.start()
@@ -0,0 +1,64 @@
+"""
+Celery tasks for database maintenance
+"""
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+from worker.app.celery_app import celery_app
+from backend.shared.database import engine
+from backend.shared.metrics import get_counter
+from backend.shared.partitioning import run_maintenance
+from worker.app.approval_listener import expire_overdue_approvals, notify_pending_approvals
+
+
+@celery_app.task(name='worker.partition_maintenance', time_limit=4 * 60 * 60, soft_time_limit=4 * 60 * 60 - 300)
+def partition_maintenance():
+    """
+    Create upcoming monthly partitions and archive/drop expired ones
+
+    Expired data leaves by dropping whole partitions, so there are no bulk
+    DELETEs holding locks on the primary or leaving dead rows to vacuum.
+    """
+    return run_maintenance(engine)
+
+
+@celery_app.task(name='worker.expire_approvals')
+def expire_approvals():
+    """
+    Expire overdue pending approvals and wake their executions
+
+    Keeps the pending set (and get_pending_approvals) limited to approvals
+    that can still be decided.
+    """
+    result = expire_overdue_approvals()
+
+    counter = get_counter("approvals_expired")
+    for workflow_id, count in result["workflows"].items():
+        counter.incr(workflow_id, count)
+    counter.flush()
+
+    if result["expired"]:
+        print(f"Expired {result['expired']} approval requests in {result['batches']} batches")
+    return result
+
+
+@celery_app.task(name='worker.notify_approvals')
+def notify_approvals():
+    """
+    Notify approvers of new pending approvals on every configured channel
+
+    Runs every approval_notification_interval_seconds; approvals created in
+    between reach the same approver as one digest.
+    """
+    result = notify_pending_approvals()
+
+    counter = get_counter("approval_notifications")
+    for channel, counts in result["channels"].items():
+        counter.incr(f"{channel}:sent", counts["sent"])
+        counter.incr(f"{channel}:failed", counts["failed"])
+    counter.flush()
+
+    if result["approvals"]:
+        print(f"Sent {result['notifications']} notifications for {result['approvals']} approval requests")
+    return result
@@ -4,14 +4,19 @@ Celery tasks for workflow execution
 from celery import Task
 from datetime import datetime
 from uuid import UUID
+from typing import Optional, Any
 import sys
 import os
 import asyncio
+import importlib
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
 from worker.app.celery_app import celery_app
+from worker.app.approval_listener import suspend_execution, claim_resume, AWAITING_APPROVAL
 from backend.shared.database import get_db_context
-from backend.workflow-service.app.models.workflow import WorkflowExecution
+from backend.shared.payload_store import resolve_input_payload
+
+WorkflowExecution = importlib.import_module("backend.workflow-service.app.models.workflow").WorkflowExecution
 
 
 class WorkflowExecutionTask(Task):
@@ -36,6 +41,9 @@ class WorkflowExecutionTask(Task):
     def on_success(self, retval, task_id, args, kwargs):
         """Handle task success"""
         execution_id = kwargs.get('execution_id')
+        # Suspended runs were persisted by the task; skipped resumes changed nothing
+        if retval.get("status") in (AWAITING_APPROVAL, "skipped"):
+            return
         if execution_id:
             with get_db_context() as db:
                 execution = db.query(WorkflowExecution).filter(
@@ -63,17 +71,76 @@ def execute_workflow_task(self, execution_id: str, workflow_data: dict, input_da
     Returns:
         Dict containing execution results
     """
-    from backend.orchestration-service.app.services.orchestration_service import OrchestrationService
+    # A redelivered task (or a webhook entry queued again) finds the execution already claimed
+    if not claim_execution(execution_id):
+        return {"status": "skipped"}
 
-    # Update execution status to running
-    with get_db_context() as db:
-        execution = db.query(WorkflowExecution).filter(
-            WorkflowExecution.id == UUID(execution_id)
+    result = _run_workflow(workflow_data, input_data, user_id)
+    _record_result(execution_id, result)
+    return result
+
+
+@celery_app.task(base=WorkflowExecutionTask, bind=True, name='worker.resume_workflow')
+def resume_workflow_task(self, execution_id: str):
+    """
+    Resume an execution that was suspended for human approval
+
+    Queued by the approval listener when a decision is published. The
+    checkpoint (completed steps and decisions) comes from the database, so
+    duplicate or late wake-ups are no-ops.
+
+    Args:
+        execution_id: ID of the suspended workflow execution
+
+    Returns:
+        Dict containing execution results
+    """
+    claim = claim_resume(execution_id)
+    if claim is None:
+        return {"status": "skipped"}
+
+    result = _run_workflow(claim["workflow_data"], claim["input_data"], claim["user_id"], claim["checkpoint"])
+    result["logs"] = claim["logs"] + result.get("logs", [])
+    _record_result(execution_id, result)
+    return result
+
+
+def claim_execution(execution_id: str, engine: Optional[Any] = None) -> bool:
+    """
+    Move a pending execution to running
+
+    The conditional UPDATE lets only one delivery of the same execution run it.
+
+    Args:
+        execution_id: ID of the workflow execution record
+        engine: SQLAlchemy engine (defaults to the shared engine)
+
+    Returns:
+        True if this caller claimed the execution
+    """
+    from sqlalchemy import update
+
+    if engine is None:
+        from backend.shared.database import engine
+
+    with engine.begin() as conn:
+        claimed = conn.execute(
+            update(WorkflowExecution)
+            .where(WorkflowExecution.id == UUID(execution_id), WorkflowExecution.status == "pending")
+            .values(status="running")
+            .returning(WorkflowExecution.id)
         ).first()
+    return claimed is not None
 
-        if execution:
-            execution.status = "running"
-            db.commit()
+
+def _run_workflow(workflow_data: dict, input_data: dict, user_id: str, checkpoint: Optional[dict] = None) -> dict:
+    """Run the orchestration service on a fresh event loop"""
+    OrchestrationService = importlib.import_module(
+        "backend.orchestration-service.app.services.orchestration_service"
+    ).OrchestrationService
+
+    # Large webhook payloads are passed as S3 references
+    input_data = resolve_input_payload(input_data)
 
     # Execute workflow using orchestration service
     # Since we're in a sync context, we need to run the async function
@@ -81,28 +148,34 @@ def execute_workflow_task(self, execution_id: str, workflow_data: dict, input_da
     asyncio.set_event_loop(loop)
 
     try:
-        result = loop.run_until_complete(
+        return loop.run_until_complete(
             OrchestrationService.execute_workflow(
                 workflow_data=workflow_data,
                 input_data=input_data,
-                user_id=UUID(user_id)
+                user_id=UUID(user_id),
+                checkpoint=checkpoint
             )
         )
+    finally:
+        loop.close()
 
-        # Update execution record with logs
-        with get_db_context() as db:
-            execution = db.query(WorkflowExecution).filter(
-                WorkflowExecution.id == UUID(execution_id)
-            ).first()
 
-            if execution:
-                execution.execution_logs = result.get("logs", [])
-                db.commit()
+def _record_result(execution_id: str, result: dict):
+    """Store a run's logs, or its checkpoint and approval request if it was suspended"""
+    if result.get("status") == AWAITING_APPROVAL:
+        # The worker slot is released here; the approval listener queues the resume
+        suspend_execution(execution_id, result)
+        return
 
-        return result
+    with get_db_context() as db:
+        execution = db.query(WorkflowExecution).filter(
+            WorkflowExecution.id == UUID(execution_id)
+        ).first()
 
-    finally:
-        loop.close()
+        if execution:
+            execution.execution_logs = result.get("logs", [])
+            execution.checkpoint = None
+            db.commit()
 
 
 @celery_app.task(name='worker.health_check')
@@ -0,0 +1,361 @@
+"""
+Webhook ingest consumer - drains the webhook stream into Postgres and the worker queue
+
+Run with: python -m worker.app.webhook_ingest
+"""
+import os
+import sys
+import time
+import uuid
+import socket
+import importlib
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple, Callable
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from backend.shared.config import settings
+from backend.shared.execution_queue import enqueue_execution
+from backend.shared.webhook_stream import (
+    WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP, WEBHOOK_DEAD_LETTER_STREAM, decode_event, webhook_input
+)
+
+webhook_models = importlib.import_module("backend.workflow-service.app.models.webhook")
+workflow_models = importlib.import_module("backend.workflow-service.app.models.workflow")
+
+WebhookEndpoint = webhook_models.WebhookEndpoint
+WebhookLog = webhook_models.WebhookLog
+Workflow = workflow_models.Workflow
+WorkflowExecution = workflow_models.WorkflowExecution
+
+# Log IDs derive from stream entry IDs, so a redelivered entry is not logged or counted twice
+LOG_ID_NAMESPACE = uuid.UUID("6f1d3c2e-8a4b-4e0f-9c57-2b1e0d7a9f43")
+
+
+class WebhookIngestConsumer:
+    """
+    Consumer-group reader for the webhook ingest stream
+
+    Each batch is written with one multi-row insert for logs and executions
+    and one counter UPDATE per webhook, then accepted executions are queued
+    and the entries acknowledged. Processing is at-least-once: entries left
+    unacknowledged by a crashed consumer are claimed after an idle timeout.
+    Acknowledged entries are trimmed from the stream after each batch.
+
+    A batch whose insert fails is retried entry by entry, so one bad entry
+    does not hold back the rest; entries delivered more than max_deliveries
+    times are moved to the dead-letter stream and acknowledged.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        engine: Optional[Any] = None,
+        consumer_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        block_ms: Optional[int] = None,
+        claim_idle_ms: Optional[int] = None,
+        max_deliveries: Optional[int] = None,
+        dispatch: Callable[..., Any] = enqueue_execution
+    ):
+        """
+        Initialize webhook ingest consumer
+
+        Args:
+            redis_client: Redis client (defaults to settings.redis_url)
+            engine: SQLAlchemy engine (defaults to the shared engine)
+            consumer_name: Unique consumer name within the group
+            batch_size: Entries read per batch
+            block_ms: Time to block waiting for new entries
+            claim_idle_ms: Idle time before another consumer's entries are claimed
+            max_deliveries: Deliveries after which an entry is dead-lettered
+            dispatch: Function queuing an execution (enqueue_execution signature)
+        """
+        if redis_client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("redis package required. Install with: pip install redis")
+            redis_client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+
+        if engine is None:
+            from backend.shared.database import engine
+
+        self.redis = redis_client
+        self.engine = engine
+        self.consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size or settings.webhook_ingest_batch_size
+        self.block_ms = block_ms or settings.webhook_ingest_block_ms
+        self.claim_idle_ms = claim_idle_ms or settings.webhook_ingest_claim_idle_ms
+        self.max_deliveries = max_deliveries or settings.webhook_ingest_max_deliveries
+        self.dispatch = dispatch
+        self._claim_cursor = "0-0"
+
+    def ensure_group(self):
+        """Create the consumer group (and stream) if missing"""
+        try:
+            self.redis.xgroup_create(WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def run(self):
+        """Process entries until interrupted"""
+        self.ensure_group()
+
+        # Entries this consumer read before a restart come first
+        self._process_read(self.redis.xreadgroup(
+            WEBHOOK_CONSUMER_GROUP, self.consumer_name, {WEBHOOK_STREAM: "0"}, count=self.batch_size
+        ))
+
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                # Unacknowledged entries are retried through the idle claim
+                print(f"Webhook ingest batch failed: {e}")
+                time.sleep(1.0)
+
+    def run_once(self) -> int:
+        """Claim stale entries, then read and process one batch of new ones"""
+        claimed = self.redis.xautoclaim(
+            WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP, self.consumer_name,
+            min_idle_time=self.claim_idle_ms, start_id=self._claim_cursor, count=self.batch_size
+        )
+        self._claim_cursor = claimed[0]
+        processed = self.process(self._dead_letter_exhausted([entry for entry in claimed[1] if entry[1]]))
+
+        processed += self._process_read(self.redis.xreadgroup(
+            WEBHOOK_CONSUMER_GROUP, self.consumer_name, {WEBHOOK_STREAM: ">"},
+            count=self.batch_size, block=self.block_ms
+        ))
+        if processed:
+            self.trim()
+        return processed
+
+    def trim(self) -> int:
+        """
+        Remove acknowledged entries from the stream
+
+        Trims below the oldest pending entry, or up to the group's last
+        delivered entry when nothing is pending, so unread and
+        unacknowledged entries are always kept.
+
+        Returns:
+            Number of entries removed
+        """
+        pending = self.redis.xpending(WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP)
+        if pending["pending"]:
+            min_id = pending["min"]
+        else:
+            groups = self.redis.xinfo_groups(WEBHOOK_STREAM)
+            min_id = next(
+                (group["last-delivered-id"] for group in groups if group["name"] == WEBHOOK_CONSUMER_GROUP),
+                None
+            )
+        if not min_id or min_id == "0-0":
+            return 0
+        # Approximate trimming drops whole stream nodes, never entries at or above min_id
+        return self.redis.xtrim(WEBHOOK_STREAM, minid=min_id, approximate=True)
+
+    def _process_read(self, response) -> int:
+        return sum(self.process(entries) for _, entries in response or [])
+
+    def _dead_letter_exhausted(self, entries: List[Tuple[str, Dict[str, str]]]) -> List[Tuple[str, Dict[str, str]]]:
+        """Move claimed entries that keep failing to the dead-letter stream; returns the rest"""
+        remaining = []
+        for entry_id, fields in entries:
+            pending = self.redis.xpending_range(
+                WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP, min=entry_id, max=entry_id, count=1
+            )
+            deliveries = pending[0]["times_delivered"] if pending else 0
+            if deliveries <= self.max_deliveries:
+                remaining.append((entry_id, fields))
+                continue
+
+            print(f"Dead-lettering webhook stream entry {entry_id} after {deliveries} deliveries")
+            self.redis.xadd(
+                WEBHOOK_DEAD_LETTER_STREAM,
+                {**fields, "entry_id": entry_id, "deliveries": str(deliveries)},
+                maxlen=settings.webhook_stream_maxlen,
+                approximate=True
+            )
+            self.redis.xack(WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP, entry_id)
+        return remaining
+
+    def process(self, entries: List[Tuple[str, Dict[str, str]]]) -> int:
+        """
+        Persist and dispatch a batch of stream entries, then acknowledge them
+
+        Args:
+            entries: (entry_id, fields) pairs from the stream
+
+        Returns:
+            Number of entries acknowledged
+        """
+        if not entries:
+            return 0
+
+        events = {}
+        for entry_id, fields in entries:
+            try:
+                event = decode_event(fields)
+            except (KeyError, ValueError):
+                print(f"Skipping malformed webhook stream entry {entry_id}")
+                continue
+            event["log_id"] = uuid.uuid5(LOG_ID_NAMESPACE, entry_id)
+            events[entry_id] = event
+
+        failed = set()
+        try:
+            to_dispatch = self._persist(list(events.values())) if events else []
+        except Exception as e:
+            if len(events) == 1:
+                raise
+            # One bad entry fails the whole multi-row insert; only that entry should be retried
+            print(f"Webhook ingest batch failed, retrying entries separately: {e}")
+            to_dispatch = []
+            for entry_id, event in events.items():
+                try:
+                    to_dispatch.extend(self._persist([event]))
+                except Exception as entry_error:
+                    print(f"Webhook stream entry {entry_id} failed: {entry_error}")
+                    failed.add(entry_id)
+            if len(failed) == len(events):
+                # Nothing went through (database unavailable); back off in run()
+                raise
+
+        for execution in to_dispatch:
+            self.dispatch(
+                execution["id"],
+                execution["workflow_data"],
+                execution["input_data"],
+                execution["user_id"]
+            )
+
+        # Failed entries stay pending and come back through the idle claim
+        acknowledged = [entry_id for entry_id, _ in entries if entry_id not in failed]
+        if acknowledged:
+            self.redis.xack(WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP, *acknowledged)
+        return len(acknowledged)
+
+    def _persist(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write logs, executions and counters in one transaction; returns executions to queue"""
+        from sqlalchemy import select, update, func
+        from sqlalchemy.dialects.postgresql import insert
+
+        with self.engine.begin() as conn:
+            # Events for webhooks deleted since they were received would fail the insert on the webhook FK
+            webhook_ids = {event["webhook_id"] for event in events}
+            existing = {
+                str(webhook_id) for webhook_id in conn.execute(
+                    select(WebhookEndpoint.id)
+                    .where(WebhookEndpoint.id.in_([uuid.UUID(webhook_id) for webhook_id in webhook_ids]))
+                ).scalars()
+            }
+            if len(existing) < len(webhook_ids):
+                dropped = [event for event in events if event["webhook_id"] not in existing]
+                print(f"Dropping {len(dropped)} webhook events for deleted webhooks")
+                events = [event for event in events if event["webhook_id"] in existing]
+                if not events:
+                    return []
+
+            workflow_ids = {event["workflow_id"] for event in events if event.get("execution_id")}
+            workflows = {}
+            if workflow_ids:
+                rows = conn.execute(
+                    select(Workflow.id, Workflow.workflow_data)
+                    .where(Workflow.id.in_([uuid.UUID(workflow_id) for workflow_id in workflow_ids]))
+                )
+                workflows = {str(row.id): row.workflow_data for row in rows}
+
+            executions = []
+            logs = []
+            for event in events:
+                received_at = datetime.fromisoformat(event["received_at"])
+                execution_id = event.get("execution_id")
+                if execution_id and event["workflow_id"] not in workflows:
+                    # Workflow deleted after the webhook was accepted
+                    execution_id = None
+                    event["message"] = "Workflow not found"
+
+                if execution_id:
+                    executions.append({
+                        "id": uuid.UUID(execution_id),
+                        "workflow_id": uuid.UUID(event["workflow_id"]),
+                        "user_id": uuid.UUID(event["user_id"]),
+                        "status": "pending",
+                        "input_data": webhook_input(event["webhook_id"], event.get("body")),
+                        "execution_logs": [],
+                        "started_at": received_at
+                    })
+
+                logs.append({
+                    "id": event["log_id"],
+                    "webhook_id": uuid.UUID(event["webhook_id"]),
+                    "execution_id": uuid.UUID(execution_id) if execution_id else None,
+                    "source_ip": event.get("source_ip"),
+                    "request_headers": event.get("headers"),
+                    "request_body": event.get("body"),
+                    "request_method": event.get("method", "POST"),
+                    "status_code": event["status_code"],
+                    "response_body": {"message": event.get("message")},
+                    "error_message": None if event["status_code"] < 400 else event.get("message"),
+                    "created_at": received_at,
+                    "processing_time_ms": event.get("processing_time_ms", 0)
+                })
+
+            inserted = set(conn.execute(
+                insert(WebhookLog.__table__).values(logs)
+                .on_conflict_do_nothing(index_elements=["id", "created_at"])
+                .returning(WebhookLog.__table__.c.id)
+            ).scalars())
+
+            # Count each accepted trigger once, even if its entry is redelivered
+            counts = defaultdict(int)
+            last_triggered = {}
+            for event in events:
+                if event["log_id"] in inserted and event.get("execution_id"):
+                    counts[event["webhook_id"]] += 1
+                    last_triggered[event["webhook_id"]] = max(
+                        last_triggered.get(event["webhook_id"], event["received_at"]), event["received_at"]
+                    )
+
+            for webhook_id, count in counts.items():
+                triggered_at = datetime.fromisoformat(last_triggered[webhook_id])
+                conn.execute(
+                    update(WebhookEndpoint)
+                    .where(WebhookEndpoint.id == uuid.UUID(webhook_id))
+                    .values(
+                        trigger_count=func.coalesce(WebhookEndpoint.trigger_count, 0) + count,
+                        last_triggered_at=func.greatest(
+                            func.coalesce(WebhookEndpoint.last_triggered_at, triggered_at), triggered_at
+                        )
+                    )
+                )
+
+            if not executions:
+                return []
+
+            conn.execute(
+                insert(WorkflowExecution.__table__).values(executions)
+                .on_conflict_do_nothing(index_elements=["id", "started_at"])
+            )
+
+            # Redelivered entries are queued again only if their execution never started
+            pending = set(conn.execute(
+                select(WorkflowExecution.id).where(
+                    WorkflowExecution.id.in_([execution["id"] for execution in executions]),
+                    WorkflowExecution.status == "pending"
+                )
+            ).scalars())
+
+        return [
+            {**execution, "workflow_data": workflows[str(execution["workflow_id"])]}
+            for execution in executions
+            if execution["id"] in pending
+        ]
+
+
+if __name__ == "__main__":
+    WebhookIngestConsumer().run()
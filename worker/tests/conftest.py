@@ -0,0 +1,45 @@
+"""
+Test configuration - run from anywhere with: pytest worker/tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite engine with the workflow-service tables (Postgres types mapped to SQLite ones)"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.dialects.postgresql import JSONB, UUID
+    from sqlalchemy.ext.compiler import compiles
+    from sqlalchemy.pool import StaticPool
+
+    @compiles(JSONB, "sqlite")
+    def compile_jsonb(type_, compiler, **kw):
+        return "JSON"
+
+    @compiles(UUID, "sqlite")
+    def compile_uuid(type_, compiler, **kw):
+        return "CHAR(32)"
+
+    from sqlalchemy import event
+    from worker.app import approval_listener, webhook_ingest
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def register_functions(dbapi_connection, connection_record):
+        dbapi_connection.create_function("greatest", 2, max)
+
+    tables = [
+        approval_listener.Workflow.__table__,
+        approval_listener.WorkflowExecution.__table__,
+        approval_listener.ApprovalRequest.__table__,
+        webhook_ingest.WebhookEndpoint.__table__,
+        webhook_ingest.WebhookLog.__table__
+    ]
+    approval_listener.Workflow.metadata.create_all(engine, tables=tables)
+    return engine
@@ -0,0 +1,57 @@
+"""
+Tests for grouping and recording approval notifications
+"""
+import uuid
+from types import SimpleNamespace
+
+from backend.shared.config import settings
+from worker.app.approval_listener import group_by_approver, pending_targets, record_notification
+
+
+def approval_row(approver="alice@example.com", notification=None, approver_user_id=None):
+    return SimpleNamespace(
+        id=uuid.uuid4(), approver_user_id=approver_user_id, approver_email=approver,
+        approval_message="Send it?", approval_data={}, approval_url=None, notification_sent=notification
+    )
+
+
+def test_groups_by_approver_and_targets_in_creation_order():
+    targets = {"targets": {"email": "alice@example.com", "slack": "#ops"}}
+    rows = [approval_row(notification=targets), approval_row("bob@example.com"), approval_row(notification=targets)]
+
+    groups = group_by_approver(rows)
+
+    assert [len(group["approvals"]) for group in groups] == [2, 1]
+    assert [approval["id"] for approval in groups[0]["approvals"]] == [rows[0].id, rows[2].id]
+    assert groups[0]["approvals"][0]["approval_url"] == f"/approvals/{rows[0].id}"
+    assert groups[1]["targets"]["email"] == "bob@example.com"
+
+
+def test_retries_only_the_channels_that_failed():
+    targets = {"email": "alice@example.com", "slack": "#ops"}
+    first = record_notification(
+        {"targets": targets, "claimed_at": "t0"}, targets,
+        {"email": {"sent": True}, "slack": {"sent": False, "error": "timeout"}}, 1, "t1"
+    )
+
+    assert "sent_at" not in first and "claimed_at" not in first
+    assert pending_targets(first) == {"slack": "#ops"}
+    partially_sent = approval_row(notification=first)
+    fresh = approval_row(notification={"targets": targets})
+    assert [len(group["approvals"]) for group in group_by_approver([partially_sent, fresh])] == [1, 1]
+
+    second = record_notification(first, {"slack": "#ops"}, {"slack": {"sent": True}}, 1, "t2")
+    assert second["sent_at"] == "t2"
+    assert second["channels"]["email"]["attempts"] == 1
+    assert second["channels"]["slack"]["attempts"] == 2
+
+
+def test_a_channel_is_given_up_after_the_attempt_cap():
+    targets = {"slack": "#ops"}
+    notification = {"targets": targets}
+    for attempt in range(settings.approval_notification_max_attempts):
+        assert "sent_at" not in notification
+        notification = record_notification(notification, targets, {"slack": {"sent": False}}, 1, f"t{attempt}")
+
+    assert notification["sent_at"] == f"t{settings.approval_notification_max_attempts - 1}"
+    assert pending_targets(notification) == {}
@@ -0,0 +1,106 @@
+"""
+Tests for suspending and resuming executions on approval decisions
+"""
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, select, update
+
+from worker.app.approval_listener import (
+    suspend_execution,
+    claim_resume,
+    ApprovalRequest,
+    ApprovalStatus,
+    Workflow,
+    WorkflowExecution,
+    AWAITING_APPROVAL
+)
+
+
+def suspended_result(key="approve:abc"):
+    return {
+        "status": AWAITING_APPROVAL,
+        "approval": {"node_id": "approve", "key": key, "message": "Send it?", "data": {"request": "send the email"}, "config": {}},
+        "checkpoint": {"steps": [{"tool": "send_email", "tool_input": "hi", "output": "sent"}], "approvals": {}},
+        "logs": []
+    }
+
+
+@pytest.fixture
+def execution_id(engine):
+    workflow_id, execution_id = uuid.uuid4(), uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(insert(Workflow.__table__).values(
+            id=workflow_id, user_id=uuid.uuid4(), name="wf", workflow_data={"nodes": []}
+        ))
+        conn.execute(insert(WorkflowExecution.__table__).values(
+            id=execution_id, workflow_id=workflow_id, user_id=uuid.uuid4(), status="running",
+            input_data={"input": "go"}, execution_logs=[], started_at=datetime.utcnow()
+        ))
+    return str(execution_id)
+
+
+def decide(engine, approval_id, status):
+    with engine.begin() as conn:
+        conn.execute(update(ApprovalRequest).where(ApprovalRequest.id == approval_id).values(status=status))
+
+
+def execution_status(engine, execution_id):
+    with engine.connect() as conn:
+        return conn.execute(
+            select(WorkflowExecution.status).where(WorkflowExecution.id == uuid.UUID(execution_id))
+        ).scalar()
+
+
+def test_resume_waits_for_the_decision(engine, execution_id):
+    suspend_execution(execution_id, suspended_result(), engine=engine)
+    assert claim_resume(execution_id, engine=engine) is None
+    assert execution_status(engine, execution_id) == AWAITING_APPROVAL
+
+
+def test_decision_resumes_once_with_keyed_decision(engine, execution_id):
+    approval_id = suspend_execution(execution_id, suspended_result(), engine=engine)
+    decide(engine, approval_id, ApprovalStatus.APPROVED)
+
+    resumed = claim_resume(execution_id, engine=engine)
+    assert resumed["checkpoint"]["approvals"] == {
+        "approve:abc": {"status": "approved", "notes": None, "request": "send the email"}
+    }
+    assert "pending_approval" not in resumed["checkpoint"]
+    assert resumed["checkpoint"]["steps"][0]["tool"] == "send_email"
+    assert execution_status(engine, execution_id) == "running"
+
+    # A duplicate wake-up finds nothing to resume
+    assert claim_resume(execution_id, engine=engine) is None
+
+
+def test_forged_approval_for_the_execution_is_ignored(engine, execution_id):
+    suspend_execution(execution_id, suspended_result(), engine=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(ApprovalRequest.__table__).values(
+            id=uuid.uuid4(), execution_id=uuid.UUID(execution_id), workflow_id=uuid.uuid4(),
+            node_id="approve", status=ApprovalStatus.APPROVED, created_at=datetime.utcnow()
+        ))
+
+    assert claim_resume(execution_id, engine=engine) is None
+    assert execution_status(engine, execution_id) == AWAITING_APPROVAL
+
+
+def test_cancelled_approval_cancels_execution(engine, execution_id):
+    approval_id = suspend_execution(execution_id, suspended_result(), engine=engine)
+    decide(engine, approval_id, ApprovalStatus.CANCELLED)
+
+    assert claim_resume(execution_id, engine=engine) is None
+    assert execution_status(engine, execution_id) == "cancelled"
+
+
+def test_earlier_unused_decisions_are_kept(engine, execution_id):
+    result = suspended_result(key="approve:second")
+    result["checkpoint"]["approvals"] = {"approve:first": {"status": "approved", "notes": None}}
+    approval_id = suspend_execution(execution_id, result, engine=engine)
+    decide(engine, approval_id, ApprovalStatus.REJECTED)
+
+    approvals = claim_resume(execution_id, engine=engine)["checkpoint"]["approvals"]
+    assert approvals["approve:first"]["status"] == "approved"
+    assert approvals["approve:second"]["status"] == "rejected"
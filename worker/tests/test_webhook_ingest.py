@@ -0,0 +1,155 @@
+"""
+Tests for the webhook ingest consumer
+"""
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, select, func
+
+from backend.shared.webhook_stream import (
+    WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP, WEBHOOK_DEAD_LETTER_STREAM, encode_event
+)
+from worker.app.webhook_ingest import WebhookIngestConsumer, WebhookEndpoint, WebhookLog, Workflow, WorkflowExecution
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def webhook(engine):
+    workflow_id, webhook_id = uuid.uuid4(), uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(insert(Workflow.__table__).values(
+            id=workflow_id, user_id=uuid.uuid4(), name="wf", workflow_data={"nodes": []}
+        ))
+        conn.execute(insert(WebhookEndpoint.__table__).values(
+            id=webhook_id, workflow_id=workflow_id, user_id=uuid.uuid4(),
+            webhook_url=f"/webhooks/{webhook_id}", webhook_secret="secret", trigger_count=0
+        ))
+    return {"webhook_id": str(webhook_id), "workflow_id": str(workflow_id)}
+
+
+def make_consumer(redis_client, engine, dispatched, **kwargs):
+    consumer = WebhookIngestConsumer(
+        redis_client=redis_client, engine=engine, consumer_name="test", block_ms=1,
+        dispatch=lambda *args: dispatched.append(args), **kwargs
+    )
+    consumer.ensure_group()
+    return consumer
+
+
+def publish(redis_client, webhook, **overrides):
+    event = {
+        **webhook,
+        "user_id": str(uuid.uuid4()),
+        "execution_id": str(uuid.uuid4()),
+        "body": {"n": 1},
+        "status_code": 202,
+        "message": "Workflow triggered",
+        "received_at": datetime.utcnow().isoformat(),
+        "processing_time_ms": 1,
+        **overrides
+    }
+    return redis_client.xadd(WEBHOOK_STREAM, encode_event(event))
+
+
+def count(engine, table):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(table)).scalar()
+
+
+def test_redelivered_entries_are_logged_and_counted_once(redis_client, engine, webhook):
+    dispatched = []
+    consumer = make_consumer(redis_client, engine, dispatched)
+    publish(redis_client, webhook)
+    entries = redis_client.xreadgroup(WEBHOOK_CONSUMER_GROUP, "test", {WEBHOOK_STREAM: ">"})[0][1]
+
+    assert consumer.process(entries) == 1
+    assert consumer.process(entries) == 1
+
+    assert count(engine, WebhookLog.__table__) == 1
+    assert count(engine, WorkflowExecution.__table__) == 1
+    assert len(dispatched) == 2  # still pending, so the redelivery queues it again for the task to claim
+    with engine.connect() as conn:
+        assert conn.execute(select(WebhookEndpoint.trigger_count)).scalar() == 1
+
+
+def test_events_for_deleted_webhooks_are_dropped(redis_client, engine, webhook):
+    dispatched = []
+    consumer = make_consumer(redis_client, engine, dispatched)
+    publish(redis_client, webhook)
+    publish(redis_client, {"webhook_id": str(uuid.uuid4()), "workflow_id": webhook["workflow_id"]})
+
+    assert consumer.run_once() == 2
+
+    assert count(engine, WebhookLog.__table__) == 1
+    assert len(dispatched) == 1
+    assert redis_client.xpending(WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP)["pending"] == 0
+
+
+def test_a_poison_entry_is_retried_alone_then_dead_lettered(redis_client, engine, webhook):
+    dispatched = []
+    consumer = make_consumer(redis_client, engine, dispatched, claim_idle_ms=1, max_deliveries=2)
+    publish(redis_client, webhook)
+    poison_id = publish(redis_client, webhook, received_at="not a timestamp")
+
+    assert consumer.run_once() == 1
+    assert len(dispatched) == 1
+
+    for _ in range(3):
+        consumer._claim_cursor = "0-0"
+        redis_client.xclaim(WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP, "test", 0, [poison_id], idle=10)
+        consumer.run_once()
+
+    assert redis_client.xpending(WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP)["pending"] == 0
+    dead = redis_client.xrange(WEBHOOK_DEAD_LETTER_STREAM)
+    assert [fields["entry_id"] for _, fields in dead] == [poison_id]
+    assert count(engine, WebhookLog.__table__) == 1
+
+
+def test_a_batch_that_fails_entirely_is_left_pending(redis_client, engine, webhook):
+    consumer = make_consumer(redis_client, engine, [])
+    publish(redis_client, webhook, received_at="bad")
+    publish(redis_client, webhook, received_at="also bad")
+
+    with pytest.raises(ValueError):
+        consumer.run_once()
+
+    assert redis_client.xpending(WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP)["pending"] == 2
+
+
+@pytest.fixture
+def single_entry_nodes(redis_client):
+    # Approximate trimming works a stream node at a time
+    redis_client.config_set("stream-node-max-entries", 1)
+
+
+@pytest.mark.usefixtures("single_entry_nodes")
+def test_trim_keeps_pending_and_unread_entries(redis_client, engine, webhook):
+    consumer = make_consumer(redis_client, engine, [], batch_size=2)
+    ids = [publish(redis_client, webhook) for _ in range(4)]
+    first, second = redis_client.xreadgroup(WEBHOOK_CONSUMER_GROUP, "other", {WEBHOOK_STREAM: ">"}, count=2)[0][1]
+    redis_client.xack(WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP, first[0])
+
+    assert consumer.trim() == 1
+    assert [entry_id for entry_id, _ in redis_client.xrange(WEBHOOK_STREAM)] == ids[1:]
+
+    redis_client.xack(WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP, second[0])
+    assert consumer.trim() == 0  # ids[1] was the last delivered entry; ids[2:] are unread
+    assert [entry_id for entry_id, _ in redis_client.xrange(WEBHOOK_STREAM)] == ids[1:]
+
+
+@pytest.mark.usefixtures("single_entry_nodes")
+def test_processed_entries_are_trimmed(redis_client, engine, webhook):
+    consumer = make_consumer(redis_client, engine, [])
+    publish(redis_client, webhook)
+    last_id = publish(redis_client, webhook)
+
+    assert consumer.run_once() == 2
+
+    assert [entry_id for entry_id, _ in redis_client.xrange(WEBHOOK_STREAM)] == [last_id]
@@ -0,0 +1,34 @@
+"""
+Tests for claiming executions in the workflow tasks
+"""
+import uuid
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+from worker.app.tasks.workflow_tasks import claim_execution, WorkflowExecution
+
+
+def create_execution(engine, status):
+    execution_id = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(insert(WorkflowExecution.__table__).values(
+            id=execution_id, workflow_id=uuid.uuid4(), user_id=uuid.uuid4(), status=status,
+            input_data={"input": "go"}, execution_logs=[], started_at=datetime.utcnow()
+        ))
+    return str(execution_id)
+
+
+def test_a_pending_execution_is_claimed_once(engine):
+    execution_id = create_execution(engine, "pending")
+
+    assert claim_execution(execution_id, engine=engine) is True
+    assert claim_execution(execution_id, engine=engine) is False
+
+    with engine.connect() as conn:
+        assert conn.execute(select(WorkflowExecution.status)).scalar() == "running"
+
+
+def test_finished_executions_are_not_claimed(engine):
+    assert claim_execution(create_execution(engine, "completed"), engine=engine) is False
+    assert claim_execution(str(uuid.uuid4()), engine=engine) is False